@@ -19,6 +19,7 @@ import cloudinary
 import cloudinary.uploader
 import cloudinary.api
 import os
+import tempfile
 
 load_dotenv()
 
@@ -61,10 +62,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'baseapp.middleware.RequestMetricsMiddleware',
     'baseapp.middleware.SecurityMiddleware',
     'baseapp.middleware.SecurityHeadersMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'baseapp.middleware.AsyncWhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -93,6 +95,9 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'FrontLWAA.wsgi.application'
 
+# Served by gunicorn with uvicorn workers (see Procfile)
+ASGI_APPLICATION = 'FrontLWAA.asgi.application'
+
 database_url = os.environ.get('JAWSDB_URL')
 
 if database_url:
@@ -164,6 +169,16 @@ EMAIL_HOST_USER = 'apikey'
 EMAIL_HOST_PASSWORD = os.environ.get('SENDGRID_API_KEY')
 DEFAULT_FROM_EMAIL = 'info@workforcecompass.com'
 
+# Email outbox (sent by the dispatch_outbox worker)
+# Send rate is messages per second; size it and the burst to the SendGrid plan
+OUTBOX_SEND_RATE = float(os.environ.get('OUTBOX_SEND_RATE', 5))
+OUTBOX_BURST = int(os.environ.get('OUTBOX_BURST', 20))
+OUTBOX_CONCURRENCY = int(os.environ.get('OUTBOX_CONCURRENCY', 4))
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', 8))
+OUTBOX_RETRY_BASE_SECONDS = int(os.environ.get('OUTBOX_RETRY_BASE_SECONDS', 30))
+OUTBOX_RETRY_MAX_SECONDS = int(os.environ.get('OUTBOX_RETRY_MAX_SECONDS', 3600))
+OUTBOX_RETENTION_DAYS = int(os.environ.get('OUTBOX_RETENTION_DAYS', 14))
+
 X_FRAME_OPTIONS = 'SAMEORIGIN'
 
 # Cloudinary configuration
@@ -258,14 +273,70 @@ WEBPACK_LOADER = {
     }
 }
 
+# The shared-memory cache needs fcntl; a single-process dev server on
+# Windows does the same job with a local memory cache
+HOST_CACHE_BACKEND = (
+    'django.core.cache.backends.locmem.LocMemCache' if os.name == 'nt'
+    else 'baseapp.cache_backends.SharedMemoryCache'
+)
+# Private (0700) directory of the shared-memory cache files; their values
+# are unpickled, so the directory must not be writable by other users
+HOST_CACHE_DIR = os.environ.get(
+    'HOST_CACHE_DIR',
+    os.path.join(tempfile.gettempdir(), f'frontlwaa-cache-{os.getuid()}' if hasattr(os, 'getuid') else 'frontlwaa-cache')
+)
+
 # Simple database caching configuration - no additional add-ons needed
+# Each worker keeps hot entries in memory (L1) in front of the shared
+# database cache (L2); see baseapp/cache_backends.py
 CACHES = {
     'default': {
+        'BACKEND': 'baseapp.cache_backends.TieredCache',
+        'LOCATION': 'tiered-default',
+        'OPTIONS': {
+            'L2': 'shared',
+            'L1_MAX_ENTRIES': int(os.environ.get('CACHE_L1_MAX_ENTRIES', 1000)),
+            # Longest a worker may serve an entry another worker has changed
+            'L1_TIMEOUT': float(os.environ.get('CACHE_L1_TIMEOUT', 2)),
+            'L1_MAX_VALUE_BYTES': 512 * 1024,
+            # In-progress flags, ETag stamps and recompute locks must be exact across workers
+            'L2_ONLY_PREFIXES': ('assessment_report_', 'data_version_', 'recompute_'),
+        },
+    },
+    'shared': {
         'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
         'LOCATION': 'django_cache_table',
-    }
+    },
+    # Shared by the worker processes of one host (dyno) through a
+    # memory-mapped file; not shared between dynos
+    'host': {
+        'BACKEND': HOST_CACHE_BACKEND,
+        'LOCATION': os.path.join(HOST_CACHE_DIR, 'host'),
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+            'MAX_SIZE': int(os.environ.get('HOST_CACHE_MAX_SIZE', 32 * 1024 * 1024)),
+        },
+    },
+    # Suspicious request counts per IP. Kept apart so a scanning flood
+    # only culls its own entries; one 1 MB page holds about 16k IPs.
+    'ip_reputation': {
+        'BACKEND': HOST_CACHE_BACKEND,
+        'LOCATION': os.path.join(HOST_CACHE_DIR, 'ip-reputation'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+            'SLOTS': 16384,
+            'MAX_SIZE': 1024 * 1024,
+        },
+    },
 }
 
+SECURITY_IP_TRACKER_CACHE = 'ip_reputation'
+
+# Rate limit counters need an atomic incr(), which the database cache lacks.
+# They are per host, so with several web dynos each one enforces the limits.
+RATE_LIMIT_CACHE = 'host'
+
 # Cache timeout for benchmark results (24 hours by default)
 BENCHMARK_CACHE_TIMEOUT = int(os.environ.get('BENCHMARK_CACHE_TIMEOUT', 86400))
 
@@ -277,5 +348,32 @@ BENCHMARK_CACHE_TIMEOUT = int(os.environ.get('BENCHMARK_CACHE_TIMEOUT', 86400))
 REPORT_CACHE_TIMEOUT = int(os.environ.get('REPORT_CACHE_TIMEOUT', 86400))       # 24 hours
 LOGO_CACHE_TIMEOUT = int(os.environ.get('LOGO_CACHE_TIMEOUT', 604800))  
 
+# Reports are rendered in a child process of the web worker (see
+# baseapp/pdf_renderer.py). The timeout stays under gunicorn's 30 seconds;
+# the memory limit caps the child's address space, which runs well above
+# its RSS. Windows has no resource limits, so it renders in-process.
+PDF_RENDER_ISOLATED = os.name != 'nt'
+PDF_RENDER_TIMEOUT = int(os.environ.get('PDF_RENDER_TIMEOUT', 25))
+PDF_RENDER_MAX_MEMORY_MB = int(os.environ.get('PDF_RENDER_MAX_MEMORY_MB', 1024))
+PDF_RENDER_MAX_RSS_MB = int(os.environ.get('PDF_RENDER_MAX_RSS_MB', 256))
+PDF_RENDER_MAX_RENDERS = int(os.environ.get('PDF_RENDER_MAX_RENDERS', 100))
+
+# Per-view request statistics (baseapp/request_metrics.py): the admin
+# request-metrics endpoint covers the last REQUEST_METRICS_WINDOWS windows
+# of REQUEST_METRICS_WINDOW_SECONDS, per worker process
+REQUEST_METRICS_WINDOW_SECONDS = int(os.environ.get('REQUEST_METRICS_WINDOW_SECONDS', 60))
+REQUEST_METRICS_WINDOWS = int(os.environ.get('REQUEST_METRICS_WINDOWS', 15))
+
+# Add time, query and cache counts to every response as a Server-Timing
+# header. Off unless enabled: it exposes backend internals to every visitor.
+SERVER_TIMING_HEADER = os.environ.get('SERVER_TIMING_HEADER', '').lower() in ('1', 'true', 'yes')
+
+# Days of delta-sync change log kept by the prune_change_log command
+CHANGE_LOG_RETENTION_DAYS = int(os.environ.get('CHANGE_LOG_RETENTION_DAYS', 7))
+
+# Seconds a change log entry waits before the change feed returns it, so a
+# cursor never skips an id whose transaction has not committed yet
+CHANGE_FEED_SETTLE_SECONDS = int(os.environ.get('CHANGE_FEED_SETTLE_SECONDS', 5))
+
 # Call django_heroku settings with staticfiles=False
 django_heroku.settings(locals(), staticfiles=False)
\ No newline at end of file
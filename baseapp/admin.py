@@ -6,7 +6,8 @@ from .models import (
     Assessment, 
     AssessmentResponse, 
     QuestionResponse, 
-    CustomUser
+    CustomUser,
+    OutboxMessage
 )
 
 @admin.register(Attribute)
@@ -53,6 +54,20 @@ class AssessmentResponseAdmin(admin.ModelAdmin):
     get_assessment_position.short_description = 'Position'
     get_assessment_position.admin_order_field = 'assessment__position'
 
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ('category', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at', 'created_at')
+    list_filter = ('status', 'category')
+    search_fields = ('subject', 'to', 'last_error')
+    raw_id_fields = ('business', 'assessment')
+    actions = ['retry_now']
+
+    @admin.action(description='Retry selected messages now')
+    def retry_now(self, request, queryset):
+        from django.utils import timezone
+        updated = queryset.exclude(status='sent').update(status='pending', attempts=0, next_attempt_at=timezone.now())
+        self.message_user(request, f'{updated} messages queued for retry')
+
 @admin.register(QuestionResponse)
 class QuestionResponseAdmin(admin.ModelAdmin):
     list_display = (
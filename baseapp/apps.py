@@ -2,4 +2,11 @@ from django.apps import AppConfig
 
 class BaseappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'baseapp'
\ No newline at end of file
+    name = 'baseapp'
+
+    def ready(self):
+        # Connects the query timer before any database connection is opened
+        from . import request_metrics
+        # Signal receivers keeping counters, the change log, ETag versions and
+        # the manager directory current; commands and the shell write rows too
+        from . import stats, change_feed, data_versions, manager_directory
@@ -0,0 +1,317 @@
+"""
+Benchmark batch file ingestion.
+
+A BenchmarkBatch stores an uploaded roster file. The
+process_benchmark_batches command reads it in chunks (pandas chunksize for
+CSV, openpyxl's read-only row stream for XLSX), validates each chunk's
+name/email rows and bulk-creates benchmark assessments linked to the batch,
+recording progress on the batch after every chunk. Only one chunk of rows
+is ever held as Python objects, so 20k-employee rosters load in constant
+memory.
+
+A batch being processed holds a lease that every chunk renews. When the
+worker dies mid-file (a dyno restart or deploy), the lease runs out and
+the next poll reclaims the batch; reprocessing skips rows already loaded.
+Every write to the batch checks the heartbeat is still the one this worker
+last wrote, so a worker that stalled past its lease stops at its next chunk
+instead of racing the one that reclaimed the batch.
+"""
+import secrets
+import logging
+from datetime import timedelta
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from .models import Assessment, BenchmarkBatch
+from .bulk_tracking import refresh_after_bulk_write
+
+logger = logging.getLogger(__name__)
+
+# Rows read, validated and inserted together
+INGEST_CHUNK_SIZE = 1000
+
+# Rejected rows kept on the batch for display
+MAX_STORED_ROW_ERRORS = 100
+
+REQUIRED_COLUMNS = ('name', 'email')
+
+# How long a processing batch stays reserved without a heartbeat. Every
+# chunk renews it, so this only needs to exceed the time one chunk takes.
+BATCH_LEASE_SECONDS = 300
+
+
+class BatchIngestError(Exception):
+    """The batch file cannot be read"""
+
+
+class BatchLeaseLost(Exception):
+    """Another worker reclaimed the batch"""
+
+
+def _column_positions(headers):
+    headers = [str(header or '').strip().lower() for header in headers]
+    missing = [column for column in REQUIRED_COLUMNS if column not in headers]
+    if missing:
+        raise BatchIngestError(f'Missing required columns: {", ".join(missing)}')
+    return {
+        column: headers.index(column)
+        for column in REQUIRED_COLUMNS + ('region',)
+        if column in headers
+    }
+
+
+def _cell(values, position):
+    if position is None or position >= len(values) or values[position] is None:
+        return ''
+    return str(values[position]).strip()
+
+
+def _csv_chunks(f, chunk_size):
+    import pandas as pd
+
+    options = {'dtype': str, 'keep_default_na': False, 'encoding': 'utf-8-sig'}
+    try:
+        # Read the header on its own so a header-only file still reports missing columns
+        positions = _column_positions(pd.read_csv(f, nrows=0, **options).columns)
+        f.seek(0)
+        reader = pd.read_csv(f, chunksize=chunk_size, **options)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise BatchIngestError(f'Could not read the CSV file: {e}')
+
+    with reader:
+        for frame in reader:
+            yield positions, frame.itertuples(index=False, name=None)
+
+
+def _xlsx_chunks(f, chunk_size):
+    from openpyxl import load_workbook
+
+    try:
+        workbook = load_workbook(f, read_only=True, data_only=True)
+    except Exception as e:
+        raise BatchIngestError(f'Could not read the spreadsheet: {e}')
+
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        positions = _column_positions(next(rows, ()))
+        chunk = []
+        for values in rows:
+            chunk.append(values)
+            if len(chunk) >= chunk_size:
+                yield positions, chunk
+                chunk = []
+        if chunk:
+            yield positions, chunk
+    finally:
+        workbook.close()
+
+
+def iter_roster_chunks(f, file_name, chunk_size=INGEST_CHUNK_SIZE):
+    """
+    Yield lists of (name, email, region) tuples read from a roster file.
+
+    Raises:
+        BatchIngestError: Unsupported format, unreadable file or missing columns
+    """
+    name = file_name.lower()
+    if name.endswith('.csv'):
+        chunks = _csv_chunks(f, chunk_size)
+    elif name.endswith('.xlsx'):
+        chunks = _xlsx_chunks(f, chunk_size)
+    else:
+        # .xls can only be parsed whole (and needs xlrd), which is what this avoids
+        raise BatchIngestError('Unsupported file type; upload a .csv or .xlsx file')
+
+    for positions, rows in chunks:
+        region_position = positions.get('region')
+        yield [
+            (_cell(values, positions['name']), _cell(values, positions['email']), _cell(values, region_position))
+            for values in rows
+        ]
+
+
+def _claimable():
+    """Pending batches, and processing ones whose worker stopped renewing the lease"""
+    stale_before = timezone.now() - timedelta(seconds=BATCH_LEASE_SECONDS)
+    return Q(status='pending') | Q(status='processing') & (
+        Q(heartbeat_at__lt=stale_before) | Q(heartbeat_at__isnull=True)
+    )
+
+
+def claimable_batch_ids():
+    """Ids of the batches a worker may claim, oldest upload first"""
+    return list(BenchmarkBatch.objects.filter(_claimable()).order_by('created_at').values_list('id', flat=True))
+
+
+def claim_batch(batch_id):
+    """Move a claimable batch to processing; False when another worker has it"""
+    return BenchmarkBatch.objects.filter(_claimable(), id=batch_id).update(
+        status='processing',
+        heartbeat_at=timezone.now()
+    ) == 1
+
+
+def _renew_lease(batch, **updates):
+    """
+    Apply updates to the batch and renew its lease, but only while this
+    worker holds it: the batch is processing and its heartbeat is the one
+    this worker last wrote.
+
+    Raises:
+        BatchLeaseLost: Another worker reclaimed the batch
+    """
+    now = timezone.now()
+    updated = BenchmarkBatch.objects.filter(
+        id=batch.id,
+        status='processing',
+        heartbeat_at=batch.heartbeat_at
+    ).update(heartbeat_at=now, **updates)
+    if not updated:
+        raise BatchLeaseLost(f'Benchmark batch {batch.id} was reclaimed by another worker')
+    batch.heartbeat_at = now
+
+
+def _record_progress(batch, processed, created, skipped, new_errors):
+    updates = {
+        'rows_processed': F('rows_processed') + processed,
+        'rows_created': F('rows_created') + created,
+        'rows_skipped': F('rows_skipped') + skipped,
+    }
+    room = MAX_STORED_ROW_ERRORS - len(batch.row_errors)
+    row_errors = batch.row_errors
+    if new_errors and room > 0:
+        row_errors = row_errors + new_errors[:room]
+        updates['row_errors'] = row_errors
+    _renew_lease(batch, **updates)
+
+    batch.row_errors = row_errors
+    batch.rows_processed += processed
+    batch.rows_created += created
+    batch.rows_skipped += skipped
+
+
+def ingest_benchmark_batch(batch, chunk_size=INGEST_CHUNK_SIZE, progress=None):
+    """
+    Load a batch's roster file into benchmark assessments.
+
+    Addresses already on the business's benchmark roster are skipped, so a
+    batch that failed part way can be reprocessed safely.
+
+    If another worker reclaims the batch, this one stops at its next write
+    and returns the batch still processing, leaving it to the new owner.
+
+    Args:
+        batch: BenchmarkBatch in the processing state, as loaded after claiming it
+        chunk_size: Rows per chunk
+        progress: Optional callback called with the batch after each chunk
+    """
+    business_id = batch.business_id
+    creator = batch.created_by
+    manager_name = creator.get_full_name() or creator.username
+
+    try:
+        _renew_lease(batch, rows_processed=0, rows_created=0, rows_skipped=0, row_errors=[], error='')
+    except BatchLeaseLost as e:
+        logger.warning(str(e))
+        return batch
+    batch.rows_processed = batch.rows_created = batch.rows_skipped = 0
+    batch.row_errors = []
+
+    # Lower-cased address -> batch id only, so this stays small even for large rosters
+    known_emails = {
+        email.lower(): batch_id for email, batch_id in Assessment.objects.filter(
+            business_id=business_id,
+            assessment_type='benchmark'
+        ).values_list('candidate_email', 'benchmark_batch_id')
+    }
+
+    row_number = 1  # The header
+    try:
+        with batch.data_file.open('rb') as f:
+            for chunk in iter_roster_chunks(f, batch.data_file.name, chunk_size):
+                new_assessments = []
+                errors = []
+                skipped = 0
+                loaded_before = 0
+
+                for name, email, region in chunk:
+                    row_number += 1
+                    if not name and not email:
+                        skipped += 1
+                        continue
+
+                    problems = []
+                    if not name:
+                        problems.append('name is required')
+                    try:
+                        validate_email(email)
+                    except ValidationError:
+                        problems.append(f'{email or "(blank)"} is not a valid email address')
+                    if problems:
+                        errors.append({'row': row_number, 'errors': problems})
+                        skipped += 1
+                        continue
+
+                    if email.lower() in known_emails:
+                        # Rows an earlier run of this batch loaded still count as created
+                        if known_emails[email.lower()] == batch.id:
+                            loaded_before += 1
+                            known_emails[email.lower()] = None
+                        else:
+                            skipped += 1
+                        continue
+                    known_emails[email.lower()] = None
+
+                    # bulk_create skips Assessment.save(), so set the link here
+                    new_assessments.append(Assessment(
+                        business_id=business_id,
+                        assessment_type='benchmark',
+                        benchmark_batch=batch,
+                        candidate_name=name[:255],
+                        candidate_email=email,
+                        region=region[:100] or 'Default',
+                        position='Benchmark Assessment',
+                        manager_name=manager_name,
+                        manager_email=creator.email,
+                        created_by=creator,
+                        unique_link=secrets.token_hex(32),
+                        email_sent=False
+                    ))
+
+                # A lost lease rolls the chunk back; the new owner loads it
+                with transaction.atomic():
+                    Assessment.objects.bulk_create(new_assessments)
+                    _record_progress(batch, len(chunk), len(new_assessments) + loaded_before, skipped, errors)
+
+                if progress:
+                    progress(batch)
+    except BatchLeaseLost as e:
+        logger.warning(str(e))
+        return batch
+    except Exception as e:
+        message = str(e) if isinstance(e, BatchIngestError) else f'Unexpected error: {e}'
+        logger.error(f"Benchmark batch {batch.id} failed at row {row_number}: {e}", exc_info=not isinstance(e, BatchIngestError))
+        try:
+            _renew_lease(batch, status='failed', error=message)
+        except BatchLeaseLost as lost:
+            logger.warning(str(lost))
+            return batch
+        batch.status, batch.error = 'failed', message
+        if batch.rows_created:
+            refresh_after_bulk_write('assessments', business_id)
+        return batch
+
+    now = timezone.now()
+    try:
+        _renew_lease(batch, status='done', processed=True, processed_at=now)
+    except BatchLeaseLost as e:
+        logger.warning(str(e))
+        return batch
+    batch.status, batch.processed, batch.processed_at = 'done', True, now
+
+    # bulk_create sends no signals; this also recomputes the batch's stats row
+    refresh_after_bulk_write('assessments', business_id)
+    logger.info(f"Benchmark batch {batch.id}: {batch.rows_created} assessments created, {batch.rows_skipped} rows skipped")
+    return batch
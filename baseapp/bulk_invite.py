@@ -0,0 +1,237 @@
+"""
+Bulk candidate invitations from a CSV or XLSX roster.
+
+Every row is validated before anything is written. The assessments are then
+inserted with bulk_create using links generated up front, their manager
+links go in through the M2M through model in one statement, and the
+invitation emails are queued in the same transaction.
+"""
+import csv
+import logging
+import secrets
+from io import StringIO
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from .models import Assessment, OutboxMessage
+from .email_templates import get_email_renderer, assessment_email_context
+from .bulk_tracking import refresh_after_bulk_write
+from .manager_directory import get_manager_directory
+
+logger = logging.getLogger(__name__)
+
+# Largest roster accepted in one upload
+MAX_INVITE_ROWS = 2000
+
+# Rows per INSERT statement
+INVITE_BATCH_SIZE = 500
+
+REQUIRED_COLUMNS = ('candidate_name', 'candidate_email', 'position', 'region')
+OPTIONAL_COLUMNS = ('manager_name', 'manager_email')
+
+
+class RosterError(Exception):
+    """The uploaded file cannot be read as a roster"""
+
+
+def _normalize_header(value):
+    return str(value or '').strip().lower().replace(' ', '_')
+
+
+def read_roster(uploaded_file):
+    """
+    Read a CSV or XLSX upload into a list of row dicts keyed by column name.
+
+    Raises:
+        RosterError: Unsupported file type, unreadable file or missing columns
+    """
+    name = uploaded_file.name.lower()
+
+    if name.endswith('.csv'):
+        try:
+            text = uploaded_file.read().decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise RosterError('CSV files must be UTF-8 encoded')
+        reader = csv.reader(StringIO(text))
+        table = list(reader)
+    elif name.endswith('.xlsx'):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise RosterError('XLSX uploads are not available on this server; upload a CSV instead')
+        try:
+            workbook = load_workbook(uploaded_file, read_only=True, data_only=True)
+        except Exception as e:
+            raise RosterError(f'Could not read the spreadsheet: {e}')
+        table = [list(row) for row in workbook.active.iter_rows(values_only=True)]
+        workbook.close()
+    else:
+        raise RosterError('Upload a .csv or .xlsx file')
+
+    if not table:
+        raise RosterError('The file is empty')
+
+    headers = [_normalize_header(value) for value in table[0]]
+    missing = [column for column in REQUIRED_COLUMNS if column not in headers]
+    if missing:
+        raise RosterError(f'Missing required columns: {", ".join(missing)}')
+
+    rows = []
+    for values in table[1:]:
+        row = {
+            header: str(value).strip() if value is not None else ''
+            for header, value in zip(headers, values)
+            if header in REQUIRED_COLUMNS or header in OPTIONAL_COLUMNS
+        }
+        # Skip blank lines
+        if any(row.values()):
+            rows.append(row)
+
+    if len(rows) > MAX_INVITE_ROWS:
+        raise RosterError(f'A roster can have at most {MAX_INVITE_ROWS} candidates')
+
+    return rows
+
+
+def validate_roster(business, rows):
+    """
+    Check every row and resolve its managers.
+
+    Returns:
+        (candidates, errors): candidates is a list of dicts ready for
+        invite_candidates(); errors is a list of {'row', 'errors'} dicts
+        using spreadsheet row numbers (header is row 1).
+    """
+    directory = get_manager_directory(business.id)
+    default_managers = directory.defaults
+
+    candidates = []
+    errors = []
+    seen_emails = set()
+
+    for index, row in enumerate(rows, start=2):
+        row_errors = []
+
+        for column in REQUIRED_COLUMNS:
+            if not row.get(column):
+                row_errors.append(f'{column} is required')
+
+        email = row.get('candidate_email', '')
+        if email:
+            try:
+                validate_email(email)
+            except ValidationError:
+                row_errors.append(f'{email} is not a valid email address')
+            if email.lower() in seen_emails:
+                row_errors.append(f'{email} appears more than once in the file')
+            seen_emails.add(email.lower())
+
+        for column, limit in (('candidate_name', 255), ('position', 255), ('region', 100)):
+            if len(row.get(column, '')) > limit:
+                row_errors.append(f'{column} is longer than {limit} characters')
+
+        # Primary manager: a listed manager, else the given contact, else the first default
+        manager_email = row.get('manager_email', '')
+        primary = directory.find_by_email(manager_email) if manager_email else None
+        manager_ids = {manager.id for manager in default_managers}
+        if primary:
+            manager_name, manager_email = primary.name, primary.email
+            manager_ids.add(primary.id)
+        elif manager_email:
+            manager_name = row.get('manager_name') or manager_email.split('@')[0]
+            try:
+                validate_email(manager_email)
+            except ValidationError:
+                row_errors.append(f'{manager_email} is not a valid manager email address')
+        elif default_managers:
+            manager_name, manager_email = default_managers[0].name, default_managers[0].email
+        else:
+            row_errors.append('manager_email is required because the business has no default managers')
+
+        if row_errors:
+            errors.append({'row': index, 'errors': row_errors})
+            continue
+
+        candidates.append({
+            'candidate_name': row['candidate_name'],
+            'candidate_email': email,
+            'position': row['position'],
+            'region': row['region'],
+            'manager_name': manager_name,
+            'manager_email': manager_email,
+            'manager_ids': manager_ids,
+        })
+
+    return candidates, errors
+
+
+def invite_candidates(business, created_by, candidates, link_for):
+    """
+    Create standard assessments for validated candidates and queue their invitations.
+
+    Args:
+        business: Business the candidates belong to
+        created_by: User recorded as the creator
+        candidates: Output of validate_roster()
+        link_for: Function turning a unique_link into an absolute assessment URL
+
+    Returns:
+        List of created Assessment objects (with ids)
+    """
+    assessments = []
+    for candidate in candidates:
+        assessments.append(Assessment(
+            business=business,
+            assessment_type='standard',
+            candidate_name=candidate['candidate_name'],
+            candidate_email=candidate['candidate_email'],
+            position=candidate['position'],
+            region=candidate['region'],
+            manager_name=candidate['manager_name'],
+            manager_email=candidate['manager_email'],
+            created_by=created_by,
+            # Links are generated now so the rows can be found again after
+            # bulk_create on databases that do not return primary keys
+            unique_link=secrets.token_hex(32)
+        ))
+
+    renderer = get_email_renderer(business.id, 'standard')
+    contexts = [
+        assessment_email_context(assessment, link_for(assessment.unique_link), business.name)
+        for assessment in assessments
+    ]
+    rendered = renderer.render_many(contexts)
+
+    Through = Assessment.managers.through
+    with transaction.atomic():
+        Assessment.objects.bulk_create(assessments, batch_size=INVITE_BATCH_SIZE)
+
+        ids_by_link = dict(Assessment.objects.filter(
+            unique_link__in=[assessment.unique_link for assessment in assessments]
+        ).values_list('unique_link', 'id'))
+        for assessment in assessments:
+            assessment.id = ids_by_link[assessment.unique_link]
+
+        Through.objects.bulk_create([
+            Through(assessment_id=assessment.id, manager_id=manager_id)
+            for assessment, candidate in zip(assessments, candidates)
+            for manager_id in candidate['manager_ids']
+        ], batch_size=INVITE_BATCH_SIZE)
+
+        OutboxMessage.objects.bulk_create([
+            OutboxMessage(
+                business=business,
+                assessment_id=assessment.id,
+                category='invitation',
+                subject=subject,
+                body=body,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[assessment.candidate_email]
+            )
+            for assessment, (subject, body) in zip(assessments, rendered)
+        ], batch_size=INVITE_BATCH_SIZE)
+
+    refresh_after_bulk_write('assessments', business.id)
+    logger.info(f"Bulk invited {len(assessments)} candidates for business {business.id}")
+    return assessments
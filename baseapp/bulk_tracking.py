@@ -0,0 +1,50 @@
+"""
+Set-based writes and the per-row bookkeeping signals.
+
+data_versions, change_feed and stats react to every saved or deleted row.
+That is right for single edits but turns a 5,000 row delete into tens of
+thousands of extra queries. Wrap such writes in suspend_row_tracking() and
+call refresh_after_bulk_write() once afterwards instead.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_row_tracking_suspended = ContextVar('row_tracking_suspended', default=False)
+
+
+def row_tracking_suspended():
+    """True while a bulk write has switched off the per-row receivers"""
+    return _row_tracking_suspended.get()
+
+
+@contextmanager
+def suspend_row_tracking():
+    token = _row_tracking_suspended.set(True)
+    try:
+        yield
+    finally:
+        _row_tracking_suspended.reset(token)
+
+
+def refresh_after_bulk_write(collection, business_id):
+    """
+    Do once what the per-row receivers would have done for a bulk write.
+
+    Args:
+        collection: Change feed collection / data version scope that changed
+        business_id: Business owning the rows
+    """
+    # Imported here because those modules import row_tracking_suspended from this one
+    from .data_versions import bump_data_version
+    from .change_feed import record_bulk_change
+    from .stats import recompute_business_stats, recompute_batch_stats
+    from .models import BenchmarkBatch
+
+    bump_data_version(collection, business_id)
+    record_bulk_change(collection, business_id)
+
+    if collection in ('assessments', 'hr_users'):
+        recompute_business_stats(business_id)
+    if collection == 'assessments':
+        for batch_id in BenchmarkBatch.objects.filter(business_id=business_id).values_list('id', flat=True):
+            recompute_batch_stats(batch_id)
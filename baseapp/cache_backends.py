@@ -0,0 +1,882 @@
+"""
+Cache backends.
+
+TieredCache puts a bounded in-process LRU (L1) in front of another
+configured cache (L2, the shared DatabaseCache). Reads served from L1 cost
+no query at all.
+
+Every value written through the tiered cache is stored in L2 together with
+a small random stamp under a companion key. An L1 entry is trusted for
+L1_TIMEOUT seconds; after that it is revalidated by reading only the stamp
+from L2, so an unchanged logo or benchmark blob is never transferred
+again, and a change made by another worker is seen within L1_TIMEOUT.
+
+Keys starting with one of L2_ONLY_PREFIXES skip L1 entirely. Use it for
+counters, locks and anything else that must be exact across workers.
+
+SharedMemoryCache keeps entries in a memory-mapped file that every worker
+process on the host maps, so the gunicorn workers of a dyno share one cache
+without an external service. The file holds a fixed-size open-addressing
+hash table and memcached-style slabs: 1 MB pages carved into chunks of one
+size class each, with a free list per class. Operations take an flock on
+the file (shared for reads, exclusive for writes), which makes add() and
+incr() atomic across processes.
+
+Values in the file are unpickled, so anyone who can write it can run code
+in the workers. The file must live in a directory only the worker user can
+enter, and a file owned by anyone else is refused.
+"""
+import hashlib
+import mmap
+import os
+import pickle
+import stat
+import struct
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache, DEFAULT_TIMEOUT
+from django.core.exceptions import ImproperlyConfigured
+from .request_metrics import count_cache_lookup
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# L1 stores shared by every thread of the process, keyed by LOCATION
+_l1_stores = {}
+_l1_stores_lock = threading.Lock()
+
+STAMP_SUFFIX = '__stamp'
+
+_MISSING = object()
+
+
+class _L1Entry:
+    __slots__ = ('pickled', 'stamp', 'fresh_until', 'expires_at')
+
+    def __init__(self, pickled, stamp, fresh_until, expires_at):
+        self.pickled = pickled
+        self.stamp = stamp
+        self.fresh_until = fresh_until
+        self.expires_at = expires_at
+
+
+class _L1Store:
+    """Thread-safe LRU of pickled values with per-tier hit/miss counters"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.counters = dict.fromkeys(
+            ('l1_hits', 'l1_misses', 'l1_revalidations', 'l1_evictions', 'l2_hits', 'l2_misses'), 0
+        )
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.counters['l1_evictions'] += 1
+
+    def discard(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def count(self, counter, amount=1):
+        with self.lock:
+            self.counters[counter] += amount
+
+
+class TieredCache(BaseCache):
+    """
+    In-process LRU (L1) in front of another cache alias (L2).
+
+    OPTIONS:
+        L2: Alias of the shared cache (default 'shared')
+        L1_MAX_ENTRIES: Entries kept per process (default 1000)
+        L1_TIMEOUT: Seconds an L1 entry is used before its stamp is rechecked (default 2)
+        L1_MAX_VALUE_BYTES: Larger pickled values are only kept in L2 (default 512 KB)
+        L2_ONLY_PREFIXES: Key prefixes that are never kept in L1
+    """
+
+    def __init__(self, location, params):
+        options = dict(params.get('OPTIONS') or {})
+        self._l2_alias = options.pop('L2', 'shared')
+        max_entries = int(options.pop('L1_MAX_ENTRIES', 1000))
+        self.l1_timeout = float(options.pop('L1_TIMEOUT', 2))
+        self.l1_max_value_bytes = int(options.pop('L1_MAX_VALUE_BYTES', 512 * 1024))
+        self.l2_only_prefixes = tuple(options.pop('L2_ONLY_PREFIXES', ()))
+        super().__init__({**params, 'OPTIONS': options})
+
+        name = location or 'tiered'
+        with _l1_stores_lock:
+            if name not in _l1_stores:
+                _l1_stores[name] = _L1Store(max_entries)
+            self._l1 = _l1_stores[name]
+
+    @property
+    def l2(self):
+        return caches[self._l2_alias]
+
+    def _l1_key(self, key, version):
+        return self.make_and_validate_key(key, version=version)
+
+    def _l2_only(self, key):
+        return key.startswith(self.l2_only_prefixes)
+
+    def _remember(self, l1_key, value, stamp, timeout):
+        if stamp is None:
+            # Written without a stamp (e.g. straight into L2), so it could not be revalidated
+            return
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        if len(pickled) > self.l1_max_value_bytes:
+            self._l1.discard(l1_key)
+            return
+
+        now = time.monotonic()
+        expires_at = float('inf') if timeout is None else now + timeout
+        self._l1.put(l1_key, _L1Entry(pickled, stamp, min(now + self.l1_timeout, expires_at), expires_at))
+
+    def _timeout(self, timeout):
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    # Reads
+
+    # Lookups count towards the request's cache hits and misses (see
+    # request_metrics); SharedMemoryCache holds counters rather than cached
+    # data, so it does not report
+
+    def get(self, key, default=None, version=None):
+        if self._l2_only(key):
+            value = self.l2.get(key, _MISSING, version=version)
+            if value is _MISSING:
+                count_cache_lookup(0, 1)
+                return default
+            count_cache_lookup(1, 0)
+            return value
+
+        l1_key = self._l1_key(key, version)
+        entry = self._l1.get(l1_key)
+        now = time.monotonic()
+
+        if entry is not None and entry.expires_at > now:
+            if entry.fresh_until > now:
+                self._l1.count('l1_hits')
+                count_cache_lookup(1, 0)
+                return pickle.loads(entry.pickled)
+
+            # Stale: one small read tells whether another worker changed it
+            if self.l2.get(key + STAMP_SUFFIX, version=version) == entry.stamp:
+                entry.fresh_until = min(now + self.l1_timeout, entry.expires_at)
+                self._l1.count('l1_revalidations')
+                count_cache_lookup(1, 0)
+                return pickle.loads(entry.pickled)
+
+        self._l1.count('l1_misses')
+        found = self.l2.get_many([key, key + STAMP_SUFFIX], version=version)
+        if key not in found:
+            self._l1.discard(l1_key)
+            self._l1.count('l2_misses')
+            count_cache_lookup(0, 1)
+            return default
+
+        self._l1.count('l2_hits')
+        count_cache_lookup(1, 0)
+        # The remaining L2 lifetime is unknown; the stamp check covers expiry
+        self._remember(l1_key, found[key], found.get(key + STAMP_SUFFIX), None)
+        return found[key]
+
+    def get_many(self, keys, version=None):
+        results = {}
+        missing = []
+        for key in keys:
+            if self._l2_only(key):
+                missing.append(key)
+                continue
+            entry = self._l1.get(self._l1_key(key, version))
+            if entry is not None and min(entry.fresh_until, entry.expires_at) > time.monotonic():
+                self._l1.count('l1_hits')
+                results[key] = pickle.loads(entry.pickled)
+            else:
+                missing.append(key)
+
+        if missing:
+            lookup = []
+            for key in missing:
+                lookup.append(key)
+                if not self._l2_only(key):
+                    lookup.append(key + STAMP_SUFFIX)
+            found = self.l2.get_many(lookup, version=version)
+
+            for key in missing:
+                if self._l2_only(key):
+                    if key in found:
+                        results[key] = found[key]
+                    continue
+                self._l1.count('l1_misses')
+                if key in found:
+                    self._l1.count('l2_hits')
+                    results[key] = found[key]
+                    self._remember(self._l1_key(key, version), found[key], found.get(key + STAMP_SUFFIX), None)
+                else:
+                    self._l1.count('l2_misses')
+                    self._l1.discard(self._l1_key(key, version))
+
+        count_cache_lookup(len(results), len(keys) - len(results))
+        return results
+
+    def has_key(self, key, version=None):
+        if self._l2_only(key):
+            return self.l2.has_key(key, version=version)
+        sentinel = object()
+        return self.get(key, sentinel, version=version) is not sentinel
+
+    # Writes
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        if self._l2_only(key):
+            self.l2.set(key, value, timeout, version=version)
+            return
+
+        timeout = self._timeout(timeout)
+        stamp = uuid.uuid4().hex[:12]
+        self.l2.set_many({key: value, key + STAMP_SUFFIX: stamp}, timeout, version=version)
+        self._remember(self._l1_key(key, version), value, stamp, timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        if self._l2_only(key):
+            return self.l2.add(key, value, timeout, version=version)
+
+        timeout = self._timeout(timeout)
+        if not self.l2.add(key, value, timeout, version=version):
+            return False
+        stamp = uuid.uuid4().hex[:12]
+        self.l2.set(key + STAMP_SUFFIX, stamp, timeout, version=version)
+        self._remember(self._l1_key(key, version), value, stamp, timeout)
+        return True
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        stamped = {}
+        stamps = {}
+        for key, value in data.items():
+            stamped[key] = value
+            if not self._l2_only(key):
+                stamps[key] = stamped[key + STAMP_SUFFIX] = uuid.uuid4().hex[:12]
+
+        failed = self.l2.set_many(stamped, timeout, version=version)
+        for key, stamp in stamps.items():
+            if key in failed:
+                self._l1.discard(self._l1_key(key, version))
+            else:
+                self._remember(self._l1_key(key, version), data[key], stamp, timeout)
+        return [key for key in failed if not key.endswith(STAMP_SUFFIX)]
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        if not self._l2_only(key):
+            self.l2.touch(key + STAMP_SUFFIX, timeout, version=version)
+            # Pick up the new expiry on the next read
+            self._l1.discard(self._l1_key(key, version))
+        return self.l2.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        if self._l2_only(key):
+            return self.l2.delete(key, version=version)
+        self._l1.discard(self._l1_key(key, version))
+        deleted = self.l2.delete(key, version=version)
+        self.l2.delete(key + STAMP_SUFFIX, version=version)
+        return deleted
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        all_keys = []
+        for key in keys:
+            all_keys.append(key)
+            if not self._l2_only(key):
+                self._l1.discard(self._l1_key(key, version))
+                all_keys.append(key + STAMP_SUFFIX)
+        self.l2.delete_many(all_keys, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        if self._l2_only(key):
+            return self.l2.incr(key, delta, version=version)
+
+        self._l1.discard(self._l1_key(key, version))
+        value = self.l2.incr(key, delta, version=version)
+        # Invalidate copies other workers hold
+        self.l2.delete(key + STAMP_SUFFIX, version=version)
+        return value
+
+    def clear(self):
+        self._l1.clear()
+        self.l2.clear()
+
+    def close(self, **kwargs):
+        self.l2.close(**kwargs)
+
+    def stats(self):
+        """Hit and miss counters of this process, per tier"""
+        with self._l1.lock:
+            return {**self._l1.counters, 'l1_entries': len(self._l1.entries)}
+
+
+# Shared-memory cache
+
+# Bump when the file layout changes; it is part of the file name
+LAYOUT_VERSION = 1
+MAGIC = b'FLWCACHE'
+SMALLEST_CHUNK = 64
+
+# Header fields, packed one after the other
+_HEADER_FIELDS = {}
+_offset = 0
+for _name, _format in (
+    ('magic', '8s'), ('pages_used', 'I'), ('count', 'I'), ('tombstones', 'I'),
+    ('seq', 'Q'), ('evictions', 'Q'),
+):
+    _HEADER_FIELDS[_name] = (_offset, struct.Struct('<' + _format))
+    _offset += _HEADER_FIELDS[_name][1].size
+HEADER_SIZE = _offset
+
+# Bucket: key hash (0 empty, 1 deleted), expiry (0 never), write sequence,
+# chunk offset, key length, value length, size class of the chunk
+BUCKET = struct.Struct('<QdQQIIB7x')
+EMPTY, DELETED = 0, 1
+POINTER = struct.Struct('<Q')
+
+# Open tables by file name, shared by every backend instance of the process
+_shared_tables = {}
+_shared_tables_lock = threading.Lock()
+
+
+def _align(value, boundary):
+    return -(-value // boundary) * boundary
+
+
+def _key_hash(key_bytes):
+    # Stable across processes, unlike hash(); 0 and 1 mark free buckets
+    return max(int.from_bytes(hashlib.blake2b(key_bytes, digest_size=8).digest(), 'little'), 2)
+
+
+class _SharedTable:
+    """
+    Hash table and slab allocator in one memory-mapped file.
+
+    Every method except lock() expects the caller to hold lock(), and the
+    exclusive one for anything that writes.
+    """
+
+    def __init__(self, path, slots, page_size, pages):
+        self.path = path
+        self.slots = slots
+        self.page_size = page_size
+        self.pages = pages
+
+        self.chunk_sizes = []
+        size = SMALLEST_CHUNK
+        while size <= page_size:
+            self.chunk_sizes.append(size)
+            size *= 2
+
+        # Size class + 1 of each page, 0 while unassigned
+        self.owners_offset = HEADER_SIZE + POINTER.size * len(self.chunk_sizes)
+        self.table_offset = _align(self.owners_offset + pages, 64)
+        self.data_offset = _align(self.table_offset + slots * BUCKET.size, mmap.PAGESIZE)
+        self.file_size = self.data_offset + pages * page_size
+
+        self.thread_lock = threading.Lock()
+        self.pid = None
+        self.fd = None
+        self.mm = None
+
+    def _open(self):
+        if self.fd is not None:
+            # Inherited from the parent process: flock() locks are shared
+            # through an inherited descriptor, so they would not exclude it
+            self.mm.close()
+            os.close(self.fd)
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+        info = os.fstat(fd)
+        if info.st_uid != os.getuid() or info.st_mode & 0o077:
+            os.close(fd)
+            raise ImproperlyConfigured(
+                f'Refusing shared cache file {self.path}: it must be owned by this user and private to it'
+            )
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(fd).st_size < self.file_size:
+                os.ftruncate(fd, self.file_size)
+            mm = mmap.mmap(fd, self.file_size)
+            if mm[:len(MAGIC)] != MAGIC:
+                # New file, or one whose creator died half way through
+                self.mm = mm
+                self.reset()
+                mm[:len(MAGIC)] = MAGIC
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+        self.fd, self.mm, self.pid = fd, mm, os.getpid()
+
+    @contextmanager
+    def lock(self, exclusive):
+        with self.thread_lock:
+            if self.pid != os.getpid():
+                self._open()
+            fcntl.flock(self.fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield self
+            finally:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    # Header
+
+    def _get(self, field):
+        offset, packer = _HEADER_FIELDS[field]
+        return packer.unpack_from(self.mm, offset)[0]
+
+    def _set(self, field, value):
+        offset, packer = _HEADER_FIELDS[field]
+        packer.pack_into(self.mm, offset, value)
+
+    def _add(self, field, amount):
+        self._set(field, self._get(field) + amount)
+
+    def _free_head(self, size_class):
+        return POINTER.unpack_from(self.mm, HEADER_SIZE + POINTER.size * size_class)[0]
+
+    def _set_free_head(self, size_class, offset):
+        POINTER.pack_into(self.mm, HEADER_SIZE + POINTER.size * size_class, offset)
+
+    # Buckets
+
+    def _bucket_offset(self, slot):
+        return self.table_offset + slot * BUCKET.size
+
+    def _bucket(self, slot):
+        return BUCKET.unpack_from(self.mm, self._bucket_offset(slot))
+
+    def _hash_at(self, slot):
+        return POINTER.unpack_from(self.mm, self._bucket_offset(slot))[0]
+
+    def _find(self, key_bytes, key_hash):
+        """Slot and bucket of a key (expired or not), or (None, None)"""
+        mask = self.slots - 1
+        slot = key_hash & mask
+        for _ in range(self.slots):
+            found_hash = self._hash_at(slot)
+            if found_hash == EMPTY:
+                break
+            if found_hash == key_hash:
+                bucket = self._bucket(slot)
+                offset, key_length = bucket[3], bucket[4]
+                if self.mm[offset:offset + key_length] == key_bytes:
+                    return slot, bucket
+            slot = (slot + 1) & mask
+        return None, None
+
+    def _live_buckets(self):
+        for slot in range(self.slots):
+            if self._hash_at(slot) > DELETED:
+                yield slot, self._bucket(slot)
+
+    @staticmethod
+    def _expired(bucket, now):
+        return bucket[1] and bucket[1] <= now
+
+    # Slabs
+
+    def _size_class(self, size):
+        for size_class, chunk_size in enumerate(self.chunk_sizes):
+            if size <= chunk_size:
+                return size_class
+        return None
+
+    def _pop_free(self, size_class):
+        offset = self._free_head(size_class)
+        if offset:
+            self._set_free_head(size_class, POINTER.unpack_from(self.mm, offset)[0])
+        return offset
+
+    def _push_free(self, size_class, offset):
+        POINTER.pack_into(self.mm, offset, self._free_head(size_class))
+        self._set_free_head(size_class, offset)
+
+    def _carve(self, page, size_class):
+        """Assign a page to a size class and put its chunks on the class's free list"""
+        self.mm[self.owners_offset + page] = size_class + 1
+        start = self.data_offset + page * self.page_size
+        chunk_size = self.chunk_sizes[size_class]
+        for offset in range(start + (self.page_size // chunk_size - 1) * chunk_size, start - 1, -chunk_size):
+            self._push_free(size_class, offset)
+
+    def _steal_page(self, page, size_class):
+        """Empty a page of another class and give it to this one"""
+        donor = self.mm[self.owners_offset + page] - 1
+        start = self.data_offset + page * self.page_size
+        end = start + self.page_size
+
+        evicted = 0
+        for slot, bucket in self._live_buckets():
+            if start <= bucket[3] < end:
+                self.remove(slot)
+                evicted += 1
+        self._add('evictions', evicted)
+
+        # Unlink the page's chunks from the donor's free list
+        kept = []
+        offset = self._free_head(donor)
+        while offset:
+            if not start <= offset < end:
+                kept.append(offset)
+            offset = POINTER.unpack_from(self.mm, offset)[0]
+        self._set_free_head(donor, 0)
+        for offset in reversed(kept):
+            self._push_free(donor, offset)
+
+        self._carve(page, size_class)
+
+    def _make_chunks(self, size_class, now):
+        """
+        Free chunks of a class once every page is assigned: its expired
+        entries if it has any, else the page holding the oldest entry when
+        that belongs to another class, else the class's oldest sixteenth.
+        """
+        expired, live = [], []
+        oldest = None
+        for slot, bucket in self._live_buckets():
+            if bucket[6] == size_class:
+                if self._expired(bucket, now):
+                    expired.append(slot)
+                else:
+                    live.append((bucket[2], slot))
+            elif oldest is None or bucket[2] < oldest[0]:
+                oldest = (bucket[2], bucket[3])
+
+        if expired:
+            for slot in expired:
+                self.remove(slot)
+            return
+
+        live.sort()
+        if oldest is not None and (not live or oldest[0] < live[0][0]):
+            self._steal_page((oldest[1] - self.data_offset) // self.page_size, size_class)
+        elif live:
+            victims = live[:max(len(live) // 16, 1)]
+            for _, slot in victims:
+                self.remove(slot)
+            self._add('evictions', len(victims))
+        else:
+            # Only this class has entries and it holds no page (all its pages were taken)
+            owners = self.mm[self.owners_offset:self.owners_offset + self.pages]
+            self._steal_page(next(page for page, owner in enumerate(owners) if owner != size_class + 1), size_class)
+
+    def _allocate(self, size_class, now):
+        """Offset of a free chunk of the class (0 when none can be freed)"""
+        if not self._free_head(size_class):
+            pages_used = self._get('pages_used')
+            if pages_used < self.pages:
+                self._set('pages_used', pages_used + 1)
+                self._carve(pages_used, size_class)
+            else:
+                self._make_chunks(size_class, now)
+        return self._pop_free(size_class)
+
+    # Entries
+
+    def read(self, key_bytes, key_hash, now):
+        """(pickled value, expiry) of a live entry, or None"""
+        slot, bucket = self._find(key_bytes, key_hash)
+        if slot is None or self._expired(bucket, now):
+            return None
+        offset, key_length, value_length = bucket[3], bucket[4], bucket[5]
+        start = offset + key_length
+        return self.mm[start:start + value_length], bucket[1]
+
+    def contains(self, key_bytes, key_hash, now):
+        slot, bucket = self._find(key_bytes, key_hash)
+        return slot is not None and not self._expired(bucket, now)
+
+    def remove(self, slot):
+        bucket = self._bucket(slot)
+        self._push_free(bucket[6], bucket[3])
+        BUCKET.pack_into(self.mm, self._bucket_offset(slot), DELETED, 0, 0, 0, 0, 0, 0)
+        self._add('count', -1)
+        self._add('tombstones', 1)
+
+    def delete(self, key_bytes, key_hash):
+        slot, _ = self._find(key_bytes, key_hash)
+        if slot is None:
+            return False
+        self.remove(slot)
+        return True
+
+    def touch(self, key_bytes, key_hash, expires, now):
+        slot, bucket = self._find(key_bytes, key_hash)
+        if slot is None or self._expired(bucket, now):
+            return False
+        BUCKET.pack_into(self.mm, self._bucket_offset(slot), *((bucket[0], expires or 0) + bucket[2:]))
+        return True
+
+    def write(self, key_bytes, key_hash, value, expires, now, max_entries, cull_frequency):
+        """Store an entry, replacing any existing one; False when it does not fit"""
+        self.delete(key_bytes, key_hash)
+        size_class = self._size_class(len(key_bytes) + len(value))
+        if size_class is None:
+            return False
+
+        if self._get('count') >= max_entries:
+            self.cull(now, cull_frequency)
+        if self._get('count') + self._get('tombstones') >= self.slots * 3 // 4:
+            self._rehash()
+        if self._get('count') >= self.slots * 3 // 4:
+            # MAX_ENTRIES was raised after the table was sized
+            self.cull(now, cull_frequency or 3)
+
+        offset = self._allocate(size_class, now)
+        if not offset:
+            return False
+        self.mm[offset:offset + len(key_bytes)] = key_bytes
+        self.mm[offset + len(key_bytes):offset + len(key_bytes) + len(value)] = value
+
+        mask = self.slots - 1
+        slot = key_hash & mask
+        while self._hash_at(slot) > DELETED:
+            slot = (slot + 1) & mask
+        if self._hash_at(slot) == DELETED:
+            self._add('tombstones', -1)
+
+        seq = self._get('seq') + 1
+        self._set('seq', seq)
+        BUCKET.pack_into(
+            self.mm, self._bucket_offset(slot),
+            key_hash, expires or 0, seq, offset, len(key_bytes), len(value), size_class
+        )
+        self._add('count', 1)
+        return True
+
+    def cull(self, now, cull_frequency):
+        """Drop expired entries, then 1/cull_frequency of the rest, oldest first (all for 0)"""
+        if cull_frequency == 0:
+            evicted = self._get('count')
+            self.reset()
+            self._add('evictions', evicted)
+            return
+
+        live = []
+        for slot, bucket in self._live_buckets():
+            if self._expired(bucket, now):
+                self.remove(slot)
+            else:
+                live.append((bucket[2], slot))
+        live.sort()
+        victims = live[:len(live) // cull_frequency]
+        for _, slot in victims:
+            self.remove(slot)
+        self._add('evictions', len(victims))
+
+    def _rehash(self):
+        """Rebuild the table without the deleted markers"""
+        entries = [bucket for _, bucket in self._live_buckets()]
+        self.mm[self.table_offset:self.table_offset + self.slots * BUCKET.size] = bytes(self.slots * BUCKET.size)
+        mask = self.slots - 1
+        for bucket in entries:
+            slot = bucket[0] & mask
+            while self._hash_at(slot) != EMPTY:
+                slot = (slot + 1) & mask
+            BUCKET.pack_into(self.mm, self._bucket_offset(slot), *bucket)
+        self._set('tombstones', 0)
+
+    def reset(self):
+        """Empty the table and return every page"""
+        self.mm[self.owners_offset:self.owners_offset + self.pages] = bytes(self.pages)
+        self.mm[self.table_offset:self.table_offset + self.slots * BUCKET.size] = bytes(self.slots * BUCKET.size)
+        for size_class in range(len(self.chunk_sizes)):
+            self._set_free_head(size_class, 0)
+        for field in ('pages_used', 'count', 'tombstones'):
+            self._set(field, 0)
+
+    def stats(self):
+        return {
+            'entries': self._get('count'),
+            'slots': self.slots,
+            'pages_used': self._get('pages_used'),
+            'pages_total': self.pages,
+            'evictions': self._get('evictions'),
+        }
+
+
+def _private_directory(path):
+    """Create the directory holding the cache files, or check that an existing one is private"""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    # lstat, so a symlink planted in its place is refused too
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise ImproperlyConfigured(
+            f'Shared cache directory {path} must be a directory owned by this user with mode 0700'
+        )
+
+
+def _get_shared_table(location, slots, page_size, pages):
+    _private_directory(os.path.dirname(os.path.abspath(location)))
+    # The geometry is part of the name, so differently configured caches
+    # never map the same file with different layouts
+    path = f'{location}.v{LAYOUT_VERSION}-{slots}x{page_size}x{pages}'
+    with _shared_tables_lock:
+        if path not in _shared_tables:
+            _shared_tables[path] = _SharedTable(path, slots, page_size, pages)
+        return _shared_tables[path]
+
+
+class SharedMemoryCache(BaseCache):
+    """
+    Cache shared by the processes of one host through a memory-mapped file.
+
+    LOCATION is the path of the file (the table geometry is appended to it).
+    Its directory is created with mode 0700 if missing and must otherwise be
+    owned by this user and closed to everyone else. Caches configured with
+    the same LOCATION and geometry share entries.
+
+    OPTIONS:
+        MAX_ENTRIES: Entries kept before culling (default 300)
+        SLOTS: Size of the hash table (default 8192); keep it well above
+            MAX_ENTRIES, the table is culled when three quarters full
+        CULL_FREQUENCY: Fraction of entries dropped when full, as with
+            the other backends (default 3, 0 empties the cache)
+        MAX_SIZE: Bytes of value storage (default 32 MB)
+        PAGE_SIZE: Slab page size, also the largest storable entry (default 1 MB)
+    """
+
+    def __init__(self, location, params):
+        if fcntl is None:
+            raise ImproperlyConfigured('SharedMemoryCache needs fcntl, which is not available on this platform')
+        super().__init__(params)
+
+        options = params.get('OPTIONS') or {}
+        page_size = int(options.get('PAGE_SIZE', 1024 * 1024))
+        pages = max(int(options.get('MAX_SIZE', 32 * 1024 * 1024)) // page_size, 1)
+        slots = 8
+        while slots < int(options.get('SLOTS', 8192)):
+            slots *= 2
+        self._table = _get_shared_table(location, slots, page_size, pages)
+
+    def _key(self, key, version):
+        key_bytes = self.make_and_validate_key(key, version=version).encode()
+        return key_bytes, _key_hash(key_bytes)
+
+    def _write(self, table, key_bytes, key_hash, pickled, expires, now):
+        return table.write(key_bytes, key_hash, pickled, expires, now, self._max_entries, self._cull_frequency)
+
+    def get(self, key, default=None, version=None):
+        key_bytes, key_hash = self._key(key, version)
+        with self._table.lock(exclusive=False) as table:
+            found = table.read(key_bytes, key_hash, time.time())
+        if found is None:
+            return default
+        return pickle.loads(found[0])
+
+    def get_many(self, keys, version=None):
+        keys = {self._key(key, version): key for key in keys}
+        found = {}
+        with self._table.lock(exclusive=False) as table:
+            now = time.time()
+            for (key_bytes, key_hash), key in keys.items():
+                entry = table.read(key_bytes, key_hash, now)
+                if entry is not None:
+                    found[key] = entry[0]
+        return {key: pickle.loads(pickled) for key, pickled in found.items()}
+
+    def has_key(self, key, version=None):
+        key_bytes, key_hash = self._key(key, version)
+        with self._table.lock(exclusive=False) as table:
+            return table.contains(key_bytes, key_hash, time.time())
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key_bytes, key_hash = self._key(key, version)
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        expires = self.get_backend_timeout(timeout)
+        with self._table.lock(exclusive=True) as table:
+            self._write(table, key_bytes, key_hash, pickled, expires, time.time())
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key_bytes, key_hash = self._key(key, version)
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        expires = self.get_backend_timeout(timeout)
+        with self._table.lock(exclusive=True) as table:
+            now = time.time()
+            if table.contains(key_bytes, key_hash, now):
+                return False
+            return self._write(table, key_bytes, key_hash, pickled, expires, now)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        entries = [
+            (key, *self._key(key, version), pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+            for key, value in data.items()
+        ]
+        expires = self.get_backend_timeout(timeout)
+        failed = []
+        with self._table.lock(exclusive=True) as table:
+            now = time.time()
+            for key, key_bytes, key_hash, pickled in entries:
+                if not self._write(table, key_bytes, key_hash, pickled, expires, now):
+                    failed.append(key)
+        return failed
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key_bytes, key_hash = self._key(key, version)
+        expires = self.get_backend_timeout(timeout)
+        with self._table.lock(exclusive=True) as table:
+            return table.touch(key_bytes, key_hash, expires, time.time())
+
+    def incr(self, key, delta=1, version=None):
+        key_bytes, key_hash = self._key(key, version)
+        with self._table.lock(exclusive=True) as table:
+            now = time.time()
+            found = table.read(key_bytes, key_hash, now)
+            if found is None:
+                raise ValueError(f"Key '{key}' not found.")
+            value = pickle.loads(found[0]) + delta
+            # Keep the entry's expiry
+            self._write(table, key_bytes, key_hash, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), found[1] or None, now)
+        return value
+
+    def delete(self, key, version=None):
+        key_bytes, key_hash = self._key(key, version)
+        with self._table.lock(exclusive=True) as table:
+            return table.delete(key_bytes, key_hash)
+
+    def delete_many(self, keys, version=None):
+        keys = [self._key(key, version) for key in keys]
+        if not keys:
+            return
+        with self._table.lock(exclusive=True) as table:
+            for key_bytes, key_hash in keys:
+                table.delete(key_bytes, key_hash)
+
+    def clear(self):
+        with self._table.lock(exclusive=True) as table:
+            table.reset()
+
+    def stats(self):
+        """Usage of the shared file (the same for every process on the host)"""
+        with self._table.lock(exclusive=False) as table:
+            return table.stats()
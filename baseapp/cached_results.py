@@ -0,0 +1,122 @@
+"""
+Stampede-safe cached computations.
+
+get_or_compute() stores a value together with how long it took to compute
+and when it goes stale. A reader of a fresh value may volunteer to
+recompute it early, with a probability that rises as expiry approaches and
+with the compute time (probabilistic early expiration), so a busy key is
+usually refreshed before it expires at all. Only the caller that wins a
+lock recomputes; every other caller keeps getting the previous value,
+which stays in the cache for STALE_GRACE past its expiry. When there is no
+previous value, the other callers wait briefly for the winner's result
+instead of running the same queries.
+
+mark_stale() replaces deleting a key on invalidation: the next reader
+recomputes while the rest keep the current value.
+"""
+import math
+import random
+import time
+import uuid
+import logging
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Seconds a value stays available after it goes stale
+STALE_GRACE = 3600
+
+# Locks and stale markers must be exact across workers, so the prefix is
+# one of the default cache's L2_ONLY_PREFIXES
+KEY_PREFIX = 'recompute_'
+
+# Longest a recompute may hold the lock
+LOCK_TIMEOUT = 300
+
+# How long callers without a previous value wait for the winner
+WAIT_TIMEOUT = 10
+WAIT_INTERVAL = 0.1
+
+
+def _lock_key(key):
+    return f'{KEY_PREFIX}lock_{key}'
+
+
+def _stale_key(key):
+    return f'{KEY_PREFIX}stale_{key}'
+
+
+def _compute_and_store(key, compute, timeout):
+    started = time.time()
+    value = compute()
+    delta = time.time() - started
+
+    if value is not None:
+        if callable(timeout):
+            timeout = timeout(value)
+        expires = started + timeout
+        stale_since = cache.get(_stale_key(key))
+        if stale_since is not None and stale_since >= started:
+            # The data changed while this ran; serve it, but recompute next time
+            expires = 0
+        cache.set(key, {'value': value, 'delta': delta, 'expires': expires}, timeout + STALE_GRACE)
+    return value
+
+
+def get_or_compute(key, compute, timeout, beta=1.0, force=False):
+    """
+    Get a cached value, computing it at most once across workers.
+
+    Args:
+        key: Cache key
+        compute: Function returning the value; None results are not cached
+        timeout: Seconds the value is fresh, or a function of the value
+            returning them (e.g. shorter for empty results)
+        beta: Eagerness of early recomputation (1 suits most values)
+        force: Recompute now, regardless of any cached value
+
+    Returns:
+        The value
+    """
+    entry = None if force else cache.get(key)
+    if entry is not None:
+        # -log(u) is exponentially distributed; slow computations start earlier
+        early = entry['delta'] * beta * -math.log(1.0 - random.random())
+        if time.time() + early < entry['expires']:
+            return entry['value']
+
+    lock_key = _lock_key(key)
+    token = uuid.uuid4().hex
+    if cache.add(lock_key, token, LOCK_TIMEOUT):
+        try:
+            return _compute_and_store(key, compute, timeout)
+        finally:
+            # Leave a lock that timed out and was taken over alone
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+
+    if entry is not None:
+        # Another worker is recomputing; the previous value will do until then
+        return entry['value']
+
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry['value']
+        if not cache.has_key(lock_key):
+            # The winner failed or produced nothing to cache
+            break
+
+    logger.warning(f"Computing {key} without the lock after waiting for another worker")
+    return _compute_and_store(key, compute, timeout)
+
+
+def mark_stale(key):
+    """Have the next reader recompute a value while other readers keep the current one"""
+    cache.set(_stale_key(key), time.time(), LOCK_TIMEOUT)
+    entry = cache.get(key)
+    if entry is not None:
+        entry['expires'] = 0
+        cache.set(key, entry, STALE_GRACE)
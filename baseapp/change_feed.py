@@ -0,0 +1,273 @@
+"""
+Per-business change log backing the admin delta-sync API.
+
+Signals append a ChangeLogEntry for every create, update and delete of the
+records the React admin keeps in memory. get_changes() folds the entries
+after a client's cursor into the current version of each touched row, so
+after an edit the client downloads a handful of records instead of the
+whole tenant.
+
+Cursors are ChangeLogEntry ids, which concurrent transactions can commit
+out of order: while one with a lower id is still open, a higher one may
+already be visible. A cursor therefore never moves past an entry younger
+than CHANGE_FEED_SETTLE_SECONDS, so it cannot skip an id whose transaction
+may not have committed yet. Those recent entries are still returned, so
+an admin sees their own edit in the sync that follows it, and they come
+back again on the next sync (applying a change twice is harmless). Writes
+that keep a transaction open longer than that should record their changes
+at the end of it.
+"""
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+from django.db.models.signals import post_save, post_delete
+from .bulk_tracking import row_tracking_suspended
+from .models import Business, CustomUser, Manager, QuestionPair, Assessment, ChangeLogEntry
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on log entries folded into one response
+CHANGE_FEED_PAGE_SIZE = 500
+
+ASSESSMENT_FIELDS = (
+    'id', 'candidate_name', 'candidate_email', 'position', 'region',
+    'manager_name', 'manager_email', 'created_at', 'completed', 'unique_link',
+    'assessment_type', 'first_accessed_at', 'completion_time_seconds', 'completed_at'
+)
+
+
+def _serialize_businesses(business_id, ids):
+    rows = []
+    for business in Business.objects.filter(id__in=ids):
+        rows.append({
+            'id': business.id,
+            'name': business.name,
+            'slug': business.slug,
+            'primary_color': business.primary_color,
+            'logo_url': business.logo.url if business.logo else None,
+            'assessment_template_uploaded': business.assessment_template_uploaded
+        })
+    return rows
+
+
+def _serialize_hr_users(business_id, ids):
+    return list(CustomUser.objects.filter(
+        id__in=ids, business_id=business_id, is_hr=True
+    ).values('id', 'email', 'first_name', 'last_name', 'is_active'))
+
+
+def _serialize_managers(business_id, ids):
+    # Managers are soft deleted, so inactive rows are reported as deleted
+    return list(Manager.objects.filter(
+        id__in=ids, business_id=business_id, active=True
+    ).values('id', 'name', 'email', 'region', 'position', 'is_default'))
+
+
+def _serialize_question_pairs(business_id, ids):
+    return list(QuestionPair.objects.filter(
+        id__in=ids, business_id=business_id
+    ).values('id', 'attribute1__name', 'attribute2__name', 'statement_a', 'statement_b'))
+
+
+def _serialize_assessments(business_id, ids):
+    return list(Assessment.objects.filter(
+        id__in=ids, business_id=business_id
+    ).values(*ASSESSMENT_FIELDS))
+
+
+# Collection name -> function returning the current rows for a set of ids.
+# Row shapes match the corresponding list endpoints.
+COLLECTION_SERIALIZERS = {
+    'businesses': _serialize_businesses,
+    'hr_users': _serialize_hr_users,
+    'managers': _serialize_managers,
+    'question_pairs': _serialize_question_pairs,
+    'assessments': _serialize_assessments,
+}
+
+
+def record_change(collection, object_id, action, business_id=None):
+    """Append one entry to the change log"""
+    ChangeLogEntry.objects.create(
+        business_id=business_id,
+        collection=collection,
+        object_id=object_id,
+        action=action
+    )
+
+
+def record_bulk_change(collection, business_id=None):
+    """
+    Record a change that bypassed model signals (bulk_create, update()).
+    Clients reload the whole collection when they see it.
+    """
+    record_change(collection, None, 'reset', business_id)
+
+
+def _settle_cutoff():
+    """Creation time after which an entry may still have lower ids committing behind it"""
+    settle = timedelta(seconds=getattr(settings, 'CHANGE_FEED_SETTLE_SECONDS', 5))
+    return timezone.now() - settle
+
+
+def latest_cursor():
+    """Cursor pointing at the newest settled log entry (0 when there is none)"""
+    last = ChangeLogEntry.objects.filter(
+        created_at__lte=_settle_cutoff()
+    ).order_by('-id').values_list('id', flat=True).first()
+    return last or 0
+
+
+def get_changes(business_id, since, collections=None, limit=CHANGE_FEED_PAGE_SIZE):
+    """
+    Fold the change log after a cursor into per-collection upserts and deletes.
+
+    Args:
+        business_id: Business whose changes to return (global entries are included)
+        since: Cursor from a previous response
+        collections: Optional iterable restricting the collections returned
+        limit: Maximum number of log entries to read
+
+    Returns:
+        Dict with cursor, has_more, reset and changes keys. reset is True when
+        the cursor predates the retained log and the client must reload.
+    """
+    # Pruning removes the oldest entries. A cursor right below the oldest
+    # retained one has lost nothing, even if its own entry is gone. A larger
+    # gap may hide pruned entries; ids skipped by rolled back inserts look
+    # the same, so those reset too.
+    if since:
+        oldest = ChangeLogEntry.objects.order_by('id').values_list('id', flat=True).first()
+        if oldest is None or since < oldest - 1:
+            return {'cursor': latest_cursor(), 'has_more': False, 'reset': True, 'changes': {}}
+
+    cutoff = _settle_cutoff()
+    entries = ChangeLogEntry.objects.filter(
+        Q(business_id=business_id) | Q(business__isnull=True),
+        id__gt=since
+    )
+    if collections:
+        entries = entries.filter(collection__in=collections)
+
+    entries = list(entries.order_by('id').values('id', 'collection', 'object_id', 'action', 'created_at')[:limit + 1])
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    # The cursor stops at the first recent entry; it and the ones after it
+    # are returned now and again from the next sync
+    cursor = since
+    for entry in entries:
+        if entry['created_at'] > cutoff:
+            break
+        cursor = entry['id']
+    # A page the cursor cannot move through would be fetched again and again
+    has_more = has_more and cursor != since
+
+    # Keep only the last action per record
+    latest_actions = {}
+    reset_collections = set()
+    for entry in entries:
+        if entry['action'] == 'reset':
+            reset_collections.add(entry['collection'])
+        else:
+            latest_actions[(entry['collection'], entry['object_id'])] = entry['action']
+
+    changes = {}
+    for collection, serialize in COLLECTION_SERIALIZERS.items():
+        if collection in reset_collections:
+            changes[collection] = {'reset': True, 'upserted': [], 'deleted': []}
+            continue
+
+        touched = {object_id for (name, object_id) in latest_actions if name == collection}
+        if not touched:
+            continue
+
+        deleted_ids = {
+            object_id for object_id in touched
+            if latest_actions[(collection, object_id)] == 'deleted'
+        }
+        upserted = serialize(business_id, touched - deleted_ids)
+
+        # Rows that no longer match the collection (e.g. deactivated managers) count as deleted
+        found_ids = {row['id'] for row in upserted}
+        deleted_ids |= touched - found_ids
+
+        changes[collection] = {
+            'reset': False,
+            'upserted': upserted,
+            'deleted': sorted(deleted_ids)
+        }
+
+    return {
+        'cursor': cursor,
+        'has_more': has_more,
+        'reset': False,
+        'changes': changes
+    }
+
+
+# Model -> (collection, function returning the business id the entry belongs to)
+LOGGED_MODELS = {
+    Business: ('businesses', lambda instance: None),
+    CustomUser: ('hr_users', lambda instance: instance.business_id),
+    Manager: ('managers', lambda instance: instance.business_id),
+    QuestionPair: ('question_pairs', lambda instance: instance.business_id),
+    Assessment: ('assessments', lambda instance: instance.business_id),
+}
+
+
+def _is_business_cascade(origin):
+    """True when a delete is part of deleting a whole business"""
+    if isinstance(origin, Business):
+        return True
+    return isinstance(origin, QuerySet) and origin.model is Business
+
+
+def _log_save(sender, instance, created, **kwargs):
+    if row_tracking_suspended():
+        return
+
+    collection, get_business_id = LOGGED_MODELS[sender]
+
+    if sender is CustomUser:
+        # Only HR users appear in the admin, and logins only touch last_login
+        update_fields = kwargs.get('update_fields')
+        if not instance.is_hr or not instance.business_id:
+            return
+        if update_fields and set(update_fields) <= {'last_login'}:
+            return
+
+    try:
+        record_change(
+            collection,
+            instance.id,
+            'created' if created else 'updated',
+            get_business_id(instance)
+        )
+    except Exception as e:
+        logger.error(f"Error recording change for {sender.__name__} {instance.id}: {e}", exc_info=True)
+
+
+def _log_delete(sender, instance, **kwargs):
+    if row_tracking_suspended():
+        return
+
+    collection, get_business_id = LOGGED_MODELS[sender]
+
+    # Entries for a business being deleted would block its own cascade
+    if sender is not Business and _is_business_cascade(kwargs.get('origin')):
+        return
+    if sender is CustomUser and (not instance.is_hr or not instance.business_id):
+        return
+
+    try:
+        record_change(collection, instance.id, 'deleted', get_business_id(instance))
+    except Exception as e:
+        logger.error(f"Error recording delete for {sender.__name__} {instance.id}: {e}", exc_info=True)
+
+
+for _model in LOGGED_MODELS:
+    post_save.connect(_log_save, sender=_model, dispatch_uid=f'change_feed_save_{_model.__name__}')
+    post_delete.connect(_log_delete, sender=_model, dispatch_uid=f'change_feed_delete_{_model.__name__}')
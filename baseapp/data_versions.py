@@ -0,0 +1,95 @@
+"""
+Per-business data version stamps.
+
+Each stamp is a short random token kept in the cache and replaced whenever
+rows in its scope change. The admin JSON endpoints build their ETag from
+these stamps, so a client holding current data gets a 304 without the view
+querying or serializing anything.
+
+Stamps are random rather than incrementing so that a stamp lost to cache
+eviction can never reproduce an ETag a client cached earlier.
+"""
+import uuid
+import logging
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from .bulk_tracking import row_tracking_suspended
+from .models import Business, CustomUser, Attribute, QuestionPair, Manager, Assessment, TrainingMaterial
+
+logger = logging.getLogger(__name__)
+
+
+def _version_key(scope, business_id=None):
+    return f'data_version_{scope}_{business_id if business_id is not None else "global"}'
+
+
+def _new_version():
+    return uuid.uuid4().hex[:12]
+
+
+def bump_data_version(scope, business_id=None):
+    """Mark every cached representation of a scope as stale"""
+    cache.set(_version_key(scope, business_id), _new_version(), None)
+
+
+def get_data_versions(business_id, *scopes):
+    """
+    Get the current stamps for several scopes in one cache round trip.
+    Missing stamps are created on the spot.
+    """
+    keys = [_version_key(scope, business_id) for scope in scopes]
+    versions = cache.get_many(keys)
+
+    for key in keys:
+        if key not in versions:
+            # add() keeps whichever stamp another worker wrote first
+            cache.add(key, _new_version(), None)
+            versions[key] = cache.get(key)
+
+    return [versions[key] for key in keys]
+
+
+def data_etag(business_id, *scopes):
+    """Build an ETag value for a response that depends on the given scopes"""
+    prefix = str(business_id) if business_id is not None else 'global'
+    return '-'.join([prefix] + get_data_versions(business_id, *scopes))
+
+
+# Model -> (scopes, function returning the owning business id)
+VERSIONED_MODELS = {
+    Business: (['business'], lambda instance: instance.id),
+    CustomUser: (['hr_users'], lambda instance: instance.business_id),
+    Attribute: (['attributes'], lambda instance: instance.business_id),
+    QuestionPair: (['question_pairs'], lambda instance: instance.business_id),
+    Manager: (['managers'], lambda instance: instance.business_id),
+    Assessment: (['assessments'], lambda instance: instance.business_id),
+    TrainingMaterial: (['training_materials'], lambda instance: None),
+}
+
+
+def _bump_for_instance(sender, instance, **kwargs):
+    if row_tracking_suspended():
+        return
+
+    scopes, get_business_id = VERSIONED_MODELS[sender]
+
+    # Logins only touch last_login, which no versioned payload includes
+    update_fields = kwargs.get('update_fields')
+    if sender is CustomUser and update_fields and set(update_fields) <= {'last_login'}:
+        return
+
+    business_id = get_business_id(instance)
+    if business_id is None and sender is not TrainingMaterial:
+        return
+
+    try:
+        for scope in scopes:
+            bump_data_version(scope, business_id)
+    except Exception as e:
+        # Never let a cache problem break the write itself
+        logger.error(f"Error bumping data version for {sender.__name__}: {e}", exc_info=True)
+
+
+for _model in VERSIONED_MODELS:
+    post_save.connect(_bump_for_instance, sender=_model, dispatch_uid=f'data_version_save_{_model.__name__}')
+    post_delete.connect(_bump_for_instance, sender=_model, dispatch_uid=f'data_version_delete_{_model.__name__}')
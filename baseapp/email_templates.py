@@ -0,0 +1,148 @@
+"""
+Compiled email templates.
+
+Templates use {{variable}} placeholders. Each template is split once into
+literal text and variable slots, so rendering a message is a single join
+instead of one str.replace pass per variable. Compiled business templates
+are cached per process, keyed by the row's updated_at, so editing a
+template in the admin takes effect on the next send.
+"""
+import re
+from functools import lru_cache
+from .models import EmailTemplate
+
+PLACEHOLDER_RE = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+
+class CompiledTemplate:
+    """A template string pre-split into literal and variable parts"""
+
+    def __init__(self, source):
+        self.source = source
+        # re.split with one group alternates literal, name, literal, ...
+        self.parts = PLACEHOLDER_RE.split(source)
+
+    def render(self, context):
+        parts = self.parts
+        out = parts[:]
+        for i in range(1, len(parts), 2):
+            name = parts[i]
+            # Unknown placeholders are left in the text unchanged
+            value = context.get(name)
+            out[i] = str(value) if value is not None else '{{' + name + '}}'
+        return ''.join(out)
+
+
+class EmailRenderer:
+    """Renders the subject and body of one email template"""
+
+    def __init__(self, subject, body):
+        self.subject = CompiledTemplate(subject)
+        self.body = CompiledTemplate(body)
+
+    def render(self, context):
+        """Return (subject, body) for one recipient"""
+        return self.subject.render(context), self.body.render(context)
+
+    def render_many(self, contexts):
+        """Render (subject, body) for each context in order"""
+        subject, body = self.subject.render, self.body.render
+        return [(subject(context), body(context)) for context in contexts]
+
+
+DEFAULT_TEMPLATES = {
+    'standard': EmailRenderer(
+        'Assessment Invitation',
+        '''Dear {{candidate_name}},
+
+You have been invited to complete an assessment for the position of {{position}}.
+Please click the following link to complete your assessment:
+
+{{assessment_url}}
+
+This link is unique to you and can only be used once.
+
+Best regards,
+{{manager_name}}'''
+    ),
+    'resend': EmailRenderer(
+        'Front-Line Worker Assessment for {{position}}',
+        '''
+Hello {{candidate_name}},
+
+You have been invited to complete an assessment for the {{position}} position.
+
+Please click the following link to complete your assessment:
+{{assessment_url}}
+
+This is a new link for your assessment. Any previous links sent will no longer work.
+
+Best regards,
+{{manager_name}}
+        '''
+    ),
+    'benchmark': EmailRenderer(
+        'Benchmark Assessment for {{business_name}}',
+        '''
+Hello,
+
+You have been selected to participate in a benchmark assessment for {{business_name}}.
+
+Please click the following link to complete your assessment:
+{{assessment_url}}
+
+This is a new link for your assessment. Any previous links sent will no longer work.
+
+Best regards,
+Work Force Compass Admin
+        '''
+    ),
+}
+
+
+@lru_cache(maxsize=256)
+def _compile_business_template(template_id, updated_at):
+    # updated_at is part of the cache key so an edited template recompiles
+    template = EmailTemplate.objects.only('subject', 'body').get(id=template_id)
+    return EmailRenderer(template.subject, template.body)
+
+
+def get_email_renderer(business_id, template_type, use_custom=True):
+    """
+    Get the renderer for a business's email of the given type.
+
+    Args:
+        business_id: Business sending the email
+        template_type: 'standard', 'resend' or 'benchmark'
+        use_custom: Use the business's saved template when there is one
+
+    Returns:
+        EmailRenderer (the built-in default when no custom template applies)
+    """
+    if use_custom:
+        row = EmailTemplate.objects.filter(
+            business_id=business_id,
+            template_type=template_type
+        ).values_list('id', 'updated_at').first()
+
+        if row:
+            try:
+                return _compile_business_template(*row)
+            except EmailTemplate.DoesNotExist:
+                # Deleted since the lookup above
+                pass
+
+    return DEFAULT_TEMPLATES[template_type]
+
+
+def assessment_email_context(assessment, assessment_url, business_name):
+    """Variables available to assessment email templates"""
+    return {
+        'business_name': business_name,
+        'candidate_name': assessment.candidate_name,
+        'candidate_email': assessment.candidate_email,
+        'position': assessment.position,
+        'region': assessment.region,
+        'manager_name': assessment.manager_name,
+        'assessment_url': assessment_url,
+    }
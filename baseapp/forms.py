@@ -1,7 +1,9 @@
+import os
 from django import forms
 from django.core.exceptions import ValidationError
 from django.contrib.auth.password_validation import validate_password
 from .models import Assessment, AssessmentResponse, QuestionResponse, Business, BenchmarkBatch, Attribute, QuestionPair, CustomUser, Manager
+from .manager_directory import get_manager_directory
 
 class BusinessForm(forms.ModelForm):
     """Form for creating and editing businesses"""
@@ -66,6 +68,7 @@ class AssessmentCreationForm(forms.ModelForm):
         if business:
             # Get available managers
             managers = Manager.objects.filter(business=business, active=True)
+            self.directory = get_manager_directory(business.id)
             
             # Set the queryset for both manager fields
             self.fields['selected_managers'].queryset = managers
@@ -76,8 +79,8 @@ class AssessmentCreationForm(forms.ModelForm):
             self.fields['primary_manager'].help_text = "This manager's name will appear as the sender on emails"
             
             # Auto-select default managers if not already in initial
-            default_managers = managers.filter(is_default=True)
-            if default_managers.exists():
+            if self.directory.default_ids:
+                default_managers = managers.filter(id__in=self.directory.default_ids)
                 if 'selected_managers' not in self.initial:
                     self.initial['selected_managers'] = default_managers
                 else:
@@ -91,7 +94,7 @@ class AssessmentCreationForm(forms.ModelForm):
                                 self.initial['selected_managers'] = list(current_selections) + [default_manager]
             
             # If user provided and they match a manager, auto-select them as primary and in the selected managers
-            if user:
+            if user and self.directory.find_by_email(user.email):
                 user_manager = managers.filter(email=user.email).first()
                 if user_manager:
                     # Set as primary manager if not already set
@@ -114,24 +117,22 @@ class AssessmentCreationForm(forms.ModelForm):
         
         # Ensure default managers and current user (if a manager) are always included
         if self.business:
-            # Get default managers
-            default_managers = Manager.objects.filter(business=self.business, is_default=True)
-            
             # Convert to list if it's not already
             if not isinstance(selected_managers, list):
                 selected_managers = list(selected_managers)
+            selected_ids = {manager.id for manager in selected_managers}
                 
-            # Add any missing default managers
-            for default_manager in default_managers:
-                if default_manager not in selected_managers:
-                    selected_managers.append(default_manager)
+            # Add any missing default managers (the form normally submits them already)
+            missing_ids = [manager_id for manager_id in self.directory.default_ids if manager_id not in selected_ids]
             
             # If the current user matches a manager, make sure they're included too
             current_user_email = self.instance.created_by.email if hasattr(self.instance, 'created_by') and self.instance.created_by else None
-            if current_user_email:
-                user_manager = Manager.objects.filter(business=self.business, email=current_user_email, active=True).first()
-                if user_manager and user_manager not in selected_managers:
-                    selected_managers.append(user_manager)
+            user_manager = self.directory.find_by_email(current_user_email) if current_user_email else None
+            if user_manager and user_manager.id not in selected_ids and user_manager.id not in missing_ids:
+                missing_ids.append(user_manager.id)
+            
+            if missing_ids:
+                selected_managers.extend(Manager.objects.filter(id__in=missing_ids))
             
             cleaned_data['selected_managers'] = selected_managers
         
@@ -169,10 +170,7 @@ class AssessmentCreationForm(forms.ModelForm):
         if commit and self.cleaned_data.get('selected_managers'):
             # Ensure default managers are always included
             if self.business:
-                default_manager_ids = set(
-                    Manager.objects.filter(business=self.business, is_default=True)
-                    .values_list('id', flat=True)
-                )
+                default_manager_ids = set(self.directory.default_ids)
                 
                 # Get the selected manager IDs
                 selected_manager_ids = set(
@@ -183,7 +181,7 @@ class AssessmentCreationForm(forms.ModelForm):
                 selected_manager_ids.update(default_manager_ids)
                 
                 # Set the managers with the combined set
-                assessment.managers.set(Manager.objects.filter(id__in=selected_manager_ids))
+                assessment.managers.set(selected_manager_ids)
             else:
                 # If no business context, just use the selected managers
                 assessment.managers.set(self.cleaned_data['selected_managers'])
@@ -200,17 +198,17 @@ class BenchmarkBatchForm(forms.ModelForm):
             'data_file': forms.FileInput(attrs={'class': 'form-control'})
         }
         help_texts = {
-            'data_file': 'Upload an Excel (.xlsx, .xls) or CSV file with columns: name, email'
+            'data_file': 'Upload an Excel (.xlsx) or CSV file with columns: name, email'
         }
 
     def clean_data_file(self):
         data_file = self.cleaned_data['data_file']
         
-        # Validate file extension
-        valid_extensions = ['.xlsx', '.xls', '.csv']
-        ext = str(data_file.name).lower()[-4:]
+        # Validate file extension (legacy .xls cannot be read in chunks)
+        valid_extensions = ['.xlsx', '.csv']
+        ext = os.path.splitext(str(data_file.name).lower())[1]
         if ext not in valid_extensions:
-            raise ValidationError('Invalid file format. Please upload an Excel or CSV file.')
+            raise ValidationError('Invalid file format. Please upload an Excel (.xlsx) or CSV file.')
         
         # Validate file size (max 5MB)
         if data_file.size > 5 * 1024 * 1024:
@@ -0,0 +1,171 @@
+# baseapp/management/commands/bench_concurrency.py
+import time
+import socket
+import asyncio
+import subprocess
+import sys
+import os
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# How gunicorn runs the project under each interface
+SERVERS = {
+    'wsgi': ['FrontLWAA.wsgi'],
+    'asgi': ['FrontLWAA.asgi', '-k', 'uvicorn_worker.UvicornWorker'],
+}
+
+class Command(BaseCommand):
+    help = 'Compare how many concurrent connections the WSGI and ASGI servers handle'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default='/thank-you/',
+            help='Path requested by every client (e.g. /assessment/<link>/)'
+        )
+        parser.add_argument(
+            '--concurrency',
+            default='10,50,200',
+            help='Comma-separated numbers of concurrent clients'
+        )
+        parser.add_argument(
+            '--idle-connections',
+            type=int,
+            default=0,
+            help='Extra connections that send half a request and hold it open, as slow clients do'
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=5,
+            help='Seconds of load per concurrency level'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=2,
+            help='Gunicorn worker processes for both servers'
+        )
+        parser.add_argument(
+            '--servers',
+            default='wsgi,asgi',
+            help=f'Comma-separated servers to measure ({", ".join(SERVERS)})'
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=10,
+            help='Seconds before a request counts as failed'
+        )
+
+    def handle(self, *args, **options):
+        levels = [int(level) for level in options['concurrency'].split(',')]
+        servers = options['servers'].split(',')
+        unknown = set(servers) - set(SERVERS)
+        if unknown:
+            raise CommandError(f'Unknown servers: {", ".join(sorted(unknown))}')
+
+        self.stdout.write(
+            f"GET {options['path']} for {options['duration']:g}s per level, "
+            f"{options['workers']} workers, {options['idle_connections']} idle connections"
+        )
+        self.stdout.write(f"{'server':<6} {'clients':>7} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'failed':>7}")
+
+        for server in servers:
+            port = self._free_port()
+            process = self._start_server(server, port, options['workers'])
+            try:
+                # Let every worker import the views before measuring
+                asyncio.run(self._load(port, options['path'], options['workers'], 0, 1, options['timeout']))
+                for clients in levels:
+                    result = asyncio.run(self._load(
+                        port, options['path'], clients, options['idle_connections'],
+                        options['duration'], options['timeout']
+                    ))
+                    self.stdout.write(
+                        f"{server:<6} {clients:>7} {result['rate']:>8.0f} {result['p50']:>8.1f} "
+                        f"{result['p99']:>8.1f} {result['max']:>8.1f} {result['failed']:>7}"
+                    )
+            finally:
+                process.terminate()
+                process.wait()
+
+        self.stdout.write(self.style.SUCCESS('Done'))
+
+    def _free_port(self):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            return sock.getsockname()[1]
+
+    def _start_server(self, server, port, workers):
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', *SERVERS[server],
+             '--bind', f'127.0.0.1:{port}', '--workers', str(workers), '--log-level', 'warning'],
+            cwd=settings.BASE_DIR,
+            env=os.environ.copy(),
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f'{server} server exited with code {process.returncode}')
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                return process
+            except OSError:
+                time.sleep(0.2)
+        process.kill()
+        raise CommandError(f'{server} server did not start listening on port {port}')
+
+    async def _load(self, port, path, clients, idle_connections, duration, timeout):
+        request = f'GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n'.encode()
+        latencies = []
+        failed = 0
+
+        async def fetch():
+            # A new connection per request, which both servers handle alike
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            try:
+                writer.write(request)
+                await writer.drain()
+                status_line = await reader.readline()
+                await reader.read()
+                return status_line.split()[1] in (b'200', b'302', b'304')
+            finally:
+                writer.close()
+
+        async def client(stop_at):
+            nonlocal failed
+            while time.monotonic() < stop_at:
+                started = time.monotonic()
+                try:
+                    ok = await asyncio.wait_for(fetch(), timeout)
+                except (asyncio.TimeoutError, OSError, IndexError):
+                    ok = False
+                if ok:
+                    latencies.append(time.monotonic() - started)
+                else:
+                    failed += 1
+
+        # Slow clients: connected, request half sent
+        idle = []
+        for _ in range(idle_connections):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(f'GET {path} HTTP/1.1\r\nHost: localhost\r\n'.encode())
+            idle.append(writer)
+
+        stop_at = time.monotonic() + duration
+        await asyncio.gather(*(client(stop_at) for _ in range(clients)))
+
+        for writer in idle:
+            writer.close()
+
+        latencies.sort()
+        if not latencies:
+            return {'rate': 0, 'p50': 0, 'p99': 0, 'max': 0, 'failed': failed}
+        return {
+            'rate': len(latencies) / duration,
+            'p50': latencies[len(latencies) // 2] * 1000,
+            'p99': latencies[int(len(latencies) * 0.99)] * 1000,
+            'max': latencies[-1] * 1000,
+            'failed': failed,
+        }
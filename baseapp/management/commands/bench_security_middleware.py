@@ -0,0 +1,106 @@
+# baseapp/management/commands/bench_security_middleware.py
+import re
+import logging
+import timeit
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory
+from baseapp.middleware import SecurityMiddleware
+
+# A mix of application, static and scanner traffic
+SAMPLE_PATHS = [
+    '/', '/login/', '/dashboard/', '/static/js/main.js', '/static/css/site.css',
+    '/assessment/3f2a9c1d0b7e4a58/', '/api/businesses/12/', '/api/businesses/12/upload-logo/',
+    '/api/question-pairs/45/', '/api/changes/', '/manage/benchmark-batches/create/',
+    '/api/benchmark-batches/7/status/', '/favicon.ico', '/robots.txt',
+    '/wp-login.php', '/.env', '/vendor/phpunit/eval-stdin.php', '/.git/config',
+]
+
+SAMPLE_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 14_2) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15',
+    'Go-http-client/1.1',
+]
+
+class Command(BaseCommand):
+    help = 'Measure the per-request overhead of SecurityMiddleware'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=100000,
+            help='Requests classified per measurement'
+        )
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        response = HttpResponse()
+        middleware = SecurityMiddleware(lambda request: response)
+
+        # Sequential matching, pattern by pattern, as the middleware used to do
+        whitelist = [re.compile(pattern) for pattern in middleware.whitelisted_paths]
+        blocklist = [re.compile(pattern) for pattern in middleware.suspicious_paths]
+        agents = [agent.lower() for agent in middleware.suspicious_agents]
+
+        def sequential(path, user_agent):
+            if any(pattern.match(path) for pattern in whitelist):
+                return 'allow'
+            if any(pattern.search(path.lower()) for pattern in blocklist):
+                return 'block'
+            user_agent = user_agent.lower()
+            return 'block' if any(agent in user_agent for agent in agents) else None
+
+        classify_path = middleware._classify_path.__wrapped__
+        is_suspicious_agent = middleware._is_suspicious_agent.__wrapped__
+
+        def compiled(path, user_agent):
+            path_class = classify_path(path)
+            if path_class is None and is_suspicious_agent(user_agent):
+                return 'block'
+            return path_class
+
+        def cached(path, user_agent):
+            path_class = middleware._classify_path(path)
+            if path_class is None and middleware._is_suspicious_agent(user_agent):
+                return 'block'
+            return path_class
+
+        samples = [
+            (path, SAMPLE_AGENTS[index % len(SAMPLE_AGENTS)])
+            for index, path in enumerate(SAMPLE_PATHS * (count // len(SAMPLE_PATHS) + 1))
+        ][:count]
+
+        # The approaches must agree before their speed means anything
+        for path, user_agent in samples[:len(SAMPLE_PATHS) * len(SAMPLE_AGENTS)]:
+            assert sequential(path, user_agent) == compiled(path, user_agent) == cached(path, user_agent), path
+
+        self.stdout.write(f'Classifying {count} requests ({len(SAMPLE_PATHS)} distinct paths):')
+        for name, classify in (
+            ('sequential patterns', sequential),
+            ('compiled classifier', compiled),
+            ('compiled + LRU', cached),
+        ):
+            seconds = min(timeit.repeat(
+                lambda: [classify(path, user_agent) for path, user_agent in samples], number=1, repeat=3
+            ))
+            self.stdout.write(f'  {name:<20} {seconds / count * 1e6:6.2f} us/request')
+
+        # Whole middleware calls on allowed requests; the view does nothing
+        factory = RequestFactory()
+        requests = [
+            factory.get(path, HTTP_USER_AGENT=SAMPLE_AGENTS[0])
+            for path in SAMPLE_PATHS
+            if middleware._classify_path(path) != 'block'
+        ]
+        logging.getLogger('baseapp.middleware').disabled = True
+        try:
+            seconds = min(timeit.repeat(
+                lambda: [middleware(request) for request in requests], number=count // len(requests), repeat=3
+            ))
+        finally:
+            logging.getLogger('baseapp.middleware').disabled = False
+        calls = count // len(requests) * len(requests)
+        self.stdout.write(f'  {"middleware call":<20} {seconds / calls * 1e6:6.2f} us/request')
+
+        self.stdout.write(self.style.SUCCESS(f'Path cache: {middleware._classify_path.cache_info()}'))
@@ -0,0 +1,175 @@
+# baseapp/management/commands/dispatch_outbox.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from baseapp.outbox import (
+    TokenBucket, build_outbox_email, claim_due_messages, mark_failed, mark_sent, prune_sent_messages,
+    renew_leases
+)
+
+class Command(BaseCommand):
+    help = 'Send queued emails from the outbox, retrying failures with backoff (runs as the worker dyno)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Send everything that is due, then exit instead of polling'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=settings.OUTBOX_CONCURRENCY,
+            help='Number of parallel SMTP connections'
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=settings.OUTBOX_SEND_RATE,
+            help='Maximum messages sent per second'
+        )
+        parser.add_argument(
+            '--burst',
+            type=int,
+            default=settings.OUTBOX_BURST,
+            help='Messages that may be sent back to back before the rate applies'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Messages claimed per database round trip'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=5,
+            help='Seconds to wait when the outbox is empty'
+        )
+
+    def handle(self, *args, **options):
+        self.bucket = TokenBucket(options['rate'], options['burst'])
+        self.local = threading.local()
+        self.connections = []
+        self.connections_lock = threading.Lock()
+
+        sent_total = 0
+        failed_total = 0
+
+        with ThreadPoolExecutor(max_workers=max(options['concurrency'], 1)) as pool:
+            try:
+                while True:
+                    # The worker outlives MySQL's idle timeout between polls
+                    close_old_connections()
+                    messages = claim_due_messages(options['batch_size'])
+
+                    if not messages:
+                        # Idle SMTP sessions get dropped by the server, so close them while waiting
+                        self.close_connections()
+                        if options['once']:
+                            break
+                        prune_sent_messages(settings.OUTBOX_RETENTION_DAYS)
+                        time.sleep(options['poll_interval'])
+                        continue
+
+                    # Build (and render reports) here so worker threads never touch the database.
+                    # Rendering can outlast the lease, so it is renewed message by message.
+                    prepared = []
+                    for message in messages:
+                        if not renew_leases([message]):
+                            continue
+                        try:
+                            prepared.append((message, build_outbox_email(message)))
+                        except Exception as e:
+                            mark_failed(message, e)
+                            failed_total += 1
+
+                    # Once more for the whole batch, which must be sent within the lease
+                    held = {message.id for message in renew_leases([message for message, _ in prepared])}
+                    prepared = [(message, email) for message, email in prepared if message.id in held]
+
+                    # One send_messages() call per worker connection for its share of the batch
+                    workers = max(options['concurrency'], 1)
+                    shares = [prepared[index::workers] for index in range(workers)]
+                    results = pool.map(self.send_batch, [[email for _, email in share] for share in shares])
+
+                    errors = [None] * len(prepared)
+                    for index, share_errors in enumerate(results):
+                        errors[index::workers] = share_errors
+
+                    sent = []
+                    for (message, _), error in zip(prepared, errors):
+                        if error is None:
+                            sent.append(message)
+                        else:
+                            mark_failed(message, error)
+                            failed_total += 1
+                    mark_sent(sent)
+                    sent_total += len(sent)
+            except KeyboardInterrupt:
+                pass
+            finally:
+                self.close_connections()
+
+        self.stdout.write(f'Sent {sent_total} emails, {failed_total} failed attempts')
+
+    def get_connection(self):
+        """SMTP connection owned by the current worker thread, opened on first use"""
+        if getattr(self.local, 'connection', None) is None:
+            connection = get_connection(fail_silently=False)
+            connection.open()
+            self.local.connection = connection
+            with self.connections_lock:
+                self.connections.append(connection)
+        return self.local.connection
+
+    def send_batch(self, emails):
+        """
+        Send messages through send_messages() on this thread's connection.
+        Returns the error (or None) of each message, in order.
+        """
+        errors = [None] * len(emails)
+        start = 0
+        while start < len(emails):
+            current = start
+
+            def rate_limited():
+                # Tracks which message the backend is on, so a failure can be attributed
+                nonlocal current
+                for current in range(start, len(emails)):
+                    self.bucket.acquire()
+                    yield emails[current]
+
+            try:
+                self.get_connection().send_messages(rate_limited())
+                break
+            except Exception as e:
+                errors[current] = e
+                # Start a fresh session for the rest of the batch
+                connection = getattr(self.local, 'connection', None)
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+                self.local.connection = None
+                start = current + 1
+        return errors
+
+    def close_connections(self):
+        """
+        Close every worker's connection. Only called while no sends are in
+        flight; threads reopen on their next send.
+        """
+        with self.connections_lock:
+            for connection in self.connections:
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+            self.connections = []
+        self.local = threading.local()
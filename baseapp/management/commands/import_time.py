@@ -0,0 +1,70 @@
+# baseapp/management/commands/import_time.py
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from django.core.management.base import BaseCommand, CommandError
+
+# Libraries only the report, import and export paths should load
+HEAVY_MODULES = ('pandas', 'numpy', 'weasyprint', 'openpyxl')
+
+# What a web worker imports before serving its first request
+WORKER_BOOT = '''
+import resource, sys
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+for name in {extra!r}:
+    __import__(name)
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+print(','.join(sorted(name for name in {heavy!r} if name in sys.modules)))
+'''
+
+class Command(BaseCommand):
+    help = 'Summarize python -X importtime for a fresh web worker boot'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'modules',
+            nargs='*',
+            help='Extra modules to import after booting (e.g. baseapp.benchmark_ingest pandas)'
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=15,
+            help='Number of top-level packages to list'
+        )
+
+    def handle(self, *args, **options):
+        code = WORKER_BOOT.format(extra=tuple(options['modules']), heavy=HEAVY_MODULES)
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', code],
+            capture_output=True, text=True, env=os.environ.copy()
+        )
+        if result.returncode != 0:
+            raise CommandError(f'Worker boot failed:\n{result.stderr[-2000:]}')
+
+        # Lines look like "import time:       self [us] |  cumulative | imported package"
+        self_time = defaultdict(int)
+        module_count = 0
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            own, _, name = line[len('import time:'):].split('|')
+            self_time[name.strip().split('.')[0]] += int(own)
+            module_count += 1
+
+        max_rss, heavy_loaded = result.stdout.splitlines()[-2:]
+        total = sum(self_time.values())
+
+        self.stdout.write(f'{module_count} modules imported in {total / 1000:.0f} ms, peak RSS {int(max_rss) // 1024} MB')
+        self.stdout.write('Slowest top-level packages (self time):')
+        for name, microseconds in sorted(self_time.items(), key=lambda item: -item[1])[:options['top']]:
+            self.stdout.write(f'  {name:<30} {microseconds / 1000:8.1f} ms')
+
+        if heavy_loaded:
+            self.stdout.write(self.style.ERROR(f'Heavy modules loaded: {heavy_loaded.replace(",", ", ")}'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'None of {", ".join(HEAVY_MODULES)} loaded'))
@@ -0,0 +1,87 @@
+# baseapp/management/commands/process_benchmark_batches.py
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.utils import timezone
+from baseapp.models import BenchmarkBatch
+from baseapp.benchmark_ingest import INGEST_CHUNK_SIZE, claim_batch, claimable_batch_ids, ingest_benchmark_batch
+
+class Command(BaseCommand):
+    help = 'Load uploaded benchmark batch files into benchmark assessments, in chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch',
+            type=int,
+            help='Process this batch now, whatever its status (e.g. to retry a failed batch), then exit'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process every pending (or abandoned) batch, then exit instead of polling'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=INGEST_CHUNK_SIZE,
+            help='Rows read and inserted per chunk'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=10,
+            help='Seconds to wait when no batch is pending'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch']:
+            updated = BenchmarkBatch.objects.filter(id=options['batch']).update(
+                status='processing',
+                heartbeat_at=timezone.now()
+            )
+            if not updated:
+                raise CommandError(f'Benchmark batch {options["batch"]} does not exist')
+            self.process(options['batch'], options['chunk_size'])
+            return
+
+        try:
+            while True:
+                # The worker outlives MySQL's idle timeout between polls
+                close_old_connections()
+                # Includes batches left processing by a worker that stopped mid-file
+                pending = claimable_batch_ids()
+
+                if not pending:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                for batch_id in pending:
+                    # Another worker may have taken it since the query above
+                    if claim_batch(batch_id):
+                        self.process(batch_id, options['chunk_size'])
+        except KeyboardInterrupt:
+            pass
+
+    def process(self, batch_id, chunk_size):
+        batch = BenchmarkBatch.objects.select_related('business', 'created_by').get(id=batch_id)
+        self.stdout.write(f'Processing batch {batch.id} ({batch})')
+        started = time.monotonic()
+
+        def report(batch):
+            self.stdout.write(
+                f'  {batch.rows_processed} rows read, {batch.rows_created} assessments created, '
+                f'{batch.rows_skipped} skipped ({time.monotonic() - started:.1f}s)'
+            )
+
+        batch = ingest_benchmark_batch(batch, chunk_size=chunk_size, progress=report)
+
+        if batch.status == 'done':
+            self.stdout.write(self.style.SUCCESS(
+                f'Batch {batch.id} done: {batch.rows_created} assessments created in {time.monotonic() - started:.1f}s'
+            ))
+        elif batch.status == 'processing':
+            self.stdout.write(self.style.WARNING(f'Batch {batch.id} was reclaimed by another worker; stopped'))
+        else:
+            self.stdout.write(self.style.ERROR(f'Batch {batch.id} failed: {batch.error}'))
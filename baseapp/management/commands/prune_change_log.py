@@ -0,0 +1,25 @@
+# baseapp/management/commands/prune_change_log.py
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from baseapp.models import ChangeLogEntry
+
+class Command(BaseCommand):
+    help = 'Delete delta-sync change log entries older than the retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=getattr(settings, 'CHANGE_LOG_RETENTION_DAYS', 7),
+            help='Keep entries newer than this many days'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+
+        # Clients holding a cursor older than the cutoff get a reset and reload
+        deleted, _ = ChangeLogEntry.objects.filter(created_at__lt=cutoff).delete()
+
+        self.stdout.write(f'Deleted {deleted} change log entries older than {options["days"]} days')
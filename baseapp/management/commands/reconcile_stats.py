@@ -0,0 +1,43 @@
+# baseapp/management/commands/reconcile_stats.py
+from django.core.management.base import BaseCommand, CommandError
+from baseapp.models import Business, BenchmarkBatch
+from baseapp.stats import recompute_business_stats, recompute_batch_stats
+
+class Command(BaseCommand):
+    help = 'Rebuild the denormalized dashboard counters from the assessment and user tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--business',
+            type=str,
+            help='Slug of a single business to reconcile (default: all)'
+        )
+
+    def handle(self, *args, **options):
+        businesses = Business.objects.all()
+        if options['business']:
+            businesses = businesses.filter(slug=options['business'])
+            if not businesses.exists():
+                raise CommandError(f'Business with slug "{options["business"]}" does not exist')
+
+        for business in businesses:
+            before = business.stats.__dict__.copy() if hasattr(business, 'stats') else None
+            stats = recompute_business_stats(business.id)
+
+            batch_ids = BenchmarkBatch.objects.filter(business=business).values_list('id', flat=True)
+            for batch_id in batch_ids:
+                recompute_batch_stats(batch_id)
+
+            drifted = before is None or any(
+                before[field] != getattr(stats, field)
+                for field in ('hr_users_count', 'assessments_count', 'completed_count',
+                              'accessed_count', 'benchmark_total', 'benchmark_completed')
+            )
+            status = 'corrected' if drifted else 'ok'
+            self.stdout.write(
+                f'{business.name}: {stats.assessments_count} assessments, '
+                f'{stats.completed_count} completed, {stats.hr_users_count} HR users, '
+                f'{len(batch_ids)} batches ({status})'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Stats reconciled'))
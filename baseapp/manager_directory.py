@@ -0,0 +1,102 @@
+"""
+Cached per-business manager directory.
+
+Creating, editing and completing assessments all need a business's default
+managers and its managers' emails. The directory loads every manager of a
+business once and keeps the rows in the cache until a Manager changes, so
+those paths resolve recipients and defaults from memory instead of
+re-querying the managers table each time.
+"""
+import logging
+from collections import namedtuple
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from .models import Manager
+
+logger = logging.getLogger(__name__)
+
+MANAGER_FIELDS = ('id', 'name', 'email', 'region', 'position', 'is_default', 'active')
+
+ManagerEntry = namedtuple('ManagerEntry', MANAGER_FIELDS)
+
+
+def _directory_key(business_id):
+    return f'manager_directory_{business_id}'
+
+
+class ManagerDirectory:
+    """Lookups over all managers of one business"""
+
+    def __init__(self, business_id, rows):
+        self.business_id = business_id
+        # Rows arrive in the model's ordering (by name)
+        self.managers = [ManagerEntry(*row) for row in rows]
+        self.by_id = {manager.id: manager for manager in self.managers}
+        self.active = [manager for manager in self.managers if manager.active]
+        self.by_email = {manager.email.lower(): manager for manager in self.active}
+        self.defaults = [manager for manager in self.active if manager.is_default]
+        self.default_ids = [manager.id for manager in self.defaults]
+
+    def get(self, manager_id):
+        """Manager of this business with the given id (active or not), or None"""
+        try:
+            return self.by_id.get(int(manager_id))
+        except (TypeError, ValueError):
+            return None
+
+    def find_by_email(self, email):
+        """Active manager with the given email, or None"""
+        return self.by_email.get((email or '').lower())
+
+    @property
+    def first_default(self):
+        return self.defaults[0] if self.defaults else None
+
+    def active_ids(self, manager_ids):
+        """The given ids that are active managers of this business, in order and without duplicates"""
+        result = []
+        for manager_id in manager_ids:
+            manager = self.get(manager_id)
+            if manager and manager.active and manager.id not in result:
+                result.append(manager.id)
+        return result
+
+    def with_defaults(self, manager_ids):
+        """active_ids() of the selection followed by any default managers it is missing"""
+        result = self.active_ids(manager_ids)
+        result.extend(manager_id for manager_id in self.default_ids if manager_id not in result)
+        return result
+
+    def emails(self, manager_ids):
+        """Emails of the active managers among the given ids"""
+        return [self.by_id[manager_id].email for manager_id in self.active_ids(manager_ids)]
+
+
+def get_manager_directory(business_id):
+    """Get the directory of a business, loading it into the cache on a miss"""
+    key = _directory_key(business_id)
+    rows = cache.get(key)
+    if rows is None:
+        rows = list(Manager.objects.filter(business_id=business_id).values_list(*MANAGER_FIELDS))
+        cache.set(key, rows, None)
+    return ManagerDirectory(business_id, rows)
+
+
+def invalidate_manager_directory(business_id):
+    cache.delete(_directory_key(business_id))
+
+
+def _manager_changed(sender, instance, **kwargs):
+    business_id = instance.business_id
+    try:
+        invalidate_manager_directory(business_id)
+        # A request that read the old rows before this transaction committed
+        # may have cached them again in the meantime
+        transaction.on_commit(lambda: invalidate_manager_directory(business_id))
+    except Exception as e:
+        logger.error(f"Error invalidating manager directory for business {business_id}: {e}", exc_info=True)
+
+
+post_save.connect(_manager_changed, sender=Manager, dispatch_uid='manager_directory_save')
+post_delete.connect(_manager_changed, sender=Manager, dispatch_uid='manager_directory_delete')
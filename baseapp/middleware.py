@@ -1,30 +1,40 @@
 import re
 import logging
+from functools import lru_cache
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.http import HttpResponseForbidden
 from django.conf import settings
-
-#test update to reflah code
+from django.core.cache import caches
+from whitenoise.middleware import WhiteNoiseMiddleware
+from .rate_limiting import client_ip
+from . import request_metrics
 
 logger = logging.getLogger(__name__)
 
 class SecurityMiddleware:
     """Middleware to block malicious requests and scanning attempts"""
+    sync_capable = True
+    async_capable = True
     
     def __init__(self, get_response):
         self.get_response = get_response
+        # Under ASGI, await the rest of the stack instead of tying up a thread
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
         
-        # Compile regex patterns for faster matching
-        self.suspicious_patterns = [
-            re.compile(r'\.php$'),              # PHP files
-            re.compile(r'/wp-'),                # WordPress scanning (changed from r'wp-' to avoid blocking legitimate paths)
-            re.compile(r'/\.env$'),             # Environment file (added leading slash)
-            re.compile(r'/eval-stdin'),         # PHP eval attempts
-            re.compile(r'/vendor/'),            # Common vendor paths
-            re.compile(r'/admin\.php'),         # Admin PHP files
-            re.compile(r'\.(git|svn|htaccess)'),# Hidden files
+        # Path patterns of scanning attempts, searched in the lower-cased path
+        self.suspicious_paths = [
+            r'\.php$',              # PHP files
+            r'/wp-',                # WordPress scanning (changed from r'wp-' to avoid blocking legitimate paths)
+            r'/\.env$',             # Environment file (added leading slash)
+            r'/eval-stdin',         # PHP eval attempts
+            r'/vendor/',            # Common vendor paths
+            r'/admin\.php',         # Admin PHP files
+            r'\.(git|svn|htaccess)',# Hidden files
             # Modified to exclude our legitimate upload endpoints
-            re.compile(r'/(shell|hack)'),       # Common attack paths (removed 'upload')
-            re.compile(r'/[0-9a-f]{32}\.php$'), # MD5 hashed PHP files
+            r'/(shell|hack)',       # Common attack paths (removed 'upload')
+            r'/[0-9a-f]{32}\.php$', # MD5 hashed PHP files
         ]
         
         # Known scanning user agents
@@ -37,13 +47,20 @@ class SecurityMiddleware:
             'nmap',
             'masscan',
         ]
+        self._suspicious_agent_tokens = [agent.lower() for agent in self.suspicious_agents]
         
-        # Track IP addresses with too many suspicious requests
-        self.suspicious_ips = {}
+        # Suspicious request counts per IP, shared by every worker on the host.
+        # The cache bounds the memory and expires an IP an hour after its
+        # first suspicious request.
+        self.ip_tracker_cache = getattr(settings, 'SECURITY_IP_TRACKER_CACHE', 'default')
+        self.tracking_window = getattr(settings, 'SECURITY_TRACKING_WINDOW', 3600)
         
         # Threshold for blocking IPs (X suspicious requests in Y seconds)
         self.block_threshold = getattr(settings, 'SECURITY_BLOCK_THRESHOLD', 5)
         
+        # Read once; looking up an unset setting on every request is surprisingly slow
+        self.bypass = getattr(settings, 'BYPASS_SECURITY_MIDDLEWARE_IN_DEBUG', False) and settings.DEBUG
+        
         # Whitelisted paths that should never be considered suspicious
         self.whitelisted_paths = [
             # Base paths
@@ -71,22 +88,47 @@ class SecurityMiddleware:
             # Add any other legitimate paths in your application
         ]
         
-        # Compile the whitelist patterns
-        self.whitelisted_patterns = [re.compile(pattern) for pattern in self.whitelisted_paths]
+        # Each list compiled into one alternation, so a path is classified
+        # with one anchored match and at most one search instead of a loop
+        # over the patterns. (A single pattern for both lists is slower: the
+        # anchored alternatives then get retried at every position.) The
+        # suspicious patterns ignore case instead of searching a lower-cased copy.
+        self.whitelist_matcher = re.compile('|'.join(f'(?:{pattern})' for pattern in self.whitelisted_paths))
+        self.suspicious_path_finder = re.compile(
+            '|'.join(f'(?:{pattern})' for pattern in self.suspicious_paths), re.IGNORECASE
+        )
+        
+        # Scanners and clients repeat the same paths and user agents, so
+        # recent classifications are remembered (bounded, least recently used out)
+        cache_size = getattr(settings, 'SECURITY_CLASSIFIER_CACHE_SIZE', 4096)
+        self._classify_path = lru_cache(maxsize=cache_size)(self._classify_path)
+        self._is_suspicious_agent = lru_cache(maxsize=cache_size)(self._is_suspicious_agent)
         
     def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self._screen(request) or self.get_response(request)
+    
+    async def __acall__(self, request):
+        # Screening only touches host memory, so it runs on the event loop
+        return self._screen(request) or await self.get_response(request)
+    
+    def _screen(self, request):
+        """A 403 response for a request to block, else None"""
         # Skip middleware in debug mode if configured to do so
-        if getattr(settings, 'BYPASS_SECURITY_MIDDLEWARE_IN_DEBUG', False) and settings.DEBUG:
-            return self.get_response(request)
+        if self.bypass:
+            return None
+        
+        path_class = self._classify_path(request.path)
         
         # Check if the path is whitelisted
-        if self._is_whitelisted_path(request.path):
-            return self.get_response(request)
+        if path_class == 'allow':
+            return None
             
         client_ip = self._get_client_ip(request)
         
         # Check if this is a suspicious request
-        is_suspicious = self._is_suspicious_request(request)
+        is_suspicious = path_class == 'block' or self._is_suspicious_agent(request.META.get('HTTP_USER_AGENT', ''))
         
         if is_suspicious:
             # Log suspicious request
@@ -107,83 +149,72 @@ class SecurityMiddleware:
             return HttpResponseForbidden("Forbidden")
             
         # Proceed with the request
-        return self.get_response(request)
+        return None
     
-    def _is_whitelisted_path(self, path):
-        """Check if the path is in our whitelist of legitimate paths"""
-        for pattern in self.whitelisted_patterns:
-            if pattern.match(path):
-                return True
-        return False
+    def _classify_path(self, path):
+        """'allow' for whitelisted paths, 'block' for suspicious ones, else None"""
+        if self.whitelist_matcher.match(path):
+            return 'allow'
+        if self.suspicious_path_finder.search(path):
+            return 'block'
+        return None
+    
+    def _is_suspicious_agent(self, user_agent):
+        """Check the user agent against known scanners"""
+        # Plain substring tests run in C and beat a regex alternation or a
+        # Python-level Aho-Corasick automaton over a handful of tokens
+        user_agent = user_agent.lower()
+        return any(token in user_agent for token in self._suspicious_agent_tokens)
     
     def _get_client_ip(self, request):
         """Get the client IP address accounting for proxies"""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            # Get the client's real IP when behind a proxy
-            ip = x_forwarded_for.split(',')[0].strip()
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
-    
-    def _is_suspicious_request(self, request):
-        """Check if this request matches known suspicious patterns"""
-        path = request.path.lower()
-        
-        # Check path against suspicious patterns
-        for pattern in self.suspicious_patterns:
-            if pattern.search(path):
-                return True
-        
-        # Check user agent against suspicious scanners
-        user_agent = request.META.get('HTTP_USER_AGENT', '').lower()
-        for agent in self.suspicious_agents:
-            if agent.lower() in user_agent:
-                return True
-                
-        return False
+        # The first X-Forwarded-For entry is whatever the client sent, so a
+        # scanner could use it to dodge its block
+        return client_ip(request)
+    
+    def _tracker_key(self, ip):
+        return f'suspicious_ip_{ip}'
     
     def _track_suspicious_ip(self, ip):
         """Track IPs making suspicious requests"""
-        from django.utils import timezone
-        import datetime
-        
-        now = timezone.now()
-        
-        # Initialize tracking for this IP
-        if ip not in self.suspicious_ips:
-            self.suspicious_ips[ip] = {
-                'count': 0,
-                'first_seen': now,
-                'last_seen': now,
-            }
-            
-        # Update tracking data
-        self.suspicious_ips[ip]['count'] += 1
-        self.suspicious_ips[ip]['last_seen'] = now
+        tracker = caches[self.ip_tracker_cache]
+        key = self._tracker_key(ip)
         
-        # Clean up old entries (more than 1 hour old)
-        for tracked_ip in list(self.suspicious_ips.keys()):
-            if now - self.suspicious_ips[tracked_ip]['last_seen'] > datetime.timedelta(hours=1):
-                del self.suspicious_ips[tracked_ip]
+        # add() and incr() are atomic, so concurrent workers never lose a count.
+        # Only add() sets the expiry and incr() keeps it, so the window runs
+        # from the first suspicious request instead of sliding with each one.
+        tracker.add(key, 0, self.tracking_window)
+        try:
+            tracker.incr(key)
+        except ValueError:
+            # Expired in between
+            tracker.add(key, 1, self.tracking_window)
     
     def _should_block_ip(self, ip):
         """Determine if an IP should be blocked based on suspicious activity"""
-        if ip not in self.suspicious_ips:
-            return False
-            
         # Block if they've made too many suspicious requests
-        return self.suspicious_ips[ip]['count'] >= self.block_threshold
+        return caches[self.ip_tracker_cache].get(self._tracker_key(ip), 0) >= self.block_threshold
 
 class SecurityHeadersMiddleware:
     """Add security headers to all responses"""
+    sync_capable = True
+    async_capable = True
     
     def __init__(self, get_response):
         self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
         
     def __call__(self, request):
-        response = self.get_response(request)
-        
+        if self.async_mode:
+            return self.__acall__(request)
+        return self._add_headers(request, self.get_response(request))
+    
+    async def __acall__(self, request):
+        return self._add_headers(request, await self.get_response(request))
+    
+    def _add_headers(self, request, response):
         # Add security headers
         
         # Content-Security-Policy: Controls what resources the browser is allowed to load
@@ -211,4 +242,84 @@ class SecurityHeadersMiddleware:
         if not request.is_secure() and not settings.DEBUG:
             response['Strict-Transport-Security'] = 'max-age=31536000; includeSubDomains'
             
-        return response
\ No newline at end of file
+        return response
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise that can sit in an async middleware stack.
+
+    WhiteNoise's middleware is sync only, so under ASGI every request
+    would hold a thread until the view finished. Static files are looked
+    up in memory either way; only serving them stays synchronous.
+    """
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+    
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+    
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
+
+class RequestMetricsMiddleware:
+    """
+    Record the time, queries, cache lookups and size of every request
+    (see request_metrics). First in MIDDLEWARE, so the time covers the
+    whole stack.
+    """
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = getattr(settings, 'SERVER_TIMING_HEADER', False)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+    
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        metrics, token = request_metrics.start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            request_metrics.stop_request(token)
+        return self._record(request, response, metrics)
+    
+    async def __acall__(self, request):
+        metrics, token = request_metrics.start_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_metrics.stop_request(token)
+        return self._record(request, response, metrics)
+    
+    def _record(self, request, response, metrics):
+        metrics.finish()
+        
+        match = request.resolver_match
+        view_name = match.view_name if match is not None else request_metrics.UNRESOLVED
+        
+        # CommonMiddleware sets Content-Length on everything but streaming responses
+        size = response.get('Content-Length')
+        if size is None:
+            size = 0 if response.streaming else len(response.content)
+        
+        request_metrics.registry.record(view_name, metrics, response.status_code, int(size))
+        if self.server_timing:
+            response['Server-Timing'] = metrics.server_timing()
+        return response
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-19 06:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('baseapp', '0014_trainingmaterial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assessment',
+            index=models.Index(fields=['business', '-created_at', '-id'], name='assessment_business_keyset'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.4 on 2026-10-19 07:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('baseapp', '0015_assessment_business_keyset_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('collection', models.CharField(max_length=50)),
+                ('object_id', models.BigIntegerField(blank=True, null=True)),
+                ('action', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('deleted', 'Deleted'), ('reset', 'Reset')], max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('business', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='change_log', to='baseapp.business')),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['business', 'id'], name='changelog_business_cursor')],
+            },
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.1.4 on 2026-10-19 07:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def populate_stats(apps, schema_editor):
+    Business = apps.get_model('baseapp', 'Business')
+    BenchmarkBatch = apps.get_model('baseapp', 'BenchmarkBatch')
+    Assessment = apps.get_model('baseapp', 'Assessment')
+    CustomUser = apps.get_model('baseapp', 'CustomUser')
+    BusinessStats = apps.get_model('baseapp', 'BusinessStats')
+    BenchmarkBatchStats = apps.get_model('baseapp', 'BenchmarkBatchStats')
+
+    for business in Business.objects.all():
+        counts = Assessment.objects.filter(business=business).aggregate(
+            assessments_count=Count('id'),
+            completed_count=Count('id', filter=Q(completed=True)),
+            accessed_count=Count('id', filter=Q(first_accessed_at__isnull=False)),
+            benchmark_total=Count('id', filter=Q(assessment_type='benchmark')),
+            benchmark_completed=Count('id', filter=Q(assessment_type='benchmark', completed=True))
+        )
+        BusinessStats.objects.create(
+            business=business,
+            hr_users_count=CustomUser.objects.filter(business=business, is_hr=True).count(),
+            **counts
+        )
+
+    for batch in BenchmarkBatch.objects.all():
+        counts = Assessment.objects.filter(benchmark_batch=batch).aggregate(
+            total=Count('id'),
+            completed=Count('id', filter=Q(completed=True))
+        )
+        BenchmarkBatchStats.objects.create(batch=batch, **counts)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('baseapp', '0016_changelogentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BenchmarkBatchStats',
+            fields=[
+                ('batch', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='baseapp.benchmarkbatch')),
+                ('total', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'benchmark batch stats',
+            },
+        ),
+        migrations.CreateModel(
+            name='BusinessStats',
+            fields=[
+                ('business', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='baseapp.business')),
+                ('hr_users_count', models.IntegerField(default=0)),
+                ('assessments_count', models.IntegerField(default=0)),
+                ('completed_count', models.IntegerField(default=0)),
+                ('accessed_count', models.IntegerField(default=0)),
+                ('benchmark_total', models.IntegerField(default=0)),
+                ('benchmark_completed', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'business stats',
+            },
+        ),
+        migrations.RunPython(populate_stats, migrations.RunPython.noop),
+    ]
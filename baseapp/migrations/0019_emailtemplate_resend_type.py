@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-19 07:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('baseapp', '0018_outboxmessage'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='emailtemplate',
+            name='template_type',
+            field=models.CharField(choices=[('benchmark', 'Benchmark Assessment'), ('standard', 'Standard Assessment'), ('resend', 'Resend Assessment')], max_length=20),
+        ),
+    ]
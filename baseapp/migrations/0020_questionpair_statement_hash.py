@@ -0,0 +1,49 @@
+# Generated by Django 5.1.4 on 2026-10-19 11:20
+
+import hashlib
+from django.db import migrations, models
+
+
+def hash_statements(business_id, statement_a, statement_b):
+    # Frozen copy of QuestionPair.hash_statements
+    normalized = [' '.join(statement.split()).casefold() for statement in (statement_a, statement_b)]
+    content = '\x1f'.join([str(business_id)] + normalized)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def populate_statement_hashes(apps, schema_editor):
+    QuestionPair = apps.get_model('baseapp', 'QuestionPair')
+
+    seen = set()
+    pairs = []
+    for pair in QuestionPair.objects.order_by('id').only('id', 'business_id', 'statement_a', 'statement_b'):
+        statement_hash = hash_statements(pair.business_id, pair.statement_a, pair.statement_b)
+        # The oldest copy of a duplicated pair keeps the hash; later copies stay null
+        if statement_hash in seen:
+            continue
+        seen.add(statement_hash)
+        pair.statement_hash = statement_hash
+        pairs.append(pair)
+
+    QuestionPair.objects.bulk_update(pairs, ['statement_hash'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('baseapp', '0019_emailtemplate_resend_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questionpair',
+            name='statement_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+        migrations.RunPython(populate_statement_hashes, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='questionpair',
+            name='statement_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, unique=True),
+        ),
+    ]
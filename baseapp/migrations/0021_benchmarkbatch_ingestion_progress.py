@@ -0,0 +1,60 @@
+# Generated by Django 5.1.4 on 2026-10-19 12:05
+
+from django.db import migrations, models
+
+
+def mark_existing_batches(apps, schema_editor):
+    # Files uploaded before ingestion existed were never read. Leave them for
+    # an explicit reprocess instead of loading old rosters on the next deploy.
+    BenchmarkBatch = apps.get_model('baseapp', 'BenchmarkBatch')
+    BenchmarkBatch.objects.filter(processed=True).update(status='done')
+    BenchmarkBatch.objects.filter(processed=False).update(
+        status='failed',
+        error='Uploaded before batch files were processed; run process_benchmark_batches --batch <id> to load it'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('baseapp', '0020_questionpair_statement_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='benchmarkbatch',
+            name='error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='benchmarkbatch',
+            name='processed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='benchmarkbatch',
+            name='row_errors',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='benchmarkbatch',
+            name='rows_created',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='benchmarkbatch',
+            name='rows_processed',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='benchmarkbatch',
+            name='rows_skipped',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='benchmarkbatch',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=20),
+        ),
+        migrations.RunPython(mark_existing_batches, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-19 08:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('baseapp', '0022_benchmarkbatch_heartbeat_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxmessage',
+            name='claim_token',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+    ]
@@ -1,7 +1,9 @@
+import hashlib
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.utils.crypto import get_random_string
 from django.core.validators import FileExtensionValidator
+from django.utils import timezone
 from cloudinary.models import CloudinaryField
 
 class Business(models.Model):
@@ -81,6 +83,9 @@ class QuestionPair(models.Model):
     active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     order = models.IntegerField(default=0)  # For controlling question order
+    # Hash of the business and normalized statements, for indexed duplicate checks.
+    # Null only for duplicates that existed before the column was added.
+    statement_hash = models.CharField(max_length=64, unique=True, null=True, blank=True, editable=False)
     
     class Meta:
         unique_together = ['business', 'attribute1', 'attribute2']
@@ -89,6 +94,43 @@ class QuestionPair(models.Model):
     def __str__(self):
         return f"{self.attribute1} vs {self.attribute2}"
 
+    @staticmethod
+    def hash_statements(business_id, statement_a, statement_b):
+        """Content hash identifying a pair of statements within a business"""
+        # Case and runs of whitespace do not make a statement different
+        normalized = [' '.join(statement.split()).casefold() for statement in (statement_a, statement_b)]
+        content = '\x1f'.join([str(business_id)] + normalized)
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    # Attributes statement_hash is computed from
+    HASHED_FIELDS = ('business_id', 'statement_a', 'statement_b')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._hashed_values = instance._current_hashed_values()
+        return instance
+
+    def _current_hashed_values(self):
+        # Deferred fields are left out rather than loaded
+        return {name: self.__dict__[name] for name in self.HASHED_FIELDS if name in self.__dict__}
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        saves_statements = update_fields is None or bool(
+            {'business', 'business_id', 'statement_a', 'statement_b'} & set(update_fields)
+        )
+
+        # Only rehash real edits: legacy duplicates keep their null hash when
+        # saved for other reasons (toggling active, reordering)
+        if saves_statements and self._current_hashed_values() != getattr(self, '_hashed_values', None):
+            self.statement_hash = self.hash_statements(self.business_id, self.statement_a, self.statement_b)
+            if update_fields is not None:
+                kwargs['update_fields'] = list(update_fields) + ['statement_hash']
+        super().save(*args, **kwargs)
+        if saves_statements:
+            self._hashed_values = self._current_hashed_values()
+
 class BenchmarkBatch(models.Model):
     """Represents a batch of benchmark assessments"""
     business = models.ForeignKey(Business, on_delete=models.CASCADE)
@@ -100,6 +142,23 @@ class BenchmarkBatch(models.Model):
         validators=[FileExtensionValidator(allowed_extensions=['xlsx', 'xls', 'csv'])]
     )
     processed = models.BooleanField(default=False)
+
+    # Ingestion progress, written by the process_benchmark_batches command
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    rows_processed = models.IntegerField(default=0)
+    rows_created = models.IntegerField(default=0)
+    rows_skipped = models.IntegerField(default=0)
+    row_errors = models.JSONField(default=list, blank=True)  # First few rejected rows
+    error = models.TextField(blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    # Renewed after every chunk; a processing batch whose heartbeat stops is reclaimed
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
     
     def __str__(self):
         return f"{self.business.name} - {self.name}"
@@ -203,6 +262,10 @@ class Assessment(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Supports keyset pagination of a business's assessments
+            models.Index(fields=['business', '-created_at', '-id'], name='assessment_business_keyset'),
+        ]
 
 class AssessmentResponse(models.Model):
     """Stores a candidate's responses to the assessment"""
@@ -254,6 +317,7 @@ class EmailTemplate(models.Model):
     TEMPLATE_TYPE_CHOICES = [
         ('benchmark', 'Benchmark Assessment'),
         ('standard', 'Standard Assessment'),
+        ('resend', 'Resend Assessment'),
     ]
     
     business = models.ForeignKey(Business, on_delete=models.CASCADE)
@@ -285,4 +349,116 @@ class TrainingMaterial(models.Model):
         return self.title
     
     class Meta:
-        ordering = ['order', 'title']
\ No newline at end of file
+        ordering = ['order', 'title']
+
+class ChangeLogEntry(models.Model):
+    """Records a change to admin-visible data, read by the delta-sync change feed"""
+    ACTION_CHOICES = [
+        ('created', 'Created'),
+        ('updated', 'Updated'),
+        ('deleted', 'Deleted'),
+        ('reset', 'Reset'),  # Bulk change; clients reload the whole collection
+    ]
+
+    # Null for global collections such as the business list itself
+    business = models.ForeignKey(
+        Business,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='change_log'
+    )
+    collection = models.CharField(max_length=50)
+    object_id = models.BigIntegerField(null=True, blank=True)
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.collection} {self.object_id} {self.action}"
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['business', 'id'], name='changelog_business_cursor'),
+        ]
+
+class BusinessStats(models.Model):
+    """Denormalized per-business counters for the admin dashboard, kept current by signals"""
+    business = models.OneToOneField(Business, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    hr_users_count = models.IntegerField(default=0)
+    assessments_count = models.IntegerField(default=0)
+    completed_count = models.IntegerField(default=0)
+    accessed_count = models.IntegerField(default=0)  # Assessments opened at least once
+    benchmark_total = models.IntegerField(default=0)
+    benchmark_completed = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Stats for {self.business}"
+
+    @property
+    def pending_count(self):
+        return self.assessments_count - self.completed_count
+
+    @property
+    def benchmark_completion(self):
+        """Percentage of benchmark assessments completed"""
+        if self.benchmark_total <= 0:
+            return 0
+        return round(self.benchmark_completed / self.benchmark_total * 100, 1)
+
+    class Meta:
+        verbose_name_plural = "business stats"
+
+class BenchmarkBatchStats(models.Model):
+    """Denormalized assessment counters for a benchmark batch"""
+    batch = models.OneToOneField(BenchmarkBatch, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    total = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Stats for {self.batch}"
+
+    @property
+    def completion_rate(self):
+        if self.total <= 0:
+            return 0
+        return round(self.completed / self.total * 100, 1)
+
+    class Meta:
+        verbose_name_plural = "benchmark batch stats"
+
+class OutboxMessage(models.Model):
+    """An email queued in the same transaction as the change that caused it, sent by dispatch_outbox"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    business = models.ForeignKey(Business, on_delete=models.SET_NULL, null=True, blank=True, related_name='outbox_messages')
+    assessment = models.ForeignKey(Assessment, on_delete=models.SET_NULL, null=True, blank=True, related_name='outbox_messages')
+    category = models.CharField(max_length=50)
+    subject = models.TextField()
+    body = models.TextField()
+    from_email = models.CharField(max_length=255)
+    to = models.JSONField(default=list)
+    reply_to = models.JSONField(default=list, blank=True)
+    attach_report = models.BooleanField(default=False)  # Render the assessment's PDF report at send time
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claim_token = models.CharField(max_length=32, blank=True, default='')  # Set by each claim; only its holder may report back
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.category} to {', '.join(self.to)} ({self.status})"
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due'),
+        ]
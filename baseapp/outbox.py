@@ -0,0 +1,226 @@
+"""
+Transactional email outbox.
+
+Views call enqueue_email() inside the transaction that makes the change the
+email is about, so a message exists exactly when the change commits. The
+dispatch_outbox command claims due messages, sends them at the provider's
+rate and retries failures with exponential backoff. Requests never wait on
+SMTP and a mail server outage only delays delivery.
+"""
+import os
+import random
+import smtplib
+import threading
+import time
+import uuid
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+# How long a claimed message is reserved for the worker that claimed it.
+# A worker that dies mid-send releases its messages when the lease runs out.
+# Workers renew the lease as they go; once another worker has reclaimed a
+# message, the claim token no longer matches and the first one lets it go.
+CLAIM_LEASE_SECONDS = 300
+
+# Errors that will not go away by retrying
+PERMANENT_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused)
+
+
+def enqueue_email(subject, body, to, business=None, assessment=None, category='general',
+                  reply_to=None, attach_report=False, from_email=None):
+    """
+    Queue an email for the dispatcher.
+
+    Args:
+        subject: Subject line
+        body: Plain text body
+        to: Recipient address or list of addresses
+        business: Business the email belongs to (defaults to the assessment's)
+        assessment: Assessment the email is about
+        category: Short label used in logs and the admin (e.g. 'invitation')
+        reply_to: Optional list of reply-to addresses
+        attach_report: Attach the assessment's PDF report, rendered at send time
+        from_email: Sender (defaults to DEFAULT_FROM_EMAIL)
+
+    Returns:
+        The OutboxMessage created
+    """
+    if isinstance(to, str):
+        to = [to]
+
+    return OutboxMessage.objects.create(
+        business_id=business.id if business else getattr(assessment, 'business_id', None),
+        assessment=assessment,
+        category=category,
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(to),
+        reply_to=list(reply_to or []),
+        attach_report=attach_report
+    )
+
+
+def build_outbox_email(message):
+    """Turn an OutboxMessage into an EmailMessage, rendering its report if needed"""
+    email = EmailMessage(
+        subject=message.subject,
+        body=message.body,
+        from_email=message.from_email,
+        to=message.to,
+        reply_to=message.reply_to or None
+    )
+
+    if message.attach_report:
+        from .utils.report_generator import generate_assessment_report
+
+        assessment = message.assessment
+        if assessment is None or not hasattr(assessment, 'assessmentresponse'):
+            raise ValueError('Assessment report is no longer available')
+
+        pdf_path = generate_assessment_report(assessment.assessmentresponse)
+        try:
+            clean_name = "".join(c for c in assessment.candidate_name if c.isalnum() or c in (' ', '-', '_')).strip()
+            completed_on = (assessment.completed_at or message.created_at).strftime("%Y%m%d")
+            with open(pdf_path, 'rb') as f:
+                email.attach(f'Assessment_Report_{clean_name}_{completed_on}.pdf', f.read(), 'application/pdf')
+        finally:
+            if os.path.exists(pdf_path):
+                os.remove(pdf_path)
+
+    return email
+
+
+def claim_due_messages(limit):
+    """
+    Reserve up to limit due messages for this worker, under one new claim token.
+    Rows locked by another worker are skipped where the database supports it.
+    """
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    with transaction.atomic():
+        due = OutboxMessage.objects.filter(
+            status='pending',
+            next_attempt_at__lte=now
+        ).select_related('assessment').order_by('next_attempt_at', 'id')
+
+        if connection.features.has_select_for_update:
+            due = due.select_for_update(
+                skip_locked=connection.features.has_select_for_update_skip_locked,
+                of=('self',) if connection.features.has_select_for_update_of else ()
+            )
+
+        messages = list(due[:limit])
+        if messages:
+            OutboxMessage.objects.filter(id__in=[m.id for m in messages]).update(
+                attempts=F('attempts') + 1,
+                next_attempt_at=now + timedelta(seconds=CLAIM_LEASE_SECONDS),
+                claim_token=token
+            )
+
+    for message in messages:
+        message.attempts += 1
+        message.claim_token = token
+    return messages
+
+
+def _by_claim(messages):
+    """Ids of messages grouped by the claim token they were claimed under"""
+    claims = defaultdict(list)
+    for message in messages:
+        claims[message.claim_token].append(message.id)
+    return claims.items()
+
+
+def renew_leases(messages):
+    """
+    Extend this worker's lease on claimed messages.
+
+    Returns:
+        The messages still held; the others were reclaimed by another
+        worker after their lease ran out and must not be sent
+    """
+    held = set()
+    lease_until = timezone.now() + timedelta(seconds=CLAIM_LEASE_SECONDS)
+    for token, ids in _by_claim(messages):
+        claimed = OutboxMessage.objects.filter(id__in=ids, claim_token=token, status='pending')
+        claimed.update(next_attempt_at=lease_until)
+        held.update(claimed.values_list('id', flat=True))
+
+    lost = [message.id for message in messages if message.id not in held]
+    if lost:
+        logger.warning(f"Lease lost on outbox messages {lost}, leaving them to the worker that reclaimed them")
+    return [message for message in messages if message.id in held]
+
+
+def retry_delay(attempts):
+    """Exponential backoff with jitter for the given attempt number"""
+    delay = settings.OUTBOX_RETRY_BASE_SECONDS * (2 ** (attempts - 1))
+    delay = min(delay, settings.OUTBOX_RETRY_MAX_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def mark_sent(messages):
+    """Mark claimed messages sent, unless another worker has reclaimed them"""
+    for token, ids in _by_claim(messages):
+        OutboxMessage.objects.filter(id__in=ids, claim_token=token).update(
+            status='sent',
+            sent_at=timezone.now(),
+            last_error=''
+        )
+
+
+def mark_failed(message, error):
+    """Schedule a retry, or give up after OUTBOX_MAX_ATTEMPTS or a permanent error"""
+    # Only while this worker still holds the claim
+    claimed = OutboxMessage.objects.filter(id=message.id, claim_token=message.claim_token)
+    permanent = isinstance(error, PERMANENT_ERRORS)
+    if permanent or message.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        if claimed.update(status='failed', last_error=str(error)):
+            logger.error(f"Giving up on outbox message {message.id} after {message.attempts} attempts: {error}")
+    else:
+        delay = retry_delay(message.attempts)
+        if claimed.update(next_attempt_at=timezone.now() + timedelta(seconds=delay), last_error=str(error)):
+            logger.warning(f"Outbox message {message.id} failed (attempt {message.attempts}), retrying in {delay:.0f}s: {error}")
+
+
+def prune_sent_messages(days):
+    """Delete sent messages older than the retention period"""
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = OutboxMessage.objects.filter(status='sent', sent_at__lt=cutoff).delete()
+    return deleted
+
+
+class TokenBucket:
+    """Thread-safe token bucket limiting sends to rate per second with bursts up to capacity"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
@@ -0,0 +1,95 @@
+import base64
+from datetime import datetime
+from django.db.models import Q
+
+
+def encode_cursor(created_at, pk):
+    """
+    Encode a (created_at, id) position into an opaque URL-safe cursor.
+
+    Args:
+        created_at: Timestamp of the last row on the page
+        pk: Primary key of the last row on the page
+
+    Returns:
+        A URL-safe base64 string
+    """
+    raw = f"{created_at.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Returns:
+        (created_at, id) tuple, or None if the cursor is missing or malformed
+    """
+    if not cursor:
+        return None
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, pk = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def keyset_page(queryset, cursor=None, limit=50):
+    """
+    Return one page of a queryset ordered newest first on (created_at, id).
+
+    Rows are fetched with a WHERE clause on the cursor position instead of
+    OFFSET, so every page costs the same no matter how deep the client scrolls.
+
+    Args:
+        queryset: Queryset or values() queryset with created_at and id
+        cursor: Cursor string from a previous page (None for the first page)
+        limit: Maximum number of rows to return
+
+    Returns:
+        (rows, next_cursor) where next_cursor is None on the last page
+    """
+    rows = list(_page_query(queryset, cursor, limit))
+    return _split_page(rows, limit)
+
+
+async def akeyset_page(queryset, cursor=None, limit=50):
+    """Async version of keyset_page, for async views"""
+    rows = [row async for row in _page_query(queryset, cursor, limit)]
+    return _split_page(rows, limit)
+
+
+def _page_query(queryset, cursor, limit):
+    position = decode_cursor(cursor)
+    if position:
+        created_at, pk = position
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+        )
+
+    # Fetch one extra row to know whether another page exists
+    return queryset.order_by('-created_at', '-id')[:limit + 1]
+
+
+def _split_page(rows, limit):
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        if isinstance(last, dict):
+            next_cursor = encode_cursor(last['created_at'], last['id'])
+        else:
+            next_cursor = encode_cursor(last.created_at, last.id)
+
+    return rows, next_cursor
+
+
+def parse_limit(value, default=50, maximum=200):
+    """Parse a page size query parameter, clamped to [1, maximum]"""
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(limit, maximum))
@@ -0,0 +1,194 @@
+"""
+PDF rendering in a supervised child process.
+
+WeasyPrint keeps the memory a render needed, and a pathological document
+can need a lot of it. Each process that renders reports therefore hands
+the rendering to a child process of its own: the child gets a memory
+limit (RLIMIT_AS, since Linux does not enforce RLIMIT_RSS), renders HTML
+and CSS strings it receives over a pipe and sends the PDF bytes back.
+
+The parent waits at most PDF_RENDER_TIMEOUT seconds and kills a child that
+takes longer. A child is replaced after PDF_RENDER_MAX_RENDERS renders,
+once its peak RSS passes PDF_RENDER_MAX_RSS, or when it runs out of memory
+or dies, so the web worker's own footprint does not grow with the number
+of reports it serves.
+
+Children are started with 'spawn': forking a web worker would copy its
+memory and state into every renderer.
+"""
+import os
+import sys
+import threading
+import logging
+import multiprocessing
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+class PDFRenderError(Exception):
+    """The renderer failed, ran out of memory or died"""
+
+
+class PDFRenderTimeout(PDFRenderError):
+    """The renderer took longer than the timeout and was killed"""
+
+
+def _render(html_string, css_string, base_url):
+    from weasyprint import HTML, CSS
+    html = HTML(string=html_string, base_url=base_url)
+    return html.write_pdf(stylesheets=[CSS(string=css_string)])
+
+
+def _peak_rss():
+    import resource
+    # Kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _serve(conn, max_memory):
+    """Child process: render requests until the parent closes the pipe"""
+    import resource
+    if max_memory:
+        resource.setrlimit(resource.RLIMIT_AS, (max_memory, max_memory))
+
+    while True:
+        try:
+            html_string, css_string, base_url = conn.recv()
+        except EOFError:
+            return
+        try:
+            pdf = _render(html_string, css_string, base_url)
+        except MemoryError:
+            conn.send(('memory', 'Ran out of memory while rendering', _peak_rss()))
+            return
+        except Exception as e:
+            conn.send(('error', f'{type(e).__name__}: {e}', _peak_rss()))
+        else:
+            conn.send(('ok', pdf, _peak_rss()))
+
+
+class PDFRenderer:
+    """
+    Supervisor of one rendering child process.
+
+    Renders are serialized; a process rendering from several threads at
+    once waits for the child in turn.
+    """
+
+    def __init__(self, timeout=25, max_memory=1024 * MB, max_rss=256 * MB, max_renders=100):
+        self.timeout = timeout
+        self.max_memory = max_memory
+        self.max_rss = max_rss
+        self.max_renders = max_renders
+        self._lock = threading.Lock()
+        self._process = None
+        self._conn = None
+        self._owner = None
+        self._renders = 0
+
+    def _start(self):
+        context = multiprocessing.get_context('spawn')
+        parent_conn, child_conn = context.Pipe()
+        process = context.Process(
+            target=_serve,
+            args=(child_conn, self.max_memory),
+            name='pdf-renderer',
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        self._process = process
+        self._conn = parent_conn
+        self._owner = os.getpid()
+        self._renders = 0
+        logger.info(f"Started PDF renderer {process.pid}")
+
+    def _stop(self, reason, kill=False):
+        process = self._process
+        self._process = None
+        # An idle child exits when its pipe closes
+        self._conn.close()
+        self._conn = None
+        if kill:
+            process.kill()
+        process.join(5)
+        if process.is_alive():
+            process.kill()
+            process.join()
+        logger.info(f"Stopped PDF renderer {process.pid} after {self._renders} renders: {reason}")
+
+    def render(self, html_string, css_string, base_url=None):
+        """
+        Render HTML and CSS to PDF bytes in the child process.
+
+        Raises:
+            PDFRenderTimeout: The render took longer than the timeout
+            PDFRenderError: The render failed or the child died
+        """
+        with self._lock:
+            if self._process is not None and self._owner != os.getpid():
+                # Forked after starting a child; that one belongs to the parent
+                self._process = self._conn = None
+            if self._process is not None and not self._process.is_alive():
+                self._stop(f'exited with code {self._process.exitcode} while idle')
+            if self._process is None:
+                self._start()
+
+            try:
+                self._conn.send((html_string, css_string, base_url))
+                if not self._conn.poll(self.timeout):
+                    self._stop(f'timed out after {self.timeout}s', kill=True)
+                    raise PDFRenderTimeout(f'PDF rendering took longer than {self.timeout} seconds')
+                status, result, peak_rss = self._conn.recv()
+            except (EOFError, OSError):
+                # Killed (e.g. by the kernel) or crashed in a native library
+                self._process.join(1)
+                exitcode = self._process.exitcode
+                self._stop(f'exited with code {exitcode}', kill=True)
+                raise PDFRenderError(f'PDF renderer exited with code {exitcode}')
+
+            self._renders += 1
+            if status == 'memory':
+                self._stop('out of memory')
+            elif peak_rss > self.max_rss:
+                self._stop(f'peak RSS {peak_rss // MB} MB')
+            elif self._renders >= self.max_renders:
+                self._stop('render limit reached')
+
+        if status != 'ok':
+            raise PDFRenderError(result)
+        return result
+
+
+_renderer = None
+_renderer_lock = threading.Lock()
+
+
+def get_renderer():
+    """This process's renderer, configured from the PDF_RENDER_* settings"""
+    global _renderer
+    with _renderer_lock:
+        if _renderer is None:
+            _renderer = PDFRenderer(
+                timeout=getattr(settings, 'PDF_RENDER_TIMEOUT', 25),
+                max_memory=getattr(settings, 'PDF_RENDER_MAX_MEMORY_MB', 1024) * MB,
+                max_rss=getattr(settings, 'PDF_RENDER_MAX_RSS_MB', 256) * MB,
+                max_renders=getattr(settings, 'PDF_RENDER_MAX_RENDERS', 100),
+            )
+        return _renderer
+
+
+def render_pdf(html_string, css_string, base_url=None):
+    """
+    Render HTML and CSS to PDF bytes.
+
+    Rendering happens in the supervised child process unless the
+    PDF_RENDER_ISOLATED setting is off, in which case it runs in this one.
+    """
+    if not getattr(settings, 'PDF_RENDER_ISOLATED', True):
+        return _render(html_string, css_string, base_url)
+    return get_renderer().render(html_string, css_string, base_url)
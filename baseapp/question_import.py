@@ -0,0 +1,276 @@
+"""
+Set-based question template import.
+
+The upload is decoded and parsed line by line instead of being read into
+one string. plan_question_import() loads the business's attributes and
+question pair hashes in two queries and works out the whole diff in memory;
+apply_question_import() writes it with bulk inserts in one transaction.
+The number of queries does not depend on the size of the template, and a
+dry run is simply a plan that is never applied.
+"""
+import codecs
+import csv
+import json
+import logging
+from django.db import transaction
+from .models import Attribute, QuestionPair
+from .data_versions import bump_data_version
+from .bulk_tracking import refresh_after_bulk_write
+
+logger = logging.getLogger(__name__)
+
+# Rows per INSERT statement
+IMPORT_BATCH_SIZE = 500
+
+# Field -> column headings accepted for it
+TEMPLATE_COLUMNS = (
+    ('attribute1', ('attribute1', 'Attribute-A')),
+    ('attribute2', ('attribute2', 'Attribute-B')),
+    ('statement_a', ('statement_a', 'Statement-A')),
+    ('statement_b', ('statement_b', 'Statement-B')),
+)
+
+ATTRIBUTE_NAME_MAX_LENGTH = Attribute._meta.get_field('name').max_length
+
+
+class TemplateImportError(Exception):
+    """The template cannot be read"""
+
+
+def read_template_rows(uploaded_file):
+    """
+    Stream the rows of a CSV template.
+
+    Yields:
+        (line_number, row) where row maps attribute1, attribute2,
+        statement_a and statement_b to stripped values
+
+    Raises:
+        TemplateImportError: Missing columns or a file that is not UTF-8
+    """
+    reader = csv.reader(codecs.iterdecode(uploaded_file, 'utf-8-sig'))
+    try:
+        headers = [header.strip() for header in next(reader, [])]
+
+        positions = {}
+        missing_columns = []
+        for field, names in TEMPLATE_COLUMNS:
+            position = next((headers.index(name) for name in names if name in headers), None)
+            if position is None:
+                missing_columns.append(' (or '.join(names) + ')')
+            positions[field] = position
+
+        if missing_columns:
+            raise TemplateImportError(f"Missing required columns: {', '.join(missing_columns)}")
+
+        for values in reader:
+            if not any(value.strip() for value in values):
+                continue
+            yield reader.line_num, {
+                field: values[position].strip() if position < len(values) else ''
+                for field, position in positions.items()
+            }
+    except UnicodeDecodeError:
+        raise TemplateImportError('The file must be UTF-8 encoded')
+
+
+def read_template_json(source):
+    """
+    Read a JSON template: a list of objects with attribute1, attribute2,
+    statement_a and statement_b (attr1/attr2 are accepted for the attributes).
+
+    Yields:
+        (item_number, row) like read_template_rows()
+    """
+    try:
+        items = json.load(source)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise TemplateImportError(f'Invalid JSON template: {e}')
+    if not isinstance(items, list):
+        raise TemplateImportError('A JSON template must be a list of question pairs')
+
+    for number, item in enumerate(items, start=1):
+        if not isinstance(item, dict):
+            raise TemplateImportError(f'Item {number} is not an object')
+        yield number, {
+            'attribute1': str(item.get('attribute1', item.get('attr1', ''))).strip(),
+            'attribute2': str(item.get('attribute2', item.get('attr2', ''))).strip(),
+            'statement_a': str(item.get('statement_a', '')).strip(),
+            'statement_b': str(item.get('statement_b', '')).strip(),
+        }
+
+
+class QuestionImportPlan:
+    """The changes an import would make to one business's question pairs"""
+
+    def __init__(self, business):
+        self.business = business
+        self.attribute_ids = {}
+        self.new_attributes = []
+        self.new_pairs = []
+        # (pair id, row) for pairs whose statements change
+        self.changed_pairs = []
+        self.existing_pairs = 0
+        self.duplicate_rows = 0
+        self.row_errors = []
+
+    def summary(self):
+        return {
+            'new_attributes': self.new_attributes,
+            'new_pairs': len(self.new_pairs),
+            'changed_pairs': len(self.changed_pairs),
+            'existing_pairs': self.existing_pairs,
+            'duplicate_rows': self.duplicate_rows,
+            'row_errors': self.row_errors,
+        }
+
+
+def _attribute_key(name):
+    # Attribute names are unique per business under the database collation,
+    # which ignores case on MySQL
+    return name.casefold()
+
+
+def plan_question_import(business, rows, update_existing=False):
+    """
+    Work out which attributes and question pairs an import would create.
+
+    Args:
+        business: Business being imported into
+        rows: Iterable of (line_number, row) as yielded by read_template_rows()
+        update_existing: Replace the statements of a pair whose attribute
+            combination already exists instead of reporting the row
+
+    Returns:
+        QuestionImportPlan
+    """
+    plan = QuestionImportPlan(business)
+
+    for name, attribute_id in Attribute.objects.filter(business=business).values_list('name', 'id'):
+        plan.attribute_ids[_attribute_key(name)] = attribute_id
+
+    existing_hashes = set()
+    # Attribute combination -> id of the existing pair (None for pairs added by this import)
+    taken_attribute_pairs = {}
+    for pair_id, statement_hash, attribute1_id, attribute2_id in QuestionPair.objects.filter(
+        business=business
+    ).values_list('id', 'statement_hash', 'attribute1_id', 'attribute2_id'):
+        existing_hashes.add(statement_hash)
+        taken_attribute_pairs[(attribute1_id, attribute2_id)] = pair_id
+
+    new_attribute_keys = set()
+    seen_hashes = set()
+
+    for line_number, row in rows:
+        errors = [f'{field} is required' for field, _ in TEMPLATE_COLUMNS if not row[field]]
+        for field in ('attribute1', 'attribute2'):
+            if len(row[field]) > ATTRIBUTE_NAME_MAX_LENGTH:
+                errors.append(f'{field} is longer than {ATTRIBUTE_NAME_MAX_LENGTH} characters')
+        if errors:
+            plan.row_errors.append({'row': line_number, 'errors': errors})
+            continue
+
+        row['statement_hash'] = QuestionPair.hash_statements(business.id, row['statement_a'], row['statement_b'])
+        if row['statement_hash'] in seen_hashes:
+            plan.duplicate_rows += 1
+            continue
+        seen_hashes.add(row['statement_hash'])
+
+        if row['statement_hash'] in existing_hashes:
+            plan.existing_pairs += 1
+            continue
+
+        # A business can only have one pair per ordered attribute combination.
+        # Attributes created by this import are keyed by name until they exist.
+        key1, key2 = _attribute_key(row['attribute1']), _attribute_key(row['attribute2'])
+        attribute_pair = (plan.attribute_ids.get(key1, key1), plan.attribute_ids.get(key2, key2))
+        if attribute_pair in taken_attribute_pairs:
+            pair_id = taken_attribute_pairs[attribute_pair]
+            if update_existing and pair_id is not None:
+                plan.changed_pairs.append((pair_id, row))
+                # Later rows for the same combination are errors
+                taken_attribute_pairs[attribute_pair] = None
+            else:
+                plan.row_errors.append({'row': line_number, 'errors': [
+                    f"{row['attribute1']} vs {row['attribute2']} already has a question pair with different statements"
+                ]})
+            continue
+        taken_attribute_pairs[attribute_pair] = None
+
+        for field, key in (('attribute1', key1), ('attribute2', key2)):
+            if key not in plan.attribute_ids and key not in new_attribute_keys:
+                new_attribute_keys.add(key)
+                plan.new_attributes.append(row[field])
+
+        plan.new_pairs.append(row)
+
+    return plan
+
+
+def apply_question_import(plan):
+    """
+    Create the planned attributes and question pairs and apply the planned
+    statement changes in one transaction.
+
+    Returns:
+        Number of question pairs created
+    """
+    business = plan.business
+    if not (plan.new_attributes or plan.new_pairs or plan.changed_pairs) and business.assessment_template_uploaded:
+        # Nothing to write; re-running an import leaves the business untouched
+        return 0
+
+    with transaction.atomic():
+        if plan.new_attributes:
+            # New attributes are ordered after the existing ones, in the order they first appear
+            first_order = len(plan.attribute_ids) + 1
+            Attribute.objects.bulk_create([
+                Attribute(name=name, business=business, active=True, order=order)
+                for order, name in enumerate(plan.new_attributes, start=first_order)
+            ], batch_size=IMPORT_BATCH_SIZE)
+
+            # Read the ids back; bulk_create does not return them on MySQL
+            for name, attribute_id in Attribute.objects.filter(
+                business=business, name__in=plan.new_attributes
+            ).values_list('name', 'id'):
+                plan.attribute_ids[_attribute_key(name)] = attribute_id
+
+        QuestionPair.objects.bulk_create([
+            QuestionPair(
+                business=business,
+                attribute1_id=plan.attribute_ids[_attribute_key(row['attribute1'])],
+                attribute2_id=plan.attribute_ids[_attribute_key(row['attribute2'])],
+                statement_a=row['statement_a'],
+                statement_b=row['statement_b'],
+                # bulk_create skips save(), which normally sets this
+                statement_hash=row['statement_hash'],
+                order=order
+            )
+            for order, row in enumerate(plan.new_pairs, start=1)
+        ], batch_size=IMPORT_BATCH_SIZE)
+
+        if plan.changed_pairs:
+            QuestionPair.objects.bulk_update([
+                QuestionPair(
+                    id=pair_id,
+                    statement_a=row['statement_a'],
+                    statement_b=row['statement_b'],
+                    statement_hash=row['statement_hash']
+                )
+                for pair_id, row in plan.changed_pairs
+            ], ['statement_a', 'statement_b', 'statement_hash'], batch_size=IMPORT_BATCH_SIZE)
+
+        # Mark business as having uploaded assessment template
+        business.assessment_template_uploaded = True
+        business.save(update_fields=['assessment_template_uploaded'])
+
+    # bulk_create sends no signals
+    if plan.new_attributes:
+        bump_data_version('attributes', business.id)
+    refresh_after_bulk_write('question_pairs', business.id)
+
+    logger.info(
+        f"Imported {len(plan.new_pairs)} question pairs and {len(plan.new_attributes)} attributes, "
+        f"updated {len(plan.changed_pairs)} question pairs for business {business.id}"
+    )
+    return len(plan.new_pairs)
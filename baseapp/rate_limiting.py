@@ -1,59 +1,170 @@
+"""
+Sliding window rate limiting.
+
+Each limited key keeps one integer counter per window, created with add()
+and bumped with incr(), so storage per key is constant and concurrent
+requests cannot undercount. A request is weighed against the current
+window's count plus the previous window's count scaled by how much of the
+previous window still overlaps the sliding period.
+
+The counters live in the RATE_LIMIT_CACHE alias, which must implement
+incr() atomically (the shared-memory 'host' cache does). Being host memory,
+it is also quick enough to use directly from async views.
+"""
+import math
+import time
 from functools import wraps
-from django.core.cache import cache
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
 from django.http import HttpResponse
-from django.utils import timezone
-import time
 
-def rate_limit(key_prefix, limit=5, period=60):
+
+def client_ip(request):
+    """Address of the client; Heroku's router appends the one it saw to X-Forwarded-For"""
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if x_forwarded_for:
+        return x_forwarded_for.split(',')[-1].strip()
+    return request.META.get('REMOTE_ADDR')
+
+
+def _user_key(request, *args, **kwargs):
+    # Anonymous requests fall back to their address
+    if request.user.is_authenticated:
+        return f'user{request.user.pk}'
+    return client_ip(request)
+
+
+def _link_key(request, *args, **kwargs):
+    return kwargs.get('unique_link')
+
+
+RATE_LIMIT_KEYS = {
+    'ip': lambda request, *args, **kwargs: client_ip(request),
+    'user': _user_key,
+    'link': _link_key,
+}
+
+
+def check_rate_limit(bucket, identifier, limit, period):
+    """
+    Count a request against a limit.
+
+    Rejected requests are counted too, so a client that keeps retrying
+    stays limited.
+
+    Args:
+        bucket: Name of the limit (e.g. 'login')
+        identifier: Who is limited (an address, user or assessment link)
+        limit: Requests allowed per period
+        period: Length of the sliding window in seconds
+
+    Returns:
+        0 when the request is allowed, else the seconds until one would be
+    """
+    cache = caches[getattr(settings, 'RATE_LIMIT_CACHE', 'default')]
+    now = time.time()
+    window = int(now // period)
+    elapsed = now - window * period
+    key = f'ratelimit_{bucket}_{identifier}'
+
+    # Each counter is kept through the next window, where it is the previous one
+    current_key = f'{key}_{window}'
+    cache.add(current_key, 0, period * 2)
+    try:
+        count = cache.incr(current_key)
+    except ValueError:
+        # Expired between add() and incr()
+        cache.add(current_key, 0, period * 2)
+        count = cache.incr(current_key)
+    previous = cache.get(f'{key}_{window - 1}', 0)
+
+    remaining_overlap = (period - elapsed) / period
+    if previous * remaining_overlap + count <= limit:
+        return 0
+
+    # The retry counts as well, so it has to fit next to this window's count
+    if count < limit:
+        # Allowed once enough of the previous window has slid out
+        wait = period * (1 - (limit - count - 1) / previous) - elapsed
+        if wait < period - elapsed:
+            return max(math.ceil(wait), 1)
+    # Otherwise in the next window, once this window's count has slid out far enough
+    wait = period - elapsed + period * max(1 - (limit - 1) / count, 0)
+    return max(math.ceil(wait), 1)
+
+
+def rate_limit(key_prefix, limit=5, period=60, key='ip', methods=None):
     """
     Rate limiting decorator for Django views.
-    
+
     Args:
         key_prefix: Prefix for the cache key (e.g., 'login', 'reset_password')
         limit: Maximum number of requests allowed in the time period
         period: Time period in seconds
-        
+        key: What is limited: 'ip', 'user' (the client address when
+            anonymous), 'link' (the view's unique_link argument) or a
+            function of the view's arguments returning an identifier
+            (None to let the request through)
+        methods: HTTP methods to limit (all when None)
+
+    Works on sync and async views; key='user' needs a sync view.
+
     Example usage:
         @rate_limit('login', limit=5, period=60)
         def login_view(request):
             # Your login view code
+
+        # Stack decorators for several limits
+        @rate_limit('assessment_submit', limit=10, period=60, key='link', methods=['POST'])
+        @rate_limit('assessment_submit_ip', limit=30, period=60, methods=['POST'])
+        def take_assessment(request, unique_link):
+            ...
     """
+    get_identifier = RATE_LIMIT_KEYS[key] if isinstance(key, str) else key
+
+    def limited_response(request, *args, **kwargs):
+        """A 429 response when the request is over the limit, else None"""
+        if methods is not None and request.method not in methods:
+            return None
+
+        identifier = get_identifier(request, *args, **kwargs)
+        if identifier is None:
+            return None
+
+        retry_after = check_rate_limit(key_prefix, identifier, limit, period)
+        if retry_after:
+            # Return a 429 Too Many Requests response
+            response = HttpResponse(
+                "Rate limit exceeded. Please try again later.",
+                status=429
+            )
+            # Add Retry-After header to indicate when the client can try again
+            response['Retry-After'] = retry_after
+            return response
+        return None
+
     def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            if key == 'user':
+                # request.user would query the database from the event loop
+                raise TypeError("rate_limit(key='user') does not support async views")
+
+            @wraps(view_func)
+            async def wrapped_view(request, *args, **kwargs):
+                response = limited_response(request, *args, **kwargs)
+                if response is not None:
+                    return response
+                return await view_func(request, *args, **kwargs)
+            return wrapped_view
+
         @wraps(view_func)
         def wrapped_view(request, *args, **kwargs):
-            # Get client IP
-            ip = request.META.get('HTTP_X_FORWARDED_FOR', request.META.get('REMOTE_ADDR'))
-            
-            # Create a unique cache key using prefix and client IP
-            cache_key = f"{key_prefix}_{ip}"
-            
-            # Get current requests info from cache
-            requests = cache.get(cache_key, [])
-            
-            # Get current timestamp
-            now = time.time()
-            
-            # Filter out requests older than the period
-            requests = [r for r in requests if r > now - period]
-            
-            # Check if request limit is reached
-            if len(requests) >= limit:
-                # Return a 429 Too Many Requests response
-                response = HttpResponse(
-                    "Rate limit exceeded. Please try again later.", 
-                    status=429
-                )
-                # Add Retry-After header to indicate when the client can try again
-                response['Retry-After'] = int(period - (now - requests[0]))
+            response = limited_response(request, *args, **kwargs)
+            if response is not None:
                 return response
-                
-            # Add current request timestamp to the list
-            requests.append(now)
-            
-            # Update cache
-            cache.set(cache_key, requests, timeout=period)
-            
+
             # Process the view
             return view_func(request, *args, **kwargs)
         return wrapped_view
-    return decorator
\ No newline at end of file
+    return decorator
@@ -0,0 +1,235 @@
+"""
+Per-request performance metrics.
+
+RequestMetricsMiddleware times every request and counts its database
+queries, their time and its cache hits and misses, then adds them to
+rolling per-view statistics kept in this process's memory. They are read
+through the admin-only request-metrics endpoint and, when the
+SERVER_TIMING_HEADER setting is on, per response from the Server-Timing
+header.
+
+Queries are timed by an execute wrapper that stays on every database
+connection (added when the connection is created), rather than one
+entered by the middleware: under ASGI the queries run in other threads,
+whose connections the middleware never sees. The wrapper and the cache
+backends find the current request's counters through a context variable,
+which follows the request into those threads. Commits and rollbacks are
+not cursor statements, so they are not counted as queries.
+
+Statistics cover the last REQUEST_METRICS_WINDOWS windows of
+REQUEST_METRICS_WINDOW_SECONDS each. Times and query counts are kept as
+fixed-bucket histograms, so recording costs the same however busy a view
+is, and percentiles are reported as the upper bound of their bucket.
+"""
+import os
+import time
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# Histogram bucket upper bounds; larger values go in a final overflow bucket
+TIME_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+# Label of requests that did not resolve to a view (404s, static files, blocked scans)
+UNRESOLVED = '(unresolved)'
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Counters of the request being handled"""
+    __slots__ = ('started', 'wall', 'queries', 'db_time', 'cache_hits', 'cache_misses')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.wall = 0.0
+        self.queries = 0
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def finish(self):
+        self.wall = time.perf_counter() - self.started
+
+    def server_timing(self):
+        """Server-Timing header value; durations are in milliseconds"""
+        return (
+            f'app;dur={self.wall * 1000:.1f}, '
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries", '
+            f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"'
+        )
+
+
+def start_request():
+    """Begin collecting for a request; returns the metrics and the token to stop"""
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def stop_request(token):
+    _current.reset(token)
+
+
+def count_cache_lookup(hits, misses):
+    """Called by cache backends for every lookup"""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.cache_hits += hits
+        metrics.cache_misses += misses
+
+
+def time_query(execute, sql, params, many, context):
+    """Database execute wrapper adding each query to the current request"""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_time += time.perf_counter() - started
+        metrics.queries += 1
+
+
+@receiver(connection_created)
+def install_query_timer(sender, connection, **kwargs):
+    # Connections are reopened on the same wrapper object, which keeps its wrappers
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+class _Window:
+    """Totals of one view over one window"""
+    __slots__ = (
+        'count', 'errors', 'wall', 'wall_max', 'wall_buckets', 'queries', 'queries_max',
+        'query_buckets', 'db_time', 'cache_hits', 'cache_misses', 'bytes'
+    )
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.wall = 0.0
+        self.wall_max = 0.0
+        self.wall_buckets = [0] * (len(TIME_BUCKETS_MS) + 1)
+        self.queries = 0
+        self.queries_max = 0
+        self.query_buckets = [0] * (len(QUERY_BUCKETS) + 1)
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.bytes = 0
+
+    def add(self, metrics, status, size):
+        wall_ms = metrics.wall * 1000
+        self.count += 1
+        if status >= 500:
+            self.errors += 1
+        self.wall += metrics.wall
+        self.wall_max = max(self.wall_max, metrics.wall)
+        self.wall_buckets[bisect_left(TIME_BUCKETS_MS, wall_ms)] += 1
+        self.queries += metrics.queries
+        self.queries_max = max(self.queries_max, metrics.queries)
+        self.query_buckets[bisect_left(QUERY_BUCKETS, metrics.queries)] += 1
+        self.db_time += metrics.db_time
+        self.cache_hits += metrics.cache_hits
+        self.cache_misses += metrics.cache_misses
+        self.bytes += size
+
+    def merge(self, other):
+        for name in ('count', 'errors', 'wall', 'queries', 'db_time', 'cache_hits', 'cache_misses', 'bytes'):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.wall_max = max(self.wall_max, other.wall_max)
+        self.queries_max = max(self.queries_max, other.queries_max)
+        self.wall_buckets = [a + b for a, b in zip(self.wall_buckets, other.wall_buckets)]
+        self.query_buckets = [a + b for a, b in zip(self.query_buckets, other.query_buckets)]
+
+
+def _percentile(buckets, bounds, fraction, maximum):
+    """Upper bound of the bucket holding the percentile (the maximum for the overflow bucket)"""
+    rank = fraction * sum(buckets)
+    seen = 0
+    for index, count in enumerate(buckets):
+        seen += count
+        if count and seen >= rank:
+            return min(bounds[index], maximum) if index < len(bounds) else maximum
+    return maximum
+
+
+class MetricsRegistry:
+    """Rolling per-view statistics of this process"""
+
+    def __init__(self, window_seconds=60, windows=15):
+        self.window_seconds = window_seconds
+        self.windows = windows
+        self._lock = threading.Lock()
+        # view name -> {window number: _Window}
+        self._views = {}
+
+    def record(self, view_name, metrics, status, size):
+        window = int(time.time() // self.window_seconds)
+        with self._lock:
+            views = self._views.get(view_name)
+            if views is None:
+                views = self._views[view_name] = {}
+            totals = views.get(window)
+            if totals is None:
+                totals = views[window] = _Window()
+                # Starting a window is the moment to drop this view's oldest
+                for old in [number for number in views if number <= window - self.windows]:
+                    del views[old]
+            totals.add(metrics, status, size)
+
+    def snapshot(self):
+        """Statistics of every view over the rolling period, slowest total first"""
+        oldest = int(time.time() // self.window_seconds) - self.windows + 1
+        with self._lock:
+            merged = {}
+            for view_name, views in self._views.items():
+                totals = _Window()
+                for number, window in views.items():
+                    if number >= oldest:
+                        totals.merge(window)
+                if totals.count:
+                    merged[view_name] = totals
+
+        endpoints = []
+        for view_name, totals in merged.items():
+            count = totals.count
+            wall_max_ms = totals.wall_max * 1000
+            endpoints.append({
+                'view': view_name,
+                'requests': count,
+                'errors': totals.errors,
+                'total_ms': round(totals.wall * 1000, 1),
+                'mean_ms': round(totals.wall * 1000 / count, 1),
+                'p50_ms': _percentile(totals.wall_buckets, TIME_BUCKETS_MS, 0.5, round(wall_max_ms, 1)),
+                'p95_ms': _percentile(totals.wall_buckets, TIME_BUCKETS_MS, 0.95, round(wall_max_ms, 1)),
+                'p99_ms': _percentile(totals.wall_buckets, TIME_BUCKETS_MS, 0.99, round(wall_max_ms, 1)),
+                'max_ms': round(wall_max_ms, 1),
+                'queries_mean': round(totals.queries / count, 1),
+                'queries_p95': _percentile(totals.query_buckets, QUERY_BUCKETS, 0.95, totals.queries_max),
+                'queries_max': totals.queries_max,
+                'db_mean_ms': round(totals.db_time * 1000 / count, 1),
+                'cache_hits': totals.cache_hits,
+                'cache_misses': totals.cache_misses,
+                'mean_bytes': round(totals.bytes / count),
+                'time_histogram_ms': dict(zip([*map(str, TIME_BUCKETS_MS), 'more'], totals.wall_buckets)),
+                'query_histogram': dict(zip([*map(str, QUERY_BUCKETS), 'more'], totals.query_buckets)),
+            })
+        endpoints.sort(key=lambda endpoint: -endpoint['total_ms'])
+
+        return {
+            'pid': os.getpid(),
+            'period_seconds': self.window_seconds * self.windows,
+            'endpoints': endpoints,
+        }
+
+
+registry = MetricsRegistry(
+    window_seconds=getattr(settings, 'REQUEST_METRICS_WINDOW_SECONDS', 60),
+    windows=getattr(settings, 'REQUEST_METRICS_WINDOWS', 15),
+)
@@ -0,0 +1,251 @@
+"""
+Denormalized dashboard counters.
+
+BusinessStats and BenchmarkBatchStats hold the numbers the admin dashboard
+header shows. Signals apply the difference each Assessment or CustomUser
+write makes as an F() increment, so reading the header is a single primary
+key lookup instead of aggregating every assessment of the business.
+
+Writes that bypass signals (bulk_create, queryset.update()) or run under
+suspend_row_tracking() are covered by refresh_after_bulk_write(). The
+reconcile_stats command rebuilds every row from scratch to repair drift.
+"""
+import logging
+from django.db.models import Count, F, Q, QuerySet
+from django.db.models.signals import post_init, post_save, post_delete
+from .bulk_tracking import row_tracking_suspended
+from .models import Business, BenchmarkBatch, CustomUser, Assessment, BusinessStats, BenchmarkBatchStats
+
+logger = logging.getLogger(__name__)
+
+# Assessment fields the counters depend on
+ASSESSMENT_TRACKED_FIELDS = ('business_id', 'assessment_type', 'completed', 'first_accessed_at', 'benchmark_batch_id')
+USER_TRACKED_FIELDS = ('business_id', 'is_hr')
+
+
+def recompute_business_stats(business_id):
+    """Rebuild the counters of one business from the source tables"""
+    assessment_counts = Assessment.objects.filter(business_id=business_id).aggregate(
+        assessments_count=Count('id'),
+        completed_count=Count('id', filter=Q(completed=True)),
+        accessed_count=Count('id', filter=Q(first_accessed_at__isnull=False)),
+        benchmark_total=Count('id', filter=Q(assessment_type='benchmark')),
+        benchmark_completed=Count('id', filter=Q(assessment_type='benchmark', completed=True))
+    )
+    hr_users_count = CustomUser.objects.filter(business_id=business_id, is_hr=True).count()
+
+    stats, _ = BusinessStats.objects.update_or_create(
+        business_id=business_id,
+        defaults={'hr_users_count': hr_users_count, **assessment_counts}
+    )
+    return stats
+
+
+def recompute_batch_stats(batch_id):
+    """Rebuild the counters of one benchmark batch from its assessments"""
+    counts = Assessment.objects.filter(benchmark_batch_id=batch_id).aggregate(
+        total=Count('id'),
+        completed=Count('id', filter=Q(completed=True))
+    )
+    stats, _ = BenchmarkBatchStats.objects.update_or_create(batch_id=batch_id, defaults=counts)
+    return stats
+
+
+def get_business_stats(business):
+    """Get the counters of a business, building the row on first use"""
+    try:
+        return BusinessStats.objects.get(business=business)
+    except BusinessStats.DoesNotExist:
+        return recompute_business_stats(business.id)
+
+
+def _apply_deltas(model, pk, deltas, recompute):
+    """Add deltas to a stats row, rebuilding it when it does not exist yet"""
+    deltas = {field: value for field, value in deltas.items() if value}
+    if pk is None or not deltas:
+        return
+
+    updated = model.objects.filter(pk=pk).update(
+        **{field: F(field) + value for field, value in deltas.items()}
+    )
+    if not updated:
+        # The rebuild already includes this write
+        recompute(pk)
+
+
+def _business_counts(state):
+    """Counters one assessment contributes to its business"""
+    if state is None:
+        return {}
+    is_benchmark = state['assessment_type'] == 'benchmark'
+    return {
+        'assessments_count': 1,
+        'completed_count': int(bool(state['completed'])),
+        'accessed_count': int(state['first_accessed_at'] is not None),
+        'benchmark_total': int(is_benchmark),
+        'benchmark_completed': int(is_benchmark and bool(state['completed'])),
+    }
+
+
+def _batch_counts(state):
+    """Counters one assessment contributes to its benchmark batch"""
+    if state is None:
+        return {}
+    return {'total': 1, 'completed': int(bool(state['completed']))}
+
+
+def _apply_change(model, recompute, old_key, old_counts, new_key, new_counts):
+    """Move an object's contribution from its old stats row to its new one"""
+    if old_key == new_key:
+        fields = set(old_counts) | set(new_counts)
+        _apply_deltas(model, new_key, {
+            field: new_counts.get(field, 0) - old_counts.get(field, 0) for field in fields
+        }, recompute)
+    else:
+        _apply_deltas(model, old_key, {field: -value for field, value in old_counts.items()}, recompute)
+        _apply_deltas(model, new_key, new_counts, recompute)
+
+
+def _snapshot(instance, fields):
+    """
+    Remember the tracked values an instance was loaded with.
+    Returns None when any of them was deferred, since reading it would query.
+    """
+    values = instance.__dict__
+    if any(field not in values for field in fields):
+        return None
+    return {field: values[field] for field in fields}
+
+
+def _is_business_cascade(origin):
+    """True when a delete is part of deleting a whole business (its stats go with it)"""
+    if isinstance(origin, Business):
+        return True
+    return isinstance(origin, QuerySet) and origin.model is Business
+
+
+def _tracked_update(update_fields, fields):
+    """False when a save explicitly left every tracked field alone"""
+    if not update_fields:
+        return True
+    names = {field[:-3] if field.endswith('_id') else field for field in fields}
+    return bool(names & set(update_fields))
+
+
+def _remember_assessment(sender, instance, **kwargs):
+    instance._stats_snapshot = _snapshot(instance, ASSESSMENT_TRACKED_FIELDS)
+
+
+def _assessment_saved(sender, instance, created, **kwargs):
+    if row_tracking_suspended():
+        return
+    if not _tracked_update(kwargs.get('update_fields'), ASSESSMENT_TRACKED_FIELDS):
+        return
+
+    old = None if created else getattr(instance, '_stats_snapshot', None)
+    new = _snapshot(instance, ASSESSMENT_TRACKED_FIELDS)
+
+    try:
+        if not created and old is None:
+            # Loaded with deferred fields, so the previous values are unknown
+            recompute_business_stats(instance.business_id)
+            if instance.benchmark_batch_id:
+                recompute_batch_stats(instance.benchmark_batch_id)
+        else:
+            _apply_change(
+                BusinessStats, recompute_business_stats,
+                old and old['business_id'], _business_counts(old),
+                new['business_id'], _business_counts(new)
+            )
+            _apply_change(
+                BenchmarkBatchStats, recompute_batch_stats,
+                old and old['benchmark_batch_id'], _batch_counts(old),
+                new['benchmark_batch_id'], _batch_counts(new)
+            )
+    except Exception as e:
+        # Counters can be reconciled later; never fail the write itself
+        logger.error(f"Error updating stats for assessment {instance.id}: {e}", exc_info=True)
+
+    instance._stats_snapshot = new
+
+
+def _assessment_deleted(sender, instance, **kwargs):
+    if row_tracking_suspended():
+        return
+    if _is_business_cascade(kwargs.get('origin')):
+        return
+
+    state = {field: getattr(instance, field) for field in ASSESSMENT_TRACKED_FIELDS}
+    try:
+        _apply_deltas(BusinessStats, state['business_id'], {
+            field: -value for field, value in _business_counts(state).items()
+        }, recompute_business_stats)
+        _apply_deltas(BenchmarkBatchStats, state['benchmark_batch_id'], {
+            field: -value for field, value in _batch_counts(state).items()
+        }, recompute_batch_stats)
+    except Exception as e:
+        logger.error(f"Error updating stats for deleted assessment {instance.id}: {e}", exc_info=True)
+
+
+def _hr_counts(state):
+    if state is None or not state['business_id'] or not state['is_hr']:
+        return {}
+    return {'hr_users_count': 1}
+
+
+def _remember_user(sender, instance, **kwargs):
+    instance._stats_snapshot = _snapshot(instance, USER_TRACKED_FIELDS)
+
+
+def _user_saved(sender, instance, created, **kwargs):
+    if row_tracking_suspended():
+        return
+    if not _tracked_update(kwargs.get('update_fields'), USER_TRACKED_FIELDS):
+        return
+
+    old = None if created else getattr(instance, '_stats_snapshot', None)
+    new = _snapshot(instance, USER_TRACKED_FIELDS)
+
+    try:
+        if not created and old is None:
+            if instance.business_id:
+                recompute_business_stats(instance.business_id)
+        else:
+            _apply_change(
+                BusinessStats, recompute_business_stats,
+                old and old['business_id'], _hr_counts(old),
+                new['business_id'], _hr_counts(new)
+            )
+    except Exception as e:
+        logger.error(f"Error updating stats for user {instance.id}: {e}", exc_info=True)
+
+    instance._stats_snapshot = new
+
+
+def _user_deleted(sender, instance, **kwargs):
+    if row_tracking_suspended():
+        return
+    if _is_business_cascade(kwargs.get('origin')):
+        return
+
+    state = {field: getattr(instance, field) for field in USER_TRACKED_FIELDS}
+    try:
+        _apply_deltas(BusinessStats, state['business_id'], {
+            field: -value for field, value in _hr_counts(state).items()
+        }, recompute_business_stats)
+    except Exception as e:
+        logger.error(f"Error updating stats for deleted user {instance.id}: {e}", exc_info=True)
+
+
+def _batch_created(sender, instance, created, **kwargs):
+    if created:
+        BenchmarkBatchStats.objects.get_or_create(batch=instance)
+
+
+post_init.connect(_remember_assessment, sender=Assessment, dispatch_uid='stats_init_assessment')
+post_save.connect(_assessment_saved, sender=Assessment, dispatch_uid='stats_save_assessment')
+post_delete.connect(_assessment_deleted, sender=Assessment, dispatch_uid='stats_delete_assessment')
+post_init.connect(_remember_user, sender=CustomUser, dispatch_uid='stats_init_user')
+post_save.connect(_user_saved, sender=CustomUser, dispatch_uid='stats_save_user')
+post_delete.connect(_user_deleted, sender=CustomUser, dispatch_uid='stats_delete_user')
+post_save.connect(_batch_created, sender=BenchmarkBatch, dispatch_uid='stats_save_batch')
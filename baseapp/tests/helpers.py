@@ -0,0 +1,65 @@
+"""
+Shared setup for the baseapp tests.
+"""
+import os
+import shutil
+import tempfile
+from django.conf import settings
+from django.core.cache import caches
+from django.test import override_settings
+from baseapp.models import Assessment, Business, CustomUser
+
+
+def make_business(name='Acme', slug=None, **fields):
+    return Business.objects.create(name=name, slug=slug or name.lower().replace(' ', '-'), **fields)
+
+
+def make_admin(business, username='admin'):
+    return CustomUser.objects.create_superuser(
+        username, f'{username}@example.com', 'password', current_business=business
+    )
+
+
+def make_hr(business, username='hr'):
+    return CustomUser.objects.create_user(
+        username, f'{username}@example.com', 'password', is_hr=True, business=business
+    )
+
+
+def make_assessment(business, created_by, number=0, **fields):
+    values = {
+        'candidate_name': f'Candidate {number}',
+        'candidate_email': f'candidate{number}@example.com',
+        'position': 'Operator',
+        'region': 'North',
+        'manager_name': 'Manager',
+        'manager_email': 'manager@example.com',
+    }
+    values.update(fields)
+    return Assessment.objects.create(business=business, created_by=created_by, **values)
+
+
+class IsolatedHostCachesMixin:
+    """
+    Points the host-wide caches (rate limits, suspicious IP counts) at a
+    fresh directory per test class, emptied before each test, so tests
+    neither see each other's counts nor leave any in the development
+    server's files
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        directory = tempfile.mkdtemp(prefix='baseapp-tests-')
+        cls.addClassCleanup(shutil.rmtree, directory, ignore_errors=True)
+        configured = dict(settings.CACHES)
+        for alias, name in (('host', 'host'), ('ip_reputation', 'ip-reputation')):
+            configured[alias] = {**configured[alias], 'LOCATION': os.path.join(directory, name)}
+        override = override_settings(CACHES=configured)
+        override.enable()
+        cls.addClassCleanup(override.disable)
+        super().setUpClass()
+
+    def setUp(self):
+        super().setUp()
+        for alias in ('host', 'ip_reputation'):
+            caches[alias].clear()
@@ -0,0 +1,138 @@
+from unittest import mock
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.cache import cache
+from django.test import TestCase
+from baseapp import views
+from baseapp.models import Assessment, AssessmentResponse, Attribute, OutboxMessage, QuestionPair, QuestionResponse
+from baseapp.pagination import akeyset_page, keyset_page
+from .helpers import IsolatedHostCachesMixin, make_admin, make_assessment, make_business, make_hr
+
+
+class CandidateFlowTests(IsolatedHostCachesMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = make_business()
+        cls.hr = make_hr(cls.business)
+        focus = Attribute.objects.create(name='Focus', business=cls.business)
+        drive = Attribute.objects.create(name='Drive', business=cls.business)
+        care = Attribute.objects.create(name='Care', business=cls.business)
+        cls.pairs = [
+            QuestionPair.objects.create(
+                business=cls.business, attribute1=first, attribute2=second,
+                statement_a=f'I {first.name}', statement_b=f'I {second.name}', order=order
+            )
+            for order, (first, second) in enumerate([(focus, drive), (drive, care), (care, focus)])
+        ]
+        cls.assessment = make_assessment(cls.business, cls.hr)
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.url = f'/assessment/{self.assessment.unique_link}/'
+
+    def test_views_are_async(self):
+        for view in (views.take_assessment, views.thank_you, views.list_businesses,
+                     views.business_hr_users, views.business_assessments, views.dashboard_assessments):
+            self.assertTrue(iscoroutinefunction(view), view.__name__)
+
+    async def test_first_access_is_recorded(self):
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['form'].fields), 3)
+
+        assessment = await Assessment.objects.aget(pk=self.assessment.pk)
+        self.assertIsNotNone(assessment.first_accessed_at)
+
+        # Later visits keep the first time
+        await self.async_client.get(self.url)
+        self.assertEqual((await Assessment.objects.aget(pk=self.assessment.pk)).first_accessed_at,
+                         assessment.first_accessed_at)
+
+    async def test_submission(self):
+        answers = {f'question_{pair.id}': 'A' for pair in self.pairs}
+        response = await self.async_client.post(self.url, answers)
+        self.assertRedirects(response, '/thank-you/', fetch_redirect_response=False)
+
+        assessment = await Assessment.objects.aget(pk=self.assessment.pk)
+        self.assertTrue(assessment.completed)
+        self.assertEqual(await AssessmentResponse.objects.filter(assessment=assessment).acount(), 1)
+        self.assertEqual(
+            await QuestionResponse.objects.filter(assessment_response__assessment=assessment, chose_a=True).acount(), 3
+        )
+        report = await OutboxMessage.objects.aget(assessment=assessment)
+        self.assertEqual((report.category, report.to), ('report', ['manager@example.com']))
+
+        # A completed assessment cannot be taken again
+        response = await self.async_client.get(self.url)
+        self.assertTemplateUsed(response, 'baseapp/assessment_closed.html')
+
+        response = await self.async_client.get('/thank-you/')
+        self.assertEqual(response.status_code, 200)
+
+    async def test_incomplete_answers_are_shown_again(self):
+        response = await self.async_client.post(self.url, {f'question_{self.pairs[0].id}': 'A'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['form'].errors)
+        self.assertFalse((await Assessment.objects.aget(pk=self.assessment.pk)).completed)
+
+    async def test_unknown_link(self):
+        response = await self.async_client.get('/assessment/missing/')
+        self.assertEqual(response.status_code, 404)
+
+    async def test_submissions_are_rate_limited_per_link(self):
+        statuses = [(await self.async_client.post(self.url, {})).status_code for _ in range(11)]
+        self.assertEqual(statuses, [200] * 10 + [429])
+
+
+class AsyncListViewTests(IsolatedHostCachesMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = make_business()
+        cls.other = make_business('Other')
+        cls.admin = make_admin(cls.business)
+        cls.hr = make_hr(cls.business)
+        make_hr(cls.other, username='other-hr')
+        for number in range(5):
+            make_assessment(cls.business, cls.hr, number)
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    async def test_list_businesses(self):
+        await self.async_client.aforce_login(self.admin)
+        response = await self.async_client.get('/api/businesses/list/')
+        self.assertEqual(
+            sorted(business['name'] for business in response.json()['businesses']),
+            ['Acme', 'Other']
+        )
+
+    async def test_business_hr_users(self):
+        await self.async_client.aforce_login(self.admin)
+        response = await self.async_client.get(f'/api/businesses/{self.business.id}/hr-users/')
+        self.assertEqual([user['id'] for user in response.json()['users']], [self.hr.id])
+
+    async def test_admin_views_require_an_admin(self):
+        await self.async_client.aforce_login(self.hr)
+        response = await self.async_client.get('/api/businesses/list/')
+        self.assertEqual(response.status_code, 302)
+
+    async def test_dashboard_assessments(self):
+        await self.async_client.aforce_login(self.hr)
+        with mock.patch('baseapp.views.HR_DASHBOARD_PAGE_SIZE', 3):
+            first = (await self.async_client.get('/dashboard/assessments/')).json()
+            rest = (await self.async_client.get('/dashboard/assessments/', {'cursor': first['next_cursor']})).json()
+        self.assertEqual((first['has_more'], rest['has_more']), (True, False))
+        self.assertEqual(first['rows_html'].count('<tr>') + rest['rows_html'].count('<tr>'), 5)
+
+    async def test_akeyset_page_matches_keyset_page(self):
+        queryset = Assessment.objects.values('id', 'created_at')
+        rows, cursor = await akeyset_page(queryset, limit=3)
+        rest, last = await akeyset_page(queryset, cursor=cursor, limit=3)
+        self.assertIsNone(last)
+        self.assertEqual(
+            [row['id'] for row in rows + rest],
+            [row['id'] for row in (await sync_to_async(keyset_page)(queryset, limit=5))[0]]
+        )
@@ -0,0 +1,158 @@
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from openpyxl import Workbook
+from baseapp.benchmark_ingest import (
+    BATCH_LEASE_SECONDS, claim_batch, claimable_batch_ids, ingest_benchmark_batch, iter_roster_chunks
+)
+from baseapp.models import Assessment, BenchmarkBatch, BenchmarkBatchStats
+from .helpers import make_admin, make_assessment, make_business
+
+MEDIA_ROOT = tempfile.mkdtemp(prefix='baseapp-tests-media-')
+
+
+def tearDownModule():
+    shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class BenchmarkIngestTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = make_business()
+        cls.admin = make_admin(cls.business)
+
+    def make_batch(self, content, name='roster.csv', **fields):
+        """A batch claimed by this worker, as the command loads it"""
+        batch = BenchmarkBatch.objects.create(
+            business=self.business, name='Q1', created_by=self.admin,
+            data_file=SimpleUploadedFile(name, content), **fields
+        )
+        self.assertTrue(claim_batch(batch.id))
+        return BenchmarkBatch.objects.get(pk=batch.pk)
+
+    def csv_batch(self, lines, **fields):
+        return self.make_batch(('Name,Email,Region\n' + ''.join(line + '\n' for line in lines)).encode(), **fields)
+
+    def test_csv_in_chunks(self):
+        make_assessment(self.business, self.admin, candidate_email='known@example.com', assessment_type='benchmark')
+        batch = self.csv_batch([
+            'Ann,ann@example.com,North',
+            'Bob,bob@example.com,',
+            ',,',
+            'Cat,not-an-email,North',
+            'Dan,KNOWN@example.com,North',
+            'Eve,ANN@example.com,South',
+            ',eve@example.com,South',
+        ])
+        chunks = []
+        batch = ingest_benchmark_batch(batch, chunk_size=2, progress=lambda batch: chunks.append(batch.rows_processed))
+
+        self.assertEqual(chunks, [2, 4, 6, 7])
+        self.assertEqual((batch.status, batch.processed), ('done', True))
+        self.assertEqual((batch.rows_processed, batch.rows_created, batch.rows_skipped), (7, 2, 5))
+        self.assertEqual([error['row'] for error in batch.row_errors], [5, 8])
+        self.assertEqual(
+            dict(Assessment.objects.filter(benchmark_batch=batch).values_list('candidate_email', 'region')),
+            {'ann@example.com': 'North', 'bob@example.com': 'Default'}
+        )
+        stats = BenchmarkBatchStats.objects.get(batch=batch)
+        self.assertEqual(stats.total, 2)
+
+        # Saved progress matches what was returned
+        batch.refresh_from_db()
+        self.assertEqual((batch.rows_created, batch.rows_skipped, len(batch.row_errors)), (2, 5, 2))
+
+    def test_reprocessing_is_idempotent(self):
+        batch = self.csv_batch(['Ann,ann@example.com,North', 'Bob,bob@example.com,North'])
+        ingest_benchmark_batch(batch)
+        BenchmarkBatch.objects.filter(pk=batch.pk).update(status='processing', heartbeat_at=timezone.now())
+        batch = ingest_benchmark_batch(BenchmarkBatch.objects.get(pk=batch.pk))
+        self.assertEqual((batch.rows_created, batch.rows_skipped), (2, 0))
+        self.assertEqual(Assessment.objects.filter(benchmark_batch=batch).count(), 2)
+
+    def test_xlsx(self):
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(['email', 'name'])
+        sheet.append(['ann@example.com', 'Ann'])
+        sheet.append([None, None])
+        sheet.append(['bob@example.com', 'Bob'])
+        content = io.BytesIO()
+        workbook.save(content)
+
+        batch = ingest_benchmark_batch(self.make_batch(content.getvalue(), name='roster.xlsx'), chunk_size=1)
+        self.assertEqual((batch.status, batch.rows_created, batch.rows_skipped), ('done', 2, 1))
+
+    def test_unreadable_files_fail_the_batch(self):
+        with self.assertLogs('baseapp.benchmark_ingest', 'ERROR'):
+            batch = ingest_benchmark_batch(self.make_batch(b'Name,Region\nAnn,North\n'))
+        self.assertEqual((batch.status, batch.error), ('failed', 'Missing required columns: email'))
+
+        with self.assertLogs('baseapp.benchmark_ingest', 'ERROR'):
+            batch = ingest_benchmark_batch(self.make_batch(b'x', name='roster.xls'))
+        self.assertEqual(batch.status, 'failed')
+        self.assertEqual(BenchmarkBatch.objects.get(pk=batch.pk).status, 'failed')
+
+    def test_stops_when_another_worker_reclaims_the_batch(self):
+        batch = self.csv_batch([f'P{n},p{n}@example.com,North' for n in range(6)])
+
+        def reclaim(batch):
+            if batch.rows_processed == 2:
+                BenchmarkBatch.objects.filter(pk=batch.pk).update(heartbeat_at=timezone.now() + timedelta(seconds=1))
+
+        with self.assertLogs('baseapp.benchmark_ingest', 'WARNING') as logs:
+            batch = ingest_benchmark_batch(batch, chunk_size=2, progress=reclaim)
+        self.assertIn('reclaimed by another worker', logs.output[0])
+
+        # The second chunk rolled back and the new owner's batch is left alone
+        self.assertEqual(batch.status, 'processing')
+        self.assertEqual(Assessment.objects.filter(benchmark_batch=batch).count(), 2)
+        batch.refresh_from_db()
+        self.assertEqual((batch.status, batch.rows_processed), ('processing', 2))
+
+    def test_chunks_are_bounded(self):
+        content = io.BytesIO(('name,email\n' + ''.join(f'P{n},p{n}@example.com\n' for n in range(25))).encode())
+        self.assertEqual([len(chunk) for chunk in iter_roster_chunks(content, 'roster.csv', chunk_size=10)], [10, 10, 5])
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class BatchLeaseTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = make_business()
+        cls.admin = make_admin(cls.business)
+
+    def make_batch(self, **fields):
+        return BenchmarkBatch.objects.create(
+            business=self.business, name='Q1', created_by=self.admin,
+            data_file=SimpleUploadedFile('roster.csv', b'name,email\nAnn,ann@example.com\n'), **fields
+        )
+
+    def test_only_one_worker_claims_a_batch(self):
+        batch = self.make_batch()
+        self.assertTrue(claim_batch(batch.id))
+        self.assertFalse(claim_batch(batch.id))
+
+    def test_abandoned_batches_are_reclaimed(self):
+        stale = timezone.now() - timedelta(seconds=BATCH_LEASE_SECONDS + 60)
+        pending = self.make_batch()
+        abandoned = self.make_batch(status='processing', heartbeat_at=stale)
+        running = self.make_batch(status='processing', heartbeat_at=timezone.now())
+        done = self.make_batch(status='done')
+
+        self.assertCountEqual(claimable_batch_ids(), [pending.id, abandoned.id])
+        self.assertFalse(claim_batch(running.id))
+
+        call_command('process_benchmark_batches', once=True, stdout=io.StringIO())
+        self.assertEqual(
+            dict(BenchmarkBatch.objects.values_list('id', 'status')),
+            {pending.id: 'done', abandoned.id: 'done', running.id: 'processing', done.id: 'done'}
+        )
@@ -0,0 +1,89 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from baseapp.models import Assessment, BusinessStats
+from .helpers import IsolatedHostCachesMixin, make_admin, make_assessment, make_business
+
+
+class BenchmarkRosterTests(IsolatedHostCachesMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = make_business()
+        cls.admin = make_admin(cls.business)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def post(self, action, data):
+        return self.client.post(
+            f'/api/businesses/{self.business.id}/{action}/', data, content_type='application/json'
+        )
+
+    def roster(self):
+        return dict(Assessment.objects.filter(
+            business=self.business, assessment_type='benchmark'
+        ).values_list('candidate_email', 'region'))
+
+    def test_add_skips_duplicates_and_invalid_addresses(self):
+        make_assessment(self.business, self.admin, candidate_email='Known@Example.com', assessment_type='benchmark')
+
+        data = self.post('add-benchmark-emails', {'emails': [
+            {'email': 'new@example.com', 'region': 'East'},
+            {'email': 'NEW@example.com', 'region': 'West'},
+            {'email': 'known@example.com', 'region': 'East'},
+            {'email': 'not an address'},
+            {'email': '  '},
+        ]}).json()
+
+        self.assertEqual((data['created'], data['updated'], data['invalid']), (1, 0, ['not an address']))
+        self.assertEqual(self.roster(), {'Known@Example.com': 'North', 'NEW@example.com': 'West'})
+        created = Assessment.objects.get(candidate_email='NEW@example.com')
+        self.assertEqual(len(created.unique_link), 64)
+        self.assertFalse(created.email_sent)
+
+    def test_upsert_moves_existing_addresses(self):
+        make_assessment(self.business, self.admin, candidate_email='known@example.com', assessment_type='benchmark')
+
+        data = self.post('add-benchmark-emails', {'upsert': True, 'emails': [
+            {'email': 'KNOWN@example.com', 'region': 'South'},
+            {'email': 'new@example.com'},
+        ]}).json()
+
+        self.assertEqual((data['created'], data['updated']), (1, 1))
+        self.assertEqual(self.roster(), {'known@example.com': 'South', 'new@example.com': 'Default'})
+
+    def test_add_query_count_does_not_grow_with_the_roster(self):
+        emails = [{'email': f'person{number}@example.com', 'region': 'East'} for number in range(200)]
+        with CaptureQueriesContext(connection) as queries:
+            self.post('add-benchmark-emails', {'emails': emails})
+        self.assertEqual(len(self.roster()), 200)
+        self.assertLess(len(queries), 30)
+        self.assertEqual(BusinessStats.objects.get(business=self.business).benchmark_total, 200)
+
+    def test_bulk_delete_matches_case_insensitively(self):
+        for number, email in enumerate(('One@Example.com', 'two@example.com', 'three@example.com')):
+            make_assessment(self.business, self.admin, number, candidate_email=email, assessment_type='benchmark')
+        standard = make_assessment(self.business, self.admin, 9, candidate_email='one@example.com')
+
+        data = self.post('bulk-delete-benchmark-emails', {'emails': ['one@example.com', 'TWO@EXAMPLE.COM']}).json()
+
+        self.assertEqual(data['deleted'], 2)
+        self.assertEqual(self.roster(), {'three@example.com': 'North'})
+        self.assertTrue(Assessment.objects.filter(pk=standard.pk).exists())
+        self.assertEqual(BusinessStats.objects.get(business=self.business).benchmark_total, 1)
+
+    def test_bulk_region_update(self):
+        for number, email in enumerate(('One@Example.com', 'two@example.com')):
+            make_assessment(self.business, self.admin, number, candidate_email=email, assessment_type='benchmark')
+
+        data = self.post('bulk-update-benchmark-region', {
+            'emails': [{'email': 'one@example.com'}, 'one@example.com'], 'region': 'West'
+        }).json()
+
+        self.assertEqual(data['updated'], 1)
+        self.assertEqual(self.roster(), {'One@Example.com': 'West', 'two@example.com': 'North'})
+
+    def test_bulk_requests_need_emails(self):
+        self.assertEqual(self.post('bulk-delete-benchmark-emails', {'emails': []}).status_code, 400)
+        self.assertEqual(self.post('bulk-update-benchmark-region', {'emails': ['a@example.com']}).status_code, 400)
@@ -0,0 +1,130 @@
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from baseapp.bulk_invite import MAX_INVITE_ROWS, RosterError, invite_candidates, read_roster, validate_roster
+from baseapp.models import Assessment, Manager, OutboxMessage
+from .helpers import IsolatedHostCachesMixin, make_admin, make_business, make_hr
+
+HEADER = 'Candidate Name,Candidate Email,Position,Region,Manager Email\n'
+
+
+def roster_file(lines, name='roster.csv', header=HEADER):
+    return SimpleUploadedFile(name, (header + ''.join(line + '\n' for line in lines)).encode('utf-8'))
+
+
+class ReadRosterTests(TestCase):
+
+    def test_reads_rows_by_normalized_header(self):
+        rows = read_roster(roster_file(['Ann,ann@example.com,Operator,North,', '', ',,,,']))
+        self.assertEqual(rows, [{
+            'candidate_name': 'Ann', 'candidate_email': 'ann@example.com',
+            'position': 'Operator', 'region': 'North', 'manager_email': '',
+        }])
+
+    def test_rejects_unreadable_files(self):
+        with self.assertRaisesMessage(RosterError, 'Missing required columns: region'):
+            read_roster(roster_file([], header='candidate_name,candidate_email,position\n'))
+        with self.assertRaisesMessage(RosterError, 'Upload a .csv or .xlsx file'):
+            read_roster(roster_file([], name='roster.txt'))
+        with self.assertRaisesMessage(RosterError, 'UTF-8'):
+            read_roster(SimpleUploadedFile('roster.csv', b'\xff\xfe\x00bad'))
+        with self.assertRaisesMessage(RosterError, 'empty'):
+            read_roster(SimpleUploadedFile('roster.csv', b''))
+
+    def test_row_limit(self):
+        lines = [f'C{n},c{n}@example.com,Operator,North,' for n in range(MAX_INVITE_ROWS + 1)]
+        with self.assertRaisesMessage(RosterError, str(MAX_INVITE_ROWS)):
+            read_roster(roster_file(lines))
+
+
+class ValidateRosterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = make_business()
+        cls.default = Manager.objects.create(business=cls.business, name='Dee', email='dee@example.com', is_default=True)
+        cls.listed = Manager.objects.create(business=cls.business, name='Lee', email='lee@example.com')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_every_row_is_checked(self):
+        rows = read_roster(roster_file([
+            'Ann,ann@example.com,Operator,North,',
+            'Bob,not-an-email,Operator,North,',
+            'Cat,ANN@example.com,Operator,North,',
+            ',,Operator,North,',
+            'Dan,dan@example.com,Operator,North,bad manager',
+        ]))
+        candidates, errors = validate_roster(self.business, rows)
+
+        self.assertEqual([candidate['candidate_email'] for candidate in candidates], ['ann@example.com'])
+        self.assertEqual([error['row'] for error in errors], [3, 4, 5, 6])
+        self.assertIn('not-an-email is not a valid email address', errors[0]['errors'])
+        self.assertIn('ANN@example.com appears more than once in the file', errors[1]['errors'])
+        self.assertIn('candidate_name is required', errors[2]['errors'])
+        self.assertIn('bad manager is not a valid manager email address', errors[3]['errors'])
+
+    def test_manager_resolution(self):
+        rows = read_roster(roster_file([
+            'Ann,ann@example.com,Operator,North,',
+            'Bob,bob@example.com,Operator,North,LEE@example.com',
+            'Cat,cat@example.com,Operator,North,outside@example.com',
+        ]))
+        candidates, errors = validate_roster(self.business, rows)
+        self.assertEqual(errors, [])
+
+        ann, bob, cat = candidates
+        self.assertEqual((ann['manager_email'], ann['manager_ids']), ('dee@example.com', {self.default.id}))
+        self.assertEqual((bob['manager_name'], bob['manager_ids']), ('Lee', {self.default.id, self.listed.id}))
+        self.assertEqual((cat['manager_name'], cat['manager_email']), ('outside', 'outside@example.com'))
+
+    def test_manager_required_without_defaults(self):
+        business = make_business('Other')
+        _, errors = validate_roster(business, read_roster(roster_file(['Ann,ann@example.com,Operator,North,'])))
+        self.assertIn('manager_email is required because the business has no default managers', errors[0]['errors'])
+
+
+class InviteCandidatesTests(IsolatedHostCachesMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = make_business()
+        cls.admin = make_admin(cls.business)
+        cls.hr = make_hr(cls.business)
+        cls.manager = Manager.objects.create(business=cls.business, name='Dee', email='dee@example.com', is_default=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_invite_creates_assessments_managers_and_emails(self):
+        rows = read_roster(roster_file([f'C{n},c{n}@example.com,Operator,North,' for n in range(5)]))
+        candidates, _ = validate_roster(self.business, rows)
+        assessments = invite_candidates(self.business, self.hr, candidates, lambda link: f'https://example.com/{link}/')
+
+        self.assertEqual(Assessment.objects.filter(business=self.business).count(), 5)
+        for assessment in assessments:
+            self.assertEqual(list(Assessment.objects.get(pk=assessment.id).managers.all()), [self.manager])
+            message = OutboxMessage.objects.get(assessment_id=assessment.id)
+            self.assertEqual(message.to, [assessment.candidate_email])
+            self.assertIn(f'https://example.com/{assessment.unique_link}/', message.body)
+            # The link is the candidate's only credential
+            self.assertEqual(len(assessment.unique_link), 64)
+
+    def test_admin_endpoint_is_all_or_nothing(self):
+        self.client.force_login(self.admin)
+        url = f'/api/businesses/{self.business.id}/bulk-invite/'
+
+        response = self.client.post(url, {'file': roster_file(['Ann,ann@example.com,Operator,North,', 'Bob,bad,Operator,North,'])})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['row_errors'][0]['row'], 3)
+        self.assertFalse(Assessment.objects.exists())
+
+        response = self.client.post(url, {'file': roster_file(['Ann,ann@example.com,Operator,North,']), 'dry_run': '1'})
+        self.assertEqual(response.json()['count'], 1)
+        self.assertFalse(Assessment.objects.exists())
+
+        response = self.client.post(url, {'file': roster_file(['Ann,ann@example.com,Operator,North,'])})
+        self.assertEqual(response.json()['count'], 1)
+        self.assertEqual(Assessment.objects.get().created_by, self.hr)
+        self.assertEqual(OutboxMessage.objects.count(), 1)
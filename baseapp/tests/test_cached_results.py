@@ -0,0 +1,114 @@
+import threading
+import time
+from unittest import mock
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from baseapp.cached_results import _lock_key, get_or_compute, mark_stale
+
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'cached-results-tests'},
+}
+
+
+class Counter:
+    """A compute function counting its calls"""
+
+    def __init__(self, value='value', delay=0):
+        self.value = value
+        self.delay = delay
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return self.value
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class GetOrComputeTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cached_until_expiry(self):
+        compute = Counter()
+        self.assertEqual(get_or_compute('key', compute, 60), 'value')
+        self.assertEqual(get_or_compute('key', compute, 60), 'value')
+        self.assertEqual(compute.calls, 1)
+
+        get_or_compute('key', compute, 60, force=True)
+        self.assertEqual(compute.calls, 2)
+
+    def test_none_is_not_cached(self):
+        compute = Counter(value=None)
+        get_or_compute('key', compute, 60)
+        get_or_compute('key', compute, 60)
+        self.assertEqual(compute.calls, 2)
+
+    def test_timeout_may_depend_on_the_value(self):
+        get_or_compute('key', Counter(value=[]), lambda value: 5 if not value else 600)
+        self.assertLessEqual(cache.get('key')['expires'], time.time() + 5)
+
+    def test_concurrent_misses_compute_once(self):
+        compute = Counter(delay=0.3)
+        results = []
+
+        def read():
+            results.append(get_or_compute('key', compute, 60))
+
+        threads = [threading.Thread(target=read) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, ['value'] * 8)
+        self.assertEqual(compute.calls, 1)
+
+    def test_stale_value_is_served_while_another_worker_recomputes(self):
+        get_or_compute('key', Counter(value='old'), 60)
+        mark_stale('key')
+        cache.add(_lock_key('key'), 'another worker', 60)
+
+        compute = Counter(value='new')
+        self.assertEqual(get_or_compute('key', compute, 60), 'old')
+        self.assertEqual(compute.calls, 0)
+
+    def test_marked_stale_value_is_recomputed_once(self):
+        get_or_compute('key', Counter(value='old'), 60)
+        mark_stale('key')
+
+        compute = Counter(value='new')
+        self.assertEqual(get_or_compute('key', compute, 60), 'new')
+        self.assertEqual(get_or_compute('key', compute, 60), 'new')
+        self.assertEqual(compute.calls, 1)
+        self.assertFalse(cache.has_key(_lock_key('key')))
+
+    def test_change_during_compute_keeps_the_result_stale(self):
+        def compute():
+            mark_stale('key')
+            return 'computed'
+
+        self.assertEqual(get_or_compute('key', compute, 60), 'computed')
+        self.assertEqual(cache.get('key')['expires'], 0)
+
+    def test_failed_compute_releases_the_lock(self):
+        def compute():
+            raise RuntimeError('Database unavailable')
+
+        with self.assertRaises(RuntimeError):
+            get_or_compute('key', compute, 60)
+        self.assertFalse(cache.has_key(_lock_key('key')))
+        self.assertEqual(get_or_compute('key', Counter(), 60), 'value')
+
+    def test_waiter_computes_when_the_winner_gives_up(self):
+        cache.add(_lock_key('key'), 'another worker', 60)
+        compute = Counter()
+
+        # The other worker fails and its lock goes away while this one waits
+        with mock.patch('baseapp.cached_results.time.sleep', side_effect=lambda _: cache.delete(_lock_key('key'))):
+            with self.assertLogs('baseapp.cached_results', 'WARNING'):
+                self.assertEqual(get_or_compute('key', compute, 60), 'value')
+        self.assertEqual(compute.calls, 1)
@@ -0,0 +1,185 @@
+from datetime import timedelta
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from baseapp.change_feed import get_changes, latest_cursor, record_bulk_change
+from baseapp.models import ChangeLogEntry, Manager
+from .helpers import IsolatedHostCachesMixin, make_admin, make_business
+
+
+@override_settings(CHANGE_FEED_SETTLE_SECONDS=0)
+class ChangeFeedTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = make_business()
+        cls.other = make_business('Other')
+
+    def add_manager(self, business=None, email='manager@example.com'):
+        return Manager.objects.create(business=business or self.business, name='Manager', email=email)
+
+    def test_changes_after_the_cursor(self):
+        since = latest_cursor()
+        manager = self.add_manager()
+        manager.name = 'Renamed'
+        manager.save()
+
+        result = get_changes(self.business.id, since)
+        self.assertFalse(result['reset'])
+        self.assertGreater(result['cursor'], since)
+        managers = result['changes']['managers']
+        self.assertEqual([row['name'] for row in managers['upserted']], ['Renamed'])
+        self.assertEqual(managers['deleted'], [])
+
+        # Nothing new after the returned cursor
+        self.assertEqual(get_changes(self.business.id, result['cursor'])['changes'], {})
+
+    def test_deleted_and_deactivated_rows(self):
+        kept = self.add_manager(email='kept@example.com')
+        deactivated = self.add_manager(email='gone@example.com')
+        deleted = self.add_manager(email='deleted@example.com')
+        since = latest_cursor()
+
+        deactivated.active = False
+        deactivated.save()
+        deleted_id = deleted.id
+        deleted.delete()
+
+        managers = get_changes(self.business.id, since)['changes']['managers']
+        self.assertEqual(managers['upserted'], [])
+        self.assertEqual(managers['deleted'], sorted([deactivated.id, deleted_id]))
+        self.assertNotIn(kept.id, managers['deleted'])
+
+    def test_other_businesses_are_excluded(self):
+        since = latest_cursor()
+        self.add_manager(business=self.other)
+        self.assertNotIn('managers', get_changes(self.business.id, since)['changes'])
+
+    def test_collection_filter(self):
+        since = latest_cursor()
+        self.add_manager()
+        self.business.name = 'Acme Ltd'
+        self.business.save()
+
+        changes = get_changes(self.business.id, since, collections=['businesses'])['changes']
+        self.assertEqual(list(changes), ['businesses'])
+        self.assertEqual(changes['businesses']['upserted'][0]['name'], 'Acme Ltd')
+
+    def test_bulk_change_resets_the_collection(self):
+        since = latest_cursor()
+        record_bulk_change('assessments', self.business.id)
+        self.assertEqual(
+            get_changes(self.business.id, since)['changes']['assessments'],
+            {'reset': True, 'upserted': [], 'deleted': []}
+        )
+
+    def test_pages_of_log_entries(self):
+        since = latest_cursor()
+        for number in range(5):
+            self.add_manager(email=f'manager{number}@example.com')
+
+        first = get_changes(self.business.id, since, limit=3)
+        self.assertTrue(first['has_more'])
+        self.assertEqual(len(first['changes']['managers']['upserted']), 3)
+        rest = get_changes(self.business.id, first['cursor'], limit=3)
+        self.assertFalse(rest['has_more'])
+        self.assertEqual(len(rest['changes']['managers']['upserted']), 2)
+
+    def test_pruned_cursor_entry_alone_needs_no_reload(self):
+        self.add_manager()
+        since = latest_cursor()
+        second = self.add_manager(email='second@example.com')
+        ChangeLogEntry.objects.filter(id__lte=since).delete()
+
+        result = get_changes(self.business.id, since)
+        self.assertFalse(result['reset'])
+        self.assertEqual([row['id'] for row in result['changes']['managers']['upserted']], [second.id])
+
+    def test_pruned_entries_after_the_cursor_require_a_reload(self):
+        self.add_manager()
+        since = latest_cursor()
+        self.add_manager(email='second@example.com')
+        self.add_manager(email='third@example.com')
+        ChangeLogEntry.objects.filter(id__lte=since + 1).delete()
+
+        result = get_changes(self.business.id, since)
+        self.assertTrue(result['reset'])
+        self.assertEqual(result['cursor'], latest_cursor())
+
+    @override_settings(CHANGE_FEED_SETTLE_SECONDS=60)
+    def test_cursor_does_not_pass_recent_entries(self):
+        self.add_manager()
+        ChangeLogEntry.objects.update(created_at=timezone.now() - timedelta(minutes=5))
+        settled = latest_cursor()
+        manager = self.add_manager(email='recent@example.com')
+
+        # The entry's transaction may have lower ids still open elsewhere
+        self.assertEqual(latest_cursor(), settled)
+        since = settled - 1
+        result = get_changes(self.business.id, since)
+        self.assertEqual(result['cursor'], settled)
+        self.assertEqual(len(result['changes']['managers']['upserted']), 2)
+
+        # Recent entries come back until they settle
+        again = get_changes(self.business.id, result['cursor'])
+        self.assertEqual(again['cursor'], settled)
+        self.assertEqual([row['id'] for row in again['changes']['managers']['upserted']], [manager.id])
+
+    @override_settings(CHANGE_FEED_SETTLE_SECONDS=60)
+    def test_unsettled_page_does_not_loop(self):
+        since = latest_cursor()
+        for number in range(3):
+            self.add_manager(email=f'manager{number}@example.com')
+        result = get_changes(self.business.id, since, limit=2)
+        self.assertEqual((result['cursor'], result['has_more']), (since, False))
+
+
+@override_settings(CHANGE_FEED_SETTLE_SECONDS=0)
+class BusinessChangesViewTests(IsolatedHostCachesMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = make_business()
+        cls.admin = make_admin(cls.business)
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.admin)
+        self.url = f'/api/businesses/{self.business.id}/changes/'
+
+    def test_cursor_then_changes(self):
+        cursor = self.client.get(self.url).json()['cursor']
+        Manager.objects.create(business=self.business, name='Manager', email='manager@example.com')
+
+        data = self.client.get(self.url, {'since': cursor, 'collections': 'managers,unknown'}).json()
+        self.assertEqual(list(data['changes']), ['managers'])
+        self.assertEqual(data['changes']['managers']['upserted'][0]['email'], 'manager@example.com')
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get(self.url, {'since': 'abc'}).status_code, 400)
+
+
+class DefaultSettleWindowTests(IsolatedHostCachesMixin, TestCase):
+    """The admin syncs right after each edit, well within the settle window"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = make_business()
+        cls.admin = make_admin(cls.business)
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.admin)
+        self.url = f'/api/businesses/{self.business.id}/changes/'
+
+    def test_own_edit_is_in_the_next_sync(self):
+        cursor = self.client.get(self.url).json()['cursor']
+        response = self.client.post(
+            f'/api/businesses/{self.business.id}/managers/',
+            {'name': 'Manager', 'email': 'manager@example.com'},
+            content_type='application/json'
+        )
+        self.assertLess(response.status_code, 300)
+
+        data = self.client.get(self.url, {'since': cursor}).json()
+        self.assertEqual(data['changes']['managers']['upserted'][0]['email'], 'manager@example.com')
+        self.assertEqual(data['cursor'], cursor)
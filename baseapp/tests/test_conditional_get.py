@@ -0,0 +1,95 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from baseapp.data_versions import data_etag
+from baseapp.models import Attribute, Manager, TrainingMaterial
+from .helpers import IsolatedHostCachesMixin, make_admin, make_business, make_hr
+
+
+class DataVersionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = make_business()
+        cls.other = make_business('Other')
+
+    def test_etag_is_stable_until_data_changes(self):
+        etag = data_etag(self.business.id, 'managers')
+        self.assertEqual(data_etag(self.business.id, 'managers'), etag)
+
+        Manager.objects.create(business=self.business, name='Manager', email='manager@example.com')
+        self.assertNotEqual(data_etag(self.business.id, 'managers'), etag)
+
+    def test_changes_are_scoped_to_their_business_and_kind(self):
+        managers = data_etag(self.business.id, 'managers')
+        attributes = data_etag(self.business.id, 'attributes')
+        other_managers = data_etag(self.other.id, 'managers')
+
+        Manager.objects.create(business=self.business, name='Manager', email='manager@example.com')
+
+        self.assertEqual(data_etag(self.business.id, 'attributes'), attributes)
+        self.assertEqual(data_etag(self.other.id, 'managers'), other_managers)
+        self.assertNotEqual(data_etag(self.business.id, 'managers'), managers)
+
+    def test_login_does_not_change_hr_users(self):
+        hr = make_hr(self.business)
+        etag = data_etag(self.business.id, 'hr_users')
+        self.client.force_login(hr)
+        self.assertEqual(data_etag(self.business.id, 'hr_users'), etag)
+
+
+class ConditionalGetTests(IsolatedHostCachesMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = make_business()
+        cls.admin = make_admin(cls.business)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+        self.urls = [
+            f'/api/businesses/{self.business.id}/details/',
+            '/api/question-pairs/',
+            '/api/attributes/',
+            f'/api/businesses/{self.business.id}/managers/',
+            '/api/training-materials/',
+            f'/api/businesses/{self.business.id}/benchmark-emails/',
+        ]
+
+    def test_unchanged_data_is_answered_with_304(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('no-cache', response['Cache-Control'])
+                self.assertEqual(
+                    self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304
+                )
+
+    def test_304_skips_the_view_queries(self):
+        url = f'/api/businesses/{self.business.id}/details/'
+        etag = self.client.get(url)['ETag']
+        with CaptureQueriesContext(connection) as full:
+            self.client.get(url)
+        with CaptureQueriesContext(connection) as conditional:
+            self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertLess(len(conditional), len(full))
+        sql = ' '.join(query['sql'] for query in conditional.captured_queries)
+        self.assertNotIn('baseapp_questionpair', sql)
+
+    def test_changes_invalidate_the_etag(self):
+        etags = {url: self.client.get(url)['ETag'] for url in self.urls}
+
+        Manager.objects.create(business=self.business, name='Manager', email='manager@example.com')
+        TrainingMaterial.objects.create(title='Handbook')
+        Attribute.objects.create(name='Focus', business=self.business)
+
+        status = {url: self.client.get(url, HTTP_IF_NONE_MATCH=etags[url]).status_code for url in self.urls}
+        self.assertEqual(status, {
+            f'/api/businesses/{self.business.id}/details/': 200,
+            '/api/question-pairs/': 200,
+            '/api/attributes/': 200,
+            f'/api/businesses/{self.business.id}/managers/': 200,
+            '/api/training-materials/': 200,
+            f'/api/businesses/{self.business.id}/benchmark-emails/': 304,
+        })
@@ -0,0 +1,58 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from baseapp.views import HR_DASHBOARD_PAGE_SIZE
+from .helpers import IsolatedHostCachesMixin, make_assessment, make_business, make_hr
+
+
+class HRDashboardTests(IsolatedHostCachesMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = make_business()
+        cls.hr = make_hr(cls.business)
+        cls.total = HR_DASHBOARD_PAGE_SIZE * 2 + 3
+        for number in range(cls.total):
+            make_assessment(
+                cls.business, cls.hr, number,
+                completed=number % 3 == 0,
+                completion_time_seconds=120 if number % 3 == 0 else None,
+                first_accessed_at=timezone.now() if number % 3 == 1 else None,
+            )
+        # Benchmarks and other businesses' assessments are not shown
+        make_assessment(cls.business, cls.hr, 'benchmark', assessment_type='benchmark')
+        other = make_business('Other')
+        make_assessment(other, make_hr(other, 'other-hr'), 'other')
+
+    def setUp(self):
+        self.client.force_login(self.hr)
+
+    def test_first_page_and_counts(self):
+        response = self.client.get('/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['assessments']), HR_DASHBOARD_PAGE_SIZE)
+        self.assertEqual(response.context['counts'], {
+            'total': self.total,
+            'completed_count': 18,
+            'in_progress_count': 18,
+            'not_started_count': 17,
+        })
+        self.assertTrue(response.context['next_cursor'])
+
+    def test_query_count_does_not_grow_with_rows(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/dashboard/')
+        # Session, user, counts and the page, whatever the number of assessments
+        self.assertLessEqual(len(queries), 6)
+
+    def test_scrolling_loads_every_row_once(self):
+        response = self.client.get('/dashboard/')
+        rows = len(response.context['assessments'])
+        cursor = response.context['next_cursor']
+        while cursor:
+            data = self.client.get('/dashboard/assessments/', {'cursor': cursor}).json()
+            rows += data['rows_html'].count('<tr>')
+            cursor = data['next_cursor']
+            self.assertEqual(data['has_more'], cursor is not None)
+        self.assertEqual(rows, self.total)
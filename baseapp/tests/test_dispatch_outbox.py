@@ -0,0 +1,162 @@
+import smtplib
+import threading
+from io import StringIO
+from unittest import mock
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from baseapp.management.commands import dispatch_outbox
+from baseapp.management.commands.dispatch_outbox import Command
+from baseapp.models import Assessment, OutboxMessage
+from baseapp.outbox import TokenBucket, enqueue_email
+from .helpers import IsolatedHostCachesMixin, make_admin, make_assessment, make_business
+
+# Test backend state, reset by each test
+opened = []
+batches = []
+failing = set()
+state_lock = threading.Lock()
+
+
+class FlakyBackend(EmailBackend):
+    """Locmem backend that drops the session on addresses in failing"""
+
+    def open(self):
+        with state_lock:
+            opened.append(self)
+        return super().open()
+
+    def send_messages(self, messages):
+        sent = 0
+        with state_lock:
+            batches.append(self)
+        for message in messages:
+            if message.to[0] in failing:
+                raise smtplib.SMTPServerDisconnected(f'Lost connection on {message.to[0]}')
+            mail.outbox.append(message)
+            sent += 1
+        return sent
+
+
+def reset_backend(fail=()):
+    opened.clear()
+    batches.clear()
+    failing.clear()
+    failing.update(fail)
+    mail.outbox = []
+
+
+@override_settings(EMAIL_BACKEND='baseapp.tests.test_dispatch_outbox.FlakyBackend')
+class SendBatchTests(TestCase):
+
+    def setUp(self):
+        reset_backend()
+        self.command = Command()
+        self.command.bucket = TokenBucket(1000, 1000)
+        self.command.local = threading.local()
+        self.command.connections = []
+        self.command.connections_lock = threading.Lock()
+
+    def emails(self, count):
+        return [EmailMessage('Hello', 'Body', 'from@example.com', [f'person{n}@example.com']) for n in range(count)]
+
+    def test_one_connection_and_call_for_the_batch(self):
+        errors = self.command.send_batch(self.emails(5))
+        self.assertEqual(errors, [None] * 5)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(len(opened), 1)
+        self.assertEqual(len(batches), 1)
+
+        # The next batch reuses the open connection
+        self.command.send_batch(self.emails(2))
+        self.assertEqual(len(opened), 1)
+
+    def test_failure_is_attributed_to_its_message(self):
+        failing.add('person2@example.com')
+        errors = self.command.send_batch(self.emails(5))
+
+        self.assertIsNone(errors[0])
+        self.assertIsNone(errors[1])
+        self.assertIsInstance(errors[2], smtplib.SMTPServerDisconnected)
+        self.assertEqual(errors[3:], [None, None])
+        self.assertEqual(
+            [message.to[0] for message in mail.outbox],
+            ['person0@example.com', 'person1@example.com', 'person3@example.com', 'person4@example.com']
+        )
+        # The rest of the batch went over a fresh session
+        self.assertEqual(len(opened), 2)
+
+    def test_consecutive_failures(self):
+        failing.update({'person0@example.com', 'person1@example.com'})
+        errors = self.command.send_batch(self.emails(3))
+        self.assertEqual([error is not None for error in errors], [True, True, False])
+        self.assertEqual(len(mail.outbox), 1)
+
+
+@override_settings(EMAIL_BACKEND='baseapp.tests.test_dispatch_outbox.FlakyBackend')
+class BenchmarkInvitationDispatchTests(IsolatedHostCachesMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = make_business()
+        cls.admin = make_admin(cls.business)
+        for number in range(12):
+            make_assessment(cls.business, cls.admin, number, assessment_type='benchmark')
+        make_assessment(cls.business, cls.admin, 'done', assessment_type='benchmark', completed=True)
+
+    def setUp(self):
+        reset_backend(fail={'candidate5@example.com'})
+        self.client.force_login(self.admin)
+
+    def test_invitations_go_out_in_batches(self):
+        response = self.client.post(
+            f'/api/businesses/{self.business.id}/send-benchmark-emails/',
+            {'filter': 'unsent'}, content_type='application/json'
+        )
+        self.assertEqual(len(response.json()['queued']), 12)
+        # The request only queues
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(Assessment.objects.filter(email_sent=True).count(), 12)
+
+        output = StringIO()
+        with self.assertLogs('baseapp.outbox', 'WARNING'):
+            call_command('dispatch_outbox', once=True, concurrency=3, rate=1000, burst=100, stdout=output)
+
+        self.assertEqual(len(mail.outbox), 11)
+        # One send_messages() call per worker share, plus a retry of the share that lost its session
+        self.assertLessEqual(len(batches), 4)
+        self.assertEqual(
+            list(OutboxMessage.objects.filter(status='pending').values_list('to', flat=True)),
+            [['candidate5@example.com']]
+        )
+        self.assertIn('Sent 11 emails, 1 failed attempts', output.getvalue())
+
+
+@override_settings(EMAIL_BACKEND='baseapp.tests.test_dispatch_outbox.FlakyBackend')
+class LostLeaseTests(TestCase):
+
+    def setUp(self):
+        reset_backend()
+
+    def test_messages_reclaimed_while_building_are_not_sent(self):
+        first = enqueue_email('Hello', 'Body', 'first@example.com')
+        second = enqueue_email('Hello', 'Body', 'second@example.com')
+        build = dispatch_outbox.build_outbox_email
+
+        def slow_build(message):
+            # Rendering the first report outlasts the lease and another worker reclaims the second
+            if message.id == first.id:
+                OutboxMessage.objects.filter(pk=second.pk).update(claim_token='another-worker')
+            return build(message)
+
+        with mock.patch.object(dispatch_outbox, 'build_outbox_email', side_effect=slow_build), \
+                self.assertLogs('baseapp.outbox', 'WARNING'):
+            call_command('dispatch_outbox', once=True, stdout=StringIO())
+
+        self.assertEqual([message.to for message in mail.outbox], [['first@example.com']])
+        self.assertEqual(
+            dict(OutboxMessage.objects.values_list('id', 'status')),
+            {first.id: 'sent', second.id: 'pending'}
+        )
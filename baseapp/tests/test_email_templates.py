@@ -0,0 +1,63 @@
+from django.test import SimpleTestCase, TestCase
+from baseapp.email_templates import (
+    DEFAULT_TEMPLATES, CompiledTemplate, EmailRenderer, _compile_business_template, assessment_email_context,
+    get_email_renderer
+)
+from baseapp.models import EmailTemplate
+from .helpers import make_admin, make_assessment, make_business
+
+
+class CompiledTemplateTests(SimpleTestCase):
+
+    def test_render(self):
+        template = CompiledTemplate('Hi {{name}}, see {{ url }} - {{name}}')
+        self.assertEqual(template.render({'name': 'Ann', 'url': 'https://x'}), 'Hi Ann, see https://x - Ann')
+
+    def test_unknown_placeholders_are_kept(self):
+        self.assertEqual(CompiledTemplate('{{missing}} and {{known}}').render({'known': 1}), '{{missing}} and 1')
+
+    def test_text_without_placeholders(self):
+        self.assertEqual(CompiledTemplate('Plain {text}').render({}), 'Plain {text}')
+
+    def test_render_many(self):
+        renderer = EmailRenderer('For {{name}}', 'Body {{name}}')
+        self.assertEqual(renderer.render_many([{'name': 'A'}, {'name': 'B'}]), [
+            ('For A', 'Body A'), ('For B', 'Body B')
+        ])
+
+
+class EmailRendererLookupTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = make_business()
+
+    def setUp(self):
+        _compile_business_template.cache_clear()
+
+    def test_default_without_custom_template(self):
+        self.assertIs(get_email_renderer(self.business.id, 'benchmark'), DEFAULT_TEMPLATES['benchmark'])
+
+    def test_custom_template_and_edits(self):
+        template = EmailTemplate.objects.create(
+            business=self.business, template_type='benchmark', subject='Join {{business_name}}', body='Go: {{assessment_url}}'
+        )
+        renderer = get_email_renderer(self.business.id, 'benchmark')
+        self.assertEqual(renderer.render({'business_name': 'Acme', 'assessment_url': 'u'}), ('Join Acme', 'Go: u'))
+        # Compiled once per version of the row
+        self.assertIs(get_email_renderer(self.business.id, 'benchmark'), renderer)
+        self.assertIs(get_email_renderer(self.business.id, 'benchmark', use_custom=False), DEFAULT_TEMPLATES['benchmark'])
+
+        template.subject = 'Edited'
+        template.save()
+        self.assertEqual(get_email_renderer(self.business.id, 'benchmark').render({})[0], 'Edited')
+
+    def test_assessment_context(self):
+        assessment = make_assessment(self.business, make_admin(self.business), candidate_name='Ann')
+        subject, body = DEFAULT_TEMPLATES['standard'].render(
+            assessment_email_context(assessment, 'https://example.com/a/', 'Acme')
+        )
+        self.assertEqual(subject, 'Assessment Invitation')
+        self.assertIn('Dear Ann,', body)
+        self.assertIn('https://example.com/a/', body)
+        self.assertNotIn('{{', body)
@@ -0,0 +1,67 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from baseapp.models import Attribute, QuestionPair
+from .helpers import make_business
+
+
+class ImportQuestionsCommandTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = make_business()
+
+    def write_source(self, suffix, content):
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def run_command(self, *args, **options):
+        output = StringIO()
+        call_command('import_questions', self.business.slug, *args, stdout=output, **options)
+        return output.getvalue()
+
+    def test_default_template_is_idempotent(self):
+        output = self.run_command()
+        self.assertIn('Import finished', output)
+        pairs = QuestionPair.objects.filter(business=self.business).count()
+        attributes = Attribute.objects.filter(business=self.business).count()
+        self.assertGreater(pairs, 0)
+
+        output = self.run_command()
+        self.assertIn(f'0 new attributes, 0 new pairs, 0 changed pairs, {pairs} unchanged', output)
+        self.assertEqual(QuestionPair.objects.filter(business=self.business).count(), pairs)
+        self.assertEqual(Attribute.objects.filter(business=self.business).count(), attributes)
+
+    def test_dry_run(self):
+        output = self.run_command(dry_run=True)
+        self.assertIn('Dry run, nothing written', output)
+        self.assertFalse(QuestionPair.objects.exists())
+
+    def test_json_source_and_update(self):
+        items = [{'attr1': 'Focus', 'attr2': 'Drive', 'statement_a': 'I plan', 'statement_b': 'I act'}]
+        self.run_command(self.write_source('.json', json.dumps(items)))
+
+        items[0]['statement_b'] = 'I act fast'
+        source = self.write_source('.json', json.dumps(items))
+        with self.assertRaisesMessage(CommandError, '1 rows have problems'):
+            self.run_command(source)
+
+        self.assertIn('1 changed pairs', self.run_command(source, update=True))
+        self.assertEqual(QuestionPair.objects.get().statement_b, 'I act fast')
+
+    def test_bad_arguments(self):
+        with self.assertRaisesMessage(CommandError, 'does not exist'):
+            call_command('import_questions', 'missing', stdout=StringIO())
+        with self.assertRaisesMessage(CommandError, '.csv or .json'):
+            self.run_command('questions.txt')
+        with self.assertRaisesMessage(CommandError, 'Could not read'):
+            self.run_command('/nonexistent/questions.csv')
+        with self.assertRaisesMessage(CommandError, 'Missing required columns'):
+            self.run_command(self.write_source('.csv', 'Attribute-A,Statement-A\nFocus,I plan\n'))
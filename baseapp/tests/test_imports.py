@@ -0,0 +1,27 @@
+import os
+import subprocess
+import sys
+from django.test import SimpleTestCase
+from baseapp.management.commands.import_time import HEAVY_MODULES
+
+
+class CandidateViewImportTests(SimpleTestCase):
+    """Candidate-facing pages must not make web workers load report/import libraries"""
+
+    def test_candidate_views_load_without_heavy_modules(self):
+        # A fresh interpreter, since this process may have imported them already
+        code = f'''
+import sys
+import django
+django.setup()
+from django.urls import resolve
+for path in ('/assessment/abc123/', '/thank-you/'):
+    resolve(path).func
+print(','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))
+'''
+        result = subprocess.run(
+            [sys.executable, '-c', code],
+            capture_output=True, text=True, env=os.environ.copy()
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), '', f'Loaded at import time: {result.stdout.strip()}')
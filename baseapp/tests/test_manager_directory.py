@@ -0,0 +1,47 @@
+from django.core.cache import cache
+from django.test import TestCase
+from baseapp.manager_directory import get_manager_directory
+from baseapp.models import Manager
+from .helpers import make_business
+
+
+class ManagerDirectoryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = make_business()
+        cls.ann = Manager.objects.create(business=cls.business, name='Ann', email='Ann@Example.com', is_default=True)
+        cls.bob = Manager.objects.create(business=cls.business, name='Bob', email='bob@example.com')
+        cls.old = Manager.objects.create(business=cls.business, name='Old', email='old@example.com', active=False, is_default=True)
+        Manager.objects.create(business=make_business('Other'), name='Zed', email='zed@example.com')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_lookups(self):
+        directory = get_manager_directory(self.business.id)
+        self.assertEqual([manager.name for manager in directory.managers], ['Ann', 'Bob', 'Old'])
+        self.assertEqual(directory.default_ids, [self.ann.id])
+        self.assertEqual(directory.find_by_email('ann@example.com').id, self.ann.id)
+        self.assertIsNone(directory.find_by_email('old@example.com'))
+        self.assertIsNone(directory.find_by_email('zed@example.com'))
+        self.assertEqual(directory.get(str(self.old.id)).name, 'Old')
+        self.assertIsNone(directory.get('abc'))
+
+    def test_selections(self):
+        directory = get_manager_directory(self.business.id)
+        self.assertEqual(directory.active_ids([self.bob.id, self.old.id, self.bob.id, 999]), [self.bob.id])
+        self.assertEqual(directory.with_defaults([self.bob.id]), [self.bob.id, self.ann.id])
+        self.assertEqual(directory.emails([self.ann.id, self.old.id]), ['Ann@Example.com'])
+
+    def test_served_from_the_cache_until_a_manager_changes(self):
+        get_manager_directory(self.business.id)
+        with self.assertNumQueries(0):
+            get_manager_directory(self.business.id)
+
+        Manager.objects.create(business=self.business, name='Cy', email='cy@example.com', is_default=True)
+        directory = get_manager_directory(self.business.id)
+        self.assertEqual([manager.name for manager in directory.defaults], ['Ann', 'Cy'])
+
+        self.bob.delete()
+        self.assertIsNone(get_manager_directory(self.business.id).find_by_email('bob@example.com'))
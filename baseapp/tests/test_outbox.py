@@ -0,0 +1,200 @@
+import smtplib
+import time
+from datetime import timedelta
+from unittest import mock
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from baseapp.models import OutboxMessage
+from baseapp.outbox import (
+    CLAIM_LEASE_SECONDS, TokenBucket, claim_due_messages, enqueue_email, mark_failed, mark_sent,
+    prune_sent_messages, renew_leases, retry_delay
+)
+from .helpers import IsolatedHostCachesMixin, make_admin, make_assessment, make_business
+
+
+@override_settings(OUTBOX_RETRY_BASE_SECONDS=30, OUTBOX_RETRY_MAX_SECONDS=3600, OUTBOX_MAX_ATTEMPTS=3)
+class OutboxTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = make_business()
+        cls.assessment = make_assessment(cls.business, make_admin(cls.business))
+
+    def enqueue(self, to='person@example.com'):
+        return enqueue_email('Hello', 'Body', to, assessment=self.assessment, category='invitation')
+
+    def test_enqueue(self):
+        message = self.enqueue()
+        self.assertEqual(message.to, ['person@example.com'])
+        self.assertEqual(message.business_id, self.business.id)
+        self.assertEqual(message.status, 'pending')
+
+    def test_claim_reserves_messages(self):
+        first = self.enqueue('first@example.com')
+        second = self.enqueue('second@example.com')
+        later = self.enqueue('later@example.com')
+        OutboxMessage.objects.filter(pk=later.pk).update(next_attempt_at=timezone.now() + timedelta(hours=1))
+
+        claimed = claim_due_messages(10)
+        self.assertEqual([message.id for message in claimed], [first.id, second.id])
+        self.assertEqual([message.attempts for message in claimed], [1, 1])
+
+        # Leased until the worker reports back, so not claimed twice
+        self.assertEqual(claim_due_messages(10), [])
+        first.refresh_from_db()
+        self.assertGreater(first.next_attempt_at, timezone.now() + timedelta(seconds=CLAIM_LEASE_SECONDS - 60))
+
+    def test_claim_limit(self):
+        for number in range(3):
+            self.enqueue(f'person{number}@example.com')
+        self.assertEqual(len(claim_due_messages(2)), 2)
+        self.assertEqual(len(claim_due_messages(2)), 1)
+
+    def test_expired_lease_is_claimed_again(self):
+        message = self.enqueue()
+        claim_due_messages(10)
+        OutboxMessage.objects.filter(pk=message.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual([claimed.attempts for claimed in claim_due_messages(10)], [2])
+
+    def test_mark_sent(self):
+        self.enqueue()
+        message = claim_due_messages(1)[0]
+        mark_sent([message])
+        message.refresh_from_db()
+        self.assertEqual(message.status, 'sent')
+        self.assertIsNotNone(message.sent_at)
+
+    def test_reclaimed_messages_belong_to_the_new_worker(self):
+        self.enqueue('first@example.com')
+        self.enqueue('second@example.com')
+        slow = claim_due_messages(10)
+
+        # The slow worker's lease runs out on the second message and another worker takes it
+        OutboxMessage.objects.filter(pk=slow[1].pk).update(next_attempt_at=timezone.now())
+        taken_over = claim_due_messages(10)
+        self.assertEqual([message.id for message in taken_over], [slow[1].id])
+
+        with self.assertLogs('baseapp.outbox', 'WARNING'):
+            self.assertEqual(renew_leases(slow), slow[:1])
+        mark_sent(slow)
+        with self.assertNoLogs('baseapp.outbox', 'WARNING'):
+            mark_failed(slow[1], smtplib.SMTPServerDisconnected('Connection lost'))
+
+        reclaimed = OutboxMessage.objects.get(pk=slow[1].pk)
+        self.assertEqual((reclaimed.status, reclaimed.last_error), ('pending', ''))
+        self.assertEqual(OutboxMessage.objects.get(pk=slow[0].pk).status, 'sent')
+
+        mark_sent(taken_over)
+        self.assertEqual(OutboxMessage.objects.get(pk=slow[1].pk).status, 'sent')
+
+    def test_renewing_extends_the_lease(self):
+        self.enqueue()
+        message = claim_due_messages(1)[0]
+        OutboxMessage.objects.filter(pk=message.pk).update(next_attempt_at=timezone.now() + timedelta(seconds=5))
+        self.assertEqual(renew_leases([message]), [message])
+        self.assertEqual(claim_due_messages(1), [])
+        message.refresh_from_db()
+        self.assertGreater(message.next_attempt_at, timezone.now() + timedelta(seconds=CLAIM_LEASE_SECONDS - 60))
+
+    def test_temporary_failure_is_retried_with_backoff(self):
+        self.enqueue()
+        message = claim_due_messages(1)[0]
+        with self.assertLogs('baseapp.outbox', 'WARNING'):
+            mark_failed(message, smtplib.SMTPServerDisconnected('Connection lost'))
+
+        message.refresh_from_db()
+        self.assertEqual(message.status, 'pending')
+        self.assertEqual(message.last_error, 'Connection lost')
+        delay = (message.next_attempt_at - timezone.now()).total_seconds()
+        self.assertTrue(20 < delay < 40, delay)
+
+    def test_permanent_failure_gives_up(self):
+        self.enqueue()
+        message = claim_due_messages(1)[0]
+        with self.assertLogs('baseapp.outbox', 'ERROR'):
+            mark_failed(message, smtplib.SMTPRecipientsRefused({'person@example.com': (550, b'No such user')}))
+        message.refresh_from_db()
+        self.assertEqual(message.status, 'failed')
+
+    def test_gives_up_after_max_attempts(self):
+        self.enqueue()
+        message = claim_due_messages(1)[0]
+        message.attempts = 3
+        with self.assertLogs('baseapp.outbox', 'ERROR'):
+            mark_failed(message, smtplib.SMTPServerDisconnected('Connection lost'))
+        message.refresh_from_db()
+        self.assertEqual(message.status, 'failed')
+
+    def test_retry_delay(self):
+        with mock.patch('baseapp.outbox.random.uniform', return_value=1):
+            self.assertEqual([retry_delay(attempt) for attempt in (1, 2, 3)], [30, 60, 120])
+            self.assertEqual(retry_delay(20), 3600)
+
+    def test_prune_sent_messages(self):
+        old = self.enqueue('old@example.com')
+        recent = self.enqueue('recent@example.com')
+        pending = self.enqueue('pending@example.com')
+        mark_sent(claim_due_messages(2))
+        OutboxMessage.objects.filter(pk=old.pk).update(sent_at=timezone.now() - timedelta(days=30))
+
+        self.assertEqual(prune_sent_messages(14), 1)
+        self.assertEqual(set(OutboxMessage.objects.values_list('id', flat=True)), {recent.id, pending.id})
+
+
+class TokenBucketTests(TestCase):
+
+    def test_burst_then_rate(self):
+        bucket = TokenBucket(rate=50, capacity=5)
+        started = time.monotonic()
+        for _ in range(5):
+            bucket.acquire()
+        self.assertLess(time.monotonic() - started, 0.05)
+
+        for _ in range(5):
+            bucket.acquire()
+        # Five more tokens at 50 per second take about 0.1s
+        self.assertGreaterEqual(time.monotonic() - started, 0.08)
+
+
+class OutboxStatusTests(IsolatedHostCachesMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = make_business()
+        cls.admin = make_admin(cls.business)
+        for number in range(3):
+            make_assessment(cls.business, cls.admin, number, assessment_type='benchmark')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_queued_ids_report_delivery(self):
+        queued = self.client.post(
+            f'/api/businesses/{self.business.id}/send-benchmark-emails/',
+            {'emails': ['CANDIDATE0@example.com', 'candidate1@example.com']}, content_type='application/json'
+        ).json()['queued']
+        self.assertEqual({item['email'] for item in queued}, {'candidate0@example.com', 'candidate1@example.com'})
+        for item in queued:
+            self.assertEqual(OutboxMessage.objects.get(pk=item['outbox_id']).to, [item['email']])
+
+        ids = [item['outbox_id'] for item in queued]
+        mark_sent([message for message in claim_due_messages(10) if message.id == ids[0]])
+        data = self.client.get(
+            f'/api/businesses/{self.business.id}/outbox-status/', {'ids': ','.join(map(str, ids))}
+        ).json()
+        self.assertEqual((data['pending'], data['sent'], data['failed']), (1, 1, 0))
+        self.assertEqual({message['id']: message['status'] for message in data['messages']}, {
+            ids[0]: 'sent', ids[1]: 'pending'
+        })
+
+    def test_other_businesses_messages_are_hidden(self):
+        other = make_business('Other')
+        message = enqueue_email('Hello', 'Body', 'person@example.com', business=other)
+        data = self.client.get(f'/api/businesses/{self.business.id}/outbox-status/', {'ids': str(message.id)}).json()
+        self.assertEqual(data['messages'], [])
+
+    def test_invalid_ids(self):
+        url = f'/api/businesses/{self.business.id}/outbox-status/'
+        self.assertEqual(self.client.get(url).status_code, 400)
+        self.assertEqual(self.client.get(url, {'ids': '1,x'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'ids': ','.join(map(str, range(1001)))}).status_code, 400)
@@ -0,0 +1,122 @@
+from datetime import datetime, timezone as dt_timezone
+from django.test import TestCase
+from baseapp.models import Assessment
+from baseapp.pagination import decode_cursor, encode_cursor, keyset_page, parse_limit
+from .helpers import IsolatedHostCachesMixin, make_admin, make_assessment, make_business, make_hr
+
+
+class CursorTests(TestCase):
+
+    def test_round_trip(self):
+        created_at = datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=dt_timezone.utc)
+        self.assertEqual(decode_cursor(encode_cursor(created_at, 42)), (created_at, 42))
+
+    def test_malformed_cursor_is_ignored(self):
+        for cursor in (None, '', 'garbage', 'bm90IGEgY3Vyc29y', encode_cursor(datetime(2024, 1, 1), 1)[:-4] + '!!!!'):
+            self.assertIsNone(decode_cursor(cursor), cursor)
+
+    def test_parse_limit(self):
+        self.assertEqual(parse_limit(None), 50)
+        self.assertEqual(parse_limit('abc'), 50)
+        self.assertEqual(parse_limit('0'), 1)
+        self.assertEqual(parse_limit('25'), 25)
+        self.assertEqual(parse_limit('5000'), 200)
+
+
+class KeysetPageTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        business = make_business()
+        hr = make_hr(business)
+        same_time = datetime(2024, 3, 1, tzinfo=dt_timezone.utc)
+        for number in range(7):
+            assessment = make_assessment(business, hr, number)
+            # Several rows share a timestamp, so the id must break ties
+            if number < 4:
+                Assessment.objects.filter(pk=assessment.pk).update(created_at=same_time)
+
+    def test_pages_cover_every_row_once_newest_first(self):
+        seen = []
+        cursor = None
+        while True:
+            rows, cursor = keyset_page(Assessment.objects.all(), cursor=cursor, limit=2)
+            seen.extend(rows)
+            if cursor is None:
+                break
+
+        expected = list(Assessment.objects.order_by('-created_at', '-id'))
+        self.assertEqual(seen, expected)
+
+    def test_values_queryset(self):
+        rows, cursor = keyset_page(Assessment.objects.values('id', 'created_at'), limit=3)
+        self.assertEqual(len(rows), 3)
+        rest, _ = keyset_page(Assessment.objects.values('id', 'created_at'), cursor=cursor, limit=10)
+        self.assertEqual(len(rest), 4)
+        self.assertFalse({row['id'] for row in rows} & {row['id'] for row in rest})
+
+    def test_last_page_has_no_cursor(self):
+        rows, cursor = keyset_page(Assessment.objects.all(), limit=7)
+        self.assertEqual(len(rows), 7)
+        self.assertIsNone(cursor)
+
+
+class BusinessAssessmentsTests(IsolatedHostCachesMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = make_business()
+        cls.admin = make_admin(cls.business)
+        hr = make_hr(cls.business)
+        for number in range(12):
+            make_assessment(
+                cls.business, hr, number,
+                region='North' if number % 2 else 'South',
+                completed=number % 3 == 0,
+                assessment_type='benchmark' if number == 11 else 'standard',
+            )
+        other = make_business('Other')
+        make_assessment(other, make_hr(other, 'other-hr'), 99)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+        self.url = f'/api/businesses/{self.business.id}/assessments/'
+
+    def test_pages_and_counts(self):
+        first = self.client.get(self.url, {'limit': 5}).json()
+        self.assertEqual(len(first['assessments']), 5)
+        self.assertTrue(first['has_more'])
+        self.assertEqual(first['counts']['total'], 12)
+        self.assertEqual(first['counts']['completed_count'], 4)
+        self.assertEqual(first['counts']['not_started_count'], 8)
+
+        ids = [row['id'] for row in first['assessments']]
+        cursor = first['next_cursor']
+        while cursor:
+            page = self.client.get(self.url, {'limit': 5, 'cursor': cursor}).json()
+            ids += [row['id'] for row in page['assessments']]
+            cursor = page['next_cursor']
+        self.assertEqual(sorted(ids), sorted(Assessment.objects.filter(business=self.business).values_list('id', flat=True)))
+
+    def test_filters_apply_to_rows_and_counts(self):
+        data = self.client.get(self.url, {'status': 'pending', 'region': 'North', 'type': 'standard'}).json()
+        rows = data['assessments']
+        self.assertEqual(data['counts']['total'], len(rows))
+        self.assertTrue(rows)
+        for row in rows:
+            self.assertFalse(row['completed'])
+            self.assertEqual(row['region'], 'North')
+            self.assertEqual(row['assessment_type'], 'standard')
+
+    def test_search(self):
+        data = self.client.get(self.url, {'q': 'CANDIDATE10@'}).json()
+        self.assertEqual([row['candidate_email'] for row in data['assessments']], ['candidate10@example.com'])
+
+    def test_bad_cursor_and_dates_start_from_the_top(self):
+        data = self.client.get(self.url, {'cursor': 'garbage', 'date_from': 'yesterday'}).json()
+        self.assertEqual(data['counts']['total'], 12)
+        self.assertEqual(len(data['assessments']), 12)
+
+    def test_requires_admin(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 302)
@@ -0,0 +1,138 @@
+import multiprocessing
+import os
+import threading
+import time
+from unittest import mock
+from django.test import SimpleTestCase, override_settings
+from baseapp import pdf_renderer
+from baseapp.pdf_renderer import MB, PDFRenderer, PDFRenderError, PDFRenderTimeout, render_pdf
+
+
+def _scripted_serve(conn, max_memory):
+    """
+    Stands in for the rendering child: the HTML says what to do, and a
+    successful render returns the child's pid
+    """
+    while True:
+        try:
+            html_string, css_string, base_url = conn.recv()
+        except EOFError:
+            return
+        if html_string == 'slow':
+            time.sleep(30)
+        elif html_string == 'crash':
+            os._exit(3)
+        elif html_string == 'memory':
+            conn.send(('memory', 'Ran out of memory while rendering', 0))
+            return
+        elif html_string == 'error':
+            conn.send(('error', 'ValueError: bad document', 0))
+        else:
+            peak_rss = 512 * MB if html_string == 'bloated' else MB
+            conn.send(('ok', str(os.getpid()).encode(), peak_rss))
+
+
+class PDFRendererTests(SimpleTestCase):
+
+    def setUp(self):
+        patcher = mock.patch('baseapp.pdf_renderer._serve', _scripted_serve)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.renderer = PDFRenderer(timeout=5, max_renders=3)
+        self.addCleanup(self.stop_renderer)
+
+    def stop_renderer(self):
+        if self.renderer._process is not None:
+            self.renderer._stop('test finished')
+
+    def render(self, html='<p>Report</p>'):
+        return self.renderer.render(html, 'p { color: black; }')
+
+    def test_child_is_reused_then_recycled(self):
+        pids = [self.render() for _ in range(4)]
+        self.assertEqual(len(set(pids[:3])), 1)
+        self.assertNotEqual(pids[3], pids[0])
+        self.assertNotEqual(pids[0], str(os.getpid()).encode())
+
+    def test_render_errors_keep_the_child(self):
+        pid = self.render()
+        with self.assertRaisesMessage(PDFRenderError, 'ValueError: bad document'):
+            self.render('error')
+        self.assertEqual(self.render(), pid)
+
+    def test_child_is_replaced_when_out_of_memory(self):
+        pid = self.render()
+        with self.assertRaisesMessage(PDFRenderError, 'Ran out of memory'):
+            self.render('memory')
+        self.assertNotEqual(self.render(), pid)
+
+    def test_child_is_replaced_when_its_peak_rss_is_too_high(self):
+        pid = self.render('bloated')
+        self.assertIsNone(self.renderer._process)
+        self.assertNotEqual(self.render(), pid)
+
+    def test_slow_renders_are_killed(self):
+        self.renderer.timeout = 1
+        pid = self.render()
+        process = self.renderer._process
+        with self.assertRaises(PDFRenderTimeout):
+            self.render('slow')
+        self.assertFalse(process.is_alive())
+        self.assertNotEqual(self.render(), pid)
+
+    def test_crashed_child_is_replaced(self):
+        pid = self.render()
+        with self.assertRaisesMessage(PDFRenderError, 'exited with code 3'):
+            self.render('crash')
+        self.assertNotEqual(self.render(), pid)
+
+
+class ServeTests(SimpleTestCase):
+    """The child's loop, run in this process"""
+
+    def serve(self, render, replies=2):
+        parent_conn, child_conn = multiprocessing.Pipe()
+        with mock.patch('baseapp.pdf_renderer._render', side_effect=render):
+            child = threading.Thread(target=pdf_renderer._serve, args=(child_conn, 0))
+            child.start()
+            parent_conn.send(('<p>Report</p>', '', None))
+            parent_conn.send(('<p>Again</p>', '', None))
+            received = [parent_conn.recv()[:2] for _ in range(replies)]
+            parent_conn.close()
+            child.join(5)
+        self.assertFalse(child.is_alive())
+        return received
+
+    def test_renders_until_the_pipe_closes(self):
+        self.assertEqual(
+            self.serve(lambda html, css, base_url: html.encode()),
+            [('ok', b'<p>Report</p>'), ('ok', b'<p>Again</p>')]
+        )
+
+    def test_failures_are_reported(self):
+        def render(html, css, base_url):
+            raise ValueError('bad document')
+        self.assertEqual(self.serve(render), [('error', 'ValueError: bad document')] * 2)
+
+    def test_stops_after_running_out_of_memory(self):
+        def render(html, css, base_url):
+            raise MemoryError
+        self.assertEqual(self.serve(render, replies=1), [('memory', 'Ran out of memory while rendering')])
+
+
+class RenderPDFTests(SimpleTestCase):
+
+    @override_settings(PDF_RENDER_ISOLATED=False)
+    def test_renders_in_process_when_isolation_is_off(self):
+        with mock.patch('baseapp.pdf_renderer._render', return_value=b'%PDF') as render, \
+                mock.patch('baseapp.pdf_renderer.get_renderer') as get_renderer:
+            self.assertEqual(render_pdf('<p>Report</p>', ''), b'%PDF')
+        render.assert_called_once_with('<p>Report</p>', '', None)
+        get_renderer.assert_not_called()
+
+    @override_settings(PDF_RENDER_ISOLATED=True)
+    def test_uses_the_supervised_child(self):
+        with mock.patch('baseapp.pdf_renderer.get_renderer') as get_renderer:
+            get_renderer.return_value.render.return_value = b'%PDF'
+            self.assertEqual(render_pdf('<p>Report</p>', '', base_url='/'), b'%PDF')
+        get_renderer.return_value.render.assert_called_once_with('<p>Report</p>', '', '/')
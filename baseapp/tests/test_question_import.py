@@ -0,0 +1,142 @@
+import io
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from baseapp.models import Attribute, QuestionPair
+from baseapp.question_import import (
+    TemplateImportError, apply_question_import, plan_question_import, read_template_json, read_template_rows
+)
+from .helpers import IsolatedHostCachesMixin, make_admin, make_business
+
+HEADER = 'Attribute-A,Attribute-B,Statement-A,Statement-B\n'
+
+
+def template(lines, header=HEADER):
+    return io.BytesIO((header + ''.join(line + '\n' for line in lines)).encode('utf-8'))
+
+
+class ReadTemplateTests(TestCase):
+
+    def test_rows_with_line_numbers(self):
+        rows = list(read_template_rows(template(['Focus, Drive ,I plan,I act', ',,,', 'Care,Drive,I help'])))
+        self.assertEqual(rows, [
+            (2, {'attribute1': 'Focus', 'attribute2': 'Drive', 'statement_a': 'I plan', 'statement_b': 'I act'}),
+            (4, {'attribute1': 'Care', 'attribute2': 'Drive', 'statement_a': 'I help', 'statement_b': ''}),
+        ])
+
+    def test_alternative_headings(self):
+        rows = list(read_template_rows(template(['A,B,x,y'], header='statement_b,attribute1,attribute2,statement_a\n')))
+        self.assertEqual(rows[0][1], {'attribute1': 'B', 'attribute2': 'x', 'statement_a': 'y', 'statement_b': 'A'})
+
+    def test_missing_columns_and_bad_encoding(self):
+        with self.assertRaisesMessage(TemplateImportError, 'Missing required columns: statement_b (or Statement-B)'):
+            list(read_template_rows(template([], header='Attribute-A,Attribute-B,Statement-A\n')))
+        with self.assertRaisesMessage(TemplateImportError, 'UTF-8'):
+            list(read_template_rows(io.BytesIO(HEADER.encode() + b'\xff\xfe,x,y,z\n')))
+
+    def test_json_template(self):
+        rows = list(read_template_json(io.StringIO('[{"attr1": "A", "attribute2": "B", "statement_a": "x", "statement_b": "y"}]')))
+        self.assertEqual(rows, [(1, {'attribute1': 'A', 'attribute2': 'B', 'statement_a': 'x', 'statement_b': 'y'})])
+        with self.assertRaises(TemplateImportError):
+            list(read_template_json(io.StringIO('{"not": "a list"}')))
+
+
+class PlanQuestionImportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = make_business()
+        cls.focus = Attribute.objects.create(name='Focus', business=cls.business, order=1)
+        cls.drive = Attribute.objects.create(name='Drive', business=cls.business, order=2)
+        cls.pair = QuestionPair.objects.create(
+            business=cls.business, attribute1=cls.focus, attribute2=cls.drive, statement_a='I plan', statement_b='I act'
+        )
+
+    def plan(self, lines, **kwargs):
+        return plan_question_import(self.business, read_template_rows(template(lines)), **kwargs)
+
+    def test_diff_against_existing_data(self):
+        plan = self.plan([
+            'Focus,Drive,I plan,I act',      # already imported
+            'focus,Care,I focus,I care',     # new pair, existing attribute in another case
+            'Focus,Care,I focus,I care',     # repeated in the file
+            'Drive,Focus,I push,I plan',     # reversed combination is a different pair
+            'Focus,,I focus,',               # incomplete
+        ])
+        self.assertEqual(plan.summary(), {
+            'new_attributes': ['Care'],
+            'new_pairs': 2,
+            'changed_pairs': 0,
+            'existing_pairs': 1,
+            'duplicate_rows': 1,
+            'row_errors': [{'row': 6, 'errors': ['attribute2 is required', 'statement_b is required']}],
+        })
+
+    def test_conflicting_statements(self):
+        plan = self.plan(['Focus,Drive,I plan ahead,I act now'])
+        self.assertEqual(plan.row_errors[0]['row'], 2)
+        self.assertIn('already has a question pair with different statements', plan.row_errors[0]['errors'][0])
+
+        plan = self.plan(['Focus,Drive,I plan ahead,I act now', 'Focus,Drive,Third,Fourth'], update_existing=True)
+        self.assertEqual([pair_id for pair_id, _ in plan.changed_pairs], [self.pair.id])
+        self.assertEqual(plan.row_errors[0]['row'], 3)
+
+    def test_planning_queries_do_not_depend_on_the_file(self):
+        lines = [f'Trait{n},Trait{n + 1},Statement {n}a,Statement {n}b' for n in range(300)]
+        with self.assertNumQueries(2):
+            plan = self.plan(lines)
+        self.assertEqual(len(plan.new_pairs), 300)
+
+    def test_apply(self):
+        plan = self.plan(['Focus,Care,I focus,I care', 'Care,Grit,I help,I persist'])
+        self.assertEqual(apply_question_import(plan), 2)
+
+        care = Attribute.objects.get(business=self.business, name='Care')
+        self.assertEqual((care.order, Attribute.objects.get(name='Grit').order), (3, 4))
+        pair = QuestionPair.objects.get(statement_a='I focus')
+        self.assertEqual((pair.attribute1, pair.attribute2), (self.focus, care))
+        self.assertEqual(pair.statement_hash, QuestionPair.hash_statements(self.business.id, 'I focus', 'I care'))
+        self.business.refresh_from_db()
+        self.assertTrue(self.business.assessment_template_uploaded)
+
+        # Importing the same file again changes nothing
+        again = self.plan(['Focus,Care,I focus,I care', 'Care,Grit,I help,I persist'])
+        self.assertEqual((again.existing_pairs, apply_question_import(again)), (2, 0))
+
+    def test_apply_updates(self):
+        plan = self.plan(['Focus,Drive,I plan ahead,I act now'], update_existing=True)
+        apply_question_import(plan)
+        self.pair.refresh_from_db()
+        self.assertEqual((self.pair.statement_a, self.pair.statement_b), ('I plan ahead', 'I act now'))
+        self.assertEqual(self.pair.statement_hash, QuestionPair.hash_statements(self.business.id, 'I plan ahead', 'I act now'))
+
+
+class UploadTemplateViewTests(IsolatedHostCachesMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = make_business()
+        cls.admin = make_admin(cls.business)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+        self.url = f'/api/businesses/{self.business.id}/upload-template/'
+
+    def upload(self, lines, **data):
+        file = SimpleUploadedFile('template.csv', template(lines).getvalue())
+        return self.client.post(self.url, {'file': file, **data})
+
+    def test_dry_run_writes_nothing(self):
+        data = self.upload(['Focus,Drive,I plan,I act'], dry_run='1').json()
+        self.assertTrue(data['dry_run'])
+        self.assertEqual(data['new_pairs'], 1)
+        self.assertFalse(QuestionPair.objects.exists())
+
+    def test_row_errors_block_the_import(self):
+        response = self.upload(['Focus,Drive,I plan,I act', 'Focus,,,'])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(QuestionPair.objects.exists())
+
+    def test_import(self):
+        data = self.upload(['Focus,Drive,I plan,I act', 'Care,Drive,I help,I act']).json()
+        self.assertEqual(data['count'], 2)
+        self.assertEqual(QuestionPair.objects.filter(business=self.business).count(), 2)
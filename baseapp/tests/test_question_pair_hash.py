@@ -0,0 +1,101 @@
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from baseapp.models import Attribute, QuestionPair
+from .helpers import IsolatedHostCachesMixin, make_admin, make_business
+
+
+class StatementHashTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = make_business()
+        cls.focus = Attribute.objects.create(name='Focus', business=cls.business)
+        cls.drive = Attribute.objects.create(name='Drive', business=cls.business)
+        cls.care = Attribute.objects.create(name='Care', business=cls.business)
+
+    def make_pair(self, attribute2, statement_a='I plan', statement_b='I act'):
+        return QuestionPair.objects.create(
+            business=self.business, attribute1=self.focus, attribute2=attribute2,
+            statement_a=statement_a, statement_b=statement_b
+        )
+
+    def test_hash_ignores_case_and_spacing(self):
+        self.assertEqual(
+            QuestionPair.hash_statements(1, 'I  plan ', 'I act'),
+            QuestionPair.hash_statements(1, 'i plan', 'I ACT')
+        )
+        self.assertNotEqual(
+            QuestionPair.hash_statements(1, 'I plan', 'I act'),
+            QuestionPair.hash_statements(2, 'I plan', 'I act')
+        )
+        self.assertNotEqual(
+            QuestionPair.hash_statements(1, 'I plan', 'I act'),
+            QuestionPair.hash_statements(1, 'I act', 'I plan')
+        )
+
+    def test_duplicate_statements_are_rejected(self):
+        self.make_pair(self.drive)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.make_pair(self.care, 'I PLAN', 'I  act')
+
+    def test_editing_statements_rehashes(self):
+        pair = self.make_pair(self.drive)
+        pair.statement_a = 'I prepare'
+        pair.save(update_fields=['statement_a'])
+        pair.refresh_from_db()
+        self.assertEqual(pair.statement_hash, QuestionPair.hash_statements(self.business.id, 'I prepare', 'I act'))
+
+    def test_legacy_duplicates_keep_a_null_hash(self):
+        first = self.make_pair(self.drive)
+        second = self.make_pair(self.care, 'Other', 'Statements')
+        # Duplicates from before the column existed have no hash
+        QuestionPair.objects.filter(pk__in=[first.pk, second.pk]).update(
+            statement_a='Same', statement_b='Same', statement_hash=None
+        )
+
+        for pair in QuestionPair.objects.all():
+            pair.active = False
+            pair.save()
+        pair = QuestionPair.objects.only('id', 'order').get(pk=second.pk)
+        pair.order = 5
+        pair.save()
+
+        self.assertEqual(list(QuestionPair.objects.values_list('statement_hash', flat=True)), [None, None])
+        self.assertEqual(QuestionPair.objects.filter(active=False).count(), 2)
+
+    def test_saves_without_edits_do_not_rehash(self):
+        pair = self.make_pair(self.drive)
+        QuestionPair.objects.filter(pk=pair.pk).update(statement_hash='stale')
+        pair = QuestionPair.objects.get(pk=pair.pk)
+        pair.order = 3
+        pair.save()
+        pair.refresh_from_db()
+        self.assertEqual(pair.statement_hash, 'stale')
+
+
+class QuestionPairEditTests(IsolatedHostCachesMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = make_business()
+        cls.admin = make_admin(cls.business)
+        focus = Attribute.objects.create(name='Focus', business=cls.business)
+        drive = Attribute.objects.create(name='Drive', business=cls.business)
+        care = Attribute.objects.create(name='Care', business=cls.business)
+        QuestionPair.objects.create(business=cls.business, attribute1=focus, attribute2=drive, statement_a='I plan', statement_b='I act')
+        cls.pair = QuestionPair.objects.create(
+            business=cls.business, attribute1=focus, attribute2=care, statement_a='I focus', statement_b='I care'
+        )
+
+    def test_edit_to_existing_statements_is_refused(self):
+        self.client.force_login(self.admin)
+        url = f'/api/question-pairs/{self.pair.id}/'
+        body = {'attribute1': 'Focus', 'attribute2': 'Care', 'statement_a': 'i plan', 'statement_b': 'I act '}
+
+        response = self.client.put(url, body, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+        body['statement_a'] = 'I concentrate'
+        self.assertEqual(self.client.put(url, body, content_type='application/json').status_code, 200)
+        self.pair.refresh_from_db()
+        self.assertEqual(self.pair.statement_hash, QuestionPair.hash_statements(self.business.id, 'I concentrate', 'I act '))
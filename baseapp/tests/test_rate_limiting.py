@@ -0,0 +1,108 @@
+from unittest import mock
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from baseapp.rate_limiting import check_rate_limit, client_ip, rate_limit
+from .helpers import IsolatedHostCachesMixin
+
+
+class FakeClockMixin:
+    """Starts each test at the beginning of a one-minute window"""
+
+    def setUp(self):
+        super().setUp()
+        self.now = 6000.0
+        patcher = mock.patch('baseapp.rate_limiting.time.time', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class CheckRateLimitTests(IsolatedHostCachesMixin, FakeClockMixin, SimpleTestCase):
+
+    def test_limit_within_a_window(self):
+        self.assertEqual([check_rate_limit('test', 'client', 5, 60) for _ in range(5)], [0] * 5)
+        self.assertGreater(check_rate_limit('test', 'client', 5, 60), 0)
+        # Limits are per identifier and per bucket
+        self.assertEqual(check_rate_limit('test', 'other-client', 5, 60), 0)
+        self.assertEqual(check_rate_limit('other-test', 'client', 5, 60), 0)
+
+    def test_previous_window_slides_out(self):
+        for _ in range(5):
+            check_rate_limit('test', 'client', 5, 60)
+
+        # Halfway through the next window half of the previous count still applies
+        self.now += 90
+        self.assertEqual(check_rate_limit('test', 'client', 5, 60), 0)
+        self.assertEqual(check_rate_limit('test', 'client', 5, 60), 0)
+        retry_after = check_rate_limit('test', 'client', 5, 60)
+        self.assertEqual(retry_after, 18)
+
+        self.now += retry_after
+        self.assertEqual(check_rate_limit('test', 'client', 5, 60), 0)
+
+    def test_rejected_requests_count(self):
+        for _ in range(20):
+            check_rate_limit('test', 'client', 5, 60)
+        # A client that kept retrying stays limited into the next window
+        self.now += 60
+        self.assertGreater(check_rate_limit('test', 'client', 5, 60), 0)
+
+    def test_counters_expire(self):
+        for _ in range(6):
+            check_rate_limit('test', 'client', 5, 60)
+        self.now += 120
+        self.assertEqual(check_rate_limit('test', 'client', 5, 60), 0)
+
+
+class RateLimitDecoratorTests(IsolatedHostCachesMixin, FakeClockMixin, SimpleTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.factory = RequestFactory()
+
+    def test_sync_view(self):
+        @rate_limit('sync', limit=2, period=60)
+        def view(request):
+            return HttpResponse('ok')
+
+        statuses = [view(self.factory.get('/')).status_code for _ in range(3)]
+        self.assertEqual(statuses, [200, 200, 429])
+        self.assertIn('Retry-After', view(self.factory.get('/')))
+        # Another address has its own allowance
+        self.assertEqual(view(self.factory.get('/', REMOTE_ADDR='10.0.0.2')).status_code, 200)
+
+    def test_methods_and_link_key(self):
+        @rate_limit('submit', limit=1, period=60, key='link', methods=['POST'])
+        def view(request, unique_link):
+            return HttpResponse('ok')
+
+        self.assertEqual(view(self.factory.get('/'), unique_link='abc').status_code, 200)
+        self.assertEqual(view(self.factory.get('/'), unique_link='abc').status_code, 200)
+        self.assertEqual(view(self.factory.post('/'), unique_link='abc').status_code, 200)
+        self.assertEqual(view(self.factory.post('/'), unique_link='abc').status_code, 429)
+        self.assertEqual(view(self.factory.post('/'), unique_link='def').status_code, 200)
+
+    async def test_async_view(self):
+        @rate_limit('async', limit=1, period=60)
+        async def view(request):
+            return HttpResponse('ok')
+
+        self.assertEqual((await view(self.factory.get('/'))).status_code, 200)
+        self.assertEqual((await view(self.factory.get('/'))).status_code, 429)
+
+    def test_user_key_is_refused_on_async_views(self):
+        with self.assertRaises(TypeError):
+            @rate_limit('async', key='user')
+            async def view(request):
+                return HttpResponse('ok')
+
+    def test_client_ip_uses_the_address_the_router_saw(self):
+        request = self.factory.get('/', HTTP_X_FORWARDED_FOR='1.2.3.4, 5.6.7.8', REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(client_ip(request), '5.6.7.8')
+        self.assertEqual(client_ip(self.factory.get('/', REMOTE_ADDR='10.0.0.1')), '10.0.0.1')
+
+
+class LoginRateLimitTests(IsolatedHostCachesMixin, TestCase):
+
+    def test_login_page_is_limited(self):
+        statuses = [self.client.get('/login/').status_code for _ in range(6)]
+        self.assertEqual(statuses, [200] * 5 + [429])
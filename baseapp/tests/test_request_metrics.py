@@ -0,0 +1,153 @@
+from unittest import mock
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+from baseapp import request_metrics
+from baseapp.cache_backends import TieredCache
+from baseapp.models import Business
+from baseapp.request_metrics import MetricsRegistry, RequestMetrics, start_request, stop_request
+from .helpers import IsolatedHostCachesMixin, make_admin, make_business, make_hr
+
+
+def finished(wall_ms, queries=0):
+    metrics = RequestMetrics()
+    metrics.wall = wall_ms / 1000
+    metrics.queries = queries
+    return metrics
+
+
+class MetricsRegistryTests(SimpleTestCase):
+
+    def setUp(self):
+        self.now = 6000.0
+        patcher = mock.patch('baseapp.request_metrics.time.time', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.registry = MetricsRegistry(window_seconds=60, windows=3)
+
+    def endpoints(self):
+        return {endpoint['view']: endpoint for endpoint in self.registry.snapshot()['endpoints']}
+
+    def test_percentiles_and_totals(self):
+        for wall_ms in [3] * 90 + [40] * 9 + [3000]:
+            self.registry.record('baseapp:dashboard', finished(wall_ms, queries=4), 200, 1000)
+        self.registry.record('baseapp:dashboard', finished(20, queries=30), 500, 0)
+        self.registry.record('baseapp:login', finished(1), 200, 10)
+
+        endpoints = self.endpoints()
+        dashboard = endpoints['baseapp:dashboard']
+        self.assertEqual((dashboard['requests'], dashboard['errors']), (101, 1))
+        self.assertEqual((dashboard['p50_ms'], dashboard['p95_ms'], dashboard['p99_ms']), (5, 50, 50))
+        self.assertEqual(dashboard['max_ms'], 3000)
+        self.assertEqual((dashboard['queries_p95'], dashboard['queries_max']), (5, 30))
+        self.assertEqual(dashboard['time_histogram_ms']['5'], 90)
+        self.assertEqual(dashboard['mean_bytes'], 990)
+        # Slowest total first
+        self.assertEqual(list(endpoints), ['baseapp:dashboard', 'baseapp:login'])
+
+    def test_percentile_in_the_overflow_bucket_is_the_maximum(self):
+        self.registry.record('baseapp:report', finished(12345), 200, 0)
+        self.assertEqual(self.endpoints()['baseapp:report']['p50_ms'], 12345)
+
+    def test_old_windows_roll_out(self):
+        self.registry.record('baseapp:login', finished(1), 200, 0)
+        self.now += 120
+        self.registry.record('baseapp:login', finished(1), 200, 0)
+        self.assertEqual(self.endpoints()['baseapp:login']['requests'], 2)
+
+        self.now += 60
+        self.assertEqual(self.endpoints()['baseapp:login']['requests'], 1)
+        self.now += 120
+        self.assertEqual(self.endpoints(), {})
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'metrics-tests-default'},
+    'l2': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'metrics-tests-l2'},
+})
+class CacheLookupCountTests(SimpleTestCase):
+
+    def setUp(self):
+        caches['l2'].clear()
+
+    def test_lookups_are_counted_during_a_request(self):
+        cache = TieredCache('metrics-tests-l1', {'OPTIONS': {'L2': 'l2'}})
+        cache.set('present', 1)
+        cache.get('present')
+
+        metrics, token = start_request()
+        try:
+            cache.get('present')
+            cache.get('missing')
+            cache.get_many(['present', 'missing', 'also-missing'])
+        finally:
+            stop_request(token)
+        self.assertEqual((metrics.cache_hits, metrics.cache_misses), (2, 3))
+
+
+class QueryCountTests(TestCase):
+
+    def test_queries_are_counted_during_a_request(self):
+        Business.objects.count()
+        metrics, token = start_request()
+        try:
+            Business.objects.count()
+            list(Business.objects.all())
+        finally:
+            stop_request(token)
+        Business.objects.count()
+        self.assertEqual(metrics.queries, 2)
+        self.assertGreater(metrics.db_time, 0)
+
+
+class RequestMetricsMiddlewareTests(IsolatedHostCachesMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = make_business()
+        cls.admin = make_admin(cls.business)
+
+    def setUp(self):
+        super().setUp()
+        caches['default'].clear()
+        self.registry = MetricsRegistry()
+        for target in ('baseapp.request_metrics.registry', 'baseapp.views.metrics_registry'):
+            patcher = mock.patch(target, self.registry)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def endpoints(self):
+        return {endpoint['view']: endpoint for endpoint in self.registry.snapshot()['endpoints']}
+
+    def test_requests_are_recorded_per_view(self):
+        self.client.get('/login/')
+        self.client.get('/login/')
+        self.client.get('/no-such-page/')
+
+        endpoints = self.endpoints()
+        self.assertEqual(endpoints['baseapp:login']['requests'], 2)
+        self.assertGreater(endpoints['baseapp:login']['mean_bytes'], 0)
+        self.assertEqual(endpoints[request_metrics.UNRESOLVED]['requests'], 1)
+
+    def test_no_server_timing_header_by_default(self):
+        self.assertNotIn('Server-Timing', self.client.get('/login/'))
+
+    @override_settings(SERVER_TIMING_HEADER=True)
+    def test_server_timing_header(self):
+        self.client.force_login(self.admin)
+        header = self.client.get('/api/businesses/list/')['Server-Timing']
+        self.assertRegex(header, r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="[1-9]\d* queries", cache;desc=')
+
+    async def test_queries_of_async_views_are_counted(self):
+        await self.async_client.aforce_login(self.admin)
+        await self.async_client.get('/api/businesses/list/')
+        self.assertGreater(self.endpoints()['baseapp:list-businesses']['queries_max'], 0)
+
+    def test_endpoint_is_admin_only(self):
+        self.client.force_login(make_hr(self.business))
+        self.assertEqual(self.client.get('/api/request-metrics/').status_code, 302)
+
+        self.client.force_login(self.admin)
+        self.client.get('/login/')
+        data = self.client.get('/api/request-metrics/').json()
+        self.assertEqual(data['period_seconds'], 900)
+        self.assertIn('baseapp:login', [endpoint['view'] for endpoint in data['endpoints']])
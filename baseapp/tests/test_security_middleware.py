@@ -0,0 +1,90 @@
+from io import StringIO
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from baseapp.middleware import SecurityMiddleware
+from .helpers import IsolatedHostCachesMixin
+
+BROWSER = 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36'
+
+
+class PathClassifierTests(SimpleTestCase):
+
+    def setUp(self):
+        self.middleware = SecurityMiddleware(lambda request: HttpResponse())
+
+    def test_paths(self):
+        cases = {
+            '/': 'allow',
+            '/login/': 'allow',
+            '/static/js/main.js': 'allow',
+            '/api/businesses/12/upload-logo/': 'allow',
+            # Whitelisted prefixes win over suspicious patterns
+            '/static/vendor/lib.php': 'allow',
+            '/wp-login.php': 'block',
+            '/WP-LOGIN.PHP': 'block',
+            '/.env': 'block',
+            '/vendor/phpunit/eval-stdin': 'block',
+            '/.git/config': 'block',
+            '/shell': 'block',
+            '/favicon.ico': None,
+            '/robots.txt': None,
+            '/api/changes/': None,
+            '/environment/': None,
+        }
+        self.assertEqual({path: self.middleware._classify_path(path) for path in cases}, cases)
+
+    def test_user_agents(self):
+        self.assertFalse(self.middleware._is_suspicious_agent(BROWSER))
+        self.assertFalse(self.middleware._is_suspicious_agent(''))
+        self.assertTrue(self.middleware._is_suspicious_agent('Go-http-client/1.1'))
+        self.assertTrue(self.middleware._is_suspicious_agent('Mozilla/5.0 zgrab/0.x'))
+        self.assertTrue(self.middleware._is_suspicious_agent('SQLMAP/1.7'))
+
+    @override_settings(SECURITY_CLASSIFIER_CACHE_SIZE=2)
+    def test_classifications_are_remembered_in_a_bounded_cache(self):
+        middleware = SecurityMiddleware(lambda request: HttpResponse())
+        for path in ['/a', '/a', '/b', '/c', '/a']:
+            middleware._classify_path(path)
+        info = middleware._classify_path.cache_info()
+        self.assertEqual((info.hits, info.misses, info.currsize, info.maxsize), (1, 4, 2, 2))
+
+    def test_benchmark_command(self):
+        output = StringIO()
+        with self.assertNoLogs('baseapp.middleware', 'WARNING'):
+            call_command('bench_security_middleware', requests=200, stdout=output)
+        self.assertIn('compiled + LRU', output.getvalue())
+
+
+class SecurityMiddlewareResponseTests(IsolatedHostCachesMixin, SimpleTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.factory = RequestFactory()
+        self.middleware = SecurityMiddleware(lambda request: HttpResponse('ok'))
+
+    def get(self, path, user_agent=BROWSER, middleware=None):
+        return (middleware or self.middleware)(self.factory.get(path, HTTP_USER_AGENT=user_agent))
+
+    def test_whitelisted_paths_pass_whatever_the_agent(self):
+        self.assertEqual(self.get('/dashboard/').status_code, 200)
+        self.assertEqual(self.get('/dashboard/', user_agent='Go-http-client/1.1').status_code, 200)
+
+    def test_neutral_paths_pass_for_browsers(self):
+        self.assertEqual(self.get('/favicon.ico').status_code, 200)
+        with self.assertLogs('baseapp.middleware', 'WARNING'):
+            self.assertEqual(self.get('/favicon.ico', user_agent='Nikto/2.5').status_code, 403)
+
+    def test_suspicious_paths_are_forbidden(self):
+        with self.assertLogs('baseapp.middleware', 'WARNING') as logs:
+            self.assertEqual(self.get('/wp-admin/setup.php').status_code, 403)
+        self.assertIn('/wp-admin/setup.php', logs.output[0])
+
+    async def test_async_stack(self):
+        async def get_response(request):
+            return HttpResponse('ok')
+
+        middleware = SecurityMiddleware(get_response)
+        self.assertEqual((await self.get('/', middleware=middleware)).status_code, 200)
+        with self.assertLogs('baseapp.middleware', 'WARNING'):
+            self.assertEqual((await self.get('/.env', middleware=middleware)).status_code, 403)
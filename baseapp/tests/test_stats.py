@@ -0,0 +1,117 @@
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.utils import timezone
+from baseapp.models import Assessment, BenchmarkBatch, BenchmarkBatchStats, BusinessStats
+from baseapp.stats import get_business_stats
+from .helpers import make_assessment, make_business, make_hr
+
+COUNTERS = (
+    'hr_users_count', 'assessments_count', 'completed_count',
+    'accessed_count', 'benchmark_total', 'benchmark_completed',
+)
+
+
+class StatsCounterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = make_business()
+        cls.other = make_business('Other')
+        cls.hr = make_hr(cls.business)
+
+    def counters(self, business=None):
+        stats = BusinessStats.objects.get(business=business or self.business)
+        return {field: getattr(stats, field) for field in COUNTERS}
+
+    def test_assessment_lifecycle(self):
+        assessment = make_assessment(self.business, self.hr)
+        make_assessment(self.business, self.hr, 1, assessment_type='benchmark')
+        self.assertEqual(self.counters(), {
+            'hr_users_count': 1, 'assessments_count': 2, 'completed_count': 0,
+            'accessed_count': 0, 'benchmark_total': 1, 'benchmark_completed': 0,
+        })
+
+        assessment.first_accessed_at = timezone.now()
+        assessment.save()
+        assessment.completed = True
+        assessment.save()
+        self.assertEqual(self.counters()['accessed_count'], 1)
+        self.assertEqual(self.counters()['completed_count'], 1)
+
+        assessment.delete()
+        self.assertEqual(self.counters()['assessments_count'], 1)
+        self.assertEqual(self.counters()['completed_count'], 0)
+
+    def test_moving_an_assessment_between_businesses(self):
+        assessment = make_assessment(self.business, self.hr, completed=True)
+        get_business_stats(self.other)
+
+        assessment.business = self.other
+        assessment.save()
+        self.assertEqual(self.counters()['assessments_count'], 0)
+        self.assertEqual(self.counters(self.other)['assessments_count'], 1)
+        self.assertEqual(self.counters(self.other)['completed_count'], 1)
+
+    def test_saving_a_deferred_instance(self):
+        make_assessment(self.business, self.hr)
+        assessment = Assessment.objects.only('id', 'completed').get()
+        assessment.completed = True
+        assessment.save()
+        self.assertEqual(self.counters()['completed_count'], 1)
+
+    def test_hr_users(self):
+        user = make_hr(self.business, 'second-hr')
+        self.assertEqual(self.counters()['hr_users_count'], 2)
+        user.is_hr = False
+        user.save()
+        self.assertEqual(self.counters()['hr_users_count'], 1)
+
+    def test_unrelated_saves_leave_counters_alone(self):
+        assessment = make_assessment(self.business, self.hr)
+        before = BusinessStats.objects.get(business=self.business).updated_at
+        assessment.candidate_name = 'Renamed'
+        assessment.save(update_fields=['candidate_name'])
+        self.assertEqual(BusinessStats.objects.get(business=self.business).updated_at, before)
+
+    def test_benchmark_batch_counters(self):
+        batch = BenchmarkBatch.objects.create(
+            business=self.business, name='Q1', created_by=self.hr, data_file='benchmark_data/q1.csv'
+        )
+        first = make_assessment(self.business, self.hr, 1, assessment_type='benchmark', benchmark_batch=batch)
+        make_assessment(self.business, self.hr, 2, assessment_type='benchmark', benchmark_batch=batch)
+        first.completed = True
+        first.save()
+
+        stats = BenchmarkBatchStats.objects.get(batch=batch)
+        self.assertEqual((stats.total, stats.completed), (2, 1))
+        self.assertEqual(stats.completion_rate, 50.0)
+
+
+class ReconcileStatsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = make_business()
+        cls.hr = make_hr(cls.business)
+        for number in range(3):
+            make_assessment(cls.business, cls.hr, number)
+
+    def test_repairs_drift_from_queryset_updates(self):
+        # update() bypasses the signals
+        Assessment.objects.filter(business=self.business).update(completed=True)
+        self.assertEqual(BusinessStats.objects.get(business=self.business).completed_count, 0)
+
+        output = StringIO()
+        call_command('reconcile_stats', business=self.business.slug, stdout=output)
+        self.assertIn('corrected', output.getvalue())
+        self.assertEqual(BusinessStats.objects.get(business=self.business).completed_count, 3)
+
+        output = StringIO()
+        call_command('reconcile_stats', stdout=output)
+        self.assertIn('(ok)', output.getvalue())
+
+    def test_unknown_business(self):
+        with self.assertRaises(CommandError):
+            call_command('reconcile_stats', business='missing', stdout=StringIO())
@@ -0,0 +1,81 @@
+import threading
+from unittest import mock
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from baseapp.middleware import SecurityMiddleware
+from .helpers import IsolatedHostCachesMixin
+
+BROWSER = 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36'
+
+
+@override_settings(SECURITY_BLOCK_THRESHOLD=5, SECURITY_TRACKING_WINDOW=3600)
+class SuspiciousIPTrackerTests(IsolatedHostCachesMixin, SimpleTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.factory = RequestFactory()
+        self.middleware = SecurityMiddleware(lambda request: HttpResponse('ok'))
+        self.now = 6000.0
+        patcher = mock.patch('baseapp.cache_backends.time.time', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, path, ip='203.0.113.7', middleware=None, **extra):
+        request = self.factory.get(path, REMOTE_ADDR=ip, HTTP_USER_AGENT=BROWSER, **extra)
+        return (middleware or self.middleware)(request)
+
+    def probe(self, times, **kwargs):
+        with self.assertLogs('baseapp.middleware', 'WARNING'):
+            for _ in range(times):
+                self.assertEqual(self.get('/wp-login.php', **kwargs).status_code, 403)
+
+    def test_ip_is_blocked_at_the_threshold(self):
+        self.probe(4)
+        self.assertEqual(self.get('/favicon.ico').status_code, 200)
+
+        self.probe(1)
+        with self.assertLogs('baseapp.middleware', 'WARNING') as logs:
+            self.assertEqual(self.get('/favicon.ico').status_code, 403)
+        self.assertIn('Blocking all requests from 203.0.113.7', logs.output[0])
+
+        # Other clients and the application's own pages are unaffected
+        self.assertEqual(self.get('/favicon.ico', ip='203.0.113.8').status_code, 200)
+        self.assertEqual(self.get('/login/').status_code, 200)
+
+    def test_block_is_seen_by_other_workers(self):
+        # Caches are per thread, so this worker reads the shared file through its own cache object
+        worker = threading.Thread(target=self.probe, args=(5,), kwargs={'middleware': SecurityMiddleware(
+            lambda request: HttpResponse('ok')
+        )})
+        worker.start()
+        worker.join()
+
+        with self.assertLogs('baseapp.middleware', 'WARNING'):
+            self.assertEqual(self.get('/favicon.ico').status_code, 403)
+
+    def test_forwarded_for_cannot_be_spoofed_to_dodge_a_block(self):
+        for n in range(5):
+            self.probe(1, ip='10.0.0.1', HTTP_X_FORWARDED_FOR=f'198.51.100.{n}, 203.0.113.7')
+        with self.assertLogs('baseapp.middleware', 'WARNING'):
+            response = self.get('/favicon.ico', ip='10.0.0.1', HTTP_X_FORWARDED_FOR='198.51.100.99, 203.0.113.7')
+        self.assertEqual(response.status_code, 403)
+
+    def test_ip_is_forgotten_a_window_after_its_first_probe(self):
+        self.probe(4)
+        self.now += 3000
+        self.probe(1)
+        with self.assertLogs('baseapp.middleware', 'WARNING'):
+            self.assertEqual(self.get('/favicon.ico').status_code, 403)
+
+        # Later probes do not extend the window
+        self.now += 1000
+        self.assertEqual(self.get('/favicon.ico').status_code, 200)
+
+    def test_memory_stays_bounded_under_a_flood(self):
+        with self.assertLogs('baseapp.middleware', 'WARNING'):
+            for n in range(12000):
+                self.get('/.env', ip=f'10.{n // 65536}.{n // 256 % 256}.{n % 256}')
+        stats = caches['ip_reputation'].stats()
+        self.assertLessEqual(stats['entries'], 10000)
+        self.assertGreater(stats['evictions'], 0)
@@ -0,0 +1,122 @@
+import itertools
+from unittest import mock
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+from baseapp.cache_backends import TieredCache
+
+L2_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tiered-tests-default'},
+    'l2': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tiered-tests-l2'},
+}
+
+# Distinct L1 stores stand in for separate worker processes
+_workers = itertools.count()
+
+
+def tiered(**options):
+    return TieredCache(f'tiered-tests-{next(_workers)}', {'OPTIONS': {'L2': 'l2', **options}})
+
+
+@override_settings(CACHES=L2_CACHES)
+class TieredCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        caches['l2'].clear()
+        self.clock = 1000.0
+        patcher = mock.patch('baseapp.cache_backends.time.monotonic', side_effect=lambda: self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reads_are_served_from_l1(self):
+        cache = tiered()
+        cache.set('key', {'value': 1})
+        with mock.patch.object(caches['l2'], 'get_many', wraps=caches['l2'].get_many) as l2_reads:
+            self.assertEqual(cache.get('key'), {'value': 1})
+            self.assertEqual(cache.get_many(['key']), {'key': {'value': 1}})
+        l2_reads.assert_not_called()
+        self.assertEqual(cache.stats()['l1_hits'], 2)
+
+    def test_l1_returns_copies(self):
+        cache = tiered()
+        cache.set('key', ['a'])
+        cache.get('key').append('b')
+        self.assertEqual(cache.get('key'), ['a'])
+
+    def test_another_workers_write_is_seen_after_l1_timeout(self):
+        worker_a, worker_b = tiered(L1_TIMEOUT=2), tiered(L1_TIMEOUT=2)
+        worker_a.set('key', 'old')
+        self.assertEqual(worker_b.get('key'), 'old')
+
+        worker_a.set('key', 'new')
+        self.assertEqual(worker_b.get('key'), 'old')
+        self.clock += 3
+        self.assertEqual(worker_b.get('key'), 'new')
+
+    def test_unchanged_entries_are_revalidated_by_stamp(self):
+        worker_a, worker_b = tiered(L1_TIMEOUT=2), tiered(L1_TIMEOUT=2)
+        worker_a.set('key', 'value')
+        worker_b.get('key')
+        self.clock += 3
+
+        with mock.patch.object(caches['l2'], 'get_many', wraps=caches['l2'].get_many) as l2_value_reads:
+            self.assertEqual(worker_b.get('key'), 'value')
+        l2_value_reads.assert_not_called()
+        self.assertEqual(worker_b.stats()['l1_revalidations'], 1)
+
+    def test_deletes_and_increments_invalidate_other_workers(self):
+        worker_a, worker_b = tiered(L1_TIMEOUT=2), tiered(L1_TIMEOUT=2)
+        worker_a.set('deleted', 'value')
+        worker_a.set('counter', 1)
+        worker_b.get('deleted')
+        worker_b.get('counter')
+
+        worker_a.delete('deleted')
+        self.assertEqual(worker_a.incr('counter', 5), 6)
+        self.assertIsNone(worker_a.get('deleted'))
+        self.assertEqual(worker_a.get('counter'), 6)
+
+        self.clock += 3
+        self.assertIsNone(worker_b.get('deleted'))
+        self.assertEqual(worker_b.get('counter'), 6)
+
+    def test_expiry(self):
+        cache = tiered(L1_TIMEOUT=60)
+        cache.set('key', 'value', timeout=10)
+        self.clock += 11
+        caches['l2'].delete('key')
+        self.assertIsNone(cache.get('key'))
+
+    def test_l2_only_prefixes_bypass_l1(self):
+        worker_a, worker_b = tiered(L2_ONLY_PREFIXES=('lock_',)), tiered(L2_ONLY_PREFIXES=('lock_',))
+        self.assertTrue(worker_a.add('lock_job', 'a'))
+        self.assertFalse(worker_b.add('lock_job', 'b'))
+        worker_a.set('lock_job', 'released')
+        self.assertEqual(worker_b.get('lock_job'), 'released')
+        self.assertFalse(caches['l2'].has_key('lock_job__stamp'))
+        self.assertEqual(worker_b.stats()['l1_entries'], 0)
+
+    def test_large_values_stay_in_l2(self):
+        cache = tiered(L1_MAX_VALUE_BYTES=100)
+        cache.set('small', 'x')
+        cache.set('large', 'x' * 1000)
+        self.assertEqual(cache.stats()['l1_entries'], 1)
+        self.assertEqual(cache.get('large'), 'x' * 1000)
+
+    def test_l1_is_bounded(self):
+        cache = tiered(L1_MAX_ENTRIES=2)
+        cache.set_many({'a': 1, 'b': 2, 'c': 3})
+        stats = cache.stats()
+        self.assertEqual((stats['l1_entries'], stats['l1_evictions']), (2, 1))
+        self.assertEqual(cache.get_many(['a', 'b', 'c']), {'a': 1, 'b': 2, 'c': 3})
+
+    def test_values_written_straight_to_l2_are_not_kept_in_l1(self):
+        cache = tiered()
+        caches['l2'].set('key', 'unstamped')
+        self.assertEqual(cache.get('key'), 'unstamped')
+        self.assertEqual(cache.stats()['l1_entries'], 0)
+
+    def test_clear(self):
+        cache = tiered()
+        cache.set('key', 'value')
+        cache.clear()
+        self.assertIsNone(cache.get('key'))
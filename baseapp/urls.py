@@ -7,6 +7,8 @@ app_name = 'baseapp'
 urlpatterns = [
     #util urls
     path('api/benchmark/refresh/<int:business_id>/', views.refresh_benchmark_cache, name='refresh_benchmark_cache'),
+    path('api/cache-stats/', views.cache_stats, name='cache-stats'),
+    path('api/request-metrics/', views.request_metrics, name='request-metrics'),
 
     #base views
     path('', views.home, name='home'),
@@ -25,6 +27,7 @@ urlpatterns = [
     path('api/businesses/', views.business_list_create, name='business-list-create'),
     path('api/businesses/list/', views.list_businesses, name='list-businesses'),
     path('api/businesses/<int:business_id>/details/', views.business_details, name='business-details'),
+    path('api/businesses/<int:business_id>/changes/', views.business_changes, name='business-changes'),
     path('api/businesses/<int:pk>/', views.business_detail, name='business-detail'),
     path('api/businesses/<int:business_id>/upload-logo/', views.upload_business_logo, name='upload-business-logo'),
 
@@ -47,12 +50,19 @@ urlpatterns = [
     path('api/businesses/<int:business_id>/benchmark-email-template/', views.benchmark_email_template, name='benchmark-email-template'),
     path('api/businesses/<int:business_id>/delete-benchmark-email/', views.delete_benchmark_email, name='delete-benchmark-email'),
     path('api/businesses/<int:business_id>/update-benchmark-email/', views.update_benchmark_email, name='update-benchmark-email'),
+    path('api/businesses/<int:business_id>/bulk-delete-benchmark-emails/', views.bulk_delete_benchmark_emails, name='bulk-delete-benchmark-emails'),
+    path('api/businesses/<int:business_id>/bulk-update-benchmark-region/', views.bulk_update_benchmark_region, name='bulk-update-benchmark-region'),
     path('api/businesses/<int:business_id>/send-benchmark-email/',views.send_benchmark_email,name='send-benchmark-email'),
+    path('api/businesses/<int:business_id>/send-benchmark-emails/', views.send_benchmark_emails_bulk, name='send-benchmark-emails'),
+    path('api/businesses/<int:business_id>/outbox-status/', views.outbox_status, name='outbox-status'),
     path('api/businesses/<int:business_id>/benchmark-results/',views.benchmark_results,name='benchmark-results'),
+    path('manage/benchmark-batches/create/', views.create_benchmark_batch, name='create_benchmark_batch'),
+    path('api/benchmark-batches/<int:batch_id>/status/', views.benchmark_batch_status, name='benchmark-batch-status'),
 
     #--admin assessment
     path('api/businesses/<int:business_id>/assessments/', views.business_assessments, name='business-assessments'),
     path('api/businesses/<int:business_id>/create-assessment/', views.admin_create_assessment, name='admin-create-assessment'),
+    path('api/businesses/<int:business_id>/bulk-invite/', views.admin_bulk_invite, name='admin-bulk-invite'),
     path('api/admin/assessments/<int:assessment_id>/preview/', views.admin_preview_assessment, name='admin-preview-assessment'),
     path('api/admin/assessments/<int:assessment_id>/download/', views.admin_download_assessment, name='admin-download-assessment'),
     path('api/admin/assessments/<int:assessment_id>/resend/', views.admin_resend_assessment, name='admin-resend-assessment'),
@@ -70,7 +80,9 @@ urlpatterns = [
 
     #hr
     path('dashboard/', views.dashboard, name='dashboard'),
+    path('dashboard/assessments/', views.dashboard_assessments, name='dashboard_assessments'),
     path('create/', views.create_assessment, name='create_assessment'),
+    path('create/bulk/', views.bulk_invite, name='bulk_invite'),
     path('assessment/<int:assessment_id>/resend/', views.resend_assessment, name='resend_assessment'),
     path('assessment/preview/<int:assessment_id>/', views.preview_assessment_report, name='preview_assessment_report'),
     path('assessment/download/<int:assessment_id>/', views.download_assessment_report, name='download_assessment_report'),
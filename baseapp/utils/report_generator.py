@@ -1,15 +1,12 @@
 from django.template.loader import render_to_string
-from weasyprint import HTML, CSS
 import os
 from django.conf import settings
-from datetime import datetime
 import logging
 from ..models import Attribute, AssessmentResponse
-from pathlib import Path
+from ..cached_results import get_or_compute
+from ..pdf_renderer import render_pdf
 import sys
 import base64
-import requests
-from io import BytesIO
 from django.core.cache import cache
 import tempfile
 
@@ -20,15 +17,17 @@ def get_benchmark_scores_for_business(business):
     Get all benchmark scores for a business in one efficient query
     Returns a dictionary of attribute_id -> score
     """
-    # Create a cache key for benchmark scores
-    cache_key = f'benchmark_scores_{business.id}'
-    
-    # Check if we have cached benchmark scores
-    cached_scores = cache.get(cache_key)
-    if cached_scores is not None:
-        logger.info(f"Using cached benchmark scores for business {business.id}")
-        return cached_scores
-    
+    # Computed by one worker at a time; concurrent reports use the previous scores meanwhile
+    return get_or_compute(
+        f'benchmark_scores_{business.id}',
+        lambda: calculate_benchmark_scores(business),
+        # Cache empty results for a shorter time (1 hour), others for
+        # 24 hours (or use BENCHMARK_CACHE_TIMEOUT setting)
+        lambda scores: getattr(settings, 'BENCHMARK_CACHE_TIMEOUT', 86400) if scores else 3600
+    )
+
+
+def calculate_benchmark_scores(business):
     logger.info(f"Calculating benchmark scores for business {business.id}")
     
     # Get all assessment responses and related data in one query
@@ -41,8 +40,6 @@ def get_benchmark_scores_for_business(business):
     # If no benchmark responses, return empty dictionary
     if not benchmark_responses.exists():
         logger.info(f"No benchmark responses found for business {business.id}")
-        # Cache empty results for a shorter time (1 hour)
-        cache.set(cache_key, {}, 3600)
         return {}
     
     # Get all attributes for this business
@@ -65,10 +62,6 @@ def get_benchmark_scores_for_business(business):
         if responses > 0:
             benchmark_scores[attribute.id] = total_score / responses
     
-    # Cache the scores for 24 hours (or use BENCHMARK_CACHE_TIMEOUT setting)
-    timeout = getattr(settings, 'BENCHMARK_CACHE_TIMEOUT', 86400)
-    cache.set(cache_key, benchmark_scores, timeout)
-    
     return benchmark_scores
 
 
@@ -85,66 +78,62 @@ def get_logo_base64(logo_field):
         # Get the URL - this works for both Cloudinary and local files
         url = logo_field.url
         
-        # Create a cache key based on the URL instead of name
-        # This works for both Cloudinary and local files
-        cache_key = f'logo_base64_{url}'
-        
-        # Check if we have a cached version
-        cached_logo = cache.get(cache_key)
-        if cached_logo is not None:
-            return cached_logo
-        
-        # For Cloudinary URLs, fetch the image content
-        if url.startswith('http'):
-            response = requests.get(url, timeout=10)
-            if response.status_code == 200:
-                image_content = response.content
-                # Determine content type from the URL or response headers
-                content_type = response.headers.get('Content-Type', 'image/png')
-            else:
-                print(f"Failed to fetch logo from URL: {url}, status: {response.status_code}")
-                return None
-        else:
-            # For local files, read the file content
-            try:
-                # If it's a relative URL, convert to absolute path
-                if url.startswith('/media/'):
-                    file_path = os.path.join(settings.MEDIA_ROOT, url.replace('/media/', ''))
-                else:
-                    file_path = os.path.join(settings.BASE_DIR, url.lstrip('/'))
-                
-                # Read the file
-                with open(file_path, 'rb') as f:
-                    image_content = f.read()
-                
-                # Determine content type from file extension
-                ext = os.path.splitext(file_path)[1].lower()
-                content_types = {
-                    '.png': 'image/png',
-                    '.jpg': 'image/jpeg',
-                    '.jpeg': 'image/jpeg',
-                    '.gif': 'image/gif',
-                    '.svg': 'image/svg+xml'
-                }
-                content_type = content_types.get(ext, 'image/png')
-            except Exception as e:
-                print(f"Error reading logo file: {str(e)}")
-                return None
-        
-        # Encode the image content as base64
-        encoded = base64.b64encode(image_content).decode('utf-8')
-        data_url = f"data:{content_type};base64,{encoded}"
-        
-        # Cache the data URL for 24 hours (logos rarely change)
-        cache.set(cache_key, data_url, 86400)
-        
-        return data_url
+        # Cache the data URL for 24 hours (logos rarely change), keyed by
+        # URL so it works for both Cloudinary and local files. Only one
+        # worker fetches a logo; failures are not cached.
+        return get_or_compute(f'logo_base64_{url}', lambda: fetch_logo_data_url(url), 86400)
         
     except Exception as e:
         logger.error(f"Error processing logo: {str(e)}")
         return None
 
 
+def fetch_logo_data_url(url):
+    """Fetch a logo and return it as a data URL, or None when it cannot be read"""
+    # For Cloudinary URLs, fetch the image content
+    if url.startswith('http'):
+        import requests
+
+        response = requests.get(url, timeout=10)
+        if response.status_code == 200:
+            image_content = response.content
+            # Determine content type from the URL or response headers
+            content_type = response.headers.get('Content-Type', 'image/png')
+        else:
+            print(f"Failed to fetch logo from URL: {url}, status: {response.status_code}")
+            return None
+    else:
+        # For local files, read the file content
+        try:
+            # If it's a relative URL, convert to absolute path
+            if url.startswith('/media/'):
+                file_path = os.path.join(settings.MEDIA_ROOT, url.replace('/media/', ''))
+            else:
+                file_path = os.path.join(settings.BASE_DIR, url.lstrip('/'))
+            
+            # Read the file
+            with open(file_path, 'rb') as f:
+                image_content = f.read()
+            
+            # Determine content type from file extension
+            ext = os.path.splitext(file_path)[1].lower()
+            content_types = {
+                '.png': 'image/png',
+                '.jpg': 'image/jpeg',
+                '.jpeg': 'image/jpeg',
+                '.gif': 'image/gif',
+                '.svg': 'image/svg+xml'
+            }
+            content_type = content_types.get(ext, 'image/png')
+        except Exception as e:
+            print(f"Error reading logo file: {str(e)}")
+            return None
+    
+    # Encode the image content as base64
+    encoded = base64.b64encode(image_content).decode('utf-8')
+    return f"data:{content_type};base64,{encoded}"
+
+
 def generate_assessment_report(assessment_response, force_refresh=False):
     """
     Generate assessment report using HTML template and WeasyPrint.
@@ -283,45 +272,25 @@ def generate_assessment_report(assessment_response, force_refresh=False):
         with open(css_path, 'r', encoding='utf-8') as css_file:
             css_string = css_file.read()
         
-        # Create temporary HTML file
-        with tempfile.NamedTemporaryFile(suffix='.html', delete=False, mode='w', encoding='utf-8') as tmp_html:
-            # Render template
-            html_string = render_to_string('baseapp/assessment_report.html', context)
-            tmp_html.write(html_string)
-            tmp_html_path = tmp_html.name
+        html_string = render_to_string('baseapp/assessment_report.html', context)
         
-        try:
-            # Generate PDF
-            html = HTML(filename=tmp_html_path)
-            css = CSS(string=css_string)
-            
-            # Create temp file for PDF to avoid permission issues on Heroku
-            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_pdf:
-                temp_pdf_path = temp_pdf.name
-            
-            # Write to temp file first
-            html.write_pdf(
-                temp_pdf_path,
-                stylesheets=[css]
-            )
-            
-            # Copy to final destination
-            import shutil
-            shutil.copy2(temp_pdf_path, pdf_path)
-            
-            # Remove temp PDF file
-            if os.path.exists(temp_pdf_path):
-                os.unlink(temp_pdf_path)
-            
-            # Clear the generating flag
-            cache.delete(f"{cache_key}_generating")
-            
-            return pdf_path
-            
-        finally:
-            # Clean up temporary HTML file
-            if os.path.exists(tmp_html_path):
-                os.unlink(tmp_html_path)
+        # Rendered in a separate, memory- and time-limited process; relative
+        # URLs resolve against the temp directory as they always have
+        pdf_bytes = render_pdf(html_string, css_string, base_url=tempfile.gettempdir() + os.sep)
+        
+        # Write next to the destination and rename, so processes waiting
+        # for the file never see a partial PDF
+        with tempfile.NamedTemporaryFile(
+            suffix='.pdf', dir=os.path.dirname(pdf_path), delete=False
+        ) as temp_pdf:
+            temp_pdf.write(pdf_bytes)
+            temp_pdf_path = temp_pdf.name
+        os.replace(temp_pdf_path, pdf_path)
+        
+        # Clear the generating flag
+        cache.delete(f"{cache_key}_generating")
+        
+        return pdf_path
         
     except Exception as e:
         # Clear the generating flag on error
@@ -1,37 +1,63 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from django.core.mail import EmailMessage, send_mail, send_mass_mail, EmailMultiAlternatives
-from django.core.cache import cache
+from django.core.cache import caches
 from django.conf import settings
 from django.contrib import messages
 from django.utils.crypto import get_random_string
 from django.urls import reverse
 from django.utils import timezone
 from django.http import FileResponse, Http404, JsonResponse
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import require_http_methods, condition
+from django.views.decorators.cache import cache_control
 from django.views.decorators.clickjacking import xframe_options_exempt
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from django.db.models import Count, Max, Q
+from django.db.models.functions import Lower
+from django.db import transaction
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
 from datetime import datetime
-import pandas as pd
 import json
-import csv
-from .models import Assessment, AssessmentResponse, QuestionPair, QuestionResponse, Attribute, Business, BenchmarkBatch, CustomUser, Manager, EmailTemplate, TrainingMaterial
+import secrets
+from .models import Assessment, AssessmentResponse, QuestionPair, QuestionResponse, Attribute, Business, BenchmarkBatch, CustomUser, Manager, EmailTemplate, TrainingMaterial, OutboxMessage
 from .forms import AssessmentCreationForm, AssessmentResponseForm, BenchmarkBatchForm, PasswordResetForm, SetNewPasswordForm
 from .utils.report_generator import generate_assessment_report
 from django.template.loader import render_to_string
-from weasyprint import HTML, CSS
 import os
-from io import StringIO
 from .rate_limiting import rate_limit
+from .pagination import keyset_page, akeyset_page, parse_limit
+from .data_versions import data_etag
+from .change_feed import get_changes, latest_cursor, COLLECTION_SERIALIZERS
+from .stats import get_business_stats, recompute_batch_stats
+from .bulk_tracking import suspend_row_tracking, refresh_after_bulk_write
+from .outbox import enqueue_email
+from .email_templates import get_email_renderer, assessment_email_context
+from .bulk_invite import read_roster, validate_roster, invite_candidates, RosterError
+from .manager_directory import get_manager_directory
+from .question_import import read_template_rows, plan_question_import, apply_question_import, TemplateImportError
+from .cached_results import get_or_compute, mark_stale
+from .request_metrics import registry as metrics_registry
+from asgiref.sync import sync_to_async
 import logging
 
 logger = logging.getLogger(__name__)
 
+# For async views: templates may use request.user and its relations, which
+# query the database, so they render in the request's thread
+arender = sync_to_async(render)
+
 
 #link generation
+def assessment_link_builder(request):
+    """Return a function mapping a unique_link to its absolute take-assessment URL"""
+    link_template = request.build_absolute_uri(
+        reverse('baseapp:take_assessment', args=['__link__'])
+    )
+    return lambda unique_link: link_template.replace('__link__', unique_link)
+
 def generate_secure_token(entity_id=None, token_type='general', length=16):
     """
     Generate a secure token of specified length.
@@ -68,6 +94,59 @@ def generate_secure_token(entity_id=None, token_type='general', length=16):
     # Return a token of the specified length
     return f"{random_part}{encoded_id}"[:length]
 
+#assessment list helpers
+ASSESSMENT_STATUS_COUNTS = {
+    'total': Count('id'),
+    'completed_count': Count('id', filter=Q(completed=True)),
+    'in_progress_count': Count('id', filter=Q(completed=False, first_accessed_at__isnull=False)),
+    'not_started_count': Count('id', filter=Q(completed=False, first_accessed_at__isnull=True)),
+}
+
+def filter_assessments(assessments, params):
+    """
+    Apply list filters from request query parameters to an assessment queryset.
+    Unknown or empty parameters are ignored.
+    """
+    status = params.get('status', 'all')
+    if status == 'completed':
+        assessments = assessments.filter(completed=True)
+    elif status == 'pending':
+        assessments = assessments.filter(completed=False)
+    elif status == 'in_progress':
+        assessments = assessments.filter(completed=False, first_accessed_at__isnull=False)
+    elif status == 'not_started':
+        assessments = assessments.filter(completed=False, first_accessed_at__isnull=True)
+
+    assessment_type = params.get('type')
+    if assessment_type in ('standard', 'benchmark'):
+        assessments = assessments.filter(assessment_type=assessment_type)
+
+    if params.get('region'):
+        assessments = assessments.filter(region=params['region'])
+    if params.get('position'):
+        assessments = assessments.filter(position=params['position'])
+
+    # Date range on creation date, both ends inclusive
+    try:
+        if params.get('date_from'):
+            assessments = assessments.filter(
+                created_at__date__gte=datetime.strptime(params['date_from'], '%Y-%m-%d').date()
+            )
+        if params.get('date_to'):
+            assessments = assessments.filter(
+                created_at__date__lte=datetime.strptime(params['date_to'], '%Y-%m-%d').date()
+            )
+    except ValueError:
+        pass
+
+    search = params.get('q', '').strip()
+    if search:
+        assessments = assessments.filter(
+            Q(candidate_name__icontains=search) | Q(candidate_email__icontains=search)
+        )
+
+    return assessments
+
 #util views
 def is_admin(user):
     """Check if user is an admin"""
@@ -173,11 +252,10 @@ def password_reset_view(request):
                 reverse('baseapp:password_reset_confirm', args=[reset_token])
             )
             
-            try:
-                # Send reset email
-                send_mail(
-                    subject='Password Reset Request',
-                    message=f'''You requested a password reset.
+            # Queue reset email (sent by the outbox dispatcher)
+            enqueue_email(
+                subject='Password Reset Request',
+                body=f'''You requested a password reset.
 
 Click the following link to reset your password:
 {reset_url}
@@ -185,20 +263,14 @@ Click the following link to reset your password:
 This link will expire in 24 hours.
 
 If you did not request this reset, please ignore this email.''',
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[email],
-                    fail_silently=False,
-                )
-                messages.success(
-                    request,
-                    'Password reset instructions have been sent to your email.'
-                )
-            except Exception as e:
-                print(f"Email error: {e}")  # For debugging
-                messages.error(
-                    request,
-                    'There was an error sending the reset email. Please try again.'
-                )
+                to=[email],
+                business=user.business,
+                category='password_reset'
+            )
+            messages.success(
+                request,
+                'Password reset instructions have been sent to your email.'
+            )
             return redirect('baseapp:login')
     else:
         form = PasswordResetForm()
@@ -250,218 +322,170 @@ def password_reset_confirm(request, token):
     
     return render(request, 'baseapp/password_reset_confirm.html', {'form': form})
 
-def take_assessment(request, unique_link):
+def queue_assessment_report(assessment):
+    """Queue the completed-assessment report email for the assessment's managers"""
+    # Associated active managers, falling back to the specified manager email
+    directory = get_manager_directory(assessment.business_id)
+    recipient_emails = directory.emails(
+        Assessment.managers.through.objects.filter(assessment=assessment).values_list('manager_id', flat=True)
+    )
+    if not recipient_emails:
+        recipient_emails = [assessment.manager_email]
+        logger.info(f"No managers associated, using fallback email: {assessment.manager_email}")
+
+    subject = f'Assessment Report - {assessment.candidate_name} - {assessment.position}'
+    message = f'''Dear Manager,
+
+The assessment for {assessment.candidate_name} for the position of {assessment.position} has been completed.
+
+Please find the assessment report attached to this email. 
+
+Assessment Details:
+- Candidate: {assessment.candidate_name}
+- Position: {assessment.position}
+- Region: {assessment.region}
+- Completion Date: {timezone.now().strftime("%Y-%m-%d %H:%M")}
+
+This is an automated message. Please do not reply to this email.
+
+Best regards,
+{assessment.manager_name}'''
+
+    logger.info(f"Queueing report for assessment ID: {assessment.id} to {len(recipient_emails)} recipients: {', '.join(recipient_emails)}")
+    enqueue_email(
+        subject=subject,
+        body=message,
+        to=recipient_emails,
+        business=assessment.business,
+        assessment=assessment,
+        category='report',
+        reply_to=[settings.DEFAULT_FROM_EMAIL],
+        attach_report=True
+    )
+
+@rate_limit('assessment_submit', limit=10, period=60, key='link', methods=['POST'])
+@rate_limit('assessment_submit_ip', limit=30, period=60, methods=['POST'])
+async def take_assessment(request, unique_link):
     """View for candidates to take their assessment"""
-    import logging
-    logger = logging.getLogger(__name__)
-    
-    # Prefetch all needed relations in one query
-    assessment = get_object_or_404(
-        Assessment.objects.select_related('business').prefetch_related('managers'),
+    # Managers are only needed on submission, where the report resolves them
+    assessment = await aget_object_or_404(
+        Assessment.objects.select_related('business'),
         unique_link=unique_link
     )
     
     # Check if assessment is already completed
     if assessment.completed:
         messages.error(request, 'This assessment has already been completed.')
-        return render(request, 'baseapp/assessment_closed.html')
+        return await arender(request, 'baseapp/assessment_closed.html')
     
     # Record first access time if not already set
     if not assessment.first_accessed_at:
         assessment.first_accessed_at = timezone.now()
-        assessment.save(update_fields=['first_accessed_at'])
+        await assessment.asave(update_fields=['first_accessed_at'])
         logger.info(f"First access recorded for assessment ID: {assessment.id}")
     
     # Get all active question pairs
-    question_pairs = QuestionPair.objects.filter(
-        business=assessment.business,
-        active=True
-    ).select_related('attribute1', 'attribute2').order_by('order')
+    question_pairs = await sync_to_async(get_question_set)(assessment.business_id)
     
     if request.method == 'POST':
         form = AssessmentResponseForm(request.POST, question_pairs=question_pairs)
         if form.is_valid():
-            try:
-                # Calculate completion time
-                now = timezone.now()
-                if assessment.first_accessed_at:
-                    completion_time_seconds = int((now - assessment.first_accessed_at).total_seconds())
-                else:
-                    # Fallback to created_at time if first_accessed_at is not available
-                    completion_time_seconds = int((now - assessment.created_at).total_seconds())
-                
-                # Create the assessment response
-                assessment_response = AssessmentResponse.objects.create(
-                    assessment=assessment
-                )
-                
-                # Save individual question responses
-                for pair in question_pairs:
-                    field_name = f'question_{pair.id}'
-                    if field_name in form.cleaned_data:
-                        chose_a = form.cleaned_data[field_name] == 'A'
-                        QuestionResponse.objects.create(
-                            assessment_response=assessment_response,
-                            question_pair=pair,
-                            chose_a=chose_a
-                        )
-                    else:
-                        messages.error(request, 'Please answer all questions before submitting.')
-                        return render(request, 'baseapp/take_assessment.html', {
-                            'form': form,
-                            'assessment': assessment
-                        })
-                
-                # Mark assessment as completed
-                assessment.completed = True
-                assessment.completed_at = now
-                assessment.completion_time_seconds = completion_time_seconds
-                assessment.save(update_fields=['completed', 'completed_at', 'completion_time_seconds'])
-
-                logger.info(f"Assessment completed in {completion_time_seconds} seconds: ID {assessment.id}")
-
-                # Invalidate benchmark cache if this is a benchmark assessment
-                if assessment.assessment_type == 'benchmark':
-                    logger.info(f"Invalidating cache for completed benchmark assessment: {assessment.id}")
-                    try:
-                        clear_benchmark_cache_for_business(assessment.business_id)
-                    except Exception as e:
-                        logger.error(f"Error clearing benchmark cache: {str(e)}")
-                        # Continue processing even if cache clearing fails
-                
-                # Only process PDF and send emails for standard assessments
-                if assessment.assessment_type == 'standard':
-                    # Initialize recipient_emails outside try block to ensure it exists in all code paths
-                    recipient_emails = []
-                    
-                    try:
-                        logger.info(f"Starting PDF generation for assessment ID: {assessment.id}")
-                        # Generate PDF report
-                        pdf_path = generate_assessment_report(assessment_response)
-                        logger.info(f"PDF generated successfully at {pdf_path}")
-                        
-                        # Add all associated managers
-                        if assessment.managers.exists():
-                            manager_emails = list(assessment.managers.filter(active=True).values_list('email', flat=True))
-                            recipient_emails.extend(manager_emails)
-                            logger.info(f"Found {len(manager_emails)} associated managers")
-                        
-                        # If no associated managers, fall back to the specified manager email
-                        if not recipient_emails:
-                            recipient_emails = [assessment.manager_email]
-                            logger.info(f"No managers associated, using fallback email: {assessment.manager_email}")
-                        
-                        # Prepare email content
-                        subject = f'Assessment Report - {assessment.candidate_name} - {assessment.position}'
-                        message = f'''Dear Manager,
-
-The assessment for {assessment.candidate_name} for the position of {assessment.position} has been completed.
-
-Please find the assessment report attached to this email. 
-
-Assessment Details:
-- Candidate: {assessment.candidate_name}
-- Position: {assessment.position}
-- Region: {assessment.region}
-- Completion Date: {timezone.now().strftime("%Y-%m-%d %H:%M")}
-
-This is an automated message. Please do not reply to this email.
-
-Best regards,
-{assessment.manager_name}'''
-
-                        logger.info(f"Preparing to send email for assessment ID: {assessment.id} to {len(recipient_emails)} recipients: {', '.join(recipient_emails)}")
-                        
-                        # Verify PDF exists and has content
-                        if os.path.exists(pdf_path):
-                            logger.info(f"PDF exists at {pdf_path}, size: {os.path.getsize(pdf_path)} bytes")
-                        else:
-                            logger.error(f"PDF file not found at {pdf_path}")
-                            raise FileNotFoundError(f"Generated PDF not found at {pdf_path}")
-                        
-                        # Attach the PDF with a clean filename
-                        clean_name = "".join(c for c in assessment.candidate_name if c.isalnum() or c in (' ', '-', '_')).strip()
-                        filename = f'Assessment_Report_{clean_name}_{timezone.now().strftime("%Y%m%d")}.pdf'
-                        
-                        # Create and send email with PDF attachment
-                        email = EmailMessage(
-                            subject=subject,
-                            body=message,
-                            from_email=settings.DEFAULT_FROM_EMAIL,
-                            to=recipient_emails,  # Send to all recipients at once
-                            reply_to=[settings.DEFAULT_FROM_EMAIL]
-                        )
-                        
-                        with open(pdf_path, 'rb') as f:
-                            email.attach(filename, f.read(), 'application/pdf')
-                        
-                        # Send the email
-                        logger.info(f"Sending email to {len(recipient_emails)} recipients: {', '.join(recipient_emails)}")
-                        email.send(fail_silently=False)
-                        logger.info(f"Email sent successfully to {len(recipient_emails)} recipients")
-                        
-                        # Clean up the PDF file after sending
-                        if os.path.exists(pdf_path):
-                            os.remove(pdf_path)
-                            logger.info(f"Cleaned up PDF file at {pdf_path}")
-                        
-                    except ImportError as e:
-                        logger.error(f"WeasyPrint import error: {str(e)}")
-                        logger.error("Please check if WeasyPrint and its dependencies are installed correctly")
-                        messages.error(request, 'There was an error generating the assessment report. The system administrator has been notified.')
-                    
-                    except OSError as e:
-                        logger.error(f"OS error during PDF generation: {str(e)}")
-                        logger.error("This might be due to file permission issues or missing system dependencies")
-                        messages.error(request, 'There was an error processing the assessment report. The system administrator has been notified.')
-                    
-                    except Exception as e:
-                        # Log the error with more details
-                        logger.error(f"Failed to generate/send assessment report: {str(e)}")
-                        logger.error(f"Assessment ID: {assessment.id}")
-                        logger.error(f"Manager Email(s): {', '.join(recipient_emails)}")
-                        logger.error(f"Email settings: FROM_EMAIL={settings.DEFAULT_FROM_EMAIL}")
-                        
-                        # Log email configuration for debugging
-                        logger.debug(f"Email Backend: {settings.EMAIL_BACKEND}")
-                        logger.debug(f"Email Host: {settings.EMAIL_HOST}")
-                        logger.debug(f"Email Port: {settings.EMAIL_PORT}")
-                        logger.debug(f"Email Use TLS: {settings.EMAIL_USE_TLS}")
-                        
-                        messages.error(request, 'There was an error sending the assessment report. The system administrator has been notified.')
-                
-                # Redirect to thank you page regardless of email success
-                return redirect('baseapp:thank_you')
-                
-            except Exception as e:
-                logger.error(f"Error processing assessment submission: {str(e)}")
-                messages.error(
-                    request,
-                    'There was an error processing your submission. Please try again.'
-                )
-                return render(request, 'baseapp/take_assessment.html', {
-                    'form': form,
-                    'assessment': assessment
-                })
+            # Saving the answers takes a transaction, which the async ORM cannot
+            return await sync_to_async(submit_assessment)(request, assessment, question_pairs, form)
     else:
         form = AssessmentResponseForm(question_pairs=question_pairs)
     
-    return render(request, 'baseapp/take_assessment.html', {
+    return await arender(request, 'baseapp/take_assessment.html', {
         'form': form,
         'assessment': assessment
     })
 
-def thank_you(request):
+def submit_assessment(request, assessment, question_pairs, form):
+    """Save a candidate's valid answers, complete the assessment and queue its report"""
+    try:
+        # Calculate completion time
+        now = timezone.now()
+        if assessment.first_accessed_at:
+            completion_time_seconds = int((now - assessment.first_accessed_at).total_seconds())
+        else:
+            # Fallback to created_at time if first_accessed_at is not available
+            completion_time_seconds = int((now - assessment.created_at).total_seconds())
+        
+        # Create the assessment response
+        assessment_response = AssessmentResponse.objects.create(
+            assessment=assessment
+        )
+        
+        # Save individual question responses
+        for pair in question_pairs:
+            field_name = f'question_{pair.id}'
+            if field_name in form.cleaned_data:
+                chose_a = form.cleaned_data[field_name] == 'A'
+                QuestionResponse.objects.create(
+                    assessment_response=assessment_response,
+                    question_pair=pair,
+                    chose_a=chose_a
+                )
+            else:
+                messages.error(request, 'Please answer all questions before submitting.')
+                return render(request, 'baseapp/take_assessment.html', {
+                    'form': form,
+                    'assessment': assessment
+                })
+        
+        # Mark assessment as completed and queue the manager report together,
+        # so a completed standard assessment always has its report email
+        assessment.completed = True
+        assessment.completed_at = now
+        assessment.completion_time_seconds = completion_time_seconds
+
+        with transaction.atomic():
+            assessment.save(update_fields=['completed', 'completed_at', 'completion_time_seconds'])
+
+            # Only standard assessments send a report; the dispatcher renders the PDF
+            if assessment.assessment_type == 'standard':
+                queue_assessment_report(assessment)
+
+        logger.info(f"Assessment completed in {completion_time_seconds} seconds: ID {assessment.id}")
+
+        # Invalidate benchmark cache if this is a benchmark assessment
+        if assessment.assessment_type == 'benchmark':
+            logger.info(f"Invalidating cache for completed benchmark assessment: {assessment.id}")
+            try:
+                clear_benchmark_cache_for_business(assessment.business_id)
+            except Exception as e:
+                logger.error(f"Error clearing benchmark cache: {str(e)}")
+                # Continue processing even if cache clearing fails
+        
+        # Redirect to thank you page regardless of email success
+        return redirect('baseapp:thank_you')
+        
+    except Exception as e:
+        logger.error(f"Error processing assessment submission: {str(e)}")
+        messages.error(
+            request,
+            'There was an error processing your submission. Please try again.'
+        )
+        return render(request, 'baseapp/take_assessment.html', {
+            'form': form,
+            'assessment': assessment
+        })
+
+async def thank_you(request):
     """Simple view for the thank you page after assessment completion"""
-    return render(request, 'baseapp/thank_you.html')
+    return await arender(request, 'baseapp/thank_you.html')
 
 #cache functions
 def clear_benchmark_cache_for_business(business_id):
-    """Clear all benchmark result caches for a business"""
+    """
+    Mark all benchmark result caches of a business stale. The next request
+    recomputes them while concurrent ones keep getting the previous results.
+    """
     logger.info(f"Clearing benchmark cache for business {business_id}")
     
-    # Clear cache for 'all' regions
-    cache.delete(f'benchmark_results_{business_id}_all')
+    # Scores used by the PDF reports, and the results for 'all' regions
+    mark_stale(f'benchmark_scores_{business_id}')
+    mark_stale(f'benchmark_results_{business_id}_all')
     
     # Find all unique regions and clear their caches
     regions = Assessment.objects.filter(
@@ -471,10 +495,24 @@ def clear_benchmark_cache_for_business(business_id):
     
     for region in regions:
         if region:  # Ensure region is not None or empty
-            cache.delete(f'benchmark_results_{business_id}_{region}')
+            mark_stale(f'benchmark_results_{business_id}_{region}')
     
     logger.info(f"Benchmark cache cleared for business {business_id}")
 
+# The key changes with the business's question pairs and attributes, so this only bounds unused entries
+QUESTION_SET_CACHE_TIMEOUT = 86400
+
+def get_question_set(business_id):
+    """Active question pairs of a business in order, cached until its pairs or attributes change"""
+    return get_or_compute(
+        f"question_set_{data_etag(business_id, 'question_pairs', 'attributes')}",
+        lambda: list(QuestionPair.objects.filter(
+            business_id=business_id,
+            active=True
+        ).select_related('attribute1', 'attribute2').order_by('order')),
+        QUESTION_SET_CACHE_TIMEOUT
+    )
+
 @receiver(post_save, sender=AssessmentResponse)
 def invalidate_benchmark_cache(sender, instance, created, **kwargs):
     """Invalidate cache when a benchmark assessment is completed"""
@@ -521,7 +559,45 @@ def refresh_benchmark_cache(request, business_id):
         }, status=500)
 
 
+#conditional GET validators
+# Each returns an ETag built from the data version stamps the view's payload
+# depends on, so unchanged data is answered with 304 before the view runs.
+def business_details_etag(request, business_id):
+    return data_etag(business_id, 'business', 'hr_users', 'question_pairs', 'attributes')
+
+def question_pair_list_etag(request):
+    return data_etag(request.user.current_business_id, 'question_pairs', 'attributes')
+
+def attribute_list_etag(request):
+    return data_etag(request.user.current_business_id, 'attributes')
+
+def managers_etag(request, business_id):
+    return data_etag(business_id, 'managers')
+
+def training_materials_etag(request):
+    return data_etag(None, 'training_materials')
+
+def benchmark_emails_etag(request, business_id):
+    return data_etag(business_id, 'assessments')
+
 #admin views
+@require_http_methods(["GET"])
+@user_passes_test(is_admin)
+def cache_stats(request):
+    """Per-tier hit/miss counters of this worker's caches"""
+    stats = {}
+    for alias in settings.CACHES:
+        backend = caches[alias]
+        if hasattr(backend, 'stats'):
+            stats[alias] = backend.stats()
+    return JsonResponse({'pid': os.getpid(), 'caches': stats})
+
+@require_http_methods(["GET"])
+@user_passes_test(is_admin)
+def request_metrics(request):
+    """Rolling per-view timings, query counts and cache lookups of this worker"""
+    return JsonResponse(metrics_registry.snapshot())
+
 #--overall
 @user_passes_test(is_admin)
 def admin_dashboard(request):
@@ -544,80 +620,17 @@ def admin_dashboard(request):
     
     current_business = request.user.current_business
     
-    # Get all assessments for current business with related data - ONE QUERY
-    assessments = Assessment.objects.filter(
-        business=current_business
-    ).select_related(
-        'created_by',
-        'assessmentresponse'
-    ).prefetch_related(
-        'benchmark_batch',
-        'managers'
-    ).order_by('-created_at')
+    # Header counters are maintained by signals, so this is one primary key lookup
+    stats = get_business_stats(current_business)
 
-    # Use a single ANNOTATE query to get counts instead of multiple queries
-    from django.db.models import Count, Q
-    
-    # Get all counts in one query
-    hr_stats = CustomUser.objects.filter(business=current_business).aggregate(
-        hr_users_count=Count('id', filter=Q(is_hr=True))
-    )
-    
-    # Get assessment counts in single query
-    assessment_stats = assessments.aggregate(
-        assessments_count=Count('id'),
-        pending_count=Count('id', filter=Q(completed=False)),
-        benchmark_completed=Count('id', filter=Q(assessment_type='benchmark', completed=True)),
-        benchmark_total=Count('id', filter=Q(assessment_type='benchmark'))
-    )
-    
-    # Calculate benchmark completion
-    benchmark_completion = 0
-    if assessment_stats['benchmark_total'] > 0:
-        benchmark_completion = round(
-            (assessment_stats['benchmark_completed'] / assessment_stats['benchmark_total']) * 100, 
-            1
-        )
-    
-    # Get benchmark batches with completion rates - optimize the loop
     benchmark_batches = BenchmarkBatch.objects.filter(
         business=current_business
-    ).prefetch_related('assessment_set')
-    
-    # Use annotation to calculate completion rates in a single query
-    from django.db.models import F, ExpressionWrapper, FloatField
-    
-    batch_ids = [batch.id for batch in benchmark_batches]
-    batch_stats = {}
-    
-    if batch_ids:
-        # Get all batch stats in one query
-        batch_data = Assessment.objects.filter(
-            benchmark_batch_id__in=batch_ids
-        ).values(
-            'benchmark_batch_id'
-        ).annotate(
-            total=Count('id'),
-            completed_count=Count('id', filter=Q(completed=True))
-        )
-        
-        # Create a lookup dictionary
-        for item in batch_data:
-            batch_id = item['benchmark_batch_id']
-            total = item['total']
-            completed = item['completed_count']
-            completion_rate = round((completed / total * 100) if total > 0 else 0, 1)
-            batch_stats[batch_id] = {
-                'total': total,
-                'completed': completed,
-                'completion_rate': completion_rate
-            }
-    
-    # Assign the stats to each batch
+    ).select_related('stats')
+
     for batch in benchmark_batches:
-        stats = batch_stats.get(batch.id, {'total': 0, 'completed': 0, 'completion_rate': 0})
-        batch.completion_rate = stats['completion_rate']
-    
+        batch_stats = batch.stats if hasattr(batch, 'stats') else recompute_batch_stats(batch.id)
+        batch.completion_rate = batch_stats.completion_rate
+
     # Get all active attributes in one query
     attributes = Attribute.objects.filter(
         business=current_business,
@@ -631,15 +644,23 @@ def admin_dashboard(request):
     ).order_by('email')
     
     # IMPORTANT: Only get the first 10 assessments instead of all and then slicing
-    recent_activity = assessments[:10]
+    recent_activity = Assessment.objects.filter(
+        business=current_business
+    ).select_related(
+        'created_by',
+        'assessmentresponse',
+        'benchmark_batch'
+    ).prefetch_related(
+        'managers'
+    ).order_by('-created_at')[:10]
     
     context = {
         'businesses': Business.objects.all(),  # Consider prefetching related data if needed
-        'hr_users_count': hr_stats['hr_users_count'],
+        'hr_users_count': stats.hr_users_count,
         'assessments': recent_activity,  # Only send the 10 we need to template
-        'assessments_count': assessment_stats['assessments_count'],
-        'pending_assessments_count': assessment_stats['pending_count'],
-        'benchmark_completion': benchmark_completion,
+        'assessments_count': stats.assessments_count,
+        'pending_assessments_count': stats.pending_count,
+        'benchmark_completion': stats.benchmark_completion,
         'benchmark_batches': benchmark_batches,
         'attributes': attributes,
         'hr_users': hr_users,
@@ -674,7 +695,7 @@ def business_list_create(request):
 
 @require_http_methods(["GET"])
 @user_passes_test(is_admin)
-def list_businesses(request):
+async def list_businesses(request):
     """
     List all businesses with minimal details
     """
@@ -685,11 +706,13 @@ def list_businesses(request):
         'assessment_template_uploaded'
     )
     return JsonResponse({
-        'businesses': list(businesses)
+        'businesses': [business async for business in businesses]
     })
 
 @require_http_methods(["GET"])
 @user_passes_test(is_admin)
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=business_details_etag)
 def business_details(request, business_id):
     """
     Get comprehensive details for a specific business
@@ -731,6 +754,37 @@ def business_details(request, business_id):
     except Business.DoesNotExist:
         return JsonResponse({"error": "Business not found"}, status=404)
     
+@require_http_methods(["GET"])
+@user_passes_test(is_admin)
+def business_changes(request, business_id):
+    """
+    Delta-sync feed of records created, updated or deleted since a cursor.
+
+    Without a since parameter only the current cursor is returned; clients
+    take it before a full load and pass it back on later syncs. Changes are
+    returned as soon as they are made, but the cursor only moves past them
+    CHANGE_FEED_SETTLE_SECONDS later, so recent ones are returned again.
+
+    Query parameters:
+        since: Cursor from a previous response
+        collections: Comma-separated subset of businesses, hr_users,
+            managers, question_pairs, assessments
+    """
+    if 'since' not in request.GET:
+        return JsonResponse({'cursor': latest_cursor(), 'has_more': False, 'reset': False, 'changes': {}})
+
+    try:
+        since = int(request.GET['since'])
+    except ValueError:
+        return JsonResponse({'error': 'Invalid cursor'}, status=400)
+
+    collections = [
+        name for name in request.GET.get('collections', '').split(',')
+        if name in COLLECTION_SERIALIZERS
+    ]
+
+    return JsonResponse(get_changes(business_id, since, collections=collections or None))
+
 @require_http_methods(["GET", "PUT", "DELETE"])
 @user_passes_test(is_admin)
 def business_detail(request, pk):
@@ -910,10 +964,10 @@ def hr_user_reset_password(request, pk):
             reverse('baseapp:password_reset_confirm', args=[reset_token])
         )
         
-        # Send reset email
-        send_mail(
+        # Queue reset email (sent by the outbox dispatcher)
+        enqueue_email(
             subject='Password Reset Request',
-            message=f'''A password reset has been requested for your account.
+            body=f'''A password reset has been requested for your account.
 
 Click the following link to reset your password:
 {reset_url}
@@ -921,9 +975,9 @@ Click the following link to reset your password:
 This link will expire in 24 hours.
 
 If you did not request this reset, please contact your administrator.''',
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            fail_silently=False,
+            to=[user.email],
+            business=user.business,
+            category='password_reset'
         )
         
         return JsonResponse({
@@ -937,12 +991,12 @@ If you did not request this reset, please contact your administrator.''',
 
 @require_http_methods(["GET"])
 @user_passes_test(is_admin)
-def business_hr_users(request, business_id):
+async def business_hr_users(request, business_id):
     users = CustomUser.objects.filter(
         business_id=business_id,
         is_hr=True
     ).values('id', 'email', 'is_active')
-    return JsonResponse({"users": list(users)})
+    return JsonResponse({"users": [user async for user in users]})
 
 #--assessment info
 @require_http_methods(["POST"])
@@ -962,91 +1016,33 @@ def upload_assessment_template(request, business_id):
                 "error": "Invalid file type. Please upload a CSV file."
             }, status=400)
 
-        decoded_file = file.read().decode('utf-8')
-        reader = csv.DictReader(StringIO(decoded_file))
-        
-        expected_columns = [
-            ('attribute1', 'Attribute-A'), 
-            ('attribute2', 'Attribute-B'), 
-            ('statement_a', 'Statement-A'), 
-            ('statement_b', 'Statement-B')
-        ]
-        
-        found_columns = reader.fieldnames or []
-        missing_columns = []
-        column_mapping = {}
-        
-        for expected, alternate in expected_columns:
-            if expected in found_columns:
-                column_mapping[expected] = expected
-            elif alternate in found_columns:
-                column_mapping[expected] = alternate
-            else:
-                missing_columns.append(f"{expected} (or {alternate})")
-        
-        if missing_columns:
+        dry_run = request.POST.get('dry_run') in ('1', 'true', 'True')
+
+        # The file is parsed as it streams; existing data is loaded in two queries
+        try:
+            plan = plan_question_import(business, read_template_rows(file))
+        except TemplateImportError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        if dry_run:
+            return JsonResponse({"dry_run": True, **plan.summary()})
+
+        if plan.row_errors:
             return JsonResponse({
-                "error": f"Missing required columns: {', '.join(missing_columns)}"
+                "error": f"{len(plan.row_errors)} rows have problems; nothing was imported",
+                **plan.summary()
             }, status=400)
-        
-        # Create a set to track unique statement pairs
-        existing_pairs = set()
-        new_pairs = []
-        
-        for row in reader:
-            # Create a unique identifier for this pair
-            pair_key = (
-                row[column_mapping['statement_a']].strip(),
-                row[column_mapping['statement_b']].strip()
-            )
-            
-            # Skip if we've seen this pair before
-            if pair_key in existing_pairs:
-                continue
-                
-            existing_pairs.add(pair_key)
-            
-            # Get or create attributes
-            attr1, _ = Attribute.objects.get_or_create(
-                name=row[column_mapping['attribute1']].strip(),
-                business=business,
-                defaults={'active': True}
-            )
-            attr2, _ = Attribute.objects.get_or_create(
-                name=row[column_mapping['attribute2']].strip(),
-                business=business,
-                defaults={'active': True}
-            )
-            
-            # Check if this pair already exists in the database
-            existing_pair = QuestionPair.objects.filter(
-                business=business,
-                statement_a=row[column_mapping['statement_a']].strip(),
-                statement_b=row[column_mapping['statement_b']].strip()
-            ).first()
-            
-            if not existing_pair:
-                new_pairs.append(QuestionPair(
-                    business=business,
-                    attribute1=attr1,
-                    attribute2=attr2,
-                    statement_a=row[column_mapping['statement_a']].strip(),
-                    statement_b=row[column_mapping['statement_b']].strip(),
-                    order=len(new_pairs) + 1
-                ))
-        
-        # Bulk create new pairs
-        QuestionPair.objects.bulk_create(new_pairs)
-        
-        # Mark business as having uploaded assessment template
-        business.assessment_template_uploaded = True
-        business.save()
+
+        count = apply_question_import(plan)
         
         return JsonResponse({
-            "message": f"Successfully imported {len(new_pairs)} question pairs",
-            "count": len(new_pairs)
+            "message": f"Successfully imported {count} question pairs",
+            "count": count,
+            **plan.summary()
         })
     
+    except Business.DoesNotExist:
+        return JsonResponse({"error": "Business not found"}, status=404)
     except Exception as e:
         return JsonResponse({
             "error": f"Unexpected error importing questions: {str(e)}"
@@ -1065,6 +1061,11 @@ def question_pair_detail(request, pk):
         elif request.method == "PUT":
             data = json.loads(request.body)
             
+            # Indexed lookup on the statements' content hash
+            statement_hash = QuestionPair.hash_statements(pair.business_id, data['statement_a'], data['statement_b'])
+            if QuestionPair.objects.filter(statement_hash=statement_hash).exclude(pk=pair.pk).exists():
+                return JsonResponse({"error": "Another question pair already has these statements"}, status=400)
+            
             # Get or create attributes
             attr1, _ = Attribute.objects.get_or_create(
                 name=data['attribute1'],
@@ -1102,6 +1103,8 @@ def question_pair_detail(request, pk):
 
 @require_http_methods(["GET"])
 @user_passes_test(is_admin)
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=question_pair_list_etag)
 def question_pair_list(request):
     pairs = QuestionPair.objects.filter(
         business=request.user.current_business
@@ -1113,6 +1116,8 @@ def question_pair_list(request):
 
 @require_http_methods(["GET"])
 @user_passes_test(is_admin)
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=attribute_list_etag)
 def attribute_list(request):
     attributes = Attribute.objects.filter(
         business=request.user.current_business
@@ -1120,8 +1125,15 @@ def attribute_list(request):
     return JsonResponse({"attributes": list(attributes)})
 
 #--benchmark
+# Rows per INSERT/UPDATE statement for roster writes
+BENCHMARK_BULK_BATCH_SIZE = 500
+# Outbox ids one status request may ask about
+OUTBOX_STATUS_MAX_IDS = 1000
+
 @require_http_methods(["GET"])
 @user_passes_test(is_admin)
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=benchmark_emails_etag)
 def benchmark_emails(request, business_id):
     """Get all benchmark emails for a business using the email_sent field"""
     try:
@@ -1148,45 +1160,146 @@ def benchmark_emails(request, business_id):
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=400)
 
+def parse_benchmark_email_list(data):
+    """Get the de-duplicated, stripped email list from a bulk request body"""
+    emails = []
+    seen = set()
+    for email in data.get('emails', []):
+        if isinstance(email, dict):
+            email = email.get('email')
+        email = (email or '').strip()
+        if email and email.lower() not in seen:
+            seen.add(email.lower())
+            emails.append(email)
+    return emails
+
 @require_http_methods(["POST"])
 @user_passes_test(is_admin)
 def add_benchmark_emails(request, business_id):
-    """Add new benchmark emails with 'sent' explicitly set to false"""
+    """
+    Add benchmark emails in bulk with 'sent' explicitly set to false.
+    With upsert set, addresses already on the roster take the new region.
+    """
+    business = get_object_or_404(Business, id=business_id)
+
     try:
         data = json.loads(request.body)
-        emails = data.get('emails', [])
-        
-        created_assessments = []
-        for email_data in emails:
-            # Skip empty emails
-            if not email_data.get('email') or email_data['email'].strip() == '':
+        upsert = bool(data.get('upsert', False))
+
+        # Normalize the roster, keeping the last region given for an address
+        roster = {}
+        invalid = []
+        for email_data in data.get('emails', []):
+            email = (email_data.get('email') or '').strip()
+            if not email:
                 continue
-                
-            # Check if assessment already exists
-            existing = Assessment.objects.filter(
-                business_id=business_id,
+            try:
+                validate_email(email)
+            except ValidationError:
+                invalid.append(email)
+                continue
+            region = (email_data.get('region') or '').strip() or 'Default'
+            roster[email.lower()] = (email, region)
+
+        # One query for every benchmark address already on file
+        existing = {}
+        for assessment_id, email, region in Assessment.objects.filter(
+            business=business,
+            assessment_type='benchmark'
+        ).values_list('id', 'candidate_email', 'region'):
+            existing[email.lower()] = (assessment_id, region)
+
+        manager_name = request.user.get_full_name() or request.user.username
+        new_assessments = []
+        region_updates = []
+        for key, (email, region) in roster.items():
+            if key in existing:
+                assessment_id, current_region = existing[key]
+                if upsert and region != current_region:
+                    region_updates.append(Assessment(id=assessment_id, region=region))
+                continue
+
+            # bulk_create skips Assessment.save(), so set the link here (one urandom call per row)
+            new_assessments.append(Assessment(
+                business=business,
                 assessment_type='benchmark',
-                candidate_email=email_data['email']
-            ).first()
-            
-            if not existing:
-                # Create new assessment with email_sent explicitly set to False
-                assessment = Assessment.objects.create(
-                    business_id=business_id,
-                    assessment_type='benchmark',
-                    candidate_email=email_data['email'],
-                    candidate_name=email_data['email'].split('@')[0],  # Basic name from email
-                    region=email_data.get('region', 'Default'),
-                    position='Benchmark Assessment',
-                    manager_name=request.user.get_full_name() or request.user.username,
-                    manager_email=request.user.email,
-                    created_by=request.user,
-                    email_sent=False  # Explicitly set to False
-                )
-                created_assessments.append(assessment)
-        
+                candidate_email=email,
+                candidate_name=email.split('@')[0],  # Basic name from email
+                region=region,
+                position='Benchmark Assessment',
+                manager_name=manager_name,
+                manager_email=request.user.email,
+                created_by=request.user,
+                unique_link=secrets.token_hex(32),
+                email_sent=False  # Explicitly set to False
+            ))
+
+        if new_assessments or region_updates:
+            with transaction.atomic():
+                Assessment.objects.bulk_create(new_assessments, batch_size=BENCHMARK_BULK_BATCH_SIZE)
+                Assessment.objects.bulk_update(region_updates, ['region'], batch_size=BENCHMARK_BULK_BATCH_SIZE)
+            refresh_after_bulk_write('assessments', business.id)
+
         return JsonResponse({
-            'message': f'Successfully added {len(created_assessments)} new benchmark emails'
+            'message': f'Successfully added {len(new_assessments)} new benchmark emails',
+            'created': len(new_assessments),
+            'updated': len(region_updates),
+            'invalid': invalid
+        })
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+@require_http_methods(["POST"])
+@user_passes_test(is_admin)
+def bulk_delete_benchmark_emails(request, business_id):
+    """Delete a list of benchmark emails (and their responses) in one request"""
+    try:
+        data = json.loads(request.body)
+        emails = parse_benchmark_email_list(data)
+
+        if not emails:
+            return JsonResponse({'error': 'At least one email is required'}, status=400)
+
+        # Matched case-insensitively, as add_benchmark_emails de-duplicates
+        assessments = Assessment.objects.alias(email_lower=Lower('candidate_email')).filter(
+            business_id=business_id,
+            assessment_type='benchmark',
+            email_lower__in=[email.lower() for email in emails]
+        )
+
+        with transaction.atomic(), suspend_row_tracking():
+            deleted, _ = assessments.delete()
+        refresh_after_bulk_write('assessments', business_id)
+
+        return JsonResponse({
+            'message': f'Deleted {deleted} records for {len(emails)} benchmark emails',
+            'deleted': deleted
+        })
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+@require_http_methods(["POST"])
+@user_passes_test(is_admin)
+def bulk_update_benchmark_region(request, business_id):
+    """Move a list of benchmark emails to another region with one UPDATE"""
+    try:
+        data = json.loads(request.body)
+        emails = parse_benchmark_email_list(data)
+        region = (data.get('region') or '').strip()
+
+        if not emails or not region:
+            return JsonResponse({'error': 'Emails and region are required'}, status=400)
+
+        updated = Assessment.objects.alias(email_lower=Lower('candidate_email')).filter(
+            business_id=business_id,
+            assessment_type='benchmark',
+            email_lower__in=[email.lower() for email in emails]
+        ).update(region=region)
+        refresh_after_bulk_write('assessments', business_id)
+
+        return JsonResponse({
+            'message': f'Moved {updated} benchmark emails to {region}',
+            'updated': updated
         })
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=400)
@@ -1337,61 +1450,30 @@ def send_benchmark_email(request, business_id):
         )
         # Set email_sent to True
         assessment.email_sent = True
-        assessment.save()
         
         # Generate the assessment URL
         assessment_url = request.build_absolute_uri(
             reverse('baseapp:take_assessment', args=[assessment.unique_link])
         )
         
-        # Email sending logic...
-        subject = f'Benchmark Assessment for {business.name}'
-        message = f"""
-Hello,
-
-You have been selected to participate in a benchmark assessment for {business.name}.
-
-Please click the following link to complete your assessment:
-{assessment_url}
-
-This is a new link for your assessment. Any previous links sent will no longer work.
-
-Best regards,
-Work Force Compass Admin
-        """
+        # Custom template if requested and saved, default text otherwise
+        renderer = get_email_renderer(business.id, 'benchmark', use_custom=use_template)
+        subject, message = renderer.render(assessment_email_context(assessment, assessment_url, business.name))
         
-        # If using custom template, replace with template
-        if use_template:
-            try:
-                template = EmailTemplate.objects.get(business=business, template_type='benchmark')
-                
-                # Replace variables in subject
-                subject = template.subject
-                subject = subject.replace("{{business_name}}", business.name)
-                subject = subject.replace("{{candidate_name}}", assessment.candidate_name)
-                
-                # Replace variables in body
-                message = template.body
-                message = message.replace("{{business_name}}", business.name)
-                message = message.replace("{{candidate_name}}", assessment.candidate_name)
-                message = message.replace("{{assessment_url}}", assessment_url)
-                message = message.replace("{{region}}", assessment.region)
-                
-            except EmailTemplate.DoesNotExist:
-                # Use default if no template exists
-                pass
-        
-        # Send email
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[email],
-            fail_silently=False,
-        )
+        # New link and its email are committed together
+        with transaction.atomic():
+            assessment.save()
+            enqueue_email(
+                subject=subject,
+                body=message,
+                to=[email],
+                business=business,
+                assessment=assessment,
+                category='benchmark'
+            )
         
         return JsonResponse({
-            'message': f'Successfully sent benchmark assessment email to {email}'
+            'message': f'Successfully queued benchmark assessment email to {email}'
         })
     except Assessment.DoesNotExist:
         return JsonResponse({
@@ -1400,106 +1482,223 @@ Work Force Compass Admin
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=400)
 
+@require_http_methods(["POST"])
+@user_passes_test(is_admin)
+def send_benchmark_emails_bulk(request, business_id):
+    """
+    Queue benchmark invitations for many participants in one transaction.
+
+    Takes either a list of emails or filter='unsent' (optionally with a region).
+    The outbox dispatcher sends them over pooled SMTP connections; the
+    response gives each address's outbox id, whose delivery outcome
+    outbox_status reports.
+    """
+    business = get_object_or_404(Business, id=business_id)
+
+    try:
+        data = json.loads(request.body)
+        use_template = data.get('useTemplate', False)
+
+        # Completed participants never get a new link
+        assessments = Assessment.objects.filter(
+            business=business,
+            assessment_type='benchmark',
+            completed=False
+        ).only('id', 'candidate_email', 'candidate_name', 'position', 'region', 'manager_name')
+
+        emails = parse_benchmark_email_list(data)
+        if emails:
+            assessments = assessments.alias(email_lower=Lower('candidate_email')).filter(
+                email_lower__in=[email.lower() for email in emails]
+            )
+        elif data.get('filter') == 'unsent':
+            assessments = assessments.filter(email_sent=False)
+            if data.get('region'):
+                assessments = assessments.filter(region=data['region'])
+        else:
+            return JsonResponse({'error': 'Provide a list of emails or filter "unsent"'}, status=400)
+
+        assessments = list(assessments)
+        if not assessments:
+            return JsonResponse({'message': 'No benchmark emails to send', 'queued': []})
+
+        # Template and URL prefix are the same for every message
+        renderer = get_email_renderer(business.id, 'benchmark', use_custom=use_template)
+        link_for = assessment_link_builder(request)
+
+        contexts = []
+        for assessment in assessments:
+            assessment.unique_link = generate_secure_token(
+                entity_id=assessment.id,
+                token_type='benchmark',
+                length=16
+            )
+            assessment_url = link_for(assessment.unique_link)
+            contexts.append(assessment_email_context(assessment, assessment_url, business.name))
+
+        outbox_messages = []
+        for assessment, (subject, message) in zip(assessments, renderer.render_many(contexts)):
+            outbox_messages.append(OutboxMessage(
+                business=business,
+                assessment=assessment,
+                category='benchmark',
+                subject=subject,
+                body=message,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[assessment.candidate_email]
+            ))
+
+        # New links, sent flags and their emails commit together
+        with transaction.atomic():
+            Assessment.objects.bulk_update(assessments, ['unique_link'], batch_size=BENCHMARK_BULK_BATCH_SIZE)
+            Assessment.objects.filter(id__in=[a.id for a in assessments]).update(email_sent=True)
+            OutboxMessage.objects.bulk_create(outbox_messages, batch_size=BENCHMARK_BULK_BATCH_SIZE)
+            if any(outbox_message.pk is None for outbox_message in outbox_messages):
+                # MySQL does not return the ids of bulk-created rows; ours are the newest per assessment
+                newest = dict(OutboxMessage.objects.filter(
+                    assessment_id__in=[a.id for a in assessments],
+                    category='benchmark'
+                ).order_by().values('assessment_id').annotate(newest_id=Max('id')).values_list('assessment_id', 'newest_id'))
+                for outbox_message in outbox_messages:
+                    outbox_message.pk = newest[outbox_message.assessment_id]
+        refresh_after_bulk_write('assessments', business.id)
+
+        queued = [
+            {'email': assessment.candidate_email, 'outbox_id': outbox_message.pk}
+            for assessment, outbox_message in zip(assessments, outbox_messages)
+        ]
+        return JsonResponse({
+            'message': f'Queued {len(queued)} benchmark emails',
+            'queued': queued
+        })
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+@require_http_methods(["GET"])
+@user_passes_test(is_admin)
+def outbox_status(request, business_id):
+    """
+    Delivery status of queued emails of a business.
+
+    Query parameters:
+        ids: Comma-separated outbox ids, as returned when the emails were queued
+    """
+    try:
+        ids = [int(value) for value in request.GET.get('ids', '').split(',') if value.strip()]
+    except ValueError:
+        return JsonResponse({'error': 'Invalid ids'}, status=400)
+
+    if not ids:
+        return JsonResponse({'error': 'At least one id is required'}, status=400)
+    if len(ids) > OUTBOX_STATUS_MAX_IDS:
+        return JsonResponse({'error': f'At most {OUTBOX_STATUS_MAX_IDS} ids per request'}, status=400)
+
+    statuses = list(OutboxMessage.objects.filter(
+        business_id=business_id,
+        id__in=ids
+    ).values('id', 'to', 'status', 'attempts', 'last_error', 'sent_at'))
+
+    counts = {'pending': 0, 'sent': 0, 'failed': 0}
+    for status in statuses:
+        counts[status['status']] += 1
+
+    return JsonResponse({'messages': statuses, **counts})
+
+def calculate_benchmark_results(business_id, region):
+    """Aggregate the completed benchmark assessments of a business into per-attribute scores"""
+    logger.info(f"Calculating benchmark results for business {business_id}, region {region}")
+
+    # Start by prefetching the QuestionResponses and QuestionPairs efficiently
+    assessments_query = AssessmentResponse.objects.filter(
+        assessment__business_id=business_id,
+        assessment__assessment_type='benchmark',
+        assessment__completed=True
+    ).select_related('assessment').prefetch_related(
+        'questionresponse_set__question_pair__attribute1',
+        'questionresponse_set__question_pair__attribute2'
+    )
+
+    # Apply region filter if specified
+    if region != 'all':
+        assessments_query = assessments_query.filter(assessment__region=region)
+
+    # Execute the query once to get filtered assessment responses
+    assessments = list(assessments_query)
+
+    # If no completed assessments, return empty results
+    if not assessments:
+        return []
+
+    # Get all attributes for the business in one query
+    attributes = list(Attribute.objects.filter(
+        business_id=business_id,
+        active=True
+    ))
+
+    # Get the true count of assessment responses - this is what we want to display
+    assessment_count = len(assessments)
+
+    # Use a dictionary to track attribute scores
+    attribute_scores = {
+        attr.id: {
+            'total': 0.0,  # Total "points" for this attribute
+            'count': 0,    # This will track instances actually measuring this attribute
+            'name': attr.name
+        } for attr in attributes
+    }
+
+    # Process all assessment responses and calculate scores in one go
+    for assessment_response in assessments:
+        # Get all question responses for this assessment
+        question_responses = assessment_response.questionresponse_set.all()
+
+        # Process each question response once
+        for question_response in question_responses:
+            question_pair = question_response.question_pair
+
+            # Process attribute1
+            if question_pair.attribute1_id in attribute_scores:
+                if question_response.chose_a:
+                    attribute_scores[question_pair.attribute1_id]['total'] += 1
+                attribute_scores[question_pair.attribute1_id]['count'] += 1
+
+            # Process attribute2
+            if question_pair.attribute2_id in attribute_scores:
+                if not question_response.chose_a:
+                    attribute_scores[question_pair.attribute2_id]['total'] += 1
+                attribute_scores[question_pair.attribute2_id]['count'] += 1
+
+    # Calculate final results - using the correct assessment count for reporting
+    results = []
+    for attr_id, data in attribute_scores.items():
+        if data['count'] > 0:
+            results.append({
+                'attribute': data['name'],
+                'score': round((data['total'] / data['count']) * 100, 2),
+                'responses': assessment_count  # Use the actual assessment count instead of attribute instances
+            })
+
+    logger.info(f"Calculated benchmark results for business {business_id}, region {region}, found {assessment_count} assessments")
+    return results
+
+def benchmark_cache_timeout(results):
+    # Empty results are kept for a shorter time (1 hour)
+    return getattr(settings, 'BENCHMARK_CACHE_TIMEOUT', 86400) if results else 3600
+
 @require_http_methods(["GET"])
 @user_passes_test(is_admin)
 def benchmark_results(request, business_id):
-    """Get benchmark results with database caching to reduce query load"""
-    import logging
-    logger = logging.getLogger(__name__)
-    
+    """Get benchmark results, computed by one worker at a time and cached"""
     try:
         region = request.GET.get('region', 'all')
         force_refresh = request.GET.get('refresh', 'false').lower() == 'true'
-        
-        # Create a cache key based on business_id and region
-        cache_key = f'benchmark_results_{business_id}_{region}'
-        
-        # Try to get results from cache first (unless force refresh is requested)
-        if not force_refresh:
-            cached_results = cache.get(cache_key)
-            if cached_results is not None:
-                logger.info(f"Cache hit - returning cached results for business {business_id}, region {region}")
-                return JsonResponse({'results': cached_results})
-        
-        logger.info(f"Cache miss - calculating benchmark results for business {business_id}, region {region}")
-        
-        # Start by prefetching the QuestionResponses and QuestionPairs efficiently
-        assessments_query = AssessmentResponse.objects.filter(
-            assessment__business_id=business_id,
-            assessment__assessment_type='benchmark',
-            assessment__completed=True
-        ).select_related('assessment').prefetch_related(
-            'questionresponse_set__question_pair__attribute1',
-            'questionresponse_set__question_pair__attribute2'
+
+        results = get_or_compute(
+            f'benchmark_results_{business_id}_{region}',
+            lambda: calculate_benchmark_results(business_id, region),
+            benchmark_cache_timeout,
+            force=force_refresh
         )
-        
-        # Apply region filter if specified
-        if region != 'all':
-            assessments_query = assessments_query.filter(assessment__region=region)
-        
-        # Execute the query once to get filtered assessment responses
-        assessments = list(assessments_query)
-        
-        # If no completed assessments, return empty results
-        if not assessments:
-            # Cache empty results for a shorter time (1 hour)
-            cache.set(cache_key, [], 3600)
-            return JsonResponse({'results': []})
-        
-        # Get all attributes for the business in one query
-        attributes = list(Attribute.objects.filter(
-            business_id=business_id,
-            active=True
-        ))
-        
-        # Get the true count of assessment responses - this is what we want to display
-        assessment_count = len(assessments)
-        
-        # Use a dictionary to track attribute scores
-        attribute_scores = {
-            attr.id: {
-                'total': 0.0,  # Total "points" for this attribute
-                'count': 0,    # This will track instances actually measuring this attribute
-                'name': attr.name
-            } for attr in attributes
-        }
-        
-        # Process all assessment responses and calculate scores in one go
-        for assessment_response in assessments:
-            # Get all question responses for this assessment
-            question_responses = assessment_response.questionresponse_set.all()
-            
-            # Process each question response once
-            for question_response in question_responses:
-                question_pair = question_response.question_pair
-                
-                # Process attribute1
-                if question_pair.attribute1_id in attribute_scores:
-                    if question_response.chose_a:
-                        attribute_scores[question_pair.attribute1_id]['total'] += 1
-                    attribute_scores[question_pair.attribute1_id]['count'] += 1
-                
-                # Process attribute2
-                if question_pair.attribute2_id in attribute_scores:
-                    if not question_response.chose_a:
-                        attribute_scores[question_pair.attribute2_id]['total'] += 1
-                    attribute_scores[question_pair.attribute2_id]['count'] += 1
-        
-        # Calculate final results - using the correct assessment count for reporting
-        results = []
-        for attr_id, data in attribute_scores.items():
-            if data['count'] > 0:
-                results.append({
-                    'attribute': data['name'],
-                    'score': round((data['total'] / data['count']) * 100, 2),
-                    'responses': assessment_count  # Use the actual assessment count instead of attribute instances
-                })
-        
-        # Cache the results using timeout from settings
-        timeout = getattr(settings, 'BENCHMARK_CACHE_TIMEOUT', 86400)  # Default 1 day
-        cache.set(cache_key, results, timeout)
-        
-        logger.info(f"Calculated benchmark results for business {business_id}, region {region}, found {assessment_count} assessments")
         return JsonResponse({'results': results})
     except Exception as e:
         logger.error(f"Error in benchmark_results: {e}", exc_info=True)
@@ -1508,39 +1707,154 @@ def benchmark_results(request, business_id):
             'results': []
         }, status=500)
 
+@require_http_methods(["GET", "POST"])
+@user_passes_test(is_admin)
+def create_benchmark_batch(request):
+    """Upload a benchmark roster file; the batch worker loads it out of band"""
+    business = request.user.current_business
+    if not business:
+        messages.error(request, 'Select a business first.')
+        return redirect('baseapp:admin_dashboard')
+
+    if request.method == 'POST':
+        form = BenchmarkBatchForm(request.POST, request.FILES)
+        if form.is_valid():
+            batch = form.save(commit=False)
+            batch.business = business
+            batch.created_by = request.user
+            batch.save()
+            logger.info(f"Benchmark batch {batch.id} queued for business {business.id}")
+            messages.success(
+                request,
+                f'Batch "{batch.name}" was uploaded and is being processed. '
+                'The assessments appear on the benchmark roster as they are loaded.'
+            )
+            return redirect('baseapp:admin_dashboard')
+    else:
+        form = BenchmarkBatchForm()
+
+    return render(request, 'baseapp/create_benchmark_batch.html', {
+        'form': form,
+        'business': business
+    })
+
+@require_http_methods(["GET"])
+@user_passes_test(is_admin)
+def benchmark_batch_status(request, batch_id):
+    """Ingestion progress of a benchmark batch"""
+    batch = get_object_or_404(BenchmarkBatch, id=batch_id)
+    return JsonResponse({
+        'id': batch.id,
+        'name': batch.name,
+        'status': batch.status,
+        'processed': batch.processed,
+        'rows_processed': batch.rows_processed,
+        'rows_created': batch.rows_created,
+        'rows_skipped': batch.rows_skipped,
+        'row_errors': batch.row_errors,
+        'error': batch.error,
+        'processed_at': batch.processed_at.isoformat() if batch.processed_at else None
+    })
+
 #--admin assessment
 @require_http_methods(["GET"])
 @user_passes_test(is_admin)
-def business_assessments(request, business_id):
-    """Get all assessments for a business"""
+async def business_assessments(request, business_id):
+    """
+    Get one page of assessments for a business.
+
+    Query parameters:
+        cursor: Cursor from a previous page's next_cursor
+        limit: Page size (default 50, max 200)
+        status: completed, pending, in_progress or not_started
+        type: standard or benchmark
+        region, position: Exact match filters
+        date_from, date_to: Created date range (YYYY-MM-DD, inclusive)
+        q: Search on candidate name or email
+    """
     try:
-        assessments = Assessment.objects.filter(
-            business_id=business_id
-        ).select_related(
-            'created_by'
-        ).order_by('-created_at').values(
-            'id', 
-            'candidate_name',
-            'candidate_email',
-            'position',
-            'region',
-            'manager_name',
-            'manager_email',
-            'created_at',
-            'completed',
-            'unique_link',
-            'assessment_type',
-            'first_accessed_at',
-            'completion_time_seconds',
-            'completed_at'
+        assessments = filter_assessments(
+            Assessment.objects.filter(business_id=business_id),
+            request.GET
         )
-        
+
+        # All counts for the filtered set in a single aggregate query
+        counts = await assessments.aaggregate(**ASSESSMENT_STATUS_COUNTS)
+
+        rows, next_cursor = await akeyset_page(
+            assessments.values(
+                'id',
+                'candidate_name',
+                'candidate_email',
+                'position',
+                'region',
+                'manager_name',
+                'manager_email',
+                'created_at',
+                'completed',
+                'unique_link',
+                'assessment_type',
+                'first_accessed_at',
+                'completion_time_seconds',
+                'completed_at'
+            ),
+            cursor=request.GET.get('cursor'),
+            limit=parse_limit(request.GET.get('limit'))
+        )
+
         return JsonResponse({
-            'assessments': list(assessments)
+            'assessments': rows,
+            'counts': counts,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
         })
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=400)
 
+@require_http_methods(["POST"])
+@user_passes_test(is_admin)
+def admin_bulk_invite(request, business_id):
+    """
+    Invite a roster of candidates from an uploaded CSV/XLSX file.
+    Nothing is created unless every row is valid; dry_run only validates.
+    """
+    business = get_object_or_404(Business, id=business_id)
+
+    hr_user = CustomUser.objects.filter(business=business, is_hr=True, is_active=True).first()
+    if not hr_user:
+        return JsonResponse({
+            'error': 'No active HR user found for this business. Please add an HR user first.'
+        }, status=400)
+
+    uploaded_file = request.FILES.get('file')
+    if not uploaded_file:
+        return JsonResponse({'error': 'No file provided'}, status=400)
+
+    try:
+        rows = read_roster(uploaded_file)
+    except RosterError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    candidates, errors = validate_roster(business, rows)
+    if errors:
+        return JsonResponse({
+            'error': f'{len(errors)} rows have problems; no candidates were invited',
+            'row_errors': errors
+        }, status=400)
+
+    if request.POST.get('dry_run') in ('1', 'true'):
+        return JsonResponse({'message': f'{len(candidates)} candidates are ready to invite', 'count': len(candidates)})
+
+    try:
+        assessments = invite_candidates(business, hr_user, candidates, assessment_link_builder(request))
+        return JsonResponse({
+            'message': f'Invited {len(assessments)} candidates',
+            'count': len(assessments)
+        })
+    except Exception as e:
+        logger.error(f"Error bulk inviting candidates for business {business_id}: {e}", exc_info=True)
+        return JsonResponse({'error': str(e)}, status=400)
+
 @require_http_methods(["GET", "POST"])
 @user_passes_test(is_admin)
 def admin_create_assessment(request, business_id):
@@ -1568,32 +1882,23 @@ def admin_create_assessment(request, business_id):
             primary_manager_id = data.get('primary_manager_id')
             manager_name = data.get('manager_name', '')
             manager_email = data.get('manager_email', '')
+            directory = get_manager_directory(business.id)
             
             # If no managers were explicitly selected, include default managers
             if not manager_ids:
-                default_managers = Manager.objects.filter(business=business, active=True, is_default=True)
-                if default_managers.exists():
-                    manager_ids = list(default_managers.values_list('id', flat=True))
+                first_default = directory.first_default
+                if first_default:
+                    manager_ids = list(directory.default_ids)
                     
                     # If no primary manager is selected, use the first default manager
                     if not primary_manager_id and not (manager_name and manager_email):
-                        first_default = default_managers.first()
                         primary_manager_id = first_default.id
                         manager_name = first_default.name
                         manager_email = first_default.email
             
-            # If managers were selected but no defaults were included, add them
+            # If managers were selected, keep this business's active ones and add any missing defaults
             else:
-                default_manager_ids = list(Manager.objects.filter(
-                    business=business, 
-                    active=True, 
-                    is_default=True
-                ).values_list('id', flat=True))
-                
-                # Add any default managers not already in the selected list
-                for default_id in default_manager_ids:
-                    if default_id not in manager_ids:
-                        manager_ids.append(default_id)
+                manager_ids = directory.with_defaults(manager_ids)
             
             # Validate manager selection
             if not manager_ids and not (manager_name and manager_email):
@@ -1603,84 +1908,74 @@ def admin_create_assessment(request, business_id):
             
             # Handle primary manager
             if primary_manager_id:
-                try:
-                    primary_manager = Manager.objects.get(id=primary_manager_id, business=business)
-                    # Use primary manager's details
-                    manager_name = primary_manager.name
-                    manager_email = primary_manager.email
-                    
-                    # Ensure primary manager is in the selected managers list
-                    if primary_manager_id not in manager_ids:
-                        manager_ids.append(primary_manager_id)
-                except Manager.DoesNotExist:
+                primary_manager = directory.get(primary_manager_id)
+                if primary_manager is None:
                     return JsonResponse({
                         'error': 'Selected primary manager does not exist'
                     }, status=400)
+                # Use primary manager's details
+                manager_name = primary_manager.name
+                manager_email = primary_manager.email
+                
+                # Ensure primary manager is in the selected managers list
+                if primary_manager.id not in manager_ids:
+                    manager_ids.append(primary_manager.id)
             elif manager_ids and not (manager_name and manager_email):
                 # If managers selected but no primary contact info provided,
                 # use the first manager (or default primary) as primary contact
-                managers = Manager.objects.filter(id__in=manager_ids, business=business)
-                primary_manager = managers.filter(is_default=True).first() or managers.first()
+                managers = [directory.get(manager_id) for manager_id in manager_ids]
+                primary_manager = next((m for m in managers if m.is_default), None) or managers[0]
                 if primary_manager:
                     manager_name = primary_manager.name
                     manager_email = primary_manager.email
                     primary_manager_id = primary_manager.id
             
-            # Create the assessment
-            assessment = Assessment.objects.create(
-                business=business,
-                assessment_type='standard',
-                candidate_name=data['candidate_name'],
-                candidate_email=data['candidate_email'],
-                position=data['position'],
-                region=data['region'],
-                manager_name=manager_name,
-                manager_email=manager_email,
-                created_by=hr_user
-            )
+            # The assessment and its invitation commit together
+            with transaction.atomic():
+                # Create the assessment
+                assessment = Assessment.objects.create(
+                    business=business,
+                    assessment_type='standard',
+                    candidate_name=data['candidate_name'],
+                    candidate_email=data['candidate_email'],
+                    position=data['position'],
+                    region=data['region'],
+                    manager_name=manager_name,
+                    manager_email=manager_email,
+                    created_by=hr_user
+                )
             
-            # Add selected managers
-            if manager_ids:
-                managers = Manager.objects.filter(id__in=manager_ids, business=business)
-                assessment.managers.set(managers)
+                # Add selected managers
+                if manager_ids:
+                    assessment.managers.add(*manager_ids)
             
-            # Generate a secure unique link
-            assessment.unique_link = generate_secure_token(
-                entity_id=assessment.id,
-                token_type='assessment',
-                length=16
-            )
-            assessment.save(update_fields=['unique_link'])
+                # Generate a secure unique link
+                assessment.unique_link = generate_secure_token(
+                    entity_id=assessment.id,
+                    token_type='assessment',
+                    length=16
+                )
+                assessment.save(update_fields=['unique_link'])
             
-            # Generate assessment link
-            assessment_link = request.build_absolute_uri(
-                reverse('baseapp:take_assessment', args=[assessment.unique_link])
-            )
+                # Generate assessment link
+                assessment_link = request.build_absolute_uri(
+                    reverse('baseapp:take_assessment', args=[assessment.unique_link])
+                )
             
-            # Send email to candidate
-            try:
-                subject = 'Assessment Invitation'
-                message = f'''Dear {assessment.candidate_name},
-
-You have been invited to complete an assessment for the position of {assessment.position}.
-Please click the following link to complete your assessment:
-
-{assessment_link}
-
-This link is unique to you and can only be used once.
-
-Best regards,
-{assessment.manager_name}'''
+                # Queue email to candidate
+                renderer = get_email_renderer(assessment.business_id, 'standard')
+                subject, message = renderer.render(
+                    assessment_email_context(assessment, assessment_link, assessment.business.name)
+                )
                 
-                send_mail(
-                    subject,
-                    message,
-                    settings.DEFAULT_FROM_EMAIL,
-                    [assessment.candidate_email],
-                    fail_silently=False,
+                enqueue_email(
+                    subject=subject,
+                    body=message,
+                    to=[assessment.candidate_email],
+                    business=business,
+                    assessment=assessment,
+                    category='invitation'
                 )
-            except Exception as e:
-                print(f"Email error: {e}")
                 
             return JsonResponse({
                 'message': 'Assessment created successfully',
@@ -1695,22 +1990,18 @@ Best regards,
             })
         
         # For GET requests, return available fields and managers
-        managers = Manager.objects.filter(business=business, active=True).values(
-            'id', 'name', 'email', 'is_default'
-        )
-        
-        # Identify default managers for pre-selection
-        default_manager_ids = list(Manager.objects.filter(
-            business=business, 
-            active=True, 
-            is_default=True
-        ).values_list('id', flat=True))
+        directory = get_manager_directory(business.id)
+        managers = [
+            {'id': m.id, 'name': m.name, 'email': m.email, 'is_default': m.is_default}
+            for m in directory.active
+        ]
         
         return JsonResponse({
             'fields': ['candidate_name', 'candidate_email', 'position', 'region', 
                       'manager_ids', 'primary_manager_id', 'manager_name', 'manager_email'],
-            'managers': list(managers),
-            'default_manager_ids': default_manager_ids
+            'managers': managers,
+            # Default managers are pre-selected
+            'default_manager_ids': directory.default_ids
         })
         
     except Business.DoesNotExist:
@@ -1818,37 +2109,29 @@ def admin_resend_assessment(request, assessment_id):
             token_type='assessment',
             length=16
         )
-        assessment.save()
         
         # Generate the assessment URL
         assessment_url = request.build_absolute_uri(
             reverse('baseapp:take_assessment', args=[assessment.unique_link])
         )
         
-        # Send email
-        subject = f'Assessment for {assessment.position}'
-        message = f"""
-Hello {assessment.candidate_name},
-
-You have been invited to complete an assessment for the {assessment.position} position.
-
-Please click the following link to complete your assessment:
-{assessment_url}
-
-This is a new link for your assessment. Any previous links sent will no longer work.
-
-Best regards,
-{assessment.manager_name}
-        """
-        
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[assessment.candidate_email],
-            fail_silently=False,
+        # Queue email
+        renderer = get_email_renderer(assessment.business_id, 'resend')
+        subject, message = renderer.render(
+            assessment_email_context(assessment, assessment_url, assessment.business.name)
         )
         
+        # New link and its email are committed together
+        with transaction.atomic():
+            assessment.save()
+            enqueue_email(
+                subject=subject,
+                body=message,
+                to=[assessment.candidate_email],
+                assessment=assessment,
+                category='resend'
+            )
+        
         return JsonResponse({
             'message': f'Successfully resent assessment email to {assessment.candidate_email}'
         })
@@ -1866,7 +2149,10 @@ def handle_assessment(request, assessment_id):
             # Return assessment details including manager ids
             manager_ids = []
             if hasattr(assessment, 'managers'):
-                manager_ids = list(assessment.managers.filter(active=True).values_list('id', flat=True))
+                directory = get_manager_directory(assessment.business_id)
+                manager_ids = directory.active_ids(
+                    Assessment.managers.through.objects.filter(assessment=assessment).values_list('manager_id', flat=True)
+                )
             
             return JsonResponse({
                 'id': assessment.id,
@@ -1908,32 +2194,12 @@ def handle_assessment(request, assessment_id):
             # Update manager relationships if provided
             if 'manager_ids' in data and hasattr(assessment, 'managers'):
                 try:
-                    # Get business for this assessment
-                    business = assessment.business
-                    
-                    # Get managers for this business with the provided IDs
-                    manager_ids = [int(id) for id in data['manager_ids'] if id]
-                    
-                    # Get all default managers and make sure they're included
-                    default_manager_ids = list(Manager.objects.filter(
-                        business=business,
-                        active=True,
-                        is_default=True
-                    ).values_list('id', flat=True))
-                    
-                    # Ensure all default managers are included
-                    for default_id in default_manager_ids:
-                        if default_id not in manager_ids:
-                            manager_ids.append(default_id)
-                    
-                    managers = Manager.objects.filter(
-                        id__in=manager_ids,
-                        business=business,
-                        active=True
-                    )
+                    # Active managers of this business with the provided IDs, plus all defaults
+                    directory = get_manager_directory(assessment.business_id)
+                    manager_ids = directory.with_defaults(id for id in data['manager_ids'] if id)
                     
                     # Update the managers relationship
-                    assessment.managers.set(managers)
+                    assessment.managers.set(manager_ids)
                 except Exception as e:
                     # Log the error but continue (don't fail the whole request)
                     import traceback
@@ -2008,6 +2274,8 @@ def assessment_managers(request, assessment_id):
 #--admin manager
 @require_http_methods(["GET", "POST"])
 @user_passes_test(is_admin)
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=managers_etag)
 def manage_managers(request, business_id):
     """Handle listing and creating managers"""
     business = get_object_or_404(Business, id=business_id)
@@ -2128,6 +2396,8 @@ def manage_manager(request, manager_id):
 #--admin training material
 @require_http_methods(["GET", "POST"])
 @user_passes_test(is_admin)
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=training_materials_etag)
 def training_materials(request):
     """Get or create training materials (global, not business-specific)"""
     try:
@@ -2227,20 +2497,92 @@ def training_material_detail(request, material_id):
         return JsonResponse({'error': str(e)}, status=400)
 
 #hr views
+HR_DASHBOARD_PAGE_SIZE = 25
+
+def hr_dashboard_assessments(user):
+    """Standard assessments for an HR user's business (benchmarks are admin-only)"""
+    return Assessment.objects.filter(
+        business_id=user.business_id,
+        assessment_type='standard'
+    ).only(
+        'id', 'candidate_name', 'position', 'created_at', 'completed',
+        'first_accessed_at', 'completion_time_seconds', 'unique_link'
+    )
+
 @login_required
 @user_passes_test(is_hr_user)
 def dashboard(request):
-    """Dashboard view for HR users to see all assessments"""
-    # Changed from created_by=request.user to business=request.user.business
-    assessments = Assessment.objects.filter(
-        business=request.user.business,
-        assessment_type='standard'  # Only show standard assessments, not benchmarks
-    ).order_by('-created_at')
-    
+    """Dashboard view for HR users showing the first page of assessments"""
+    assessments = hr_dashboard_assessments(request.user)
+
+    # Status counts in one conditional aggregate query
+    counts = assessments.aggregate(**ASSESSMENT_STATUS_COUNTS)
+
+    page, next_cursor = keyset_page(assessments, limit=HR_DASHBOARD_PAGE_SIZE)
+
     return render(request, 'baseapp/dashboard.html', {
-        'assessments': assessments
+        'assessments': page,
+        'counts': counts,
+        'next_cursor': next_cursor
+    })
+
+@login_required
+@user_passes_test(is_hr_user)
+@require_http_methods(["GET"])
+async def dashboard_assessments(request):
+    """JSON endpoint returning the next page of dashboard rows as the HR user scrolls"""
+    page, next_cursor = await akeyset_page(
+        hr_dashboard_assessments(await request.auser()),
+        cursor=request.GET.get('cursor'),
+        limit=HR_DASHBOARD_PAGE_SIZE
+    )
+
+    rows_html = render_to_string(
+        'baseapp/includes/dashboard_assessment_rows.html',
+        {'assessments': page},
+        request=request
+    )
+
+    return JsonResponse({
+        'rows_html': rows_html,
+        'next_cursor': next_cursor,
+        'has_more': next_cursor is not None
     })
 
+@login_required
+@user_passes_test(is_hr_user)
+@require_http_methods(["POST"])
+def bulk_invite(request):
+    """Invite a roster of candidates from an uploaded CSV/XLSX file"""
+    uploaded_file = request.FILES.get('roster_file')
+    if not uploaded_file:
+        messages.error(request, 'Please choose a CSV or XLSX file to upload.')
+        return redirect('baseapp:dashboard')
+
+    try:
+        rows = read_roster(uploaded_file)
+    except RosterError as e:
+        messages.error(request, str(e))
+        return redirect('baseapp:dashboard')
+
+    candidates, errors = validate_roster(request.user.business, rows)
+    if errors:
+        # Show the first few problems; nothing is created until the file is clean
+        for error in errors[:10]:
+            messages.error(request, f"Row {error['row']}: {'; '.join(error['errors'])}")
+        if len(errors) > 10:
+            messages.error(request, f'...and {len(errors) - 10} more rows with problems.')
+        return redirect('baseapp:dashboard')
+
+    try:
+        assessments = invite_candidates(request.user.business, request.user, candidates, assessment_link_builder(request))
+        messages.success(request, f'{len(assessments)} assessments created and invitations queued.')
+    except Exception as e:
+        logger.error(f"Error bulk inviting candidates: {e}", exc_info=True)
+        messages.error(request, 'There was an error inviting the candidates. Please try again.')
+
+    return redirect('baseapp:dashboard')
+
 @login_required
 @user_passes_test(is_hr_user)
 def create_assessment(request):
@@ -2272,71 +2614,50 @@ def create_assessment(request):
                 assessment.manager_name = first_manager.name
                 assessment.manager_email = first_manager.email
             
-            # Save the assessment to get an ID
-            assessment.save()
-            
-            # Get all default managers for this business
-            default_managers = Manager.objects.filter(
-                business=request.user.business,
-                active=True,
-                is_default=True
-            )
-            
-            # Create a set of all manager IDs to avoid duplicates
-            manager_ids = set(manager.id for manager in selected_managers)
+            # The assessment and its invitation commit together
+            with transaction.atomic():
+                # Save the assessment to get an ID
+                assessment.save()
             
-            # Add default managers if they're not already included
-            for default_manager in default_managers:
-                manager_ids.add(default_manager.id)
+                # Selected managers plus all default managers for this business
+                directory = get_manager_directory(assessment.business_id)
+                manager_ids = directory.with_defaults(manager.id for manager in selected_managers)
             
-            # If primary manager is not in the set, add it
-            if primary_manager and primary_manager.id not in manager_ids:
-                manager_ids.add(primary_manager.id)
+                # If primary manager is not in the list, add it
+                if primary_manager and primary_manager.id not in manager_ids:
+                    manager_ids.append(primary_manager.id)
             
-            # Set all managers explicitly, bypassing form.save_m2m()
-            if manager_ids:
-                managers = Manager.objects.filter(id__in=manager_ids)
-                assessment.managers.set(managers)
+                # Set all managers explicitly, bypassing form.save_m2m()
+                if manager_ids:
+                    assessment.managers.add(*manager_ids)
             
-            # Generate a secure unique link
-            assessment.unique_link = generate_secure_token(
-                entity_id=assessment.id,
-                token_type='assessment',
-                length=16
-            )
-            assessment.save(update_fields=['unique_link'])
+                # Generate a secure unique link
+                assessment.unique_link = generate_secure_token(
+                    entity_id=assessment.id,
+                    token_type='assessment',
+                    length=16
+                )
+                assessment.save(update_fields=['unique_link'])
             
-            # Generate assessment link
-            assessment_link = request.build_absolute_uri(
-                reverse('baseapp:take_assessment', args=[assessment.unique_link])
-            )
+                # Generate assessment link
+                assessment_link = request.build_absolute_uri(
+                    reverse('baseapp:take_assessment', args=[assessment.unique_link])
+                )
             
-            # Send email to candidate
-            try:
-                subject = 'Assessment Invitation'
-                message = f'''Dear {assessment.candidate_name},
-
-You have been invited to complete an assessment for the position of {assessment.position}.
-Please click the following link to complete your assessment:
-
-{assessment_link}
-
-This link is unique to you and can only be used once.
-
-Best regards,
-{assessment.manager_name}'''
+                # Queue email to candidate
+                renderer = get_email_renderer(assessment.business_id, 'standard')
+                subject, message = renderer.render(
+                    assessment_email_context(assessment, assessment_link, assessment.business.name)
+                )
                 
-                email = EmailMessage(
-                    subject,
-                    message,
-                    settings.DEFAULT_FROM_EMAIL,
-                    [assessment.candidate_email]
+                enqueue_email(
+                    subject=subject,
+                    body=message,
+                    to=[assessment.candidate_email],
+                    assessment=assessment,
+                    category='invitation'
                 )
-                email.send()
-                messages.success(request, 'Assessment created and invitation sent successfully!')
-            except Exception as e:
-                messages.error(request, 'Failed to send invitation email. Please try again.')
-                print(f"Email error: {e}")
+            messages.success(request, 'Assessment created and invitation sent successfully!')
             
             return redirect('baseapp:dashboard')
     else:
@@ -2370,7 +2691,6 @@ def resend_assessment(request, assessment_id):
             token_type='assessment',
             length=16
         )
-        assessment.save()
         
         # Generate the full assessment URL
         assessment_url = request.build_absolute_uri(
@@ -2378,30 +2698,22 @@ def resend_assessment(request, assessment_id):
         )
         
         # Email content
-        subject = f'Front-Line Worker Assessment for {assessment.position}'
-        message = f"""
-Hello {assessment.candidate_name},
-
-You have been invited to complete an assessment for the {assessment.position} position.
-
-Please click the following link to complete your assessment:
-{assessment_url}
-
-This is a new link for your assessment. Any previous links sent will no longer work.
-
-Best regards,
-{assessment.manager_name}
-        """
-        
-        # Send email
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[assessment.candidate_email],
-            fail_silently=False,
+        renderer = get_email_renderer(assessment.business_id, 'resend')
+        subject, message = renderer.render(
+            assessment_email_context(assessment, assessment_url, assessment.business.name)
         )
         
+        # Queue email together with the new link
+        with transaction.atomic():
+            assessment.save()
+            enqueue_email(
+                subject=subject,
+                body=message,
+                to=[assessment.candidate_email],
+                assessment=assessment,
+                category='resend'
+            )
+        
         # Add success message
         messages.success(
             request, 
@@ -2410,7 +2722,7 @@ Best regards,
         
     except Exception as e:
         # Log the error
-        print(f"Error resending assessment {assessment_id}: {str(e)}")
+        logger.error(f"Error resending assessment {assessment_id}: {str(e)}")
         # Add error message
         messages.error(
             request, 
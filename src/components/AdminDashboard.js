@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import BenchmarkSection from './BenchmarkSection';
 import AssessmentSection from './AssessmentSection';
 import QuestionPairManager from './QuestionPairManager';
@@ -7,6 +7,8 @@ import ModuleVisibilityMenu from './ModuleVisibilityMenu';
 import { ChevronRight, Upload, Menu, X } from 'lucide-react';
 import AdminNavbar from './AdminNavbar';
 import TrainingMaterialsManager from './TrainingMaterialsManager';
+import conditionalFetch from '../utils/conditionalFetch';
+import { fetchChangeCursor, fetchChanges, applyChanges } from '../utils/changeFeed';
 
 const AdminDashboard = () => {
   const [isMobileSidebarOpen, setIsMobileSidebarOpen] = useState(false);
@@ -44,6 +46,8 @@ const AdminDashboard = () => {
     is_default: false
   });
   const [managers, setManagers] = useState([]);
+  // Change feed cursor taken before the last full load of the selected business
+  const changeCursor = useRef(null);
   const [moduleVisibility, setModuleVisibility] = useState({
     sidebarModule: true,
     hrUsersModule: true,
@@ -112,7 +116,7 @@ const AdminDashboard = () => {
 
   const refreshBusinessData = async () => {
     if (selectedBusiness) {
-      await fetchBusinessDetails(selectedBusiness.id);
+      await syncChanges();
     }
   };
 
@@ -155,7 +159,7 @@ const AdminDashboard = () => {
       const data = await response.json();
       
       // Fully refresh the business data after successful upload
-      await fetchBusinessDetails(selectedBusiness.id);
+      await syncChanges();
       
       setSuccess('Logo uploaded successfully');
       setTimeout(() => setSuccess(null), 3000);
@@ -170,7 +174,8 @@ const AdminDashboard = () => {
   const fetchBusinessDetails = async (businessId) => {
     try {
       setLoading(true);
-      const response = await fetch(`/api/businesses/${businessId}/details/`);
+      changeCursor.current = await fetchChangeCursor(businessId);
+      const response = await conditionalFetch(`/api/businesses/${businessId}/details/`);
       if (!response.ok) throw new Error('Failed to fetch business details');
       const data = await response.json();
       
@@ -181,7 +186,7 @@ const AdminDashboard = () => {
       setBusinessDetails(data);
       
       // Also refresh managers
-      await fetchManagers();
+      await fetchManagers(businessId);
     } catch (err) {
       setError(err.message);
     } finally {
@@ -190,11 +195,11 @@ const AdminDashboard = () => {
   };
 
   // Fetch managers for the selected business
-  const fetchManagers = async () => {
-    if (!selectedBusiness) return;
+  const fetchManagers = async (businessId = selectedBusiness?.id) => {
+    if (!businessId) return;
     
     try {
-      const response = await fetch(`/api/businesses/${selectedBusiness.id}/managers/`);
+      const response = await conditionalFetch(`/api/businesses/${businessId}/managers/`);
       if (!response.ok) throw new Error('Failed to fetch managers');
       const data = await response.json();
       setManagers(data.managers || []);
@@ -203,11 +208,70 @@ const AdminDashboard = () => {
     }
   };
 
+  // Patch local state with the records changed since the last sync instead of
+  // reloading the whole business after every edit
+  const syncChanges = async () => {
+    if (!selectedBusiness) return;
+
+    if (changeCursor.current === null) {
+      await fetchBusinessDetails(selectedBusiness.id);
+      return;
+    }
+
+    try {
+      let data;
+      do {
+        data = await fetchChanges(
+          selectedBusiness.id,
+          changeCursor.current,
+          ['businesses', 'hr_users', 'managers', 'question_pairs']
+        );
+        const { changes } = data;
+
+        // Cursor expired or a bulk change happened: fall back to a full reload
+        if (data.reset || changes.hr_users?.reset || changes.question_pairs?.reset) {
+          await fetchBusinessDetails(selectedBusiness.id);
+          return;
+        }
+
+        if (changes.businesses) {
+          setBusinesses(prev => applyChanges(prev, changes.businesses));
+          const updatedBusiness = changes.businesses.upserted.find(b => b.id === selectedBusiness.id);
+          if (updatedBusiness) {
+            setBusinessDetails(prev => ({
+              ...prev,
+              business: { ...prev.business, ...updatedBusiness }
+            }));
+          }
+        }
+
+        if (changes.hr_users || changes.question_pairs) {
+          setBusinessDetails(prev => ({
+            ...prev,
+            hr_users: applyChanges(prev.hr_users, changes.hr_users),
+            question_pairs: applyChanges(prev.question_pairs, changes.question_pairs)
+          }));
+        }
+
+        if (changes.managers?.reset) {
+          await fetchManagers();
+        } else if (changes.managers) {
+          setManagers(prev => applyChanges(prev, changes.managers));
+        }
+
+        changeCursor.current = data.cursor;
+      } while (data.has_more);
+    } catch (err) {
+      setError(err.message);
+    }
+  };
+
   // Handle business selection
   const handleBusinessSelect = async (business) => {
     try {
       setLoading(true);
-      const response = await fetch(`/api/businesses/${business.id}/details/`);
+      changeCursor.current = await fetchChangeCursor(business.id);
+      const response = await conditionalFetch(`/api/businesses/${business.id}/details/`);
       if (!response.ok) throw new Error('Failed to fetch business details');
       const data = await response.json();
       
@@ -326,7 +390,7 @@ const AdminDashboard = () => {
       }
 
       // Refresh business details to show new HR user
-      await fetchBusinessDetails(selectedBusiness.id);
+      await syncChanges();
       
       // Close the modal
       setShowAddHRUserModal(false);
@@ -396,11 +460,11 @@ const AdminDashboard = () => {
     const file = event.target.files[0];
     if (!file) return;
 
-    const formData = new FormData();
-    formData.append('file', file);
+    const uploadTemplate = async (dryRun) => {
+      const formData = new FormData();
+      formData.append('file', file);
+      if (dryRun) formData.append('dry_run', '1');
 
-    try {
-      setLoading(true);
       const response = await fetch(`/api/businesses/${selectedBusiness.id}/upload-template/`, {
         method: 'POST',
         headers: {
@@ -408,14 +472,37 @@ const AdminDashboard = () => {
         },
         body: formData
       });
+      const data = await response.json();
 
       if (!response.ok) {
-        const errorData = await response.json();
-        throw new Error(errorData.error || 'Failed to upload assessment template');
+        throw new Error(data.error || 'Failed to upload assessment template');
       }
+      return data;
+    };
+
+    try {
+      setLoading(true);
+
+      // Validate first and show what the import would change
+      const preview = await uploadTemplate(true);
+      if (preview.row_errors.length > 0) {
+        const details = preview.row_errors.slice(0, 5)
+          .map(rowError => `Row ${rowError.row}: ${rowError.errors.join(', ')}`)
+          .join('\n');
+        throw new Error(`${preview.row_errors.length} rows have problems; nothing was imported\n${details}`);
+      }
+
+      const summary = [
+        `${preview.new_pairs} new question pairs`,
+        `${preview.new_attributes.length} new attributes`,
+        `${preview.existing_pairs} already imported`
+      ].join(', ');
+      if (!window.confirm(`Import ${summary}?`)) return;
+
+      await uploadTemplate(false);
 
       // Refresh business details
-      await fetchBusinessDetails(selectedBusiness.id);
+      await syncChanges();
       
       // Show success message
       setSuccess('Assessment template uploaded successfully');
@@ -465,7 +552,7 @@ const AdminDashboard = () => {
       }
 
       // Refresh managers list
-      await fetchManagers();
+      await syncChanges();
       
       // Close the modal
       setShowAddManagerModal(false);
@@ -503,7 +590,7 @@ const AdminDashboard = () => {
       if (!response.ok) throw new Error('Failed to delete manager');
       
       // Refresh managers list
-      await fetchManagers();
+      await syncChanges();
       setSuccess('Manager deleted successfully');
       setTimeout(() => setSuccess(null), 3000);
     } catch (err) {
@@ -534,7 +621,7 @@ const AdminDashboard = () => {
       if (!response.ok) throw new Error('Failed to update manager');
       
       // Refresh managers list
-      await fetchManagers();
+      await syncChanges();
       
       // Close the modal
       setShowEditManagerModal(false);
@@ -812,7 +899,7 @@ const AdminDashboard = () => {
                                     if (!response.ok) throw new Error('Failed to delete HR user');
                                     
                                     // Refresh business details
-                                    await fetchBusinessDetails(selectedBusiness.id);
+                                    await syncChanges();
                                     
                                     setSuccess('HR user deleted successfully');
                                     setTimeout(() => setSuccess(null), 3000);
@@ -834,7 +921,7 @@ const AdminDashboard = () => {
                                     if (!response.ok) throw new Error('Failed to update HR user');
                                     
                                     // Refresh business details
-                                    await fetchBusinessDetails(selectedBusiness.id);
+                                    await syncChanges();
                                     
                                     setSuccess('HR user updated successfully');
                                     setTimeout(() => setSuccess(null), 3000);
@@ -899,7 +986,7 @@ const AdminDashboard = () => {
                                   if (!response.ok) throw new Error('Failed to delete question pair');
                                   
                                   // Refresh business details
-                                  await fetchBusinessDetails(selectedBusiness.id);
+                                  await syncChanges();
                                   
                                   setSuccess('Question pair deleted successfully');
                                   setTimeout(() => setSuccess(null), 3000);
@@ -921,7 +1008,7 @@ const AdminDashboard = () => {
                                   if (!response.ok) throw new Error('Failed to update question pair');
                                   
                                   // Refresh business details
-                                  await fetchBusinessDetails(selectedBusiness.id);
+                                  await syncChanges();
                                   
                                   setSuccess('Question pair updated successfully');
                                   setTimeout(() => setSuccess(null), 3000);
@@ -1,5 +1,7 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { FileText, Copy, Mail, X, Download, Pencil, Trash2, ChevronDown, Clock, Eye } from 'lucide-react';
+import conditionalFetch from '../utils/conditionalFetch';
+import { fetchChangeCursor, fetchChanges, applyChanges } from '../utils/changeFeed';
 
 const AssessmentSection = ({ businessDetails }) => {
   const [assessments, setAssessments] = useState([]);
@@ -21,6 +23,12 @@ const AssessmentSection = ({ businessDetails }) => {
     date: false,
     status: false
   });
+  const [search, setSearch] = useState('');
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [totalCount, setTotalCount] = useState(0);
+  // Change feed cursor taken before the first page was loaded
+  const changeCursor = useRef(null);
   const [newAssessment, setNewAssessment] = useState({
   candidate_name: '',
   candidate_email: '',
@@ -44,6 +52,8 @@ const AssessmentSection = ({ businessDetails }) => {
   const [showResendModal, setShowResendModal] = useState(false);
   const [selectedAssessment, setSelectedAssessment] = useState(null);
   const [managers, setManagers] = useState([]);
+  const [inviting, setInviting] = useState(false);
+  const rosterInput = useRef(null);
 
   // Get CSRF token
   const getCsrfToken = () => {
@@ -53,24 +63,127 @@ const AssessmentSection = ({ businessDetails }) => {
 
   useEffect(() => {
     if (businessDetails?.business?.id) {
-      fetchAssessments();
       fetchManagers();
     }
   }, [businessDetails?.business?.id]);
 
-  const fetchAssessments = async () => {
-    setLoading(true);
+  // Filtering happens server-side, so refetch the first page whenever a filter changes
+  useEffect(() => {
+    if (!businessDetails?.business?.id) return;
+    const timer = setTimeout(() => fetchAssessments(), search ? 300 : 0);
+    return () => clearTimeout(timer);
+  }, [businessDetails?.business?.id, filters, activeFilters, search]);
+
+  const hasActiveFilters = () => (
+    (activeFilters.date && (filters.dateRange.start || filters.dateRange.end)) ||
+    (activeFilters.status && filters.status !== 'all') ||
+    search.trim() !== ''
+  );
+
+  const buildAssessmentQuery = (cursor) => {
+    // Only standard assessments are listed here; benchmarks live in BenchmarkSection
+    const params = new URLSearchParams({ type: 'standard' });
+    if (activeFilters.date) {
+      if (filters.dateRange.start) params.set('date_from', filters.dateRange.start);
+      if (filters.dateRange.end) params.set('date_to', filters.dateRange.end);
+    }
+    if (activeFilters.status && filters.status !== 'all') {
+      params.set('status', filters.status);
+    }
+    if (search.trim()) params.set('q', search.trim());
+    if (cursor) params.set('cursor', cursor);
+    return params.toString();
+  };
+
+  const fetchAssessments = async (cursor = null) => {
+    if (cursor) {
+      setLoadingMore(true);
+    } else {
+      setLoading(true);
+    }
     try {
-      const response = await fetch(`/api/businesses/${businessDetails.business.id}/assessments/`);
+      if (!cursor) {
+        changeCursor.current = await fetchChangeCursor(businessDetails.business.id);
+      }
+      const response = await fetch(
+        `/api/businesses/${businessDetails.business.id}/assessments/?${buildAssessmentQuery(cursor)}`
+      );
       if (!response.ok) throw new Error('Failed to fetch assessments');
       const data = await response.json();
-      // Filter out benchmark assessments
-      const standardAssessments = data.assessments.filter(a => a.assessment_type === 'standard');
-      setAssessments(standardAssessments);
+      setAssessments(prev => cursor ? [...prev, ...data.assessments] : data.assessments);
+      setNextCursor(data.next_cursor);
+      setTotalCount(data.counts.total);
     } catch (err) {
       setError(err.message);
     } finally {
       setLoading(false);
+      setLoadingMore(false);
+    }
+  };
+
+  // Patch the loaded rows with assessments changed since the last sync instead of
+  // reloading the list. New rows are left to the next full load so filters still apply.
+  const syncAssessments = async () => {
+    if (changeCursor.current === null) {
+      await fetchAssessments();
+      return;
+    }
+
+    try {
+      let data;
+      do {
+        data = await fetchChanges(businessDetails.business.id, changeCursor.current, ['assessments']);
+        const change = data.changes.assessments;
+
+        if (data.reset || change?.reset) {
+          await fetchAssessments();
+          return;
+        }
+
+        if (change) {
+          const removed = assessments.filter(a => change.deleted.includes(a.id)).length;
+          setAssessments(prev => applyChanges(prev, change, { insert: false }));
+          setTotalCount(prev => prev - removed);
+        }
+        changeCursor.current = data.cursor;
+      } while (data.has_more);
+    } catch (err) {
+      setError(err.message);
+    }
+  };
+
+  // Create assessments for a whole CSV/XLSX roster in one request
+  const handleRosterUpload = async (event) => {
+    const file = event.target.files[0];
+    event.target.value = '';
+    if (!file) return;
+
+    setInviting(true);
+    setError(null);
+    try {
+      const formData = new FormData();
+      formData.append('file', file);
+
+      const response = await fetch(`/api/businesses/${businessDetails.business.id}/bulk-invite/`, {
+        method: 'POST',
+        headers: { 'X-CSRFToken': getCsrfToken() },
+        body: formData
+      });
+      const data = await response.json();
+
+      if (!response.ok) {
+        const rowErrors = (data.row_errors || [])
+          .slice(0, 5)
+          .map(item => `Row ${item.row}: ${item.errors.join('; ')}`);
+        throw new Error([data.error || 'Failed to invite candidates', ...rowErrors].join('\n'));
+      }
+
+      setSuccess(data.message);
+      await fetchAssessments();
+    } catch (err) {
+      setError(err.message);
+    } finally {
+      setInviting(false);
     }
   };
 
@@ -78,7 +191,7 @@ const AssessmentSection = ({ businessDetails }) => {
   if (!businessDetails?.business?.id) return;
   
   try {
-    const response = await fetch(`/api/businesses/${businessDetails.business.id}/managers/`);
+    const response = await conditionalFetch(`/api/businesses/${businessDetails.business.id}/managers/`);
     if (!response.ok) throw new Error('Failed to fetch managers');
     const data = await response.json();
     setManagers(data.managers);
@@ -132,7 +245,7 @@ const AssessmentSection = ({ businessDetails }) => {
       
       if (!response.ok) throw new Error('Failed to resend assessment');
       
-      await fetchAssessments();
+      await syncAssessments();
       setShowResendModal(false);
       alert('Assessment has been resent successfully!');
     } catch (err) {
@@ -159,7 +272,7 @@ const AssessmentSection = ({ businessDetails }) => {
 
     if (!response.ok) throw new Error('Failed to update assessment');
 
-    await fetchAssessments();
+    await syncAssessments();
     setShowEditModal(false);
     setSelectedAssessment(null);
     setSuccess('Assessment updated successfully!');
@@ -180,7 +293,7 @@ const AssessmentSection = ({ businessDetails }) => {
 
       if (!response.ok) throw new Error('Failed to delete assessment');
 
-      await fetchAssessments();
+      await syncAssessments();
       setShowDeleteModal(false);
       setSelectedAssessment(null);
       //alert('Assessment deleted successfully!');
@@ -225,34 +338,6 @@ const AssessmentSection = ({ businessDetails }) => {
     }
   };
 
-  const getFilteredAssessments = () => {
-    return assessments.filter(assessment => {
-      // Date filter
-      if (activeFilters.date && filters.dateRange.start && filters.dateRange.end) {
-        const assessmentDate = new Date(assessment.created_at);
-        const startDate = new Date(filters.dateRange.start);
-        const endDate = new Date(filters.dateRange.end);
-        endDate.setHours(23, 59, 59);
-        
-        if (assessmentDate < startDate || assessmentDate > endDate) {
-          return false;
-        }
-      }
-
-      // Status filter
-      if (activeFilters.status && filters.status !== 'all') {
-        if (filters.status === 'completed' && !assessment.completed) {
-          return false;
-        }
-        if (filters.status === 'pending' && assessment.completed) {
-          return false;
-        }
-      }
-
-      return true;
-    });
-  };
-
   const isMobileDevice = () => {
     return /Android|webOS|iPhone|iPad|iPod|BlackBerry|IEMobile|Opera Mini/i.test(navigator.userAgent) || 
            window.innerWidth <= 768;
@@ -263,12 +348,29 @@ const AssessmentSection = ({ businessDetails }) => {
       {/* Header section */}
       <div className="flex justify-between items-center mb-6">
         <h3 className="text-xl font-semibold">Assessments</h3>
-        <button
-          onClick={() => setShowCreateModal(true)}
-          className="px-4 py-2 bg-blue-500 text-white rounded hover:bg-blue-600 inline-flex items-center"
-        >
-          Create New Assessment
-        </button>
+        <div className="flex gap-2">
+          <input
+            ref={rosterInput}
+            type="file"
+            accept=".csv,.xlsx"
+            onChange={handleRosterUpload}
+            className="hidden"
+          />
+          <button
+            onClick={() => rosterInput.current?.click()}
+            disabled={inviting}
+            title="Columns: candidate_name, candidate_email, position, region (optional manager_email, manager_name)"
+            className="px-4 py-2 border border-blue-500 text-blue-600 rounded hover:bg-blue-50 inline-flex items-center disabled:opacity-50"
+          >
+            {inviting ? 'Inviting...' : 'Bulk Invite'}
+          </button>
+          <button
+            onClick={() => setShowCreateModal(true)}
+            className="px-4 py-2 bg-blue-500 text-white rounded hover:bg-blue-600 inline-flex items-center"
+          >
+            Create New Assessment
+          </button>
+        </div>
       </div>
 
       {/* Filters Section */}
@@ -288,6 +390,7 @@ const AssessmentSection = ({ businessDetails }) => {
                   status: 'all'
                 });
                 setActiveFilters({ date: false, status: false });
+                setSearch('');
               }}
               className="text-sm text-gray-600 hover:text-gray-800"
             >
@@ -298,6 +401,19 @@ const AssessmentSection = ({ businessDetails }) => {
 
         {showFilters && (
           <div className="bg-white p-4 rounded-lg shadow-sm space-y-4">
+            {/* Search */}
+            <div>
+              <label className="block text-sm font-medium text-gray-700 mb-2">
+                Search by Name or Email
+              </label>
+              <input
+                type="text"
+                value={search}
+                onChange={(e) => setSearch(e.target.value)}
+                placeholder="Search candidates..."
+                className="w-full p-2 border rounded text-sm"
+              />
+            </div>
             <div className="flex flex-col md:flex-row items-start space-y-4 md:space-y-0 md:space-x-6">
               {/* Date Filter */}
               <div className="w-full md:flex-1">
@@ -392,12 +508,12 @@ const AssessmentSection = ({ businessDetails }) => {
           <div className="w-8 h-8 md:w-12 md:h-12 animate-spin mx-auto border-4 border-blue-500 border-t-transparent rounded-full" />
           <p className="mt-4 text-sm md:text-base text-gray-500">Loading assessments...</p>
         </div>
-      ) : getFilteredAssessments().length > 0 ? (
+      ) : assessments.length > 0 ? (
         // Assessment responsive layout
         <div className="bg-white rounded-lg shadow overflow-hidden">
           {/* Mobile Card View */}
           <div className="md:hidden">
-            {getFilteredAssessments().map((assessment) => (
+            {assessments.map((assessment) => (
               <div key={assessment.id} className="border-b p-4 last:border-b-0">
                 <div className="space-y-3">
                   {/* Header with status */}
@@ -580,7 +696,7 @@ const AssessmentSection = ({ businessDetails }) => {
                 </tr>
               </thead>
               <tbody>
-                {getFilteredAssessments().map((assessment) => (
+                {assessments.map((assessment) => (
                   <tr key={assessment.id} className="border-t hover:bg-gray-50">
                     <td className="px-4 py-3">
                       <div>
@@ -662,6 +778,22 @@ const AssessmentSection = ({ businessDetails }) => {
               </tbody>
             </table>
           </div>
+
+          {/* Pagination */}
+          <div className="flex flex-col sm:flex-row items-center justify-between gap-2 px-4 py-3 border-t bg-gray-50">
+            <span className="text-sm text-gray-500">
+              Showing {assessments.length} of {totalCount} assessments
+            </span>
+            {nextCursor && (
+              <button
+                onClick={() => fetchAssessments(nextCursor)}
+                disabled={loadingMore}
+                className="px-4 py-2 text-sm bg-white border rounded hover:bg-gray-100 disabled:opacity-50"
+              >
+                {loadingMore ? 'Loading...' : 'Load More'}
+              </button>
+            )}
+          </div>
         </div>
       ) : (
         // Empty states
@@ -670,16 +802,16 @@ const AssessmentSection = ({ businessDetails }) => {
             <FileText className="w-12 h-12 md:w-16 md:h-16 mx-auto text-gray-300" />
           </div>
           <h3 className="text-lg md:text-xl font-medium mb-2">
-            {assessments.length > 0 
+            {hasActiveFilters()
               ? 'No assessments match the selected filters'
               : 'No assessments found'}
           </h3>
           <p className="text-sm md:text-base text-gray-400 mb-4">
-            {assessments.length > 0 
+            {hasActiveFilters()
               ? 'Try adjusting your filters or clearing them to see more results.'
               : 'Create your first assessment to get started with candidate evaluations.'}
           </p>
-          {assessments.length === 0 && (
+          {!hasActiveFilters() && (
             <button
               onClick={() => setShowCreateModal(true)}
               className="inline-flex items-center px-4 py-2 bg-blue-500 text-white rounded hover:bg-blue-600 text-sm md:text-base"
@@ -1395,7 +1527,7 @@ const AssessmentSection = ({ businessDetails }) => {
         <div className="fixed inset-0 bg-black bg-opacity-50 flex items-center justify-center z-50 p-4">
           <div className="bg-white p-4 md:p-6 rounded-lg w-full max-w-md md:max-w-2xl max-h-[90vh] overflow-y-auto">
             <h3 className="text-lg font-semibold text-red-600 mb-2">Error</h3>
-            <p className="text-gray-700 mb-4">{error}</p>
+            <p className="text-gray-700 mb-4 whitespace-pre-line">{error}</p>
             <button
               onClick={() => setError(null)}
               className="px-4 py-2 bg-blue-500 text-white rounded hover:bg-blue-600"
@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, Legend } from 'recharts';
 import Papa from 'papaparse';
 import { Send, RefreshCw, Edit, Trash2, Mail } from 'lucide-react';
+import conditionalFetch from '../utils/conditionalFetch';
 
 const BenchmarkSection = ({ businessDetails }) => {
   const [activeTab, setActiveTab] = useState('template');
@@ -16,6 +17,8 @@ const BenchmarkSection = ({ businessDetails }) => {
   const [showEditModal, setShowEditModal] = useState(false);
   const [currentEmail, setCurrentEmail] = useState(null);
   const [showDeleteConfirmation, setShowDeleteConfirmation] = useState(false);
+  const [selectedEmails, setSelectedEmails] = useState([]);
+  const [bulkRegion, setBulkRegion] = useState('');
   const [emailTemplate, setEmailTemplate] = useState({
     subject: 'Benchmark Assessment for {{business_name}}',
     body: `Hello {{candidate_name}},
@@ -118,10 +121,14 @@ Best regards,
   // Fetch current benchmark emails and their status
   const fetchBenchmarkEmails = async () => {
     try {
-      const response = await fetch(`/api/businesses/${businessDetails.business.id}/benchmark-emails/`);
+      const response = await conditionalFetch(`/api/businesses/${businessDetails.business.id}/benchmark-emails/`);
       if (!response.ok) throw new Error('Failed to fetch benchmark emails');
       const data = await response.json();
       setBenchmarkEmails(data.emails);
+
+      // Drop selections for addresses that are no longer on the roster
+      const current = new Set(data.emails.map(item => item.email));
+      setSelectedEmails(prev => prev.filter(email => current.has(email)));
       
       // Extract unique regions
       const uniqueRegions = ['all', ...new Set(data.emails.map(item => item.region))];
@@ -166,7 +173,8 @@ Best regards,
                 'Content-Type': 'application/json',
                 'X-CSRFToken': getCsrfToken(),
               },
-              body: JSON.stringify({ emails: emailData })
+              // Upsert so a re-uploaded roster updates regions in the same request
+              body: JSON.stringify({ emails: emailData, upsert: true })
             });
 
             if (!response.ok) {
@@ -244,6 +252,53 @@ Best regards,
     }
   };
 
+  // Poll the outbox until queued invitations are delivered, then report failures
+  const watchDelivery = async (queued, attempts = 40) => {
+    const ids = queued.map(item => item.outbox_id).join(',');
+    for (let attempt = 0; attempt < attempts; attempt++) {
+      await new Promise(resolve => setTimeout(resolve, 3000));
+      const response = await fetch(`/api/businesses/${businessDetails.business.id}/outbox-status/?ids=${ids}`);
+      if (!response.ok) return;
+
+      const data = await response.json();
+      if (data.pending === 0) {
+        const failed = data.messages.filter(item => item.status === 'failed');
+        if (failed.length > 0) {
+          setError(`Failed to send to: ${failed.map(item => item.to.join(', ')).join(', ')}`);
+        }
+        return;
+      }
+    }
+  };
+
+  // Send invitations to many participants in one request
+  const handleBulkSend = async (payload) => {
+    setIsLoading(true);
+    try {
+      const response = await fetch(`/api/businesses/${businessDetails.business.id}/send-benchmark-emails/`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          'X-CSRFToken': getCsrfToken(),
+        },
+        body: JSON.stringify({ ...payload, useTemplate: true })
+      });
+
+      const data = await response.json();
+      if (!response.ok) throw new Error(data.error || 'Failed to send benchmark emails');
+
+      setSelectedEmails([]);
+      await fetchBenchmarkEmails();
+      if (data.queued.length > 0) {
+        watchDelivery(data.queued);
+      }
+    } catch (error) {
+      setError(error.message);
+    } finally {
+      setIsLoading(false);
+    }
+  };
+
   // Delete benchmark email
   const handleDeleteEmail = async () => {
     if (!currentEmail) return;
@@ -268,6 +323,83 @@ Best regards,
     }
   };
 
+  // Bulk selection
+  const toggleEmailSelection = (email) => {
+    setSelectedEmails(prev =>
+      prev.includes(email) ? prev.filter(item => item !== email) : [...prev, email]
+    );
+  };
+
+  const toggleSelectAll = () => {
+    setSelectedEmails(prev =>
+      prev.length === benchmarkEmails.length ? [] : benchmarkEmails.map(item => item.email)
+    );
+  };
+
+  // Delete all selected emails in one request
+  const handleBulkDelete = async () => {
+    if (selectedEmails.length === 0) return;
+    if (!window.confirm(`Delete ${selectedEmails.length} benchmark emails? Completed assessments will be removed as well.`)) return;
+
+    setIsLoading(true);
+    try {
+      const response = await fetch(`/api/businesses/${businessDetails.business.id}/bulk-delete-benchmark-emails/`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          'X-CSRFToken': getCsrfToken(),
+        },
+        body: JSON.stringify({ emails: selectedEmails })
+      });
+
+      if (!response.ok) {
+        const errorData = await response.json();
+        throw new Error(errorData.error || 'Failed to delete benchmark emails');
+      }
+
+      setSelectedEmails([]);
+      await fetchBenchmarkEmails();
+    } catch (error) {
+      setError(error.message);
+    } finally {
+      setIsLoading(false);
+    }
+  };
+
+  // Move all selected emails to another region in one request
+  const handleBulkRegionUpdate = async (e) => {
+    e.preventDefault();
+    if (selectedEmails.length === 0 || !bulkRegion.trim()) return;
+
+    setIsLoading(true);
+    try {
+      const response = await fetch(`/api/businesses/${businessDetails.business.id}/bulk-update-benchmark-region/`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          'X-CSRFToken': getCsrfToken(),
+        },
+        body: JSON.stringify({ emails: selectedEmails, region: bulkRegion.trim() })
+      });
+
+      if (!response.ok) {
+        const errorData = await response.json();
+        throw new Error(errorData.error || 'Failed to update regions');
+      }
+
+      setBulkRegion('');
+      setSelectedEmails([]);
+      await fetchBenchmarkEmails();
+    } catch (error) {
+      setError(error.message);
+    } finally {
+      setIsLoading(false);
+    }
+  };
+
+  // Set lookup keeps the row checkboxes linear on large rosters
+  const selectedEmailSet = new Set(selectedEmails);
+
   // Edit benchmark email
   const handleEditEmail = async (e) => {
     e.preventDefault();
@@ -401,6 +533,9 @@ Best regards,
               <p className="text-sm text-gray-500">
                 CSV should include email and region columns
               </p>
+              <a href="/manage/benchmark-batches/create/" className="text-sm text-blue-600 hover:underline">
+                Large roster? Upload it as a batch file
+              </a>
             </div>
           </div>
   
@@ -436,7 +571,19 @@ Best regards,
   
           {/* Email List - Mobile Responsive */}
           <div>
-            <h3 className="text-lg font-semibold mb-3">Benchmark Emails</h3>
+            <div className="flex justify-between items-center mb-3">
+              <h3 className="text-lg font-semibold">Benchmark Emails</h3>
+              {benchmarkEmails.some(item => !item.sent && !item.completed) && (
+                <button
+                  onClick={() => handleBulkSend({ filter: 'unsent' })}
+                  disabled={isLoading}
+                  className="inline-flex items-center px-3 py-2 rounded text-sm font-medium text-white bg-blue-500 hover:bg-blue-600 disabled:opacity-50"
+                >
+                  <Send className="w-4 h-4 mr-1" />
+                  Send All Unsent
+                </button>
+              )}
+            </div>
             
             {benchmarkEmails.length === 0 ? (
               <div className="text-center text-gray-500 py-8">
@@ -446,6 +593,45 @@ Best regards,
               </div>
             ) : (
               <div className="bg-white rounded-lg shadow overflow-hidden">
+                {/* Bulk Actions */}
+                {selectedEmails.length > 0 && (
+                  <div className="flex flex-col md:flex-row md:items-center gap-2 p-3 bg-blue-50 border-b">
+                    <span className="text-sm font-medium">{selectedEmails.length} selected</span>
+                    <form onSubmit={handleBulkRegionUpdate} className="flex gap-2 md:ml-auto">
+                      <input
+                        type="text"
+                        value={bulkRegion}
+                        onChange={(e) => setBulkRegion(e.target.value)}
+                        placeholder="New region"
+                        className="px-3 py-1 border rounded text-sm"
+                      />
+                      <button
+                        type="submit"
+                        disabled={isLoading || !bulkRegion.trim()}
+                        className="px-3 py-1 rounded text-sm font-medium text-white bg-blue-500 hover:bg-blue-600 disabled:opacity-50"
+                      >
+                        Move
+                      </button>
+                    </form>
+                    <button
+                      onClick={() => handleBulkSend({ emails: selectedEmails })}
+                      disabled={isLoading}
+                      className="inline-flex items-center justify-center px-3 py-1 rounded text-sm font-medium text-white bg-blue-500 hover:bg-blue-600 disabled:opacity-50"
+                    >
+                      <Send className="w-4 h-4 mr-1" />
+                      Send Selected
+                    </button>
+                    <button
+                      onClick={handleBulkDelete}
+                      disabled={isLoading}
+                      className="inline-flex items-center justify-center px-3 py-1 rounded text-sm font-medium text-red-600 bg-red-100 hover:bg-red-200 disabled:opacity-50"
+                    >
+                      <Trash2 className="w-4 h-4 mr-1" />
+                      Delete Selected
+                    </button>
+                  </div>
+                )}
+
                 {/* Mobile Card View */}
                 <div className="md:hidden">
                   {benchmarkEmails.map((email, index) => (
@@ -453,6 +639,12 @@ Best regards,
                       <div className="space-y-3">
                         {/* Header with status */}
                         <div className="flex justify-between items-start">
+                          <input
+                            type="checkbox"
+                            checked={selectedEmailSet.has(email.email)}
+                            onChange={() => toggleEmailSelection(email.email)}
+                            className="mt-1 mr-3"
+                          />
                           <div className="flex-1 min-w-0">
                             <h3 className="font-medium text-base truncate">{email.email}</h3>
                             <p className="text-sm text-gray-600">{email.region}</p>
@@ -531,6 +723,13 @@ Best regards,
                   <table className="w-full">
                     <thead>
                       <tr className="bg-gray-50">
+                        <th className="px-4 py-2 text-left">
+                          <input
+                            type="checkbox"
+                            checked={selectedEmails.length === benchmarkEmails.length}
+                            onChange={toggleSelectAll}
+                          />
+                        </th>
                         <th className="px-4 py-2 text-left">Email</th>
                         <th className="px-4 py-2 text-left">Region</th>
                         <th className="px-4 py-2 text-center">Status</th>
@@ -540,6 +739,13 @@ Best regards,
                     <tbody>
                       {benchmarkEmails.map((email, index) => (
                         <tr key={index} className="border-t hover:bg-gray-50">
+                          <td className="px-4 py-2">
+                            <input
+                              type="checkbox"
+                              checked={selectedEmailSet.has(email.email)}
+                              onChange={() => toggleEmailSelection(email.email)}
+                            />
+                          </td>
                           <td className="px-4 py-2">{email.email}</td>
                           <td className="px-4 py-2">{email.region}</td>
                           <td className="px-4 py-2 text-center">
@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { Edit, Trash2 } from 'lucide-react';
+import conditionalFetch from '../utils/conditionalFetch';
 
 const ManagerSection = ({ businessDetails }) => {
   const [managers, setManagers] = useState([]);
@@ -38,7 +39,7 @@ const ManagerSection = ({ businessDetails }) => {
     
     setLoading(true);
     try {
-      const response = await fetch(`/api/businesses/${businessDetails.business.id}/managers/`);
+      const response = await conditionalFetch(`/api/businesses/${businessDetails.business.id}/managers/`);
       if (!response.ok) throw new Error('Failed to fetch managers');
       const data = await response.json();
       setManagers(data.managers);
@@ -6,6 +6,7 @@ import {
   Clipboard, Coffee, FileText, Heart, HelpCircle, 
   MessageCircle, Star, Target, ThumbsUp, Settings
 } from 'lucide-react';
+import conditionalFetch from '../utils/conditionalFetch';
 
 const TrainingMaterialsManager = ({ businessId }) => {
     const [trainingMaterials, setTrainingMaterials] = useState([]);
@@ -110,7 +111,7 @@ const TrainingMaterialsManager = ({ businessId }) => {
         
         try {
             // Attempt to call the real API endpoint
-            const response = await fetch(`/api/training-materials/`);
+            const response = await conditionalFetch(`/api/training-materials/`);
             
             if (response.ok) {
                 const data = await response.json();
@@ -0,0 +1,47 @@
+// Client for the delta-sync change feed (/api/businesses/<id>/changes/).
+//
+// Components take a cursor before their full load, then after a mutation ask
+// for the changes since that cursor and patch their local lists with
+// applyChanges instead of refetching everything.
+
+export const fetchChangeCursor = async (businessId) => {
+  const response = await fetch(`/api/businesses/${businessId}/changes/`);
+  if (!response.ok) throw new Error('Failed to fetch change cursor');
+  const data = await response.json();
+  return data.cursor;
+};
+
+export const fetchChanges = async (businessId, since, collections = []) => {
+  const params = new URLSearchParams({ since: String(since) });
+  if (collections.length > 0) {
+    params.set('collections', collections.join(','));
+  }
+
+  const response = await fetch(`/api/businesses/${businessId}/changes/?${params.toString()}`);
+  if (!response.ok) throw new Error('Failed to fetch changes');
+  return response.json();
+};
+
+// Merge one collection's changes into a list of records keyed by id.
+// New records are added at the start (newest-first lists) or the end; pass
+// insert: false to only patch and remove records already in the list.
+export const applyChanges = (items, change, { insert = true, position = 'end' } = {}) => {
+  if (!change) return items;
+
+  const deleted = new Set(change.deleted);
+  const upserted = new Map(change.upserted.map(item => [item.id, item]));
+
+  const patched = items
+    .filter(item => !deleted.has(item.id))
+    .map(item => {
+      if (!upserted.has(item.id)) return item;
+      const updated = { ...item, ...upserted.get(item.id) };
+      upserted.delete(item.id);
+      return updated;
+    });
+
+  if (!insert || upserted.size === 0) return patched;
+
+  const added = Array.from(upserted.values());
+  return position === 'start' ? [...added, ...patched] : [...patched, ...added];
+};
@@ -0,0 +1,42 @@
+// Conditional GET helper for the admin JSON APIs.
+//
+// Remembers the ETag and body of each successful GET and sends If-None-Match
+// on the next request for the same URL. When the server answers 304 the
+// remembered body is replayed as a normal 200 response, so callers can keep
+// using response.ok / response.json() unchanged.
+
+const responseCache = new Map();
+
+export const conditionalFetch = async (url, options = {}) => {
+  const method = (options.method || 'GET').toUpperCase();
+  if (method !== 'GET') {
+    return fetch(url, options);
+  }
+
+  const cached = responseCache.get(url);
+  const headers = { ...(options.headers || {}) };
+  if (cached) {
+    headers['If-None-Match'] = cached.etag;
+  }
+
+  const response = await fetch(url, { ...options, headers });
+
+  if (response.status === 304 && cached) {
+    return new Response(cached.body, {
+      status: 200,
+      headers: { 'Content-Type': 'application/json', 'ETag': cached.etag }
+    });
+  }
+
+  const etag = response.headers.get('ETag');
+  if (response.ok && etag) {
+    const body = await response.clone().text();
+    responseCache.set(url, { etag, body });
+  } else if (!response.ok) {
+    responseCache.delete(url);
+  }
+
+  return response;
+};
+
+export default conditionalFetch;